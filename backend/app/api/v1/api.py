@@ -2,7 +2,7 @@ from fastapi import APIRouter
 from app.api.v1.endpoints import (
     meta_tags, global_keywords, scenario_keywords, rule_policy, scenarios,
     auth, playground, performance, users, staging, permissions, audit_logs, sso,
-    roles
+    roles, keyword_duplicates, keyword_redundancy, maintenance
 )
 
 api_router = APIRouter()
@@ -15,8 +15,11 @@ api_router.include_router(audit_logs.router, prefix="/audit-logs", tags=["audit-
 api_router.include_router(staging.router, prefix="/staging", tags=["staging"])
 api_router.include_router(meta_tags.router, prefix="/tags", tags=["tags"])
 api_router.include_router(global_keywords.router, prefix="/keywords/global", tags=["global-keywords"])
+api_router.include_router(keyword_duplicates.router, prefix="/keywords/duplicates", tags=["keyword-duplicates"])
+api_router.include_router(keyword_redundancy.router, prefix="/keywords/redundancy", tags=["keyword-redundancy"])
 api_router.include_router(scenario_keywords.router, prefix="/keywords/scenario", tags=["scenario-keywords"])
 api_router.include_router(rule_policy.router, prefix="/policies", tags=["rule-policies"])
 api_router.include_router(scenarios.router, prefix="/apps", tags=["apps"])
 api_router.include_router(playground.router, prefix="/playground", tags=["playground"])
 api_router.include_router(performance.router, prefix="/performance", tags=["performance"])
+api_router.include_router(maintenance.router, prefix="/maintenance", tags=["maintenance"])
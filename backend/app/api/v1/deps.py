@@ -1,14 +1,14 @@
 from typing import List, Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import BaseModel
-from sqlalchemy import select, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.db import get_db
 from app.models.db_meta import User
+from app.services.auth_tokens import REFRESHED_TOKEN_HEADER, authenticate
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"/api/v1/login/access-token"
@@ -86,12 +86,16 @@ async def get_current_user(token: str = Depends(reusable_oauth2)) -> str:
 
 
 async def get_current_user_full(
+    response: Response,
     token: str = Depends(reusable_oauth2),
     db: AsyncSession = Depends(get_db)
 ) -> User:
     """
     获取完整的当前用户对象（支持SSO和传统登录）
 
+    令牌带用户声明且权限版本号未变化时直接由声明构造用户（不查询数据库），
+    否则按主键（旧令牌按 user_id / username）查询；版本号变化时新令牌通过 X-Access-Token 响应头下发。
+
     Args:
         token: JWT Token
         db: 数据库会话
@@ -119,12 +123,7 @@ async def get_current_user_full(
     except JWTError:
         raise credentials_exception
 
-    # 查询数据库获取完整用户信息（支持user_id和username两种方式）
-    query = select(User).where(
-        or_(User.user_id == sub, User.username == sub)
-    )
-    result = await db.execute(query)
-    user = result.scalars().first()
+    user, refreshed_token = await authenticate(payload, db)
 
     if not user:
         raise HTTPException(
@@ -138,6 +137,9 @@ async def get_current_user_full(
             detail="Inactive user"
         )
 
+    if refreshed_token:
+        response.headers[REFRESHED_TOKEN_HEADER] = refreshed_token
+
     return user
 
 
@@ -194,19 +196,11 @@ def require_scenario_permission(permission: str):
         current_user: User = Depends(get_current_user_full),
         db: AsyncSession = Depends(get_db)
     ) -> User:
-        from app.services.permission import PermissionService
-
-        # SYSTEM_ADMIN 有所有权限
-        if current_user.role == "SYSTEM_ADMIN":
-            return current_user
-
-        # 其他角色需要检查权限
-        perm_service = PermissionService(db)
-        has_perm = await perm_service.check_scenario_permission(
-            current_user.id, scenario_id, permission
-        )
+        from app.services.authorization import get_authorization_context
 
-        if not has_perm:
+        # SYSTEM_ADMIN 有所有权限，其他角色检查 V1 细粒度权限
+        context = await get_authorization_context(current_user, db)
+        if not context.v1_has_permission(scenario_id, permission):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Missing permission: {permission} for scenario: {scenario_id}"
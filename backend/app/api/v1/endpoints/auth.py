@@ -1,8 +1,9 @@
 from datetime import timedelta
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
@@ -10,6 +11,7 @@ from app.core.config import settings
 from app.core.security import create_access_token, verify_password, get_password_hash
 from app.core.db import get_db
 from app.models.db_meta import User
+from app.services.auth_sessions import AuthSessionService
 
 router = APIRouter()
 
@@ -19,8 +21,13 @@ HARDCODED_USERNAME = "llm_guard"
 HARDCODED_HASHED_PASSWORD = "$2b$12$kL2oKnM0Qs5jNa3dT/GDbegCYyG5VpTCrgwgQkq/czEwuFQNfzAY."
 
 
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
+
 @router.post("/access-token", response_model=dict)
 async def login_access_token(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
@@ -53,7 +60,19 @@ async def login_access_token(
             )
         if not user.is_active:
              raise HTTPException(status_code=400, detail="Inactive user")
-        user_role = user.role
+        tokens = await AuthSessionService(db).issue_tokens(
+            user,
+            subject=username,
+            user_agent=request.headers.get("user-agent"),
+            ip_address=request.client.host if request.client else None
+        )
+        return {
+            "access_token": tokens["access_token"],
+            "refresh_token": tokens["refresh_token"],
+            "token_type": "bearer",
+            "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            "role": user.role
+        }
 
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return {
@@ -62,4 +81,40 @@ async def login_access_token(
         ),
         "token_type": "bearer",
         "role": user_role
-    }
\ No newline at end of file
+    }
+
+
+@router.post("/refresh", response_model=dict)
+async def refresh_access_token(
+    refresh_in: RefreshTokenRequest,
+    db: AsyncSession = Depends(get_db)
+) -> Any:
+    """
+    Exchange a refresh token for a new access token; the refresh token is rotated
+    """
+    try:
+        tokens = await AuthSessionService(db).refresh(refresh_in.refresh_token)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return {
+        "access_token": tokens["access_token"],
+        "refresh_token": tokens["refresh_token"],
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    }
+
+
+@router.post("/logout", response_model=dict)
+async def logout(
+    refresh_in: RefreshTokenRequest,
+    db: AsyncSession = Depends(get_db)
+) -> Any:
+    """
+    Revoke the session of the given refresh token
+    """
+    revoked = await AuthSessionService(db).logout(refresh_in.refresh_token)
+    return {"message": "Logged out" if revoked else "Session not found"}
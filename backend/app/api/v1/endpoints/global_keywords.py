@@ -1,10 +1,21 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import List, Any, Optional, Literal
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.db import get_db
-from app.schemas.global_keywords import GlobalKeywordsResponse, GlobalKeywordsCreate, GlobalKeywordsUpdate
+from app.schemas.global_keywords import (
+    GlobalKeywordsResponse, GlobalKeywordsCreate, GlobalKeywordsUpdate, GlobalKeywordsSearchResponse
+)
+from app.schemas.bulk_job import BulkJobResponse
 from app.services.global_keywords import GlobalKeywordsService
+from app.services.keyword_import import (
+    KeywordImportService, JOB_TYPE_GLOBAL_IMPORT,
+    detect_format, iter_records, iter_text_lines, iter_upload_blocks
+)
 from app.services.audit import AuditService
+from app.services.library_export import (
+    global_keywords_spec, stream_export, export_media_type, export_filename
+)
 from app.api.v1.deps import get_current_user, get_current_user_full, require_role
 from app.models.db_meta import User
 
@@ -23,6 +34,47 @@ async def read_keywords(
     service = GlobalKeywordsService(db)
     return await service.get_all_keywords(skip, limit, keyword=q, tag_code=tag)
 
+@router.get("/search", response_model=GlobalKeywordsSearchResponse)
+async def search_keywords(
+    q: str = Query(..., min_length=1, max_length=255, description="检索词（子串匹配，单字为前缀匹配）"),
+    tag: Optional[List[str]] = Query(None, description="标签过滤，可传多个"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    current_user: str = Depends(get_current_user)
+) -> Any:
+    """检索全局敏感词，按相关度排序并返回总数（所有角色可访问）"""
+    service = GlobalKeywordsService(db)
+    return await service.search_keywords(q, tag_codes=tag, skip=skip, limit=limit)
+
+@router.get("/export")
+async def export_keywords(
+    request: Request,
+    format: Literal["csv", "jsonl"] = Query("csv", description="导出格式"),
+    compress: bool = Query(False, description="是否 gzip 压缩"),
+    tag: Optional[str] = Query(None, description="按标签过滤"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["SYSTEM_ADMIN", "AUDITOR"]))
+) -> Any:
+    """流式导出全局敏感词库（SYSTEM_ADMIN 和 AUDITOR）"""
+    spec = global_keywords_spec(tag_code=tag)
+
+    # 记录审计日志
+    audit_service = AuditService(db)
+    await audit_service.log_export(
+        user_id=current_user.id,
+        username=current_user.username,
+        resource_type="GLOBAL_KEYWORD",
+        details={"format": format, "compress": compress, **spec.details},
+        request=request
+    )
+
+    return StreamingResponse(
+        stream_export(spec, format, compress),
+        media_type=export_media_type(format, compress),
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(spec, format, compress)}"'}
+    )
+
 @router.post("/", response_model=GlobalKeywordsResponse)
 async def create_keyword(
     keyword_in: GlobalKeywordsCreate,
@@ -50,6 +102,65 @@ async def create_keyword(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/import", response_model=BulkJobResponse)
+async def import_keywords(
+    request: Request,
+    file: UploadFile = File(..., description="CSV（含表头 keyword,tag_code,risk_level[,is_active]）或 JSONL 文件"),
+    format: Optional[str] = Query(None, description="csv 或 jsonl，默认按文件扩展名识别"),
+    on_conflict: Literal["update", "skip"] = Query("update", description="已存在的关键词：更新或跳过"),
+    job_id: Optional[str] = Query(None, description="续传失败任务时传入原任务ID"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["SYSTEM_ADMIN"]))
+) -> Any:
+    """批量导入全局敏感词（仅 SYSTEM_ADMIN），流式解析、分批去重写入，可断点续传"""
+    service = KeywordImportService(db)
+    try:
+        fmt = detect_format(file.filename, format)
+        job = await service.prepare_job(
+            JOB_TYPE_GLOBAL_IMPORT,
+            source_name=file.filename,
+            created_by=current_user.id,
+            job_id=job_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    records = iter_records(iter_text_lines(iter_upload_blocks(file)), fmt)
+    job = await service.import_global_keywords(job, records, update_existing=(on_conflict == "update"))
+
+    # 记录审计日志
+    audit_service = AuditService(db)
+    await audit_service.log_create(
+        user_id=current_user.id,
+        username=current_user.username,
+        resource_type="GLOBAL_KEYWORD_IMPORT",
+        resource_id=job.id,
+        details={
+            "file": file.filename,
+            "status": job.status,
+            "inserted": job.inserted_rows,
+            "updated": job.updated_rows,
+            "skipped": job.skipped_rows,
+            "errors": job.error_rows,
+        },
+        request=request
+    )
+
+    return job
+
+@router.get("/import/{job_id}", response_model=BulkJobResponse)
+async def get_import_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["SYSTEM_ADMIN"]))
+) -> Any:
+    """查询全局敏感词导入任务进度（仅 SYSTEM_ADMIN）"""
+    service = KeywordImportService(db)
+    job = await service.get_job(job_id)
+    if not job or job.job_type != JOB_TYPE_GLOBAL_IMPORT:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
 @router.put("/{keyword_id}", response_model=GlobalKeywordsResponse)
 async def update_keyword(
     keyword_id: str,
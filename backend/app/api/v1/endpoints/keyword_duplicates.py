@@ -0,0 +1,135 @@
+from typing import Any, Optional, Literal
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.db import get_db
+from app.schemas.bulk_job import BulkJobResponse
+from app.schemas.keyword_duplicate import (
+    KeywordDuplicatePairResponse, KeywordDuplicatePairListResponse, KeywordDuplicateMergeRequest
+)
+from app.services.keyword_duplicates import KeywordDuplicateService, run_duplicate_scan
+from app.services.audit import AuditService
+from app.api.v1.deps import require_role
+from app.models.db_meta import User
+
+router = APIRouter()
+
+@router.post("/scan", response_model=BulkJobResponse)
+async def start_duplicate_scan(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["SYSTEM_ADMIN"]))
+) -> Any:
+    """启动变体/近似重复扫描任务（仅 SYSTEM_ADMIN），后台执行，通过 GET /scan/{job_id} 查询进度"""
+    service = KeywordDuplicateService(db)
+    try:
+        job = await service.create_scan_job(created_by=current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    background_tasks.add_task(run_duplicate_scan, job.id)
+
+    # 记录审计日志
+    audit_service = AuditService(db)
+    await audit_service.log_create(
+        user_id=current_user.id,
+        username=current_user.username,
+        resource_type="KEYWORD_DUPLICATE_SCAN",
+        resource_id=job.id,
+        request=request
+    )
+
+    return job
+
+@router.get("/scan/{job_id}", response_model=BulkJobResponse)
+async def get_duplicate_scan(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["SYSTEM_ADMIN", "AUDITOR"]))
+) -> Any:
+    """查询扫描任务进度"""
+    service = KeywordDuplicateService(db)
+    job = await service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Scan job not found")
+    return job
+
+@router.get("/", response_model=KeywordDuplicatePairListResponse)
+async def list_duplicate_pairs(
+    status: Optional[Literal["OPEN", "MERGED", "DISMISSED"]] = Query("OPEN"),
+    source: Optional[Literal["GLOBAL", "SCENARIO", "STAGING"]] = Query(None, description="涉及的词库来源"),
+    scenario_id: Optional[str] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["SYSTEM_ADMIN", "AUDITOR"]))
+) -> Any:
+    """获取变体/近似重复候选列表"""
+    service = KeywordDuplicateService(db)
+    return await service.list_pairs(status, source, scenario_id, skip, limit)
+
+@router.post("/{pair_id}/merge", response_model=KeywordDuplicatePairResponse)
+async def merge_duplicate_pair(
+    pair_id: str,
+    merge_in: KeywordDuplicateMergeRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["SYSTEM_ADMIN"]))
+) -> Any:
+    """合并候选对：保留一方，删除另一方（仅 SYSTEM_ADMIN）"""
+    service = KeywordDuplicateService(db)
+    try:
+        pair = await service.merge_pair(
+            pair_id, merge_in.keep, current_user.username,
+            include_policy_referenced=merge_in.include_policy_referenced
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    kept, dropped = ("a", "b") if merge_in.keep == "a" else ("b", "a")
+
+    # 记录审计日志
+    audit_service = AuditService(db)
+    await audit_service.log_delete(
+        user_id=current_user.id,
+        username=current_user.username,
+        resource_type=f"{getattr(pair, f'source_{dropped}')}_KEYWORD",
+        resource_id=getattr(pair, f"id_{dropped}"),
+        scenario_id=pair.scenario_id,
+        details={
+            "merged_into": getattr(pair, f"id_{kept}"),
+            "keyword": getattr(pair, f"keyword_{dropped}"),
+            "kept_keyword": getattr(pair, f"keyword_{kept}"),
+            "pair_id": pair.id,
+        },
+        request=request
+    )
+
+    return pair
+
+@router.post("/{pair_id}/dismiss", response_model=KeywordDuplicatePairResponse)
+async def dismiss_duplicate_pair(
+    pair_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["SYSTEM_ADMIN"]))
+) -> Any:
+    """标记候选对为非重复（仅 SYSTEM_ADMIN）"""
+    service = KeywordDuplicateService(db)
+    try:
+        pair = await service.dismiss_pair(pair_id, current_user.username)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # 记录审计日志
+    audit_service = AuditService(db)
+    await audit_service.log_update(
+        user_id=current_user.id,
+        username=current_user.username,
+        resource_type="KEYWORD_DUPLICATE_PAIR",
+        resource_id=pair.id,
+        details={"status": pair.status},
+        request=request
+    )
+
+    return pair
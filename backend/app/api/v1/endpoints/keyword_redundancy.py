@@ -0,0 +1,134 @@
+from typing import Any, Optional, Literal
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.db import get_db
+from app.schemas.bulk_job import BulkJobResponse
+from app.schemas.keyword_redundancy import (
+    KeywordRedundancyListResponse, KeywordRedundancyCleanupRequest, KeywordRedundancyCleanupResponse
+)
+from app.services.keyword_redundancy import KeywordRedundancyService, run_redundancy_scan
+from app.services.audit import AuditService
+from app.api.v1.deps import get_current_user_full, require_role
+from app.api.v1.permission_helpers import check_scenario_access_or_403
+from app.models.db_meta import User
+
+router = APIRouter()
+
+RedundancyKind = Literal["EXACT", "SUBSUMED", "WHITELIST_OVERRIDES_GLOBAL", "WHITE_BLACK_CONFLICT"]
+
+@router.post("/scan", response_model=BulkJobResponse)
+async def start_redundancy_scan(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    scenario_id: Optional[str] = Query(None, description="只分析指定场景，默认全部场景"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["SYSTEM_ADMIN"]))
+) -> Any:
+    """启动场景敏感词冗余分析任务（仅 SYSTEM_ADMIN），后台执行"""
+    service = KeywordRedundancyService(db)
+    try:
+        job = await service.create_scan_job(created_by=current_user.id, scenario_id=scenario_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    background_tasks.add_task(run_redundancy_scan, job.id)
+
+    # 记录审计日志
+    audit_service = AuditService(db)
+    await audit_service.log_create(
+        user_id=current_user.id,
+        username=current_user.username,
+        resource_type="KEYWORD_REDUNDANCY_SCAN",
+        resource_id=job.id,
+        scenario_id=scenario_id,
+        request=request
+    )
+
+    return job
+
+@router.get("/scan/{job_id}", response_model=BulkJobResponse)
+async def get_redundancy_scan(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["SYSTEM_ADMIN", "AUDITOR"]))
+) -> Any:
+    """查询分析任务进度"""
+    service = KeywordRedundancyService(db)
+    job = await service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Scan job not found")
+    return job
+
+@router.get("/", response_model=KeywordRedundancyListResponse)
+async def list_redundancies(
+    scenario_id: Optional[str] = Query(None),
+    kind: Optional[RedundancyKind] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["SYSTEM_ADMIN", "AUDITOR"]))
+) -> Any:
+    """获取最近一次批量分析的结果"""
+    service = KeywordRedundancyService(db)
+    return await service.list_findings(scenario_id, kind, skip, limit)
+
+@router.get("/scenario/{scenario_id}", response_model=KeywordRedundancyListResponse)
+async def analyze_scenario_redundancy(
+    scenario_id: str,
+    kind: Optional[RedundancyKind] = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_full)
+) -> Any:
+    """实时分析单个场景的冗余与冲突关键词"""
+    # 权限检查：需要有场景敏感词权限
+    await check_scenario_access_or_403(current_user, scenario_id, db, permission="scenario_keywords")
+
+    service = KeywordRedundancyService(db)
+    findings = await service.analyze_scenario(scenario_id)
+    if kind:
+        findings = [f for f in findings if f.kind == kind]
+    return {"total": len(findings), "items": findings}
+
+@router.post("/scenario/{scenario_id}/cleanup", response_model=KeywordRedundancyCleanupResponse)
+async def cleanup_scenario_redundancy(
+    scenario_id: str,
+    cleanup_in: KeywordRedundancyCleanupRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_full)
+) -> Any:
+    """一键删除场景中被全局词库覆盖的冗余关键词（dry_run=true 时只返回将被删除的行）"""
+    # 权限检查：需要有场景敏感词权限
+    await check_scenario_access_or_403(current_user, scenario_id, db, permission="scenario_keywords")
+
+    service = KeywordRedundancyService(db)
+    try:
+        result = await service.cleanup_scenario(
+            scenario_id,
+            kinds=cleanup_in.kinds,
+            include_tag_overrides=cleanup_in.include_tag_overrides,
+            keyword_ids=cleanup_in.keyword_ids,
+            dry_run=cleanup_in.dry_run,
+            include_policy_referenced=cleanup_in.include_policy_referenced
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if result["deleted_count"]:
+        # 记录审计日志
+        audit_service = AuditService(db)
+        await audit_service.log_delete(
+            user_id=current_user.id,
+            username=current_user.username,
+            resource_type="SCENARIO_KEYWORD",
+            resource_id=scenario_id,
+            scenario_id=scenario_id,
+            details={
+                "reason": "redundancy_cleanup",
+                "deleted_count": result["deleted_count"],
+                "keywords": [f.keyword for f in result["items"]][:100],
+            },
+            request=request
+        )
+
+    return result
@@ -0,0 +1,46 @@
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.db import get_db
+from app.services.maintenance import scheduler
+from app.services.scheduler import JobLockedError
+from app.services.audit import AuditService
+from app.api.v1.deps import require_role
+from app.models.db_meta import User
+
+router = APIRouter()
+
+@router.get("/scheduler")
+async def get_scheduler_status(
+    current_user: User = Depends(require_role(["SYSTEM_ADMIN", "AUDITOR"]))
+) -> Any:
+    """查询本副本的定时任务调度状态与运行指标（是否为主副本、各任务最近一次执行结果）"""
+    return scheduler.status()
+
+@router.post("/jobs/{job_name}/run")
+async def run_maintenance_job(
+    job_name: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["SYSTEM_ADMIN"]))
+) -> Any:
+    """在本副本立即执行一次维护任务（仅 SYSTEM_ADMIN），与定时执行共用任务锁，正在执行时返回 409"""
+    try:
+        result = await scheduler.run_job(job_name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Maintenance job not found")
+    except JobLockedError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    # 记录审计日志
+    audit_service = AuditService(db)
+    await audit_service.log_create(
+        user_id=current_user.id,
+        username=current_user.username,
+        resource_type="MAINTENANCE_JOB",
+        resource_id=job_name,
+        details=result,
+        request=request
+    )
+
+    return result
@@ -1,10 +1,14 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import List, Any, Literal
+from fastapi import APIRouter, Depends, HTTPException, Request, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.db import get_db
 from app.schemas.meta_tags import MetaTagsResponse, MetaTagsCreate, MetaTagsUpdate
 from app.services.meta_tags import MetaTagsService
 from app.services.audit import AuditService
+from app.services.library_export import (
+    meta_tags_spec, stream_export, export_media_type, export_filename
+)
 from app.api.v1.deps import get_current_user, get_current_user_full, require_role
 from app.models.db_meta import User
 
@@ -21,6 +25,33 @@ async def read_tags(
     service = MetaTagsService(db)
     return await service.get_all_tags(skip, limit)
 
+@router.get("/export")
+async def export_tags(
+    request: Request,
+    format: Literal["csv", "jsonl"] = Query("csv", description="导出格式"),
+    compress: bool = Query(False, description="是否 gzip 压缩"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["SYSTEM_ADMIN", "AUDITOR"]))
+) -> Any:
+    """流式导出标签（SYSTEM_ADMIN 和 AUDITOR）"""
+    spec = meta_tags_spec()
+
+    # 记录审计日志
+    audit_service = AuditService(db)
+    await audit_service.log_export(
+        user_id=current_user.id,
+        username=current_user.username,
+        resource_type="META_TAG",
+        details={"format": format, "compress": compress},
+        request=request
+    )
+
+    return StreamingResponse(
+        stream_export(spec, format, compress),
+        media_type=export_media_type(format, compress),
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(spec, format, compress)}"'}
+    )
+
 @router.post("/", response_model=MetaTagsResponse)
 async def create_tag(
     tag_in: MetaTagsCreate,
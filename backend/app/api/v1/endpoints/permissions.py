@@ -10,6 +10,7 @@ from app.core.db import get_db
 from app.api.v1.deps import get_current_user_full
 from app.models.db_meta import User
 from app.services.permission import PermissionService
+from app.services.authorization import get_authorization_context
 from app.schemas.permission import (
     UserPermissionsResponse,
     PermissionCheckRequest,
@@ -50,11 +51,7 @@ async def check_permission(
     Returns:
         是否有权限
     """
-    perm_service = PermissionService(db)
-    has_permission = await perm_service.check_scenario_permission(
-        current_user.id,
-        request.scenario_id,
-        request.permission
-    )
+    context = await get_authorization_context(current_user, db)
+    has_permission = context.v1_has_permission(request.scenario_id, request.permission)
 
     return {"has_permission": has_permission}
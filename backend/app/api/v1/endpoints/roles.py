@@ -10,7 +10,7 @@ from app.models.db_meta import Role, User
 from app.repositories.role import RoleRepository, PermissionRepository
 from app.schemas.role import (
     RoleCreate, RoleUpdate, RoleResponse, RoleDetailResponse,
-    PermissionResponse, RolePermissionUpdate
+    PermissionResponse, RolePermissionUpdate, RolePermissionMatrixUpdate
 )
 
 router = APIRouter()
@@ -33,11 +33,10 @@ async def list_roles(
 ) -> Any:
     """获取角色列表"""
     repo = RoleRepository(db)
-    roles = await repo.get_all(active_only=False)
+    roles = await repo.get_all_with_permission_counts(active_only=False)
 
     result = []
-    for role in roles:
-        count = await repo.get_role_permission_count(role.id)
+    for role, count in roles:
         result.append(RoleResponse(
             id=role.id,
             role_code=role.role_code,
@@ -191,8 +190,38 @@ async def update_role_permissions(
     if invalid_ids:
         raise HTTPException(status_code=400, detail=f"无效的权限ID: {invalid_ids}")
 
-    await repo.update_role_permissions(role_id, perm_in.permission_ids)
-    return {"message": "权限已更新", "count": len(perm_in.permission_ids)}
+    stats = await repo.update_role_permissions(role_id, perm_in.permission_ids)
+    return {"message": "权限已更新", "count": len(perm_in.permission_ids), **stats}
+
+
+@router.put("/permissions/matrix")
+async def update_permission_matrix(
+    matrix_in: RolePermissionMatrixUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_full)
+) -> Any:
+    """批量编辑角色-权限矩阵（所列角色的权限整体替换，单事务）"""
+    _check_admin(current_user)
+
+    repo = RoleRepository(db)
+    roles = await repo.get_by_ids(list(matrix_in.matrix))
+    missing_roles = set(matrix_in.matrix) - set(roles)
+    if missing_roles:
+        raise HTTPException(status_code=404, detail=f"角色不存在: {missing_roles}")
+
+    requested = {perm_id for perm_ids in matrix_in.matrix.values() for perm_id in perm_ids}
+    valid_perms = await PermissionRepository(db).get_by_ids(list(requested)) if requested else []
+    invalid_ids = requested - {p.id for p in valid_perms}
+    if invalid_ids:
+        raise HTTPException(status_code=400, detail=f"无效的权限ID: {invalid_ids}")
+
+    stats = await repo.replace_permission_matrix(matrix_in.matrix)
+    return {
+        "message": "权限矩阵已更新",
+        "added": sum(s["added"] for s in stats.values()),
+        "removed": sum(s["removed"] for s in stats.values()),
+        "roles": stats
+    }
 
 
 # ============================================
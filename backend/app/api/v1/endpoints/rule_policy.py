@@ -1,5 +1,6 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import List, Any, Literal
+from fastapi import APIRouter, Depends, HTTPException, Request, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.db import get_db
 from app.schemas.rule_policy import (
@@ -8,6 +9,9 @@ from app.schemas.rule_policy import (
 )
 from app.services.rule_policy import RulePolicyService
 from app.services.audit import AuditService
+from app.services.library_export import (
+    scenario_policies_spec, global_defaults_spec, stream_export, export_media_type, export_filename
+)
 from app.api.v1.deps import get_current_user, get_current_user_full, require_role
 from app.api.v1.permission_helpers import check_scenario_access_or_403
 from app.models.db_meta import User
@@ -29,6 +33,38 @@ async def read_scenario_policies(
     service = RulePolicyService(db)
     return await service.get_scenario_policies(scenario_id)
 
+@router.get("/scenario/{scenario_id}/export")
+async def export_scenario_policies(
+    scenario_id: str,
+    request: Request,
+    format: Literal["csv", "jsonl"] = Query("csv", description="导出格式"),
+    compress: bool = Query(False, description="是否 gzip 压缩"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_full)
+) -> Any:
+    """流式导出场景策略"""
+    # 权限检查：需要有场景策略权限
+    await check_scenario_access_or_403(current_user, scenario_id, db, permission="scenario_policies")
+
+    spec = scenario_policies_spec(scenario_id)
+
+    # 记录审计日志
+    audit_service = AuditService(db)
+    await audit_service.log_export(
+        user_id=current_user.id,
+        username=current_user.username,
+        resource_type="SCENARIO_POLICY",
+        scenario_id=scenario_id,
+        details={"format": format, "compress": compress},
+        request=request
+    )
+
+    return StreamingResponse(
+        stream_export(spec, format, compress),
+        media_type=export_media_type(format, compress),
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(spec, format, compress)}"'}
+    )
+
 @router.post("/scenario/", response_model=RuleScenarioPolicyResponse)
 async def create_scenario_policy(
     policy_in: RuleScenarioPolicyCreate,
@@ -150,6 +186,33 @@ async def read_global_defaults(
     service = RulePolicyService(db)
     return await service.get_all_global_defaults(skip, limit)
 
+@router.get("/defaults/export")
+async def export_global_defaults(
+    request: Request,
+    format: Literal["csv", "jsonl"] = Query("csv", description="导出格式"),
+    compress: bool = Query(False, description="是否 gzip 压缩"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["SYSTEM_ADMIN", "AUDITOR"]))
+) -> Any:
+    """流式导出全局默认规则（SYSTEM_ADMIN 和 AUDITOR）"""
+    spec = global_defaults_spec()
+
+    # 记录审计日志
+    audit_service = AuditService(db)
+    await audit_service.log_export(
+        user_id=current_user.id,
+        username=current_user.username,
+        resource_type="GLOBAL_DEFAULT_POLICY",
+        details={"format": format, "compress": compress},
+        request=request
+    )
+
+    return StreamingResponse(
+        stream_export(spec, format, compress),
+        media_type=export_media_type(format, compress),
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(spec, format, compress)}"'}
+    )
+
 @router.post("/defaults/", response_model=RuleGlobalDefaultsResponse)
 async def create_global_default(
     default_in: RuleGlobalDefaultsCreate,
@@ -1,10 +1,19 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import List, Any, Optional, Literal
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.db import get_db
 from app.schemas.scenario_keywords import ScenarioKeywordsResponse, ScenarioKeywordsCreate, ScenarioKeywordsUpdate
+from app.schemas.bulk_job import BulkJobResponse
 from app.services.scenario_keywords import ScenarioKeywordsService
+from app.services.keyword_import import (
+    KeywordImportService, JOB_TYPE_SCENARIO_IMPORT,
+    detect_format, iter_records, iter_text_lines, iter_upload_blocks
+)
 from app.services.audit import AuditService
+from app.services.library_export import (
+    scenario_keywords_spec, stream_export, export_media_type, export_filename
+)
 from app.api.v1.deps import get_current_user, get_current_user_full
 from app.api.v1.permission_helpers import check_scenario_access_or_403
 from app.models.db_meta import User
@@ -25,6 +34,39 @@ async def read_scenario_keywords(
     service = ScenarioKeywordsService(db)
     return await service.get_by_scenario(scenario_id, rule_mode)
 
+@router.get("/{scenario_id}/export")
+async def export_scenario_keywords(
+    scenario_id: str,
+    request: Request,
+    format: Literal["csv", "jsonl"] = Query("csv", description="导出格式"),
+    compress: bool = Query(False, description="是否 gzip 压缩"),
+    rule_mode: Optional[int] = Query(None, description="按规则模式过滤"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_full)
+) -> Any:
+    """流式导出场景敏感词"""
+    # 权限检查：需要有场景敏感词权限
+    await check_scenario_access_or_403(current_user, scenario_id, db, permission="scenario_keywords")
+
+    spec = scenario_keywords_spec(scenario_id, rule_mode=rule_mode)
+
+    # 记录审计日志
+    audit_service = AuditService(db)
+    await audit_service.log_export(
+        user_id=current_user.id,
+        username=current_user.username,
+        resource_type="SCENARIO_KEYWORD",
+        scenario_id=scenario_id,
+        details={"format": format, "compress": compress, **spec.details},
+        request=request
+    )
+
+    return StreamingResponse(
+        stream_export(spec, format, compress),
+        media_type=export_media_type(format, compress),
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(spec, format, compress)}"'}
+    )
+
 @router.post("/", response_model=ScenarioKeywordsResponse)
 async def create_scenario_keyword(
     keyword_in: ScenarioKeywordsCreate,
@@ -56,6 +98,76 @@ async def create_scenario_keyword(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/{scenario_id}/import", response_model=BulkJobResponse)
+async def import_scenario_keywords(
+    scenario_id: str,
+    request: Request,
+    file: UploadFile = File(..., description="CSV（含表头 keyword,tag_code[,rule_mode,risk_level,category,is_active]）或 JSONL 文件"),
+    format: Optional[str] = Query(None, description="csv 或 jsonl，默认按文件扩展名识别"),
+    on_conflict: Literal["update", "skip"] = Query("update", description="已存在的关键词：更新或跳过"),
+    job_id: Optional[str] = Query(None, description="续传失败任务时传入原任务ID"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_full)
+) -> Any:
+    """批量导入场景敏感词，流式解析、分批去重写入，可断点续传"""
+    # 权限检查：需要有场景敏感词权限
+    await check_scenario_access_or_403(current_user, scenario_id, db, permission="scenario_keywords")
+
+    service = KeywordImportService(db)
+    try:
+        fmt = detect_format(file.filename, format)
+        job = await service.prepare_job(
+            JOB_TYPE_SCENARIO_IMPORT,
+            source_name=file.filename,
+            created_by=current_user.id,
+            scenario_id=scenario_id,
+            job_id=job_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    records = iter_records(iter_text_lines(iter_upload_blocks(file)), fmt)
+    job = await service.import_scenario_keywords(
+        job, scenario_id, records, update_existing=(on_conflict == "update")
+    )
+
+    # 记录审计日志
+    audit_service = AuditService(db)
+    await audit_service.log_create(
+        user_id=current_user.id,
+        username=current_user.username,
+        resource_type="SCENARIO_KEYWORD_IMPORT",
+        resource_id=job.id,
+        scenario_id=scenario_id,
+        details={
+            "file": file.filename,
+            "status": job.status,
+            "inserted": job.inserted_rows,
+            "updated": job.updated_rows,
+            "skipped": job.skipped_rows,
+            "errors": job.error_rows,
+        },
+        request=request
+    )
+
+    return job
+
+@router.get("/import/{job_id}", response_model=BulkJobResponse)
+async def get_scenario_import_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_full)
+) -> Any:
+    """查询场景敏感词导入任务进度"""
+    service = KeywordImportService(db)
+    job = await service.get_job(job_id)
+    if not job or job.job_type != JOB_TYPE_SCENARIO_IMPORT:
+        raise HTTPException(status_code=404, detail="Import job not found")
+
+    # 权限检查：需要有该任务所属场景的敏感词权限
+    await check_scenario_access_or_403(current_user, job.scenario_id, db, permission="scenario_keywords")
+    return job
+
 @router.put("/{keyword_id}", response_model=ScenarioKeywordsResponse)
 async def update_scenario_keyword(
     keyword_id: str,
@@ -1,8 +1,8 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.db import get_db
-from app.schemas.scenarios import ScenariosResponse, ScenariosCreate, ScenariosUpdate
+from app.schemas.scenarios import ScenariosResponse, ScenariosCreate, ScenariosUpdate, AccessibleScenarioPage
 from app.services.scenarios import ScenariosService
 from app.services.audit import AuditService
 from app.api.v1.deps import get_current_user, get_current_user_full, require_role
@@ -21,6 +21,23 @@ async def read_scenarios(
     service = ScenariosService(db)
     return await service.get_all_scenarios(skip, limit)
 
+@router.get("/accessible", response_model=AccessibleScenarioPage)
+async def read_accessible_scenarios(
+    search: Optional[str] = Query(None, description="按 app_id / app_name 模糊搜索"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_full)
+) -> Any:
+    """
+    获取当前用户有权访问的场景（keyset 分页，附带每个场景的有效权限）
+    """
+    service = ScenariosService(db)
+    try:
+        return await service.list_accessible_scenarios(current_user, search=search, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.post("/", response_model=ScenariosResponse)
 async def create_scenario(
     scenario_in: ScenariosCreate,
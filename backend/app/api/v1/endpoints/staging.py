@@ -1,27 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
+from typing import List, Optional, Union
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, func, and_
+from sqlalchemy import select, and_
 from app.core.db import get_db
-from app.api.v1.deps import get_current_user, get_current_user_full
-from app.models.db_meta import StagingGlobalKeywords, GlobalKeywords, StagingGlobalRules, RuleGlobalDefaults, User
+from app.api.v1.deps import get_current_user, get_current_user_full, require_role
+from app.models.db_meta import StagingGlobalKeywords, StagingGlobalRules, User
+from app.services.staging import StagingService, TASK_MODELS, get_china_now
+from app.services.staging_sync import StagingSyncService, run_staging_sync
+from app.services.staging_ingest import StagingIngestService
+from app.services.staging_auto_accept import StagingAutoAcceptService, run_staging_auto_accept
+from app.services.keyword_import import iter_records, iter_text_lines
+from app.services.audit import AuditService
+from app.schemas.bulk_job import BulkJobResponse
 from pydantic import BaseModel
-from datetime import datetime, timedelta
+from datetime import datetime
 import uuid
-import pytz
 import logging
 
 logger = logging.getLogger(__name__)
 
-# 中国时区
-CHINA_TZ = pytz.timezone('Asia/Shanghai')
-
-def get_china_now():
-    """获取中国时区的当前时间"""
-    return datetime.now(CHINA_TZ)
-
 router = APIRouter()
 
+# 废弃的全量列表接口（GET /keywords、/rules）的分页上限，新代码使用 /{task_type}/page
+LEGACY_LIST_DEFAULT_LIMIT = 1000
+LEGACY_LIST_MAX_LIMIT = 5000
+LEGACY_LIST_HAS_MORE_HEADER = "X-Has-More"  # true 表示本页之后还有数据，需增大 skip 继续请求
+
 # --- Schemas ---
 class StagingKeywordResponse(BaseModel):
     id: str
@@ -32,6 +36,8 @@ class StagingKeywordResponse(BaseModel):
     final_risk: Optional[str]
     status: str
     is_modified: bool
+    confidence: Optional[float] = None
+    priority: float = 0.0
     claimed_by: Optional[str]
     claimed_at: Optional[datetime]
     batch_id: Optional[str]
@@ -50,6 +56,8 @@ class StagingRuleResponse(BaseModel):
     final_strategy: Optional[str]
     status: str
     is_modified: bool
+    confidence: Optional[float] = None
+    priority: float = 0.0
     claimed_by: Optional[str]
     claimed_at: Optional[datetime]
     batch_id: Optional[str]
@@ -60,6 +68,49 @@ class StagingRuleResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class StagingKeywordListItem(BaseModel):
+    id: str
+    keyword: str
+    predicted_tag: str
+    predicted_risk: str
+    final_tag: Optional[str]
+    final_risk: Optional[str]
+    status: str
+    is_modified: bool
+    confidence: Optional[float] = None
+    priority: float = 0.0
+    claimed_by: Optional[str]
+    batch_id: Optional[str]
+    annotator: Optional[str]
+    created_at: datetime
+
+class StagingRuleListItem(BaseModel):
+    id: str
+    tag_code: str
+    extra_condition: Optional[str]
+    predicted_strategy: str
+    final_strategy: Optional[str]
+    status: str
+    is_modified: bool
+    confidence: Optional[float] = None
+    priority: float = 0.0
+    claimed_by: Optional[str]
+    batch_id: Optional[str]
+    annotator: Optional[str]
+    created_at: datetime
+
+class StagingKeywordPage(BaseModel):
+    total: int
+    next_cursor: Optional[str]
+    batch_id: Optional[str]
+    items: List[StagingKeywordListItem]
+
+class StagingRulePage(BaseModel):
+    total: int
+    next_cursor: Optional[str]
+    batch_id: Optional[str]
+    items: List[StagingRuleListItem]
+
 class StagingReviewRequest(BaseModel):
     final_tag: Optional[str] = None
     final_risk: Optional[str] = None
@@ -89,24 +140,269 @@ class BatchRuleReviewRequest(BaseModel):
 class SyncRequest(BaseModel):
     ids: List[str]
 
+class SyncJobRequest(BaseModel):
+    ids: Optional[List[str]] = None  # 为空时同步全部已审核任务
+
+class LibraryChangeResponse(BaseModel):
+    id: str
+    library: str
+    version: int
+    record_id: str
+    record_key: str
+    action: str
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class LibraryChangeListResponse(BaseModel):
+    library: str
+    current_version: int
+    items: List[LibraryChangeResponse]
+
+# --- Helpers ---
+
+async def _review_one(db: AsyncSession, current_user: User, task_type: str, item: dict):
+    try:
+        return await StagingService(db, task_type).review_one(
+            current_user.username, item, is_admin=current_user.role == "SYSTEM_ADMIN"
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# --- Endpoints: Sync ---
+
+async def _sync_now(db: AsyncSession, current_user: User, task_type: str, ids: List[str]) -> dict:
+    if current_user.role != "SYSTEM_ADMIN":
+        raise HTTPException(status_code=403, detail="Only SYSTEM_ADMIN can sync")
+
+    service = StagingSyncService(db, task_type)
+    try:
+        job = await service.create_sync_job(created_by=current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    job = await service.run_sync(job.id, ids)
+    if job.status == "FAILED":
+        raise HTTPException(status_code=500, detail=f"Sync failed after {job.processed_rows} items: {job.message}")
+    return {"synced_count": job.processed_rows, "job_id": job.id, "version": await service.get_current_version()}
+
+async def _start_sync_job(
+    db: AsyncSession, current_user: User, task_type: str,
+    ids: Optional[List[str]], background_tasks: BackgroundTasks
+):
+    if current_user.role != "SYSTEM_ADMIN":
+        raise HTTPException(status_code=403, detail="Only SYSTEM_ADMIN can sync")
+
+    service = StagingSyncService(db, task_type)
+    try:
+        job = await service.create_sync_job(created_by=current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    background_tasks.add_task(run_staging_sync, job.id, task_type, ids)
+    return job
+
+@router.post("/keywords/sync-jobs", response_model=BulkJobResponse)
+async def start_keyword_sync_job(
+    sync_req: SyncJobRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_full)
+):
+    """后台同步关键词到正式库（仅 SYSTEM_ADMIN），通过 GET /sync-jobs/{job_id} 查询进度"""
+    return await _start_sync_job(db, current_user, "keywords", sync_req.ids, background_tasks)
+
+@router.post("/rules/sync-jobs", response_model=BulkJobResponse)
+async def start_rule_sync_job(
+    sync_req: SyncJobRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_full)
+):
+    """后台同步规则到正式库（仅 SYSTEM_ADMIN），通过 GET /sync-jobs/{job_id} 查询进度"""
+    return await _start_sync_job(db, current_user, "rules", sync_req.ids, background_tasks)
+
+@router.get("/sync-jobs/{job_id}", response_model=BulkJobResponse)
+async def get_sync_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: str = Depends(get_current_user)
+):
+    """查询同步任务进度"""
+    job = await StagingSyncService(db).get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+    return job
+
+@router.get("/changes", response_model=LibraryChangeListResponse)
+async def list_library_changes(
+    task_type: str = Query("keywords", description="keywords（全局敏感词库）or rules（全局默认策略）"),
+    since_version: int = Query(0, ge=0, description="上次拉取到的版本号"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=5000),
+    db: AsyncSession = Depends(get_db),
+    current_user: str = Depends(get_current_user)
+):
+    """按版本增量拉取正式库变更（仅包含已封版的版本）"""
+    try:
+        service = StagingSyncService(db, task_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await service.list_changes(since_version, skip, limit)
+
+# --- Endpoints: Ingest ---
+
+@router.post("/{task_type}/ingest", response_model=BulkJobResponse)
+async def ingest_staging_tasks(
+    task_type: str,
+    request: Request,
+    source: Optional[str] = Query(None, description="数据来源（如模型版本、批次文件名），记录在任务中"),
+    job_id: Optional[str] = Query(None, description="续传失败任务时传入原任务ID"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["SYSTEM_ADMIN"]))
+):
+    """
+    流式入库模型预测结果（仅 SYSTEM_ADMIN），请求体为 NDJSON，每行一个 JSON 对象：
+    - keywords: {"keyword", "predicted_tag", "predicted_risk", "confidence"?}
+    - rules: {"tag_code", "predicted_strategy", "extra_condition"?, "confidence"?}
+    文件内重复、待审核表或正式库中已存在的行跳过；置信度越低的任务越先被认领
+    """
+    try:
+        service = StagingIngestService(db, task_type)
+        job = await service.prepare_job(
+            service.job_type,
+            source_name=source,
+            created_by=current_user.id,
+            job_id=job_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    records = iter_records(iter_text_lines(request.stream()), "jsonl")
+    job = await service.ingest(job, records)
+
+    audit_service = AuditService(db)
+    await audit_service.log_create(
+        user_id=current_user.id,
+        username=current_user.username,
+        resource_type="STAGING_INGEST",
+        resource_id=job.id,
+        details={
+            "task_type": task_type,
+            "source": source,
+            "status": job.status,
+            "inserted": job.inserted_rows,
+            "skipped": job.skipped_rows,
+            "errors": job.error_rows,
+        },
+        request=request
+    )
+
+    return job
+
+@router.get("/ingest-jobs/{job_id}", response_model=BulkJobResponse)
+async def get_ingest_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["SYSTEM_ADMIN"]))
+):
+    """查询入库任务进度与行级错误"""
+    job = await StagingIngestService(db).get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingest job not found")
+    return job
+
+# --- Endpoints: Auto-accept ---
+
+@router.post("/{task_type}/auto-accept-jobs", response_model=BulkJobResponse)
+async def start_auto_accept_job(
+    task_type: str,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["SYSTEM_ADMIN"]))
+):
+    """
+    后台预审 PENDING 任务（仅 SYSTEM_ADMIN）：与正式库及人工审核历史一致的任务自动标记为 REVIEWED，
+    其余留给人工审核。通过 GET /auto-accept-jobs/{job_id} 查询进度与吞吐量
+    """
+    try:
+        service = StagingAutoAcceptService(db, task_type)
+        job = await service.create_job(created_by=current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    background_tasks.add_task(run_staging_auto_accept, job.id, task_type)
+    return job
+
+@router.get("/auto-accept-jobs/{job_id}", response_model=BulkJobResponse)
+async def get_auto_accept_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["SYSTEM_ADMIN"]))
+):
+    """查询预审任务进度"""
+    job = await StagingAutoAcceptService(db).get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Auto-accept job not found")
+    return job
+
 # --- Endpoints: Keywords ---
 
-@router.get("/keywords", response_model=List[StagingKeywordResponse])
+@router.get("/{task_type}/page", response_model=Union[StagingKeywordPage, StagingRulePage])
+async def list_staging_page(
+    task_type: str,
+    status: Optional[str] = None,
+    batch_id: Optional[str] = Query(None, description="按认领批次查询"),
+    my_tasks: bool = Query(False, description="只显示我认领的批次（未指定 batch_id 时取当前批次）"),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    limit: int = Query(50, ge=1, le=500),
+    order: str = Query("desc", description="按创建时间排序：asc or desc"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_full)
+):
+    """
+    分页获取智能标注任务（keyset 分页，返回 total 与 next_cursor）
+    权限：所有角色可访问，ANNOTATOR 只能看到自己认领/审核的任务
+    """
+    try:
+        service = StagingService(db, task_type)
+        page = await service.list_tasks(
+            current_user.username, current_user.role,
+            status=status, batch_id=batch_id, my_tasks=my_tasks,
+            cursor=cursor, limit=limit, order=order
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if task_type == "keywords":
+        return StagingKeywordPage(**page)
+    return StagingRulePage(**page)
+
+def _legacy_page(response: Response, rows: list, limit: int) -> list:
+    """多取一行判断是否截断，通过响应头告知调用方（响应体保持数组格式以兼容旧调用方）"""
+    response.headers[LEGACY_LIST_HAS_MORE_HEADER] = "true" if len(rows) > limit else "false"
+    return rows[:limit]
+
+@router.get("/keywords", response_model=List[StagingKeywordResponse], deprecated=True)
 async def list_staging_keywords(
+    response: Response,
     status: Optional[str] = None,
     my_tasks: bool = Query(False, description="只显示我认领的任务"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(LEGACY_LIST_DEFAULT_LIMIT, ge=1, le=LEGACY_LIST_MAX_LIMIT),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user_full)
 ):
     """
-    获取智能标注关键词列表
+    获取智能标注关键词列表（已废弃，请使用 /keywords/page 的 keyset 分页）
     权限：所有角色可访问，但根据角色过滤数据
+    单次最多返回 LEGACY_LIST_MAX_LIMIT 条，响应头 X-Has-More 为 true 时结果被截断
     """
     user_role = current_user.role
 
-    # 调试日志
-    logger.info(f"[KEYWORDS] current_user: {current_user.username}, user_role: {user_role}, status: {status}")
-
     stmt = select(StagingGlobalKeywords)
     if status:
         stmt = stmt.where(StagingGlobalKeywords.status == status)
@@ -135,9 +431,9 @@ async def list_staging_keywords(
         stmt = stmt.order_by(StagingGlobalKeywords.claimed_at.asc(), StagingGlobalKeywords.id.asc())
     else:
         # 非我的任务，按照创建时间排序
-        stmt = stmt.order_by(StagingGlobalKeywords.created_at.desc())
-    result = await db.execute(stmt)
-    return result.scalars().all()
+        stmt = stmt.order_by(StagingGlobalKeywords.created_at.desc(), StagingGlobalKeywords.id.desc())
+    result = await db.execute(stmt.offset(skip).limit(limit + 1))
+    return _legacy_page(response, result.scalars().all(), limit)
 
 @router.patch("/keywords/{keyword_id}", response_model=StagingKeywordResponse)
 async def review_keyword(
@@ -146,31 +442,8 @@ async def review_keyword(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user_full)
 ):
-    """审核关键词（ANNOTATOR 和 SYSTEM_ADMIN）"""
-    stmt = select(StagingGlobalKeywords).where(StagingGlobalKeywords.id == keyword_id)
-    result = await db.execute(stmt)
-    item = result.scalars().first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-
-    if review_data.final_tag:
-        item.final_tag = review_data.final_tag
-    if review_data.final_risk:
-        item.final_risk = review_data.final_risk
-
-    item.status = review_data.status
-    item.annotator = current_user.username
-    item.annotated_at = get_china_now()
-
-    # Check modification
-    if item.final_tag != item.predicted_tag or item.final_risk != item.predicted_risk:
-        item.is_modified = True
-    else:
-        item.is_modified = False
-
-    await db.commit()
-    await db.refresh(item)
-    return item
+    """审核关键词（ANNOTATOR 和 SYSTEM_ADMIN），校验规则与批量审核一致"""
+    return await _review_one(db, current_user, "keywords", {"id": keyword_id, **review_data.model_dump()})
 
 @router.post("/keywords/batch-review")
 async def batch_review_keywords(
@@ -178,43 +451,16 @@ async def batch_review_keywords(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user_full)
 ):
-    """批量审核关键词（ANNOTATOR 和 SYSTEM_ADMIN）"""
-    success_count = 0
-    failed_ids = []
-
-    for item_data in batch_data.items:
-        try:
-            stmt = select(StagingGlobalKeywords).where(StagingGlobalKeywords.id == item_data.id)
-            result = await db.execute(stmt)
-            item = result.scalars().first()
-
-            if not item:
-                failed_ids.append(item_data.id)
-                continue
-
-            # 更新字段
-            if item_data.final_tag:
-                item.final_tag = item_data.final_tag
-            if item_data.final_risk:
-                item.final_risk = item_data.final_risk
-
-            item.status = item_data.status
-            item.annotator = current_user.username
-            item.annotated_at = get_china_now()
-            item.is_modified = True
-
-            success_count += 1
-        except Exception as e:
-            failed_ids.append(item_data.id)
-            continue
-
-    await db.commit()
-
-    return {
-        "success_count": success_count,
-        "failed_count": len(failed_ids),
-        "failed_ids": failed_ids
-    }
+    """
+    批量审核关键词（ANNOTATOR 和 SYSTEM_ADMIN）
+    标注员只能审核自己认领的任务；返回逐条结果 results
+    """
+    service = StagingService(db, "keywords")
+    return await service.batch_review(
+        current_user.username,
+        [item.model_dump() for item in batch_data.items],
+        is_admin=current_user.role == "SYSTEM_ADMIN"
+    )
 
 @router.post("/keywords/sync")
 async def sync_keywords(
@@ -222,41 +468,8 @@ async def sync_keywords(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user_full)
 ):
-    """同步关键词到正式库（仅 SYSTEM_ADMIN）"""
-    if current_user.role != "SYSTEM_ADMIN":
-        raise HTTPException(status_code=403, detail="Only SYSTEM_ADMIN can sync")
-        
-    stmt = select(StagingGlobalKeywords).where(StagingGlobalKeywords.id.in_(sync_req.ids))
-    result = await db.execute(stmt)
-    items = result.scalars().all()
-    
-    synced_count = 0
-    for item in items:
-        if item.status != "REVIEWED":
-            continue
-            
-        g_stmt = select(GlobalKeywords).where(GlobalKeywords.keyword == item.keyword)
-        g_res = await db.execute(g_stmt)
-        existing = g_res.scalars().first()
-        
-        if existing:
-            existing.tag_code = item.final_tag
-            existing.risk_level = item.final_risk
-        else:
-            new_kw = GlobalKeywords(
-                id=str(uuid.uuid4()),
-                keyword=item.keyword,
-                tag_code=item.final_tag,
-                risk_level=item.final_risk,
-                is_active=True
-            )
-            db.add(new_kw)
-            
-        item.status = "SYNCED"
-        synced_count += 1
-        
-    await db.commit()
-    return {"synced_count": synced_count}
+    """同步关键词到正式库（仅 SYSTEM_ADMIN），分块批量写入，大批量请使用 POST /keywords/sync-jobs"""
+    return await _sync_now(db, current_user, "keywords", sync_req.ids)
 
 @router.post("/keywords/import-mock")
 async def import_mock_keywords(db: AsyncSession = Depends(get_db)):
@@ -265,8 +478,8 @@ async def import_mock_keywords(db: AsyncSession = Depends(get_db)):
         ("bad_word_2", "PORN", "High"),
         ("maybe_bad", "AD", "Low"),
     ]
-    for k, t, r in data:
-        obj = StagingGlobalKeywords(
+    await StagingService(db, "keywords").add_tasks([
+        StagingGlobalKeywords(
             id=str(uuid.uuid4()),
             keyword=k,
             predicted_tag=t,
@@ -275,8 +488,8 @@ async def import_mock_keywords(db: AsyncSession = Depends(get_db)):
             final_risk=r,
             status="PENDING"
         )
-        db.add(obj)
-    await db.commit()
+        for k, t, r in data
+    ])
     return {"message": "Mock keywords imported"}
 
 @router.delete("/keywords/{keyword_id}")
@@ -286,32 +499,28 @@ async def delete_staging_keyword(
     current_user: str = Depends(get_current_user)
 ):
     # Optional: Check if user is admin or annotator
-    stmt = select(StagingGlobalKeywords).where(StagingGlobalKeywords.id == keyword_id)
-    result = await db.execute(stmt)
-    item = result.scalars().first()
-    if item:
-        await db.delete(item)
-        await db.commit()
+    await StagingService(db, "keywords").delete_task(keyword_id)
     return {"message": "Deleted"}
 
 # --- Endpoints: Rules ---
 
-@router.get("/rules", response_model=List[StagingRuleResponse])
+@router.get("/rules", response_model=List[StagingRuleResponse], deprecated=True)
 async def list_staging_rules(
+    response: Response,
     status: Optional[str] = None,
     my_tasks: bool = Query(False, description="只显示我认领的任务"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(LEGACY_LIST_DEFAULT_LIMIT, ge=1, le=LEGACY_LIST_MAX_LIMIT),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user_full)
 ):
     """
-    获取智能标注规则列表
+    获取智能标注规则列表（已废弃，请使用 /rules/page 的 keyset 分页）
     权限：所有角色可访问，但根据角色过滤数据
+    单次最多返回 LEGACY_LIST_MAX_LIMIT 条，响应头 X-Has-More 为 true 时结果被截断
     """
     user_role = current_user.role
 
-    # 调试日志
-    logger.info(f"[RULES] current_user: {current_user.username}, user_role: {user_role}, status: {status}")
-
     stmt = select(StagingGlobalRules)
     if status:
         stmt = stmt.where(StagingGlobalRules.status == status)
@@ -337,9 +546,9 @@ async def list_staging_rules(
         stmt = stmt.order_by(StagingGlobalRules.claimed_at.asc(), StagingGlobalRules.id.asc())
     else:
         # 非我的任务，按照创建时间排序
-        stmt = stmt.order_by(StagingGlobalRules.created_at.desc())
-    result = await db.execute(stmt)
-    return result.scalars().all()
+        stmt = stmt.order_by(StagingGlobalRules.created_at.desc(), StagingGlobalRules.id.desc())
+    result = await db.execute(stmt.offset(skip).limit(limit + 1))
+    return _legacy_page(response, result.scalars().all(), limit)
 
 @router.patch("/rules/{rule_id}", response_model=StagingRuleResponse)
 async def review_rule(
@@ -348,26 +557,8 @@ async def review_rule(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user_full)
 ):
-    """审核规则（ANNOTATOR 和 SYSTEM_ADMIN）"""
-    stmt = select(StagingGlobalRules).where(StagingGlobalRules.id == rule_id)
-    result = await db.execute(stmt)
-    item = result.scalars().first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-
-    item.final_strategy = review_data.final_strategy
-    item.status = review_data.status
-    item.annotator = current_user.username
-    item.annotated_at = get_china_now()
-
-    if item.final_strategy != item.predicted_strategy:
-        item.is_modified = True
-    else:
-        item.is_modified = False
-
-    await db.commit()
-    await db.refresh(item)
-    return item
+    """审核规则（ANNOTATOR 和 SYSTEM_ADMIN），校验规则与批量审核一致"""
+    return await _review_one(db, current_user, "rules", {"id": rule_id, **review_data.model_dump()})
 
 @router.post("/rules/batch-review")
 async def batch_review_rules(
@@ -375,39 +566,16 @@ async def batch_review_rules(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user_full)
 ):
-    """批量审核规则（ANNOTATOR 和 SYSTEM_ADMIN）"""
-    success_count = 0
-    failed_ids = []
-
-    for item_data in batch_data.items:
-        try:
-            stmt = select(StagingGlobalRules).where(StagingGlobalRules.id == item_data.id)
-            result = await db.execute(stmt)
-            item = result.scalars().first()
-
-            if not item:
-                failed_ids.append(item_data.id)
-                continue
-
-            # 更新字段
-            item.final_strategy = item_data.final_strategy
-            item.status = item_data.status
-            item.annotator = current_user.username
-            item.annotated_at = get_china_now()
-            item.is_modified = True
-
-            success_count += 1
-        except Exception as e:
-            failed_ids.append(item_data.id)
-            continue
-
-    await db.commit()
-
-    return {
-        "success_count": success_count,
-        "failed_count": len(failed_ids),
-        "failed_ids": failed_ids
-    }
+    """
+    批量审核规则（ANNOTATOR 和 SYSTEM_ADMIN）
+    标注员只能审核自己认领的任务；返回逐条结果 results
+    """
+    service = StagingService(db, "rules")
+    return await service.batch_review(
+        current_user.username,
+        [item.model_dump() for item in batch_data.items],
+        is_admin=current_user.role == "SYSTEM_ADMIN"
+    )
 
 @router.post("/rules/sync")
 async def sync_rules(
@@ -415,43 +583,8 @@ async def sync_rules(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user_full)
 ):
-    """同步规则到正式库（仅 SYSTEM_ADMIN）"""
-    if current_user.role != "SYSTEM_ADMIN":
-        raise HTTPException(status_code=403, detail="Only SYSTEM_ADMIN can sync")
-        
-    stmt = select(StagingGlobalRules).where(StagingGlobalRules.id.in_(sync_req.ids))
-    result = await db.execute(stmt)
-    items = result.scalars().all()
-    
-    synced_count = 0
-    for item in items:
-        if item.status != "REVIEWED":
-            continue
-            
-        g_stmt = select(RuleGlobalDefaults).where(
-            RuleGlobalDefaults.tag_code == item.tag_code,
-            RuleGlobalDefaults.extra_condition == item.extra_condition
-        )
-        g_res = await db.execute(g_stmt)
-        existing = g_res.scalars().first()
-        
-        if existing:
-            existing.strategy = item.final_strategy
-        else:
-            new_rule = RuleGlobalDefaults(
-                id=str(uuid.uuid4()),
-                tag_code=item.tag_code,
-                extra_condition=item.extra_condition,
-                strategy=item.final_strategy,
-                is_active=True
-            )
-            db.add(new_rule)
-            
-        item.status = "SYNCED"
-        synced_count += 1
-        
-    await db.commit()
-    return {"synced_count": synced_count}
+    """同步规则到正式库（仅 SYSTEM_ADMIN），分块批量写入，大批量请使用 POST /rules/sync-jobs"""
+    return await _sync_now(db, current_user, "rules", sync_req.ids)
 
 @router.post("/rules/import-mock")
 async def import_mock_rules(db: AsyncSession = Depends(get_db)):
@@ -460,8 +593,8 @@ async def import_mock_rules(db: AsyncSession = Depends(get_db)):
         ("AD", "HighRisk", "BLOCK"),
         ("PORN", None, "BLOCK"),
     ]
-    for t, e, s in data:
-        obj = StagingGlobalRules(
+    await StagingService(db, "rules").add_tasks([
+        StagingGlobalRules(
             id=str(uuid.uuid4()),
             tag_code=t,
             extra_condition=e,
@@ -469,8 +602,8 @@ async def import_mock_rules(db: AsyncSession = Depends(get_db)):
             final_strategy=s,
             status="PENDING"
         )
-        db.add(obj)
-    await db.commit()
+        for t, e, s in data
+    ])
     return {"message": "Mock rules imported"}
 
 @router.delete("/rules/{rule_id}")
@@ -479,12 +612,7 @@ async def delete_staging_rule(
     db: AsyncSession = Depends(get_db),
     current_user: str = Depends(get_current_user)
 ):
-    stmt = select(StagingGlobalRules).where(StagingGlobalRules.id == rule_id)
-    result = await db.execute(stmt)
-    item = result.scalars().first()
-    if item:
-        await db.delete(item)
-        await db.commit()
+    await StagingService(db, "rules").delete_task(rule_id)
     return {"message": "Deleted"}
 
 
@@ -506,47 +634,14 @@ async def claim_batch(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user_full)
 ):
-    """批量认领任务（ANNOTATOR 和 SYSTEM_ADMIN）"""
-    batch_id = str(uuid.uuid4())
-    timeout_minutes = 30  # 30分钟超时
-    expires_at = get_china_now() + timedelta(minutes=timeout_minutes)
-
-    if claim_req.task_type == "keywords":
-        # 查询可认领的任务（PENDING状态）
-        stmt = select(StagingGlobalKeywords).where(
-            StagingGlobalKeywords.status == "PENDING"
-        ).limit(claim_req.batch_size)
-        result = await db.execute(stmt)
-        items = result.scalars().all()
-
-        # 更新为CLAIMED状态
-        for item in items:
-            item.status = "CLAIMED"
-            item.claimed_by = current_user.username
-            item.claimed_at = get_china_now()
-            item.batch_id = batch_id
-    else:
-        # 规则认领
-        stmt = select(StagingGlobalRules).where(
-            StagingGlobalRules.status == "PENDING"
-        ).limit(claim_req.batch_size)
-        result = await db.execute(stmt)
-        items = result.scalars().all()
-
-        for item in items:
-            item.status = "CLAIMED"
-            item.claimed_by = current_user.username
-            item.claimed_at = get_china_now()
-            item.batch_id = batch_id
-
-    await db.commit()
-
-    return ClaimResponse(
-        claimed_count=len(items),
-        batch_id=batch_id,
-        expires_at=expires_at,
-        timeout_minutes=timeout_minutes
-    )
+    """批量认领任务（ANNOTATOR 和 SYSTEM_ADMIN），按优先级从高到低、同优先级最早入队的优先，并发认领不会重复分配"""
+    try:
+        service = StagingService(db, claim_req.task_type)
+        result = await service.claim_batch(current_user.username, claim_req.batch_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return ClaimResponse(**result)
 
 
 @router.post("/release-expired")
@@ -554,42 +649,10 @@ async def release_expired_claims(
     db: AsyncSession = Depends(get_db),
     current_user: str = Depends(get_current_user)
 ):
-    """释放超时的认领任务（管理员或系统定时任务调用）"""
-    timeout_threshold = get_china_now() - timedelta(minutes=30)
-
-    # 释放超时的关键词任务
-    stmt_kw = update(StagingGlobalKeywords).where(
-        and_(
-            StagingGlobalKeywords.status == "CLAIMED",
-            StagingGlobalKeywords.claimed_at < timeout_threshold
-        )
-    ).values(
-        status="PENDING",
-        claimed_by=None,
-        claimed_at=None,
-        batch_id=None
-    )
-    result_kw = await db.execute(stmt_kw)
-
-    # 释放超时的规则任务
-    stmt_rule = update(StagingGlobalRules).where(
-        and_(
-            StagingGlobalRules.status == "CLAIMED",
-            StagingGlobalRules.claimed_at < timeout_threshold
-        )
-    ).values(
-        status="PENDING",
-        claimed_by=None,
-        claimed_at=None,
-        batch_id=None
-    )
-    result_rule = await db.execute(stmt_rule)
-
-    await db.commit()
-
+    """立即释放超时的认领任务（定时任务 release_expired_claims 每分钟自动执行，此接口用于手动触发）"""
     return {
-        "released_keywords": result_kw.rowcount,
-        "released_rules": result_rule.rowcount
+        "released_keywords": await StagingService(db, "keywords").release_expired(),
+        "released_rules": await StagingService(db, "rules").release_expired()
     }
 
 
@@ -598,6 +661,9 @@ class AnnotatorStats(BaseModel):
     reviewed_count: int
     ignored_count: int
     total_count: int
+    agreement_samples: int = 0  # 参与的双人审核抽样数（作为第一或第二审核人）
+    observed_agreement: Optional[float] = None
+    kappa: Optional[float] = None
 
 @router.get("/stats/annotators", response_model=List[AnnotatorStats])
 async def get_annotator_stats(
@@ -605,43 +671,84 @@ async def get_annotator_stats(
     db: AsyncSession = Depends(get_db),
     current_user: str = Depends(get_current_user)
 ):
-    """获取标注员统计信息（管理员查看）"""
-    if task_type == "keywords":
-        # 统计每个标注员的完成情况
-        stmt = select(
-            StagingGlobalKeywords.annotator,
-            func.sum(func.if_(StagingGlobalKeywords.status == "REVIEWED", 1, 0)).label("reviewed_count"),
-            func.sum(func.if_(StagingGlobalKeywords.status == "IGNORED", 1, 0)).label("ignored_count"),
-            func.count(StagingGlobalKeywords.id).label("total_count")
-        ).where(
-            StagingGlobalKeywords.annotator.isnot(None)
-        ).group_by(
-            StagingGlobalKeywords.annotator
-        )
-    else:
-        stmt = select(
-            StagingGlobalRules.annotator,
-            func.sum(func.if_(StagingGlobalRules.status == "REVIEWED", 1, 0)).label("reviewed_count"),
-            func.sum(func.if_(StagingGlobalRules.status == "IGNORED", 1, 0)).label("ignored_count"),
-            func.count(StagingGlobalRules.id).label("total_count")
-        ).where(
-            StagingGlobalRules.annotator.isnot(None)
-        ).group_by(
-            StagingGlobalRules.annotator
-        )
+    """获取标注员统计信息（管理员查看），读取计数器"""
+    try:
+        service = StagingService(db, task_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return [AnnotatorStats(**stats) for stats in await service.annotator_stats()]
 
-    result = await db.execute(stmt)
-    rows = result.all()
 
-    return [
-        AnnotatorStats(
-            annotator=row.annotator,
-            reviewed_count=row.reviewed_count,
-            ignored_count=row.ignored_count,
-            total_count=row.total_count
-        )
-        for row in rows
-    ]
+# --- Double review (agreement sampling) ---
+
+class SecondReviewClaimRequest(BaseModel):
+    batch_size: int = 50
+
+class SecondReviewItem(BaseModel):
+    id: str
+    status: str  # REVIEWED or IGNORED
+    final_tag: Optional[str] = None       # keywords
+    final_strategy: Optional[str] = None  # rules
+
+class SecondReviewSubmitRequest(BaseModel):
+    items: List[SecondReviewItem]
+
+class AgreementScope(BaseModel):
+    key: str
+    samples: int
+    observed_agreement: Optional[float]
+    kappa: Optional[float]
+
+class AgreementSummary(BaseModel):
+    task_type: str
+    fraction: float
+    overall: AgreementScope
+    by_tag: List[AgreementScope]
+    by_annotator: List[AgreementScope]
+
+@router.post("/{task_type}/second-reviews/claim")
+async def claim_second_reviews(
+    task_type: str,
+    claim_req: SecondReviewClaimRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_full)
+):
+    """认领双人审核抽样任务（盲审：不返回第一次的审核结论，也不会分配给第一次审核的人）"""
+    try:
+        service = StagingService(db, task_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    items = await service.agreement.claim(current_user.username, claim_req.batch_size, get_china_now())
+    return {"claimed_count": len(items), "items": items}
+
+@router.post("/{task_type}/second-reviews/submit")
+async def submit_second_reviews(
+    task_type: str,
+    req: SecondReviewSubmitRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_full)
+):
+    """提交第二次审核结论，增量更新一致性统计；不影响任务本身的审核结果"""
+    try:
+        service = StagingService(db, task_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await service.agreement.submit(
+        current_user.username, [item.model_dump() for item in req.items], get_china_now()
+    )
+
+@router.get("/{task_type}/agreement", response_model=AgreementSummary)
+async def get_agreement_summary(
+    task_type: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: str = Depends(get_current_user)
+):
+    """双人审核一致性：全局、按标签、按标注员的一致率与 Cohen's kappa（读取累计量）"""
+    try:
+        service = StagingService(db, task_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await service.agreement.summary()
 
 
 class MyTasksStats(BaseModel):
@@ -658,80 +765,12 @@ async def get_my_tasks_stats(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user_full)
 ):
-    """获取当前用户的任务统计"""
-    if task_type == "keywords":
-        # 查询当前用户认领的任务
-        stmt_claimed = select(StagingGlobalKeywords).where(
-            and_(
-                StagingGlobalKeywords.claimed_by == current_user.username,
-                StagingGlobalKeywords.status == "CLAIMED"
-            )
-        )
-        result_claimed = await db.execute(stmt_claimed)
-        claimed_items = result_claimed.scalars().all()
-
-        # 查询已完成的任务（本批次）
-        batch_id = claimed_items[0].batch_id if claimed_items else None
-        claimed_at = claimed_items[0].claimed_at if claimed_items else None
-
-        if batch_id:
-            stmt_batch = select(
-                func.sum(func.if_(StagingGlobalKeywords.status == "REVIEWED", 1, 0)).label("reviewed_count"),
-                func.sum(func.if_(StagingGlobalKeywords.status == "IGNORED", 1, 0)).label("ignored_count")
-            ).where(
-                StagingGlobalKeywords.batch_id == batch_id
-            )
-            result_batch = await db.execute(stmt_batch)
-            row = result_batch.first()
-            reviewed_count = row.reviewed_count if row else 0
-            ignored_count = row.ignored_count if row else 0
-        else:
-            reviewed_count = 0
-            ignored_count = 0
-    else:
-        # 规则任务统计
-        stmt_claimed = select(StagingGlobalRules).where(
-            and_(
-                StagingGlobalRules.claimed_by == current_user.username,
-                StagingGlobalRules.status == "CLAIMED"
-            )
-        )
-        result_claimed = await db.execute(stmt_claimed)
-        claimed_items = result_claimed.scalars().all()
-
-        batch_id = claimed_items[0].batch_id if claimed_items else None
-        claimed_at = claimed_items[0].claimed_at if claimed_items else None
-
-        if batch_id:
-            stmt_batch = select(
-                func.sum(func.if_(StagingGlobalRules.status == "REVIEWED", 1, 0)).label("reviewed_count"),
-                func.sum(func.if_(StagingGlobalRules.status == "IGNORED", 1, 0)).label("ignored_count")
-            ).where(
-                StagingGlobalRules.batch_id == batch_id
-            )
-            result_batch = await db.execute(stmt_batch)
-            row = result_batch.first()
-            reviewed_count = row.reviewed_count if row else 0
-            ignored_count = row.ignored_count if row else 0
-        else:
-            reviewed_count = 0
-            ignored_count = 0
-
-    expires_at = None
-    if claimed_at:
-        # 如果 claimed_at 是 naive datetime，将其视为中国时区
-        if claimed_at.tzinfo is None:
-            claimed_at = CHINA_TZ.localize(claimed_at)
-        expires_at = claimed_at + timedelta(minutes=30)
-
-    return MyTasksStats(
-        claimed_count=len(claimed_items),
-        reviewed_count=reviewed_count,
-        ignored_count=ignored_count,
-        batch_id=batch_id,
-        claimed_at=claimed_at,
-        expires_at=expires_at
-    )
+    """获取当前用户的任务统计，读取计数器"""
+    try:
+        service = StagingService(db, task_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return MyTasksStats(**await service.my_tasks_stats(current_user.username))
 
 
 class TaskOverview(BaseModel):
@@ -748,34 +787,20 @@ async def get_task_overview(
     db: AsyncSession = Depends(get_db),
     current_user: str = Depends(get_current_user)
 ):
-    """获取任务总览统计"""
-    if task_type == "keywords":
-        stmt = select(
-            func.sum(func.if_(StagingGlobalKeywords.status == "PENDING", 1, 0)).label("pending_count"),
-            func.sum(func.if_(StagingGlobalKeywords.status == "CLAIMED", 1, 0)).label("claimed_count"),
-            func.sum(func.if_(StagingGlobalKeywords.status == "REVIEWED", 1, 0)).label("reviewed_count"),
-            func.sum(func.if_(StagingGlobalKeywords.status == "SYNCED", 1, 0)).label("synced_count"),
-            func.sum(func.if_(StagingGlobalKeywords.status == "IGNORED", 1, 0)).label("ignored_count"),
-            func.count(StagingGlobalKeywords.id).label("total_count")
-        )
-    else:
-        stmt = select(
-            func.sum(func.if_(StagingGlobalRules.status == "PENDING", 1, 0)).label("pending_count"),
-            func.sum(func.if_(StagingGlobalRules.status == "CLAIMED", 1, 0)).label("claimed_count"),
-            func.sum(func.if_(StagingGlobalRules.status == "REVIEWED", 1, 0)).label("reviewed_count"),
-            func.sum(func.if_(StagingGlobalRules.status == "SYNCED", 1, 0)).label("synced_count"),
-            func.sum(func.if_(StagingGlobalRules.status == "IGNORED", 1, 0)).label("ignored_count"),
-            func.count(StagingGlobalRules.id).label("total_count")
-        )
+    """获取任务总览统计，读取计数器"""
+    try:
+        service = StagingService(db, task_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return TaskOverview(**await service.overview())
 
-    result = await db.execute(stmt)
-    row = result.first()
-
-    return TaskOverview(
-        pending_count=row.pending_count or 0,
-        claimed_count=row.claimed_count or 0,
-        reviewed_count=row.reviewed_count or 0,
-        synced_count=row.synced_count or 0,
-        ignored_count=row.ignored_count or 0,
-        total_count=row.total_count or 0
-    )
\ No newline at end of file
+
+@router.post("/counters/reconcile")
+async def reconcile_counters(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_full)
+):
+    """按任务表重新统计计数器（仅 SYSTEM_ADMIN，定时对账任务也会调用）"""
+    if current_user.role != "SYSTEM_ADMIN":
+        raise HTTPException(status_code=403, detail="Only SYSTEM_ADMIN can reconcile counters")
+    return [await StagingService(db, task_type).counters.reconcile() for task_type in TASK_MODELS]
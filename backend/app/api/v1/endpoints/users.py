@@ -3,17 +3,23 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.db import get_db
+from app.core.permission_cache import permission_cache
 from app.api.v1.deps import get_current_user, get_current_user_full, require_role
 from app.models.db_meta import User, UserScenarioRole, Role
 from app.services.audit import AuditService
+from app.services.auth_sessions import AuthSessionService
+from app.services.permission import PermissionService
 from app.repositories.role import RoleRepository, UserScenarioRoleRepository
-from app.schemas.role import UserRoleAssign, UserRoleResponse, UserPermissionsResponse
+from app.schemas.role import UserRoleAssign, UserRoleBulkAssign, UserRoleResponse, UserPermissionsResponse
 from pydantic import BaseModel, Field
 from datetime import datetime
 import uuid
 
 router = APIRouter()
 
+# 批量分配角色单次最多写入的分配数
+BULK_ASSIGN_MAX = 50000
+
 
 # ============================================
 # V2 Schemas - 简化的用户模型
@@ -43,6 +49,20 @@ class UserStatusUpdate(BaseModel):
     is_active: bool
 
 
+class UserSessionResponse(BaseModel):
+    """登录会话"""
+    id: str
+    user_agent: str | None = None
+    ip_address: str | None = None
+    refresh_count: int
+    created_at: datetime
+    last_refreshed_at: datetime | None = None
+    expires_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 # ============================================
 # V2 用户管理端点
 # ============================================
@@ -96,6 +116,7 @@ async def update_user_role(
     old_role = user.role
     user.role = role_in.role
     await db.commit()
+    await permission_cache.invalidate_user(user_id)
 
     # 记录审计日志
     audit_service = AuditService(db)
@@ -136,6 +157,10 @@ async def toggle_user_status(
 
     user.is_active = status_in.is_active
     await db.commit()
+    await permission_cache.invalidate_user(user_id)
+    if not status_in.is_active:
+        # 禁用即强制下线：吊销全部会话，刷新令牌与已签发的访问令牌随之失效
+        await AuthSessionService(db).revoke_user_sessions(user_id, "USER_DISABLED")
 
     # 记录审计日志
     audit_service = AuditService(db)
@@ -173,8 +198,10 @@ async def delete_user(
     if user.id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot delete yourself")
 
+    await AuthSessionService(db).revoke_user_sessions(user_id, "USER_DELETED")
     await db.delete(user)
     await db.commit()
+    await permission_cache.invalidate_user(user_id)
 
     # 记录审计日志
     audit_service = AuditService(db)
@@ -190,6 +217,52 @@ async def delete_user(
     return {"message": "User deleted"}
 
 
+@router.get("/{user_id}/sessions", response_model=List[UserSessionResponse])
+async def list_user_sessions(
+    user_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["SYSTEM_ADMIN"]))
+):
+    """
+    获取用户的有效登录会话
+
+    权限：仅 SYSTEM_ADMIN
+    """
+    return await AuthSessionService(db).list_active_sessions(user_id)
+
+
+@router.delete("/{user_id}/sessions")
+async def revoke_user_sessions(
+    user_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["SYSTEM_ADMIN"]))
+):
+    """
+    强制下线：吊销用户的全部登录会话
+
+    权限：仅 SYSTEM_ADMIN
+    """
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    revoked = await AuthSessionService(db).revoke_user_sessions(user_id, "ADMIN")
+
+    # 记录审计日志
+    audit_service = AuditService(db)
+    await audit_service.log_update(
+        user_id=current_user.id,
+        username=current_user.user_id or current_user.username,
+        resource_type="USER",
+        resource_id=user_id,
+        details={"revoked_sessions": revoked},
+        request=request
+    )
+
+    return {"message": "Sessions revoked", "revoked": revoked}
+
+
 # ============================================
 # V2 用户角色分配端点
 # ============================================
@@ -206,11 +279,10 @@ async def get_user_roles(
         raise HTTPException(status_code=403, detail="Not authorized")
 
     repo = UserScenarioRoleRepository(db)
-    assignments = await repo.get_user_roles(user_id)
+    assignments = await repo.get_user_roles_with_role(user_id)
 
     result = []
-    for a in assignments:
-        role = await db.get(Role, a.role_id)
+    for a, role in assignments:
         result.append(UserRoleResponse(
             id=a.id,
             user_id=a.user_id,
@@ -251,10 +323,8 @@ async def assign_role_to_user(
 
     # 检查是否已分配
     repo = UserScenarioRoleRepository(db)
-    existing = await repo.get_user_roles(user_id)
-    for a in existing:
-        if a.role_id == role_assign.role_id and a.scenario_id == role_assign.scenario_id:
-            raise HTTPException(status_code=400, detail="该角色已分配")
+    if await repo.get_assignment(user_id, role_assign.scenario_id, role_assign.role_id):
+        raise HTTPException(status_code=400, detail="该角色已分配")
 
     assignment = UserScenarioRole(
         id=str(uuid.uuid4()),
@@ -263,7 +333,6 @@ async def assign_role_to_user(
         role_id=role_assign.role_id,
         created_by=current_user.id
     )
-    repo = UserScenarioRoleRepository(db)
     assignment = await repo.assign_role(assignment)
 
     # 记录审计日志
@@ -290,6 +359,62 @@ async def assign_role_to_user(
     )
 
 
+@router.post("/roles/bulk-assign")
+async def bulk_assign_roles(
+    bulk_in: UserRoleBulkAssign,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["SYSTEM_ADMIN"]))
+) -> Any:
+    """
+    批量分配角色：用户 × 场景 × 角色（全局角色只按用户分配，场景角色按用户 × 场景分配），已存在的分配跳过
+
+    权限：仅 SYSTEM_ADMIN
+    """
+    user_ids = sorted(set(bulk_in.user_ids))
+    result = await db.execute(select(User.id).where(User.id.in_(user_ids)))
+    missing_users = set(user_ids) - set(result.scalars().all())
+    if missing_users:
+        raise HTTPException(status_code=404, detail=f"User not found: {sorted(missing_users)}")
+
+    roles = await RoleRepository(db).get_by_ids(bulk_in.role_ids)
+    missing_roles = set(bulk_in.role_ids) - set(roles)
+    if missing_roles:
+        raise HTTPException(status_code=404, detail=f"Role not found: {sorted(missing_roles)}")
+
+    scenario_ids = sorted(set(bulk_in.scenario_ids))
+    if not scenario_ids and any(role.role_type == "SCENARIO" for role in roles.values()):
+        raise HTTPException(status_code=400, detail="场景角色需要指定场景")
+
+    targets = []
+    for role in roles.values():
+        scopes = [None] if role.role_type == "GLOBAL" else scenario_ids
+        targets.extend((user_id, scenario_id, role.id) for user_id in user_ids for scenario_id in scopes)
+    if len(targets) > BULK_ASSIGN_MAX:
+        raise HTTPException(status_code=400, detail=f"单次最多分配 {BULK_ASSIGN_MAX} 条")
+
+    created, skipped = await UserScenarioRoleRepository(db).bulk_assign(targets, created_by=current_user.id)
+
+    # 记录审计日志（整批一条）
+    audit_service = AuditService(db)
+    await audit_service.log_create(
+        user_id=current_user.id,
+        username=current_user.user_id or current_user.username,
+        resource_type="USER_ROLE_ASSIGNMENT",
+        resource_id=None,
+        details={
+            "user_count": len(user_ids),
+            "scenario_ids": scenario_ids,
+            "role_codes": sorted(role.role_code for role in roles.values()),
+            "created": created,
+            "skipped": skipped,
+        },
+        request=request
+    )
+
+    return {"message": "角色已批量分配", "created": created, "skipped": skipped}
+
+
 @router.delete("/{user_id}/roles/{assignment_id}")
 async def remove_user_role(
     user_id: str,
@@ -328,8 +453,7 @@ async def get_my_permissions(
     current_user: User = Depends(get_current_user_full)
 ) -> Any:
     """获取当前用户权限"""
-    repo = UserScenarioRoleRepository(db)
-    perms = await repo.get_user_permission_codes(current_user.id)
+    perms = (await PermissionService(db).get_v2_permission_set(current_user.id)).to_dict()
     return UserPermissionsResponse(
         user_id=current_user.user_id or current_user.id,
         global_permissions=perms["global_permissions"],
@@ -0,0 +1,29 @@
+"""
+keyset 分页游标
+游标为上一页最后一行排序键的 JSON 数组（base64url 编码），对调用方不透明；
+排序键的类型与个数由各分页接口自行校验。
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """把上一页最后一行的排序键编码为不透明游标"""
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """
+    Raises:
+        ValueError: 游标格式无效
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
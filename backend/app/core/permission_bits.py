@@ -0,0 +1,84 @@
+"""
+权限位图
+权限编码在进程内按首次出现的顺序分配位号（只增不减，不持久化），
+用户的有效权限表示为 全局位图 + {场景ID: 位图}，权限判断为一次字典查找加一次按位与。
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_BITS: Dict[str, int] = {}
+_CODES: List[str] = []
+
+
+def bit_of(code: str) -> int:
+    """权限编码对应的位（首次出现时分配）"""
+    bit = _BITS.get(code)
+    if bit is None:
+        bit = _BITS.setdefault(code, len(_CODES))
+        if bit == len(_CODES):
+            _CODES.append(code)
+    return 1 << bit
+
+
+def mask_of(codes: Iterable[str]) -> int:
+    mask = 0
+    for code in codes:
+        mask |= bit_of(code)
+    return mask
+
+
+def codes_of(mask: int) -> List[str]:
+    """位图还原为权限编码列表（按位号顺序）"""
+    codes = []
+    bit = 0
+    while mask:
+        if mask & 1:
+            codes.append(_CODES[bit])
+        mask >>= 1
+        bit += 1
+    return codes
+
+
+class PermissionSet:
+    """用户的有效权限（V2 RBAC）：全局角色的权限 + 各场景角色的权限"""
+
+    __slots__ = ("global_mask", "scenario_masks")
+
+    def __init__(self, global_mask: int = 0, scenario_masks: Optional[Dict[str, int]] = None):
+        self.global_mask = global_mask
+        self.scenario_masks = scenario_masks or {}
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[Optional[str], str]]) -> "PermissionSet":
+        """由 (场景ID, 权限编码) 行构建，场景ID 为空表示全局角色"""
+        permission_set = cls()
+        scenario_masks = permission_set.scenario_masks
+        for scenario_id, code in rows:
+            if scenario_id is None:
+                permission_set.global_mask |= bit_of(code)
+            else:
+                scenario_masks[scenario_id] = scenario_masks.get(scenario_id, 0) | bit_of(code)
+        return permission_set
+
+    def has_global(self, code: str) -> bool:
+        return bool(self.global_mask & bit_of(code))
+
+    def has(self, code: str, scenario_id: Optional[str] = None) -> bool:
+        """全局权限包含，或指定场景的权限包含"""
+        bit = bit_of(code)
+        if self.global_mask & bit:
+            return True
+        return scenario_id is not None and bool(self.scenario_masks.get(scenario_id, 0) & bit)
+
+    def has_scenario(self, scenario_id: str) -> bool:
+        """是否在该场景有角色（有任一场景权限）"""
+        return scenario_id in self.scenario_masks
+
+    def scenario_ids(self) -> List[str]:
+        return list(self.scenario_masks)
+
+    def to_dict(self) -> dict:
+        """{"global_permissions": [...], "scenario_permissions": {场景ID: [...]}}"""
+        return {
+            "global_permissions": codes_of(self.global_mask),
+            "scenario_permissions": {k: codes_of(v) for k, v in self.scenario_masks.items()},
+        }
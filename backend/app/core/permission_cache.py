@@ -0,0 +1,173 @@
+"""
+用户有效权限缓存
+进程内 LRU + TTL，缓存项带上写入时的权限版本号（epoch）：
+- 全局 epoch：角色、角色权限变更时递增（影响所有用户）
+- 用户 epoch：该用户的角色分配、场景分配、场景管理员权限、角色/状态变更时递增
+读取时版本号与当前不一致即视为失效，无需逐项删除。
+配置 REDIS_URL 时版本号存放在 Redis 中，由多个副本共享（失效对所有副本立即可见）；
+缓存值本身只保存在进程内（权限位图的位号按进程分配，不跨进程共享）。
+未配置或 Redis 不可用时版本号退化为进程内计数，其他副本最迟在 TTL 到期后刷新。
+令牌快速路径不使用这一退化（见 auth_epoch）：版本号读取失败时返回 None，由调用方回落到数据库。
+Redis 需使用不淘汰无过期时间键的策略（noeviction / volatile-*），版本号键被单独淘汰会使其回退。
+"""
+
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL")
+PERMISSION_CACHE_TTL_SECONDS = int(os.getenv("PERMISSION_CACHE_TTL_SECONDS", "60"))
+PERMISSION_CACHE_MAX_ENTRIES = int(os.getenv("PERMISSION_CACHE_MAX_ENTRIES", "10000"))
+
+GLOBAL_EPOCH_KEY = "perm:epoch"
+USER_EPOCH_KEY = "perm:epoch:user:{}"
+GENERATION_KEY = "perm:generation"   # 版本号代次，Redis 数据丢失后重新生成
+
+Epoch = Tuple[int, int]
+
+
+class PermissionCache:
+    """按 (用户ID, 类别) 缓存有效权限"""
+
+    def __init__(
+        self,
+        ttl_seconds: int = PERMISSION_CACHE_TTL_SECONDS,
+        max_entries: int = PERMISSION_CACHE_MAX_ENTRIES,
+        redis_url: Optional[str] = REDIS_URL
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.redis_url = redis_url
+        self._redis = None
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Epoch, float, Any]]" = OrderedDict()
+        self._global_epoch = 0
+        self._user_epochs: Dict[str, int] = {}
+        self._generation = uuid.uuid4().hex
+        self._pending_user_bumps: Set[str] = set()
+        self.hits = 0
+        self.misses = 0
+
+    def _client(self):
+        if self._redis is None and self.redis_url:
+            import redis.asyncio as redis
+            self._redis = redis.from_url(self.redis_url, decode_responses=True)
+        return self._redis
+
+    async def epoch(self, user_id: str) -> Epoch:
+        """用户当前的权限版本号 (全局 epoch, 用户 epoch)"""
+        client = self._client()
+        if client is not None:
+            try:
+                values = await client.mget(GLOBAL_EPOCH_KEY, USER_EPOCH_KEY.format(user_id))
+                return int(values[0] or 0), int(values[1] or 0)
+            except Exception as e:
+                logger.warning("Permission epoch lookup failed, falling back to local epoch: %s", e)
+        return self._global_epoch, self._user_epochs.get(user_id, 0)
+
+    async def auth_epoch(self, user_id: str) -> Optional[Tuple[str, int]]:
+        """
+        令牌快速路径使用的 (代次, 用户 epoch)，签入令牌后与当前值一致才可跳过数据库
+
+        代次在 Redis 中以 SET NX 生成：Redis 数据丢失后版本号从 0 重新开始，但代次随之改变，
+        丢失前签发的令牌不会重新匹配。未配置 Redis 时代次为进程内随机值（进程重启后旧令牌失效）。
+        Redis 不可用，或本进程还有未写入 Redis 的版本号递增时返回 None，调用方应回落到数据库。
+        """
+        client = self._client()
+        if client is None:
+            return self._generation, self._user_epochs.get(user_id, 0)
+        try:
+            if self._pending_user_bumps:
+                pending = list(self._pending_user_bumps)
+                await self._bump_users(client, pending)
+                self._pending_user_bumps.difference_update(pending)
+            generation, user_epoch = await client.mget(GENERATION_KEY, USER_EPOCH_KEY.format(user_id))
+            if generation is None:
+                await client.set(GENERATION_KEY, uuid.uuid4().hex, nx=True)
+                generation = await client.get(GENERATION_KEY)
+            return generation, int(user_epoch or 0)
+        except Exception as e:
+            logger.warning("Permission epoch lookup failed, skipping token fast path: %s", e)
+            return None
+
+    async def user_epochs(self, user_ids: List[str], chunk_size: int = 1000) -> Dict[str, int]:
+        """批量读取用户 epoch（Redis 按批 MGET）"""
+        client = self._client()
+        if client is not None:
+            try:
+                epochs = {}
+                for start in range(0, len(user_ids), chunk_size):
+                    chunk = user_ids[start:start + chunk_size]
+                    values = await client.mget(*[USER_EPOCH_KEY.format(user_id) for user_id in chunk])
+                    epochs.update((user_id, int(value or 0)) for user_id, value in zip(chunk, values))
+                return epochs
+            except Exception as e:
+                logger.warning("Permission epoch lookup failed, falling back to local epoch: %s", e)
+        return {user_id: self._user_epochs.get(user_id, 0) for user_id in user_ids}
+
+    async def get_or_load(self, user_id: str, kind: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        读取缓存，未命中（不存在、过期或版本号变化）时调用 loader 加载并写入
+
+        Args:
+            user_id: 用户主键
+            kind: 缓存类别（如 v1 / v2），同一用户的不同类别分别缓存、一起失效
+            loader: 从数据库加载的协程函数
+        """
+        key = (user_id, kind)
+        epoch = await self.epoch(user_id)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == epoch and entry[1] > now:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+        self.misses += 1
+        # 先取版本号再加载：加载期间发生的变更会使本次写入的缓存项在下次读取时失效
+        value = await loader()
+        self._entries[key] = (epoch, now + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    async def invalidate_user(self, *user_ids: str) -> None:
+        """用户的分配、权限配置或状态变更后调用"""
+        for user_id in user_ids:
+            self._user_epochs[user_id] = self._user_epochs.get(user_id, 0) + 1
+        client = self._client()
+        if client is not None and user_ids:
+            try:
+                await self._bump_users(client, user_ids)
+            except Exception as e:
+                # 记下未写入的递增，写入成功前本进程的令牌快速路径回落到数据库
+                self._pending_user_bumps.update(user_ids)
+                logger.warning("Permission epoch bump failed for users %s: %s", user_ids, e)
+
+    @staticmethod
+    async def _bump_users(client, user_ids) -> None:
+        async with client.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                pipe.incr(USER_EPOCH_KEY.format(user_id))
+            await pipe.execute()
+
+    async def invalidate_all(self) -> None:
+        """角色或角色权限变更后调用"""
+        self._global_epoch += 1
+        client = self._client()
+        if client is not None:
+            try:
+                await client.incr(GLOBAL_EPOCH_KEY)
+            except Exception as e:
+                logger.warning("Global permission epoch bump failed: %s", e)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+permission_cache = PermissionCache()
@@ -1,11 +1,26 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1.api import api_router
+from app.api.v1.endpoints.staging import LEGACY_LIST_HAS_MORE_HEADER
+from app.services.auth_tokens import REFRESHED_TOKEN_HEADER
+from app.services.maintenance import SCHEDULER_ENABLED, scheduler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 定时维护任务（多副本时只有选主成功的副本执行），SCHEDULER_ENABLED=true 开启
+    if SCHEDULER_ENABLED:
+        await scheduler.start()
+    yield
+    await scheduler.stop()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # Set all CORS enabled origins
@@ -15,6 +30,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 权限版本号变化后重新签发的令牌；废弃的待审核列表接口的截断标记
+    expose_headers=[REFRESHED_TOKEN_HEADER, LEGACY_LIST_HAS_MORE_HEADER],
 )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
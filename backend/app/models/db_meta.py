@@ -1,5 +1,5 @@
 from typing import Optional, Any
-from sqlalchemy import String, Integer, Boolean, CHAR, Text, JSON, DateTime
+from sqlalchemy import String, Integer, Boolean, CHAR, Text, JSON, DateTime, Index, Float
 from sqlalchemy.sql import func
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
@@ -29,12 +29,19 @@ class Scenarios(Base):
 
 class GlobalKeywords(Base):
     __tablename__ = "lib_global_keywords"
+    __table_args__ = (
+        Index("uk_global_keyword", "keyword", unique=True),
+        Index("idx_global_keyword_tag", "tag_code"),
+        # ngram 全文索引，支持中文子串检索（MySQL 5.7.6+）
+        Index("ft_global_keyword", "keyword", mysql_prefix="FULLTEXT", mysql_with_parser="ngram"),
+    )
 
     id: Mapped[str] = mapped_column(CHAR(36), primary_key=True)
     keyword: Mapped[str] = mapped_column(String(255))
     tag_code: Mapped[str] = mapped_column(String(64))
     risk_level: Mapped[str] = mapped_column(String(32))
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    norm_hash: Mapped[Optional[str]] = mapped_column(CHAR(40), nullable=True, index=True)  # 归一化形式哈希（变体检测）
 
 
 class MetaTags(Base):
@@ -52,6 +59,9 @@ class MetaTags(Base):
 
 class ScenarioKeywords(Base):
     __tablename__ = "lib_scenario_keywords"
+    __table_args__ = (
+        Index("uk_scenario_keyword", "scenario_id", "keyword", "rule_mode", unique=True),
+    )
 
     CATEGORY_WHITE = 0
     CATEGORY_BLACK = 1
@@ -66,6 +76,7 @@ class ScenarioKeywords(Base):
     category: Mapped[int] = mapped_column(
         Integer, default=CATEGORY_BLACK, comment="0:白, 1:黑"
     )
+    norm_hash: Mapped[Optional[str]] = mapped_column(CHAR(40), nullable=True, index=True)  # 归一化形式哈希（变体检测）
 
 
 class RuleScenarioPolicy(Base):
@@ -94,6 +105,9 @@ class RuleGlobalDefaults(Base):
 
 class PlaygroundHistory(Base):
     __tablename__ = "playground_history"
+    __table_args__ = (
+        Index("idx_playground_created", "created_at"),  # 按保留期限清理
+    )
 
     id: Mapped[str] = mapped_column(CHAR(36), primary_key=True)
     request_id: Mapped[str] = mapped_column(String(64), index=True)
@@ -135,6 +149,19 @@ class User(Base):
 
 class StagingGlobalKeywords(Base):
     __tablename__ = "staging_global_keywords"
+    __table_args__ = (
+        # 认领：WHERE status = 'PENDING' ORDER BY created_at（二级索引自带主键，覆盖查询）
+        Index("idx_staging_kw_status_created", "status", "created_at"),
+        # 列表：标注员查看自己的已认领/已审核任务；定位用户当前批次
+        Index("idx_staging_kw_claimer_status", "claimed_by", "status", "claimed_at"),
+        Index("idx_staging_kw_annotator_status", "annotator", "status", "created_at"),
+        # 超时释放：WHERE status = 'CLAIMED' AND claimed_at < ? ORDER BY claimed_at LIMIT n
+        Index("idx_staging_kw_status_claimed", "status", "claimed_at"),
+        # 入库去重：keyword IN (...)
+        Index("idx_staging_kw_keyword", "keyword"),
+        # 优先级刷新：待打分（priority_at IS NULL）与过期的 PENDING 任务
+        Index("idx_staging_kw_status_priority_at", "status", "priority_at"),
+    )
 
     id: Mapped[str] = mapped_column(CHAR(36), primary_key=True)
     keyword: Mapped[str] = mapped_column(String(255))
@@ -146,6 +173,15 @@ class StagingGlobalKeywords(Base):
     
     status: Mapped[str] = mapped_column(String(32), default="PENDING", index=True) # PENDING, CLAIMED, REVIEWED, SYNCED, IGNORED
     is_modified: Mapped[bool] = mapped_column(Boolean, default=False)
+    norm_hash: Mapped[Optional[str]] = mapped_column(CHAR(40), nullable=True, index=True)  # 归一化形式哈希（变体检测）
+
+    # 模型置信度与认领优先级（优先级高的先认领，由 staging_priority 按置信度/近期提示词命中/风险综合打分）
+    confidence: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    priority: Mapped[float] = mapped_column(Float, default=0.0)
+    priority_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)  # 为空表示待打分
+    # 近期提示词命中数（按半衰期衰减到 prompt_hits_at 时刻的值）
+    prompt_hits: Mapped[float] = mapped_column(Float, default=0.0)
+    prompt_hits_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
     # 认领信息
     claimed_by: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, index=True)
@@ -159,6 +195,13 @@ class StagingGlobalKeywords(Base):
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
 
+# 认领：WHERE status = 'PENDING' ORDER BY priority DESC, created_at（降序索引列，需在类定义后引用列对象）
+Index(
+    "idx_staging_kw_claim_priority",
+    StagingGlobalKeywords.status, StagingGlobalKeywords.priority.desc(), StagingGlobalKeywords.created_at
+)
+
+
 # ============================================
 # RBAC 相关模型 (V2 - 标准 RBAC)
 # ============================================
@@ -201,6 +244,10 @@ class Permission(Base):
 class RolePermission(Base):
     """角色-权限关联表"""
     __tablename__ = "role_permissions"
+    __table_args__ = (
+        # 权限解析：JOIN role_permissions ON role_id（覆盖 permission_id，无需回表）；同一角色同一权限只关联一次
+        Index("uk_role_permission", "role_id", "permission_id", unique=True),
+    )
 
     id: Mapped[str] = mapped_column(CHAR(36), primary_key=True)
     role_id: Mapped[str] = mapped_column(CHAR(36), index=True)
@@ -211,6 +258,10 @@ class RolePermission(Base):
 class UserScenarioRole(Base):
     """用户-场景-角色关联表"""
     __tablename__ = "user_scenario_roles"
+    __table_args__ = (
+        # 权限解析：WHERE user_id = ?，覆盖 role_id / scenario_id；同一场景角色只分配一次（全局角色 scenario_id 为 NULL，由写入方去重）
+        Index("uk_user_scenario_role", "user_id", "role_id", "scenario_id", unique=True),
+    )
 
     id: Mapped[str] = mapped_column(CHAR(36), primary_key=True)
     user_id: Mapped[str] = mapped_column(CHAR(36), index=True)
@@ -280,6 +331,14 @@ class AuditLog(Base):
 
 class StagingGlobalRules(Base):
     __tablename__ = "staging_global_rules"
+    __table_args__ = (
+        Index("idx_staging_rule_status_created", "status", "created_at"),
+        Index("idx_staging_rule_claimer_status", "claimed_by", "status", "claimed_at"),
+        Index("idx_staging_rule_annotator_status", "annotator", "status", "created_at"),
+        Index("idx_staging_rule_status_claimed", "status", "claimed_at"),
+        Index("idx_staging_rule_tag_condition", "tag_code", "extra_condition"),
+        Index("idx_staging_rule_status_priority_at", "status", "priority_at"),
+    )
 
     id: Mapped[str] = mapped_column(CHAR(36), primary_key=True)
     tag_code: Mapped[str] = mapped_column(String(64))
@@ -291,6 +350,10 @@ class StagingGlobalRules(Base):
     status: Mapped[str] = mapped_column(String(32), default="PENDING", index=True) # PENDING, CLAIMED, REVIEWED, SYNCED, IGNORED
     is_modified: Mapped[bool] = mapped_column(Boolean, default=False)
 
+    confidence: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    priority: Mapped[float] = mapped_column(Float, default=0.0)
+    priority_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
     # 认领信息
     claimed_by: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, index=True)
     claimed_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -300,4 +363,233 @@ class StagingGlobalRules(Base):
     annotator: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, index=True)
     annotated_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
-    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+Index(
+    "idx_staging_rule_claim_priority",
+    StagingGlobalRules.status, StagingGlobalRules.priority.desc(), StagingGlobalRules.created_at
+)
+
+class BulkJob(Base):
+    """批量任务表（导入等长任务的进度、错误与断点）"""
+    __tablename__ = "bulk_jobs"
+
+    id: Mapped[str] = mapped_column(CHAR(36), primary_key=True)
+    job_type: Mapped[str] = mapped_column(String(32), index=True)  # GLOBAL_KEYWORD_IMPORT, SCENARIO_KEYWORD_IMPORT, KEYWORD_DUPLICATE_SCAN, KEYWORD_REDUNDANCY_SCAN, STAGING_KEYWORD_SYNC, STAGING_RULE_SYNC, STAGING_KEYWORD_INGEST, STAGING_RULE_INGEST, STAGING_KEYWORD_AUTO_ACCEPT, STAGING_RULE_AUTO_ACCEPT
+    status: Mapped[str] = mapped_column(String(16), default="PENDING", index=True)  # PENDING, RUNNING, COMPLETED, FAILED
+    scenario_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, index=True)
+    source_name: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)  # 上传文件名
+
+    # 进度统计
+    processed_rows: Mapped[int] = mapped_column(Integer, default=0)
+    inserted_rows: Mapped[int] = mapped_column(Integer, default=0)
+    updated_rows: Mapped[int] = mapped_column(Integer, default=0)
+    skipped_rows: Mapped[int] = mapped_column(Integer, default=0)
+    error_rows: Mapped[int] = mapped_column(Integer, default=0)
+
+    # 断点：已提交的最后一行行号，续传时跳过该行及之前的数据
+    checkpoint: Mapped[int] = mapped_column(Integer, default=0)
+    errors: Mapped[Optional[Any]] = mapped_column(JSON, nullable=True)  # [{"row": 12, "error": "..."}]
+    message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    created_by: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[Optional[DateTime]] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=True
+    )
+    finished_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class KeywordDuplicatePair(Base):
+    """敏感词变体/近似重复候选对（a 为建议保留项，b 为建议合并掉的变体）"""
+    __tablename__ = "keyword_duplicate_pairs"
+    __table_args__ = (
+        Index("uk_duplicate_pair", "source_a", "id_a", "source_b", "id_b", unique=True),
+        Index("idx_duplicate_status", "status", "created_at"),
+    )
+
+    id: Mapped[str] = mapped_column(CHAR(36), primary_key=True)
+    source_a: Mapped[str] = mapped_column(String(16))  # GLOBAL, SCENARIO, STAGING
+    id_a: Mapped[str] = mapped_column(CHAR(36))
+    keyword_a: Mapped[str] = mapped_column(String(255))
+    source_b: Mapped[str] = mapped_column(String(16))
+    id_b: Mapped[str] = mapped_column(CHAR(36), index=True)
+    keyword_b: Mapped[str] = mapped_column(String(255))
+    scenario_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, index=True)  # 涉及场景词时的场景
+
+    match_type: Mapped[str] = mapped_column(String(16))  # NORMALIZED, SIMILAR
+    similarity: Mapped[float] = mapped_column(Float, default=1.0)
+    status: Mapped[str] = mapped_column(String(16), default="OPEN")  # OPEN, MERGED, DISMISSED
+    job_id: Mapped[Optional[str]] = mapped_column(CHAR(36), nullable=True)  # 发现该候选对的扫描任务，创建时检测为空
+
+    resolved_by: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    resolved_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class KeywordRedundancy(Base):
+    """场景敏感词冗余/冲突分析结果（按场景整体替换）"""
+    __tablename__ = "keyword_redundancies"
+    __table_args__ = (
+        Index("idx_redundancy_scenario_kind", "scenario_id", "kind"),
+    )
+
+    id: Mapped[str] = mapped_column(CHAR(36), primary_key=True)
+    job_id: Mapped[Optional[str]] = mapped_column(CHAR(36), nullable=True)  # 产生该结果的分析任务，清理后重算为空
+    scenario_id: Mapped[str] = mapped_column(String(64))
+    scenario_keyword_id: Mapped[str] = mapped_column(CHAR(36))
+    keyword: Mapped[str] = mapped_column(String(255))
+    category: Mapped[int] = mapped_column(Integer)
+    rule_mode: Mapped[int] = mapped_column(Integer)
+
+    kind: Mapped[str] = mapped_column(String(32))  # EXACT, SUBSUMED, WHITELIST_OVERRIDES_GLOBAL, WHITE_BLACK_CONFLICT
+    related_source: Mapped[str] = mapped_column(String(16))  # GLOBAL, SCENARIO
+    related_id: Mapped[str] = mapped_column(CHAR(36))
+    related_keyword: Mapped[str] = mapped_column(String(255))
+    tag_match: Mapped[bool] = mapped_column(Boolean, default=True)
+
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class StagingPriorityState(Base):
+    """待审核任务优先级刷新进度（已扫描到的最后一条沙盒测试记录）"""
+    __tablename__ = "staging_priority_state"
+
+    task_type: Mapped[str] = mapped_column(String(16), primary_key=True)  # keywords, rules
+    prompt_created_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    prompt_id: Mapped[Optional[str]] = mapped_column(CHAR(36), nullable=True)
+    refreshed_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class LibraryVersion(Base):
+    """正式库版本（每次从待审核库同步生成一个新版本，下游按版本增量拉取变更）"""
+    __tablename__ = "library_versions"
+    __table_args__ = (
+        Index("uk_library_version", "library", "version", unique=True),
+    )
+
+    id: Mapped[str] = mapped_column(CHAR(36), primary_key=True)
+    library: Mapped[str] = mapped_column(String(32))  # GLOBAL_KEYWORDS, GLOBAL_DEFAULTS
+    version: Mapped[int] = mapped_column(Integer)
+    job_id: Mapped[Optional[str]] = mapped_column(CHAR(36), nullable=True)
+    inserted_rows: Mapped[int] = mapped_column(Integer, default=0)
+    updated_rows: Mapped[int] = mapped_column(Integer, default=0)
+    created_by: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    finished_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)  # 非空表示版本已封版，不再追加变更
+
+
+class LibraryChange(Base):
+    """正式库变更流水（与被同步的数据在同一事务中写入）"""
+    __tablename__ = "library_changes"
+    __table_args__ = (
+        Index("idx_library_change_version", "library", "version"),
+    )
+
+    id: Mapped[str] = mapped_column(CHAR(36), primary_key=True)
+    library: Mapped[str] = mapped_column(String(32))
+    version: Mapped[int] = mapped_column(Integer)
+    record_id: Mapped[str] = mapped_column(CHAR(36))
+    record_key: Mapped[str] = mapped_column(String(255))  # 关键词，或 标签|附加条件
+    action: Mapped[str] = mapped_column(String(16))  # INSERT, UPDATE
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class StagingTaskCounter(Base):
+    """待审核任务计数器（与任务状态变更在同一事务中增量维护，按分片分散热点行）"""
+    __tablename__ = "staging_task_counters"
+    __table_args__ = (
+        Index("uk_staging_counter", "task_type", "dimension", "dim_key", "status", "shard", unique=True),
+    )
+
+    id: Mapped[str] = mapped_column(CHAR(36), primary_key=True)
+    task_type: Mapped[str] = mapped_column(String(16))  # keywords, rules
+    dimension: Mapped[str] = mapped_column(String(16))  # STATUS, ANNOTATOR, CLAIMER, BATCH
+    dim_key: Mapped[str] = mapped_column(String(64), default="")  # 标注员/认领人用户名或批次ID，STATUS 维度为空串
+    status: Mapped[str] = mapped_column(String(32))
+    shard: Mapped[int] = mapped_column(Integer, default=0)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[Optional[DateTime]] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=True
+    )
+
+
+class StagingReviewSample(Base):
+    """双人审核抽样：抽中的任务在首次人工审核后，由另一名标注员盲审一次，用于计算标注一致性"""
+    __tablename__ = "staging_review_samples"
+    __table_args__ = (
+        Index("uk_review_sample", "task_type", "task_id", unique=True),
+        # 第二次审核认领：WHERE task_type = ? AND status = 'PENDING' ORDER BY created_at
+        Index("idx_review_sample_status", "task_type", "status", "created_at"),
+    )
+
+    id: Mapped[str] = mapped_column(CHAR(36), primary_key=True)
+    task_type: Mapped[str] = mapped_column(String(16))  # keywords, rules
+    task_id: Mapped[str] = mapped_column(CHAR(36))
+    tag: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)  # 一致性按标签分组的键（关键词为预测标签，规则为标签）
+    first_annotator: Mapped[str] = mapped_column(String(64))
+    first_label: Mapped[str] = mapped_column(String(64))  # 审核结论：最终标签/策略，忽略为 IGNORED
+    status: Mapped[str] = mapped_column(String(16), default="PENDING")  # PENDING, CLAIMED, DONE
+    claimed_by: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    claimed_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    second_annotator: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    second_label: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    reviewed_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class StagingAgreementCounter(Base):
+    """标注一致性累计量（每完成一次双人审核增量更新，Cohen's kappa 由这些计数直接算出）"""
+    __tablename__ = "staging_agreement_counters"
+    __table_args__ = (
+        Index("uk_agreement_counter", "task_type", "scope", "scope_key", "cell", unique=True),
+    )
+
+    id: Mapped[str] = mapped_column(CHAR(36), primary_key=True)
+    task_type: Mapped[str] = mapped_column(String(16))
+    scope: Mapped[str] = mapped_column(String(16))  # GLOBAL, TAG, ANNOTATOR
+    scope_key: Mapped[str] = mapped_column(String(64), default="")  # 标签或标注员，GLOBAL 为空串
+    cell: Mapped[str] = mapped_column(String(80))  # n, agree, a:<结论>, b:<结论>
+    count: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class UserSession(Base):
+    """登录会话（刷新令牌索引）：刷新令牌为 "<会话ID>.<随机串>"，只保存随机串的哈希，每次刷新轮换"""
+    __tablename__ = "user_sessions"
+    __table_args__ = (
+        # 按用户列出/批量吊销有效会话
+        Index("idx_user_session_user_revoked", "user_id", "revoked_at"),
+    )
+
+    id: Mapped[str] = mapped_column(CHAR(36), primary_key=True)
+    user_id: Mapped[str] = mapped_column(CHAR(36))
+    refresh_token_hash: Mapped[str] = mapped_column(CHAR(64))  # SHA-256（十六进制）
+    user_agent: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    ip_address: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    refresh_count: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    last_refreshed_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    expires_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True))
+    revoked_at: Mapped[Optional[DateTime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    revoked_reason: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)  # LOGOUT, USER_DISABLED, USER_DELETED, TOKEN_REUSED, ADMIN
+
+
+class SchedulerLease(Base):
+    """定时任务选主租约（持有未过期租约的副本为主，负责执行定时任务）"""
+    __tablename__ = "scheduler_leases"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    holder: Mapped[str] = mapped_column(String(128))  # 副本标识：主机名:进程号:随机串
+    expires_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True))
+    updated_at: Mapped[Optional[DateTime]] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=True
+    )
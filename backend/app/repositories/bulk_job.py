@@ -0,0 +1,20 @@
+from typing import List, Optional
+from sqlalchemy import select, desc
+from app.repositories.base import BaseRepository
+from app.models.db_meta import BulkJob
+
+class BulkJobRepository(BaseRepository[BulkJob]):
+    async def get_recent(
+        self,
+        job_type: Optional[str] = None,
+        scenario_id: Optional[str] = None,
+        limit: int = 20
+    ) -> List[BulkJob]:
+        query = select(self.model)
+        if job_type:
+            query = query.where(self.model.job_type == job_type)
+        if scenario_id:
+            query = query.where(self.model.scenario_id == scenario_id)
+        query = query.order_by(desc(self.model.created_at)).limit(limit)
+        result = await self.db.execute(query)
+        return result.scalars().all()
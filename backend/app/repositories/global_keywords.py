@@ -1,8 +1,17 @@
-from typing import List, Optional
-from sqlalchemy import select
+from typing import List, Optional, Set, Tuple
+from sqlalchemy import select, func, case
+from sqlalchemy.dialects.mysql import insert as mysql_insert, match
 from app.repositories.base import BaseRepository
 from app.models.db_meta import GlobalKeywords
 
+# 与 MySQL ngram_token_size 保持一致（默认 2）；更短的查询词无法走全文索引
+NGRAM_TOKEN_SIZE = 2
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
 class GlobalKeywordsRepository(BaseRepository[GlobalKeywords]):
     async def get_all(
         self, 
@@ -32,3 +41,85 @@ class GlobalKeywordsRepository(BaseRepository[GlobalKeywords]):
     async def search(self, keyword: str) -> List[GlobalKeywords]:
         result = await self.db.execute(select(self.model).where(self.model.keyword.like(f"%{keyword}%")))
         return result.scalars().all()
+
+    def search_condition(self, keyword: str):
+        """
+        search_ranked 的检索条件（仅用于 /keywords/global/search，其他列表接口保持 LIKE 子串匹配）
+
+        长度 >= NGRAM_TOKEN_SIZE：ngram 全文索引短语匹配（等价于子串匹配）
+        更短的查询词：转义后的 LIKE 子串匹配
+        """
+        if len(keyword) >= NGRAM_TOKEN_SIZE:
+            return self._match(keyword)
+        return self.model.keyword.contains(keyword, autoescape=True)
+
+    def _match(self, keyword: str):
+        # 以短语形式检索，ngram 短语匹配要求相邻 token 连续出现
+        phrase = '"' + keyword.replace('"', " ") + '"'
+        return match(self.model.keyword, against=phrase).in_boolean_mode()
+
+    async def search_ranked(
+        self,
+        keyword: str,
+        tag_codes: Optional[List[str]] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> Tuple[List[GlobalKeywords], int]:
+        """
+        带排序与总数的关键词检索
+
+        排序：完全匹配 > 前缀匹配 > 全文相关度 > 关键词长度
+
+        Returns:
+            (当前页结果, 总命中数)
+        """
+        keyword = keyword.strip()
+        conditions = [self.search_condition(keyword)]
+        if tag_codes:
+            conditions.append(self.model.tag_code.in_(tag_codes))
+
+        count_query = select(func.count()).select_from(self.model).where(*conditions)
+        total = (await self.db.execute(count_query)).scalar() or 0
+        if total == 0:
+            return [], 0
+
+        order_by = [
+            case((self.model.keyword == keyword, 0), else_=1),
+            case((self.model.keyword.like(f"{_escape_like(keyword)}%", escape="\\"), 0), else_=1),
+        ]
+        if len(keyword) >= NGRAM_TOKEN_SIZE:
+            order_by.append(self._match(keyword).desc())
+        order_by += [func.char_length(self.model.keyword), self.model.id]
+
+        query = select(self.model).where(*conditions).order_by(*order_by).offset(skip).limit(limit)
+        result = await self.db.execute(query)
+        return result.scalars().all(), total
+
+    async def get_existing_keywords(self, keywords: List[str]) -> Set[str]:
+        """一次 IN 查询返回已存在的关键词（用于批量去重）"""
+        if not keywords:
+            return set()
+        query = select(self.model.keyword).where(self.model.keyword.in_(keywords))
+        result = await self.db.execute(query)
+        return set(result.scalars().all())
+
+    async def bulk_upsert(self, rows: List[dict], update_existing: bool = True) -> None:
+        """
+        多行 INSERT ... ON DUPLICATE KEY UPDATE（依赖 uk_global_keyword 唯一索引）
+
+        不提交事务，由调用方控制批次事务边界。
+        update_existing=False 时已存在的关键词保持不变。
+        """
+        if not rows:
+            return
+        stmt = mysql_insert(self.model).values(rows)
+        if update_existing:
+            stmt = stmt.on_duplicate_key_update(
+                tag_code=stmt.inserted.tag_code,
+                risk_level=stmt.inserted.risk_level,
+                is_active=stmt.inserted.is_active,
+                norm_hash=stmt.inserted.norm_hash,
+            )
+        else:
+            stmt = stmt.prefix_with("IGNORE")
+        await self.db.execute(stmt)
@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import select, delete, func, or_, and_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from app.repositories.base import BaseRepository
+from app.models.db_meta import KeywordDuplicatePair
+
+class KeywordDuplicatePairRepository(BaseRepository[KeywordDuplicatePair]):
+    async def list_pairs(
+        self,
+        status: Optional[str] = None,
+        source: Optional[str] = None,
+        scenario_id: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> Tuple[List[KeywordDuplicatePair], int]:
+        conditions = []
+        if status:
+            conditions.append(self.model.status == status)
+        if source:
+            conditions.append(or_(self.model.source_a == source, self.model.source_b == source))
+        if scenario_id:
+            conditions.append(self.model.scenario_id == scenario_id)
+
+        count_query = select(func.count()).select_from(self.model).where(*conditions)
+        total = (await self.db.execute(count_query)).scalar() or 0
+
+        query = (
+            select(self.model)
+            .where(*conditions)
+            .order_by(self.model.created_at.desc(), self.model.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await self.db.execute(query)
+        return result.scalars().all(), total
+
+    async def upsert_pairs(self, rows: List[dict]) -> None:
+        """
+        多行写入候选对（依赖 uk_duplicate_pair 唯一索引）
+
+        已存在的候选对只刷新关键词、相似度和任务ID，保留处理状态（已忽略的不会被重新打开）。
+        不提交事务。
+        """
+        if not rows:
+            return
+        stmt = mysql_insert(self.model).values(rows)
+        stmt = stmt.on_duplicate_key_update(
+            keyword_a=stmt.inserted.keyword_a,
+            keyword_b=stmt.inserted.keyword_b,
+            match_type=stmt.inserted.match_type,
+            similarity=stmt.inserted.similarity,
+            job_id=stmt.inserted.job_id,
+        )
+        await self.db.execute(stmt)
+
+    async def delete_stale_open(self, job_id: str, started_at: datetime) -> int:
+        """删除扫描开始前产生、本次扫描未再发现的未处理候选对（关键词已被修改或删除）"""
+        stmt = delete(self.model).where(
+            self.model.status == "OPEN",
+            or_(self.model.job_id.is_(None), self.model.job_id != job_id),
+            self.model.created_at < started_at,
+        ).execution_options(synchronize_session=False)
+        result = await self.db.execute(stmt)
+        return result.rowcount
+
+    async def delete_open_for(self, source: str, keyword_id: str) -> None:
+        """删除涉及某条关键词的未处理候选对（该关键词已被合并）"""
+        stmt = delete(self.model).where(
+            self.model.status == "OPEN",
+            or_(
+                and_(self.model.source_a == source, self.model.id_a == keyword_id),
+                and_(self.model.source_b == source, self.model.id_b == keyword_id),
+            )
+        ).execution_options(synchronize_session=False)
+        await self.db.execute(stmt)
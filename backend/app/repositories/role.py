@@ -1,10 +1,34 @@
 """角色和权限 Repository"""
-from typing import List, Optional
-from sqlalchemy import select, delete
+import uuid
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.permission_bits import PermissionSet
+from app.core.permission_cache import permission_cache
 from app.models.db_meta import Role, Permission, RolePermission, UserScenarioRole
 
+# 多行 INSERT / DELETE 每条语句的行数
+BULK_CHUNK_SIZE = 500
+
+# (user_id, scenario_id, role_id)
+AssignmentKey = Tuple[str, Optional[str], str]
+
+
+def _chunks(items: List, size: int = BULK_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+async def _insert_ignore(db: AsyncSession, model, rows: List[dict]) -> int:
+    """多行 INSERT，违反唯一索引的行跳过（并发写入同一行时不报错），不提交事务；返回插入行数"""
+    inserted = 0
+    for chunk in _chunks(rows):
+        result = await db.execute(mysql_insert(model).values(chunk).prefix_with("IGNORE"))
+        inserted += result.rowcount
+    return inserted
+
 
 class RoleRepository:
     def __init__(self, db: AsyncSession):
@@ -21,6 +45,29 @@ class RoleRepository:
     async def get_by_id(self, role_id: str) -> Optional[Role]:
         return await self.db.get(Role, role_id)
 
+    async def get_all_with_permission_counts(self, active_only: bool = True) -> List[Tuple[Role, int]]:
+        """角色列表及各角色的权限数（GROUP BY 子查询 + 外连接，单条查询）"""
+        counts = (
+            select(RolePermission.role_id, func.count().label("permission_count"))
+            .group_by(RolePermission.role_id)
+            .subquery()
+        )
+        query = select(Role, func.coalesce(counts.c.permission_count, 0)).outerjoin(
+            counts, counts.c.role_id == Role.id
+        )
+        if active_only:
+            query = query.where(Role.is_active == True)
+        query = query.order_by(Role.role_type, Role.role_code)
+        result = await self.db.execute(query)
+        return [(role, count) for role, count in result.all()]
+
+    async def get_by_ids(self, role_ids: List[str]) -> Dict[str, Role]:
+        """按ID批量查询（IN），返回 {角色ID: 角色}"""
+        if not role_ids:
+            return {}
+        result = await self.db.execute(select(Role).where(Role.id.in_(set(role_ids))))
+        return {role.id: role for role in result.scalars().all()}
+
     async def get_by_code(self, role_code: str) -> Optional[Role]:
         query = select(Role).where(Role.role_code == role_code)
         result = await self.db.execute(query)
@@ -35,6 +82,7 @@ class RoleRepository:
     async def update(self, role: Role) -> Role:
         await self.db.commit()
         await self.db.refresh(role)
+        await permission_cache.invalidate_all()
         return role
 
     async def delete_role(self, role_id: str) -> bool:
@@ -51,6 +99,7 @@ class RoleRepository:
         )
         await self.db.delete(role)
         await self.db.commit()
+        await permission_cache.invalidate_all()
         return True
 
     # ============================================
@@ -68,25 +117,55 @@ class RoleRepository:
         return list(result.scalars().all())
 
     async def get_role_permission_count(self, role_id: str) -> int:
-        query = select(RolePermission).where(RolePermission.role_id == role_id)
+        query = select(func.count()).select_from(RolePermission).where(RolePermission.role_id == role_id)
         result = await self.db.execute(query)
-        return len(result.scalars().all())
+        return result.scalar_one()
 
-    async def update_role_permissions(self, role_id: str, permission_ids: List[str]):
-        # 删除旧的
-        await self.db.execute(
-            delete(RolePermission).where(RolePermission.role_id == role_id)
+    async def update_role_permissions(self, role_id: str, permission_ids: List[str]) -> Dict[str, int]:
+        """替换角色的权限集合，返回 {"added": 新增数, "removed": 移除数}"""
+        return (await self.replace_permission_matrix({role_id: permission_ids}))[role_id]
+
+    async def replace_permission_matrix(self, matrix: Dict[str, List[str]]) -> Dict[str, Dict[str, int]]:
+        """
+        批量替换多个角色的权限集合（单事务，只写入差异，提交后统一失效一次权限缓存）
+
+        Args:
+            matrix: {角色ID: 权限ID列表}
+
+        Returns:
+            {角色ID: {"added": 新增数, "removed": 移除数}}
+        """
+        result = await self.db.execute(
+            select(RolePermission.id, RolePermission.role_id, RolePermission.permission_id)
+            .where(RolePermission.role_id.in_(list(matrix)))
         )
-        # 插入新的
-        import uuid
-        for perm_id in permission_ids:
-            rp = RolePermission(
-                id=str(uuid.uuid4()),
-                role_id=role_id,
-                permission_id=perm_id
-            )
-            self.db.add(rp)
+        current: Dict[str, Dict[str, str]] = {role_id: {} for role_id in matrix}
+        for row_id, role_id, permission_id in result.all():
+            current[role_id][permission_id] = row_id
+
+        stats = {}
+        to_delete: List[str] = []
+        to_insert: List[dict] = []
+        for role_id, permission_ids in matrix.items():
+            desired = set(permission_ids)
+            existing = current[role_id]
+            removed = [row_id for permission_id, row_id in existing.items() if permission_id not in desired]
+            added = [
+                {"id": str(uuid.uuid4()), "role_id": role_id, "permission_id": permission_id}
+                for permission_id in sorted(desired - set(existing))
+            ]
+            to_delete.extend(removed)
+            to_insert.extend(added)
+            stats[role_id] = {"added": len(added), "removed": len(removed)}
+
+        for chunk in _chunks(to_delete):
+            await self.db.execute(delete(RolePermission).where(RolePermission.id.in_(chunk)))
+        if to_insert:
+            await _insert_ignore(self.db, RolePermission, to_insert)
         await self.db.commit()
+        if to_delete or to_insert:
+            await permission_cache.invalidate_all()
+        return stats
 
 
 class PermissionRepository:
@@ -113,52 +192,100 @@ class UserScenarioRoleRepository:
         result = await self.db.execute(query)
         return list(result.scalars().all())
 
+    async def get_assignment(self, user_id: str, scenario_id: Optional[str], role_id: str) -> Optional[UserScenarioRole]:
+        """按 (用户, 场景, 角色) 查询分配（走唯一索引）"""
+        scenario_condition = (
+            UserScenarioRole.scenario_id.is_(None) if scenario_id is None else UserScenarioRole.scenario_id == scenario_id
+        )
+        query = select(UserScenarioRole).where(
+            UserScenarioRole.user_id == user_id, UserScenarioRole.role_id == role_id, scenario_condition
+        )
+        result = await self.db.execute(query)
+        return result.scalars().first()
+
+    async def get_user_roles_with_role(self, user_id: str) -> List[Tuple[UserScenarioRole, Optional[Role]]]:
+        """用户的角色分配及对应角色（外连接，单条查询；角色已删除时为 None）"""
+        query = (
+            select(UserScenarioRole, Role)
+            .outerjoin(Role, Role.id == UserScenarioRole.role_id)
+            .where(UserScenarioRole.user_id == user_id)
+        )
+        result = await self.db.execute(query)
+        return [(assignment, role) for assignment, role in result.all()]
+
     async def assign_role(self, assignment: UserScenarioRole) -> UserScenarioRole:
         self.db.add(assignment)
         await self.db.commit()
         await self.db.refresh(assignment)
+        await permission_cache.invalidate_user(assignment.user_id)
         return assignment
 
+    async def bulk_assign(self, targets: Iterable[AssignmentKey], created_by: Optional[str] = None) -> Tuple[int, int]:
+        """
+        批量分配角色（单事务）：一次查询已有分配做集合差，只插入缺失的行，提交后统一失效涉及用户的权限缓存
+
+        Args:
+            targets: [(用户ID, 场景ID, 角色ID)]，场景ID 为 None 表示全局角色
+
+        Returns:
+            (新增数, 已存在而跳过数)
+        """
+        wanted: Set[AssignmentKey] = set(targets)
+        if not wanted:
+            return 0, 0
+        user_ids = sorted({user_id for user_id, _, _ in wanted})
+        role_ids = sorted({role_id for _, _, role_id in wanted})
+        existing: Set[AssignmentKey] = set()
+        for chunk in _chunks(user_ids):
+            result = await self.db.execute(
+                select(UserScenarioRole.user_id, UserScenarioRole.scenario_id, UserScenarioRole.role_id)
+                .where(UserScenarioRole.user_id.in_(chunk), UserScenarioRole.role_id.in_(role_ids))
+            )
+            existing.update(tuple(row) for row in result.all())
+
+        missing = sorted(wanted - existing, key=lambda key: (key[0], key[1] or "", key[2]))
+        inserted = await _insert_ignore(self.db, UserScenarioRole, [
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "scenario_id": scenario_id,
+                "role_id": role_id,
+                "created_by": created_by,
+            }
+            for user_id, scenario_id, role_id in missing
+        ]) if missing else 0
+        await self.db.commit()
+        if missing:
+            await permission_cache.invalidate_user(*sorted({user_id for user_id, _, _ in missing}))
+        return inserted, len(wanted) - inserted
+
     async def remove_role(self, assignment_id: str) -> bool:
         assignment = await self.db.get(UserScenarioRole, assignment_id)
         if not assignment:
             return False
         await self.db.delete(assignment)
         await self.db.commit()
+        await permission_cache.invalidate_user(assignment.user_id)
         return True
 
+    async def get_user_permission_set(self, user_id: str) -> PermissionSet:
+        """
+        一条 JOIN 查询解析用户的有效权限（user_scenario_roles → role_permissions → permissions）
+
+        Returns:
+            按全局/场景分组的权限位图
+        """
+        query = (
+            select(UserScenarioRole.scenario_id, Permission.permission_code)
+            .join(RolePermission, RolePermission.role_id == UserScenarioRole.role_id)
+            .join(Permission, Permission.id == RolePermission.permission_id)
+            .where(UserScenarioRole.user_id == user_id)
+            .where(Permission.is_active == True)
+            .distinct()
+        )
+        result = await self.db.execute(query)
+        return PermissionSet.from_rows(result.all())
+
     async def get_user_permission_codes(self, user_id: str) -> dict:
         """获取用户的所有权限编码，按全局/场景分组"""
-        # 查询用户所有角色分配
-        query = select(UserScenarioRole).where(UserScenarioRole.user_id == user_id)
-        result = await self.db.execute(query)
-        assignments = result.scalars().all()
-
-        global_perms = set()
-        scenario_perms = {}  # {scenario_id: set(perm_codes)}
-
-        for assignment in assignments:
-            # 获取角色的权限
-            perm_query = (
-                select(Permission.permission_code, Permission.scope)
-                .join(RolePermission, RolePermission.permission_id == Permission.id)
-                .where(RolePermission.role_id == assignment.role_id)
-                .where(Permission.is_active == True)
-            )
-            perm_result = await self.db.execute(perm_query)
-            perms = perm_result.fetchall()
-
-            for perm_code, perm_scope in perms:
-                if assignment.scenario_id is None:
-                    # 全局角色：全局权限直接加入，场景权限加入所有场景
-                    global_perms.add(perm_code)
-                else:
-                    # 场景角色：只加入对应场景
-                    if assignment.scenario_id not in scenario_perms:
-                        scenario_perms[assignment.scenario_id] = set()
-                    scenario_perms[assignment.scenario_id].add(perm_code)
-
-        return {
-            "global_permissions": list(global_perms),
-            "scenario_permissions": {k: list(v) for k, v in scenario_perms.items()}
-        }
+        return (await self.get_user_permission_set(user_id)).to_dict()
@@ -1,5 +1,6 @@
-from typing import List, Optional
-from sqlalchemy import select
+from typing import List, Optional, Set, Tuple
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from app.repositories.base import BaseRepository
 from app.models.db_meta import ScenarioKeywords
 
@@ -19,3 +20,37 @@ class ScenarioKeywordsRepository(BaseRepository[ScenarioKeywords]):
         )
         result = await self.db.execute(query)
         return result.scalars().first()
+
+    async def get_existing_keys(
+        self, scenario_id: str, keys: List[Tuple[str, int]]
+    ) -> Set[Tuple[str, int]]:
+        """一次查询返回场景内已存在的 (keyword, rule_mode) 组合（用于批量去重）"""
+        if not keys:
+            return set()
+        query = select(self.model.keyword, self.model.rule_mode).where(
+            self.model.scenario_id == scenario_id,
+            tuple_(self.model.keyword, self.model.rule_mode).in_(keys)
+        )
+        result = await self.db.execute(query)
+        return {(row.keyword, row.rule_mode) for row in result.all()}
+
+    async def bulk_upsert(self, rows: List[dict], update_existing: bool = True) -> None:
+        """
+        多行 INSERT ... ON DUPLICATE KEY UPDATE（依赖 uk_scenario_keyword 唯一索引）
+
+        不提交事务，由调用方控制批次事务边界。
+        """
+        if not rows:
+            return
+        stmt = mysql_insert(self.model).values(rows)
+        if update_existing:
+            stmt = stmt.on_duplicate_key_update(
+                tag_code=stmt.inserted.tag_code,
+                risk_level=stmt.inserted.risk_level,
+                is_active=stmt.inserted.is_active,
+                category=stmt.inserted.category,
+                norm_hash=stmt.inserted.norm_hash,
+            )
+        else:
+            stmt = stmt.prefix_with("IGNORE")
+        await self.db.execute(stmt)
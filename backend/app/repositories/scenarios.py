@@ -1,9 +1,51 @@
-from typing import Optional
-from sqlalchemy import select
+from typing import List, Optional
+from sqlalchemy import select, exists, or_
 from app.repositories.base import BaseRepository
-from app.models.db_meta import Scenarios
+from app.models.db_meta import Scenarios, UserScenarioAssignment, UserScenarioRole, RolePermission, Permission
 
 class ScenariosRepository(BaseRepository[Scenarios]):
     async def get_by_app_id(self, app_id: str) -> Optional[Scenarios]:
         result = await self.db.execute(select(self.model).where(self.model.app_id == app_id))
         return result.scalars().first()
+
+    async def list_accessible_page(
+        self,
+        user_id: Optional[str],
+        search: Optional[str],
+        after_app_id: Optional[str],
+        limit: int
+    ) -> List[Scenarios]:
+        """
+        keyset 分页（按 app_id）查询用户可访问的场景，单条查询
+
+        Args:
+            user_id: 只返回该用户有 V1 场景分配或 V2 场景角色（含启用的权限）的场景；None 表示不按权限过滤
+            search: 按 app_id / app_name 模糊搜索
+        """
+        query = select(self.model)
+        if user_id is not None:
+            query = query.where(or_(
+                exists().where(
+                    UserScenarioAssignment.user_id == user_id,
+                    UserScenarioAssignment.scenario_id == self.model.app_id
+                ),
+                # 与 PermissionSet.has_scenario 一致：场景角色至少有一项启用的权限才可访问
+                select(UserScenarioRole.id)
+                .join(RolePermission, RolePermission.role_id == UserScenarioRole.role_id)
+                .join(Permission, Permission.id == RolePermission.permission_id)
+                .where(
+                    UserScenarioRole.user_id == user_id,
+                    UserScenarioRole.scenario_id == self.model.app_id,
+                    Permission.is_active == True
+                )
+                .exists(),
+            ))
+        if search:
+            query = query.where(or_(
+                self.model.app_id.contains(search, autoescape=True),
+                self.model.app_name.contains(search, autoescape=True),
+            ))
+        if after_app_id is not None:
+            query = query.where(self.model.app_id > after_app_id)
+        result = await self.db.execute(query.order_by(self.model.app_id).limit(limit))
+        return list(result.scalars().all())
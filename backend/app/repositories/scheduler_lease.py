@@ -0,0 +1,53 @@
+from sqlalchemy import select, insert, update, or_, func, text
+from sqlalchemy.exc import IntegrityError
+from app.models.db_meta import SchedulerLease
+from app.repositories.base import BaseRepository
+
+
+def _db_now():
+    """数据库 UTC 时间：所有副本以同一时钟判断与计算租约过期，不受副本本地时钟偏差影响"""
+    return func.utc_timestamp()
+
+
+class SchedulerLeaseRepository(BaseRepository[SchedulerLease]):
+
+    async def try_acquire(self, name: str, holder: str, ttl_seconds: int) -> bool:
+        """
+        获取或续约租约（提交事务）
+
+        单条条件 UPDATE：租约属于自己或已过期时改为自己持有，并发副本中只有一个能更新成功。
+        租约行不存在时插入，主键冲突说明被其他副本抢先。
+        过期判断与新的过期时间都在 SQL 中按数据库时钟计算。
+        """
+        expires_at = func.timestampadd(text("SECOND"), ttl_seconds, _db_now())
+        result = await self.db.execute(
+            update(self.model)
+            .where(self.model.name == name, or_(self.model.holder == holder, self.model.expires_at < _db_now()))
+            .values(holder=holder, expires_at=expires_at)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            await self.db.commit()
+            return True
+
+        exists = (await self.db.execute(select(self.model.name).where(self.model.name == name))).scalar()
+        if exists:
+            await self.db.commit()
+            return False
+        try:
+            await self.db.execute(insert(self.model).values(name=name, holder=holder, expires_at=expires_at))
+            await self.db.commit()
+            return True
+        except IntegrityError:
+            await self.db.rollback()
+            return False
+
+    async def release(self, name: str, holder: str) -> None:
+        """主动放弃租约（正常停机时调用，其他副本无需等待过期即可接管）"""
+        await self.db.execute(
+            update(self.model)
+            .where(self.model.name == name, self.model.holder == holder)
+            .values(expires_at=func.timestampadd(text("SECOND"), -1, _db_now()))
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
@@ -0,0 +1,148 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+from sqlalchemy import select, update, func, or_, and_
+from app.repositories.base import BaseRepository, ModelType
+
+IN_CHUNK_SIZE = 1000   # 单条 IN (...) 语句的最大主键数
+MAX_CLAIM_ROUNDS = 10  # 补足认领数量的最大轮数（仅在不支持 SKIP LOCKED 的数据库上会超过一轮）
+
+class StagingRepository(BaseRepository[ModelType]):
+    """待审核任务仓储（StagingGlobalKeywords / StagingGlobalRules 共用认领字段）"""
+
+    def claim_order(self) -> list:
+        """认领顺序：优先级高的（模型最不确定的）优先，同优先级按入队时间先到先得"""
+        return [self.model.priority.desc(), self.model.created_at, self.model.id]
+
+    async def claim_pending(
+        self, username: str, batch_id: str, claimed_at: datetime, limit: int
+    ) -> List[str]:
+        """
+        原子认领一批 PENDING 任务
+
+        1. SELECT id ... FOR UPDATE SKIP LOCKED：按 (status, priority DESC, created_at) 索引取最优先的一批，
+           跳过其他事务正在认领的行，并发认领互不等待、不会拿到同一行
+        2. 单条 UPDATE ... WHERE id IN (...) AND status = 'PENDING' 写入认领信息
+        MySQL 8.0+ 一轮即可完成；不支持 SKIP LOCKED 的数据库上被并发抢走的行会再补一轮。
+
+        不提交事务，由调用方提交（提交前行锁一直持有）。
+
+        Returns:
+            实际认领到的任务ID
+        """
+        claimed: List[str] = []
+        for _ in range(MAX_CLAIM_ROUNDS):
+            if len(claimed) >= limit:
+                break
+            id_query = (
+                select(self.model.id)
+                .where(self.model.status == "PENDING")
+                .order_by(*self.claim_order())
+                .limit(limit - len(claimed))
+                .with_for_update(skip_locked=True)
+            )
+            ids = (await self.db.execute(id_query)).scalars().all()
+            if not ids:
+                break
+
+            stmt = (
+                update(self.model)
+                .where(self.model.id.in_(ids), self.model.status == "PENDING")
+                .values(status="CLAIMED", claimed_by=username, claimed_at=claimed_at, batch_id=batch_id)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.db.execute(stmt)
+            if result.rowcount == len(ids):
+                claimed.extend(ids)
+                continue
+
+            # 不支持 SKIP LOCKED 的数据库上可能与并发事务重叠：以实际写入本批次的行为准，再补足剩余数量
+            rows = await self.db.execute(select(self.model.id).where(self.model.batch_id == batch_id))
+            claimed = rows.scalars().all()
+        return claimed
+
+    async def get_many_for_update(self, ids: Sequence[str]) -> Dict[str, Any]:
+        """按主键批量读取并加行锁（id IN (...)），返回 {id: 行}"""
+        rows = {}
+        for start in range(0, len(ids), IN_CHUNK_SIZE):
+            query = (
+                select(self.model)
+                .where(self.model.id.in_(ids[start:start + IN_CHUNK_SIZE]))
+                .with_for_update()
+            )
+            result = await self.db.execute(query)
+            rows.update({row.id: row for row in result.scalars().all()})
+        return rows
+
+    async def bulk_update_by_ids(self, ids: Sequence[str], values: Dict[str, Any]) -> int:
+        """对一组主键执行同一条 UPDATE，不提交事务"""
+        updated = 0
+        for start in range(0, len(ids), IN_CHUNK_SIZE):
+            stmt = (
+                update(self.model)
+                .where(self.model.id.in_(ids[start:start + IN_CHUNK_SIZE]))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.db.execute(stmt)
+            updated += result.rowcount
+        return updated
+
+    async def get_current_batch(self, username: str) -> Optional[Any]:
+        """用户当前持有的认领批次 (batch_id, claimed_at)（按 (claimed_by, status, claimed_at) 索引取最近一批）"""
+        result = await self.db.execute(
+            select(self.model.batch_id, self.model.claimed_at)
+            .where(self.model.claimed_by == username, self.model.status == "CLAIMED")
+            .order_by(self.model.claimed_at.desc())
+            .limit(1)
+        )
+        return result.first()
+
+    async def get_current_batch_id(self, username: str) -> Optional[str]:
+        batch = await self.get_current_batch(username)
+        return batch.batch_id if batch else None
+
+    async def lock_expired_claims(self, threshold: datetime, limit: int) -> List[Any]:
+        """
+        加锁读取一批认领超时的任务（计数所需的列）
+
+        走 (status, claimed_at) 索引按超时先后取前 limit 条；SKIP LOCKED 跳过正在被审核的行，
+        清理不会阻塞标注员提交。
+        """
+        result = await self.db.execute(
+            select(self.model.id, self.model.status, self.model.annotator,
+                   self.model.claimed_by, self.model.batch_id)
+            .where(self.model.status == "CLAIMED", self.model.claimed_at < threshold)
+            .order_by(self.model.claimed_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return result.all()
+
+    async def count(self, conditions: Sequence[Any]) -> int:
+        result = await self.db.execute(select(func.count()).select_from(self.model).where(*conditions))
+        return result.scalar() or 0
+
+    async def list_page(
+        self,
+        columns: Sequence[Any],
+        conditions: Sequence[Any],
+        order_by: Sequence[Any],
+        after: Optional[Sequence[Any]],
+        limit: int,
+        descending: bool = False
+    ) -> List[Any]:
+        """
+        keyset 分页：WHERE (k1, k2) > (:v1, :v2) ORDER BY k1, k2 LIMIT n
+
+        after 为上一页最后一行的排序键值；展开为 OR 形式以便 MySQL 使用复合索引做范围扫描。
+        """
+        query = select(*columns).where(*conditions)
+        if after is not None:
+            keyset = []
+            for i, column in enumerate(order_by):
+                bound = column < after[i] if descending else column > after[i]
+                keyset.append(and_(*[order_by[j] == after[j] for j in range(i)], bound))
+            query = query.where(or_(*keyset))
+        query = query.order_by(*[c.desc() if descending else c.asc() for c in order_by]).limit(limit)
+        result = await self.db.execute(query)
+        return result.all()
@@ -0,0 +1,44 @@
+import uuid
+from typing import Dict, Optional, Sequence, Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from app.models.db_meta import StagingAgreementCounter
+from app.repositories.base import BaseRepository
+
+# 累计量键：(scope, scope_key, cell)
+AgreementKey = Tuple[str, str, str]
+
+
+class StagingAgreementCounterRepository(BaseRepository[StagingAgreementCounter]):
+
+    async def increment(self, task_type: str, deltas: Sequence[Tuple[AgreementKey, int]]) -> None:
+        """多行 INSERT ... ON DUPLICATE KEY UPDATE count = count + delta，不提交事务（调用方按键排序传入）"""
+        if not deltas:
+            return
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "task_type": task_type,
+                "scope": scope,
+                "scope_key": scope_key,
+                "cell": cell,
+                "count": delta,
+            }
+            for (scope, scope_key, cell), delta in deltas
+        ]
+        stmt = mysql_insert(self.model).values(rows)
+        stmt = stmt.on_duplicate_key_update(count=self.model.count + stmt.inserted["count"])
+        await self.db.execute(stmt)
+
+    async def load(self, task_type: str, scope: str, scope_key: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """读取某个范围的累计量：{scope_key: {cell: count}}"""
+        conditions = [self.model.task_type == task_type, self.model.scope == scope]
+        if scope_key is not None:
+            conditions.append(self.model.scope_key == scope_key)
+        result = await self.db.execute(
+            select(self.model.scope_key, self.model.cell, self.model.count).where(*conditions)
+        )
+        cells: Dict[str, Dict[str, int]] = {}
+        for key, cell, count in result.all():
+            cells.setdefault(key, {})[cell] = count
+        return cells
@@ -0,0 +1,84 @@
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import select, delete, insert, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from app.models.db_meta import StagingTaskCounter
+from app.repositories.base import BaseRepository
+
+INSERT_CHUNK_SIZE = 1000
+
+# 计数器键：(dimension, dim_key, status)
+CounterKey = Tuple[str, str, str]
+
+
+class StagingCounterRepository(BaseRepository[StagingTaskCounter]):
+
+    async def increment(self, task_type: str, shard: int, deltas: Sequence[Tuple[CounterKey, int]]) -> None:
+        """
+        多行 INSERT ... ON DUPLICATE KEY UPDATE count = count + delta，不提交事务
+
+        调用方需按键排序传入，保证并发事务以相同顺序加锁，避免死锁。
+        """
+        if not deltas:
+            return
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "task_type": task_type,
+                "dimension": dimension,
+                "dim_key": dim_key,
+                "status": status,
+                "shard": shard,
+                "count": delta,
+            }
+            for (dimension, dim_key, status), delta in deltas
+        ]
+        stmt = mysql_insert(self.model).values(rows)
+        stmt = stmt.on_duplicate_key_update(count=self.model.count + stmt.inserted["count"])
+        await self.db.execute(stmt)
+
+    async def sums(
+        self, task_type: str, dimension: str, dim_key: Optional[str] = None
+    ) -> Dict[Tuple[str, str], int]:
+        """汇总各分片：{(dim_key, status): count}"""
+        conditions = [self.model.task_type == task_type, self.model.dimension == dimension]
+        if dim_key is not None:
+            conditions.append(self.model.dim_key == dim_key)
+        result = await self.db.execute(
+            select(self.model.dim_key, self.model.status, func.sum(self.model.count))
+            .where(*conditions)
+            .group_by(self.model.dim_key, self.model.status)
+        )
+        return {(row[0], row[1]): int(row[2] or 0) for row in result.all()}
+
+    async def lock_all(self, task_type: str) -> Dict[CounterKey, int]:
+        """锁定某类任务的全部计数器行（对账期间阻塞增量更新），返回各键汇总值"""
+        result = await self.db.execute(
+            select(self.model.dimension, self.model.dim_key, self.model.status, self.model.count)
+            .where(self.model.task_type == task_type)
+            .with_for_update()
+        )
+        totals: Dict[CounterKey, int] = {}
+        for dimension, dim_key, status, count in result.all():
+            key = (dimension, dim_key, status)
+            totals[key] = totals.get(key, 0) + count
+        return totals
+
+    async def replace_all(self, task_type: str, counts: Dict[CounterKey, int]) -> None:
+        """用重新统计的结果整体替换某类任务的计数器（合并到 0 号分片），不提交事务"""
+        await self.db.execute(delete(self.model).where(self.model.task_type == task_type))
+        rows: List[Dict[str, Any]] = [
+            {
+                "id": str(uuid.uuid4()),
+                "task_type": task_type,
+                "dimension": dimension,
+                "dim_key": dim_key,
+                "status": status,
+                "shard": 0,
+                "count": count,
+            }
+            for (dimension, dim_key, status), count in sorted(counts.items())
+            if count
+        ]
+        for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+            await self.db.execute(insert(self.model), rows[start:start + INSERT_CHUNK_SIZE])
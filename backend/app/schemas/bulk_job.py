@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, ConfigDict
+
+class BulkJobResponse(BaseModel):
+    id: str
+    job_type: str
+    status: str
+    scenario_id: Optional[str] = None
+    source_name: Optional[str] = None
+    processed_rows: int = 0
+    inserted_rows: int = 0
+    updated_rows: int = 0
+    skipped_rows: int = 0
+    error_rows: int = 0
+    checkpoint: int = 0
+    errors: Optional[List[Dict[str, Any]]] = None
+    message: Optional[str] = None
+    created_by: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,3 +1,4 @@
+from typing import List
 from pydantic import BaseModel, ConfigDict
 
 class GlobalKeywordsBase(BaseModel):
@@ -19,3 +20,7 @@ class GlobalKeywordsResponse(GlobalKeywordsBase):
     id: str
 
     model_config = ConfigDict(from_attributes=True)
+
+class GlobalKeywordsSearchResponse(BaseModel):
+    total: int
+    items: List[GlobalKeywordsResponse]
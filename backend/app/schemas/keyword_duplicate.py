@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import List, Literal, Optional
+from pydantic import BaseModel, ConfigDict
+
+class KeywordDuplicatePairResponse(BaseModel):
+    id: str
+    source_a: str
+    id_a: str
+    keyword_a: str
+    source_b: str
+    id_b: str
+    keyword_b: str
+    scenario_id: Optional[str] = None
+    match_type: str
+    similarity: float
+    status: str
+    job_id: Optional[str] = None
+    resolved_by: Optional[str] = None
+    resolved_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class KeywordDuplicatePairListResponse(BaseModel):
+    total: int
+    items: List[KeywordDuplicatePairResponse]
+
+class KeywordDuplicateMergeRequest(BaseModel):
+    keep: Literal["a", "b"] = "a"  # 保留的一方，另一方被删除（待审核词标记为 IGNORED）
+    include_policy_referenced: bool = False  # 被删除的关键词被场景 KEYWORD 策略引用时是否仍然合并
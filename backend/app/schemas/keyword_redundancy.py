@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import List, Literal, Optional
+from pydantic import BaseModel, ConfigDict
+
+class KeywordRedundancyResponse(BaseModel):
+    kind: str
+    scenario_id: str
+    scenario_keyword_id: str
+    keyword: str
+    category: int
+    rule_mode: int
+    related_source: str
+    related_id: str
+    related_keyword: str
+    tag_match: bool
+    created_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class KeywordRedundancyListResponse(BaseModel):
+    total: int
+    items: List[KeywordRedundancyResponse]
+
+class KeywordRedundancyCleanupRequest(BaseModel):
+    kinds: List[Literal["EXACT", "SUBSUMED"]] = ["EXACT", "SUBSUMED"]
+    include_tag_overrides: bool = False  # 是否同时删除标签与全局词不同的行
+    keyword_ids: Optional[List[str]] = None  # 只清理指定的场景关键词
+    dry_run: bool = False
+    include_policy_referenced: bool = False  # 是否同时删除被场景 KEYWORD 策略引用的关键词
+
+class KeywordRedundancyCleanupResponse(BaseModel):
+    scenario_id: str
+    dry_run: bool
+    deleted_count: int
+    items: List[KeywordRedundancyResponse]
+    skipped_referenced: List[KeywordRedundancyResponse] = []  # 因被策略引用而未删除的行
@@ -1,5 +1,5 @@
 """角色和权限相关 Schema"""
-from typing import Optional, List
+from typing import Dict, Optional, List
 from pydantic import BaseModel, Field
 from datetime import datetime
 
@@ -62,6 +62,10 @@ class RolePermissionUpdate(BaseModel):
     permission_ids: List[str] = Field(..., description="权限ID列表")
 
 
+class RolePermissionMatrixUpdate(BaseModel):
+    matrix: Dict[str, List[str]] = Field(..., description="{角色ID: 权限ID列表}，列表中的角色权限整体替换")
+
+
 # ============================================
 # 用户角色分配 Schema
 # ============================================
@@ -71,6 +75,12 @@ class UserRoleAssign(BaseModel):
     scenario_id: Optional[str] = Field(None, description="场景ID，全局角色不传")
 
 
+class UserRoleBulkAssign(BaseModel):
+    user_ids: List[str] = Field(..., min_length=1, description="用户ID列表")
+    role_ids: List[str] = Field(..., min_length=1, description="角色ID列表")
+    scenario_ids: List[str] = Field(default_factory=list, description="场景ID列表，只分配全局角色时不传")
+
+
 class UserRoleResponse(BaseModel):
     id: str
     user_id: str
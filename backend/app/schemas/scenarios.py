@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, ConfigDict
 
 class ScenariosBase(BaseModel):
@@ -24,3 +24,10 @@ class ScenariosUpdate(BaseModel):
 class ScenariosResponse(ScenariosBase):
     id: str
     model_config = ConfigDict(from_attributes=True)
+
+class AccessibleScenario(ScenariosResponse):
+    permissions: Dict[str, bool] = {}  # 当前用户在该场景的有效权限
+
+class AccessibleScenarioPage(BaseModel):
+    next_cursor: Optional[str] = None
+    items: List[AccessibleScenario]
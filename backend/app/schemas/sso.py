@@ -15,6 +15,8 @@ class SSOLoginResponse(BaseModel):
     expires_in: int
     user_id: str
     role: str
+    refresh_token: Optional[str] = None  # 凭刷新令牌调用 /login/refresh 续期
+    session_id: Optional[str] = None
 
 
 class SSOUserInfoResponse(BaseModel):
@@ -0,0 +1,14 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+class StagingKeywordIngest(BaseModel):
+    keyword: str = Field(..., min_length=1, max_length=255)
+    predicted_tag: str = Field(..., max_length=64)
+    predicted_risk: str = Field(..., max_length=32)
+    confidence: Optional[float] = Field(None, ge=0, le=1)  # 模型对预测结果的置信度，越低越先认领
+
+class StagingRuleIngest(BaseModel):
+    tag_code: str = Field(..., min_length=1, max_length=64)
+    predicted_strategy: str = Field(..., max_length=32)
+    extra_condition: Optional[str] = Field(None, max_length=64)
+    confidence: Optional[float] = Field(None, ge=0, le=1)
@@ -0,0 +1,160 @@
+"""
+登录会话与刷新令牌
+登录时创建会话并签发 访问令牌（短期，带 sid 声明）+ 刷新令牌（"<会话ID>.<随机串>"，服务端只保存哈希）。
+刷新时按主键取会话、比对哈希并轮换随机串，无需重新走 USAP Ticket 验证；
+已轮换掉的旧刷新令牌再次出现视为泄露，立即吊销该会话。
+吊销会话（登出、禁用/删除用户、管理员强制下线）同时递增用户的权限版本号，
+使仍在有效期内的访问令牌回落到数据库校验（会话已吊销则拒绝）。
+"""
+
+import hashlib
+import os
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.permission_cache import permission_cache
+from app.models.db_meta import User, UserSession
+from app.services.auth_tokens import issue_access_token
+
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+
+
+def _hash(secret: str) -> str:
+    return hashlib.sha256(secret.encode("utf-8")).hexdigest()
+
+
+def _utc(value: datetime) -> datetime:
+    """统一为不带时区的 UTC 时间（MySQL / SQLite 读出的 DATETIME 不带时区）"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class AuthSessionService:
+    """登录会话管理"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_session(
+        self,
+        user: User,
+        user_agent: Optional[str] = None,
+        ip_address: Optional[str] = None
+    ) -> Tuple[UserSession, str]:
+        """
+        创建会话
+
+        Returns:
+            (会话, 刷新令牌)
+        """
+        secret = secrets.token_urlsafe(32)
+        session = UserSession(
+            id=str(uuid.uuid4()),
+            user_id=user.id,
+            refresh_token_hash=_hash(secret),
+            user_agent=(user_agent or "")[:255] or None,
+            ip_address=ip_address,
+            refresh_count=0,
+            expires_at=_now() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+        self.db.add(session)
+        await self.db.commit()
+        return session, f"{session.id}.{secret}"
+
+    async def issue_tokens(
+        self,
+        user: User,
+        subject: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        ip_address: Optional[str] = None
+    ) -> dict:
+        """登录成功后创建会话并签发访问令牌与刷新令牌"""
+        session, refresh_token = await self.create_session(user, user_agent, ip_address)
+        return {
+            "access_token": await issue_access_token(user, subject=subject, session_id=session.id),
+            "refresh_token": refresh_token,
+            "session_id": session.id,
+        }
+
+    async def refresh(self, refresh_token: str) -> dict:
+        """
+        用刷新令牌换取新的访问令牌，并轮换刷新令牌
+
+        Raises:
+            ValueError: 令牌格式错误、会话不存在/已吊销/已过期、令牌已被使用过、用户不存在或已禁用
+        """
+        session_id, _, secret = refresh_token.partition(".")
+        session = await self.db.get(UserSession, session_id, with_for_update=True) if secret else None
+        if not session or session.revoked_at is not None:
+            raise ValueError("Invalid refresh token")
+        if not secrets.compare_digest(session.refresh_token_hash, _hash(secret)):
+            # 已轮换掉的旧令牌被再次使用：令牌可能泄露，吊销整个会话
+            await self._revoke_where(UserSession.id == session.id, "TOKEN_REUSED")
+            await self.db.commit()
+            await permission_cache.invalidate_user(session.user_id)
+            raise ValueError("Refresh token reuse detected, session revoked")
+        if _utc(session.expires_at) <= _now():
+            raise ValueError("Refresh token expired")
+
+        user = await self.db.get(User, session.user_id)
+        if not user or not user.is_active:
+            raise ValueError("User not found or inactive")
+
+        new_secret = secrets.token_urlsafe(32)
+        session.refresh_token_hash = _hash(new_secret)
+        session.refresh_count += 1
+        session.last_refreshed_at = _now()
+        await self.db.commit()
+        return {
+            "access_token": await issue_access_token(user, session_id=session.id),
+            "refresh_token": f"{session.id}.{new_secret}",
+            "session_id": session.id,
+        }
+
+    async def logout(self, refresh_token: str) -> bool:
+        """凭刷新令牌登出当前会话"""
+        session_id, _, secret = refresh_token.partition(".")
+        session = await self.db.get(UserSession, session_id) if secret else None
+        if not session or session.revoked_at is not None:
+            return False
+        if not secrets.compare_digest(session.refresh_token_hash, _hash(secret)):
+            return False
+        await self._revoke_where(UserSession.id == session.id, "LOGOUT")
+        await self.db.commit()
+        await permission_cache.invalidate_user(session.user_id)
+        return True
+
+    async def revoke_user_sessions(self, user_id: str, reason: str) -> int:
+        """吊销用户的全部有效会话（强制下线），返回吊销数"""
+        count = await self._revoke_where(UserSession.user_id == user_id, reason)
+        await self.db.commit()
+        await permission_cache.invalidate_user(user_id)
+        return count
+
+    async def list_active_sessions(self, user_id: str) -> List[UserSession]:
+        result = await self.db.execute(
+            select(UserSession)
+            .where(UserSession.user_id == user_id, UserSession.revoked_at.is_(None))
+            .order_by(UserSession.created_at.desc())
+        )
+        return [s for s in result.scalars().all() if _utc(s.expires_at) > _now()]
+
+    async def _revoke_where(self, condition, reason: str) -> int:
+        result = await self.db.execute(
+            update(UserSession)
+            .where(condition, UserSession.revoked_at.is_(None))
+            .values(revoked_at=_now(), revoked_reason=reason)
+            .execution_options(synchronize_session="fetch")
+        )
+        return result.rowcount
+
@@ -0,0 +1,112 @@
+"""
+访问令牌签发与校验
+令牌携带签名的用户声明：uid（用户主键）、uname / uext（用户名 / USAP UserID）、role、act（是否启用）、
+pg / pe（签发时的版本号代次与该用户的权限版本号，见 app.core.permission_cache.auth_epoch）。
+快速路径：声明中的 (代次, 版本号) 与当前值一致时直接由声明构造用户，不查询数据库；
+用户的角色、状态变更或被删除都会递增其版本号，之后的请求回落到数据库校验，并在响应头中下发新令牌。
+版本号读取失败（Redis 不可用）时一律回落到数据库校验，且不签入版本号声明。
+版本号只在配置 REDIS_URL 时跨副本共享（且不随进程重启清零），因此默认只在配置 Redis 时启用快速路径，
+可通过 AUTH_FAST_PATH 显式开启/关闭（单副本部署可开启）。
+"""
+
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.permission_cache import REDIS_URL, permission_cache
+from app.core.security import create_access_token
+from app.models.db_meta import User, UserSession
+
+AUTH_FAST_PATH = os.getenv("AUTH_FAST_PATH", "true" if REDIS_URL else "false").lower() in ("1", "true", "yes")
+
+# 版本号变化后重新签发的令牌通过该响应头下发
+REFRESHED_TOKEN_HEADER = "X-Access-Token"
+
+
+async def user_claims(user: User) -> Dict[str, Any]:
+    """签入访问令牌的用户声明（版本号读取失败时不含 pg / pe，该令牌不走快速路径）"""
+    claims = {
+        "uid": user.id,
+        "uname": user.username,
+        "uext": user.user_id,
+        "role": user.role,
+        "act": bool(user.is_active),
+    }
+    epoch = await permission_cache.auth_epoch(user.id)
+    if epoch is not None:
+        claims["pg"], claims["pe"] = epoch
+    return claims
+
+
+async def issue_access_token(user: User, subject: Optional[str] = None, session_id: Optional[str] = None) -> str:
+    """
+    签发带用户声明的访问令牌
+
+    Args:
+        subject: sub 字段（SSO 登录为 USAP UserID，账号密码登录为用户名），缺省按 user_id / username
+        session_id: 登录会话ID（sid 声明），会话吊销后令牌在数据库校验时被拒绝
+    """
+    return _sign(user, await user_claims(user), subject, session_id)
+
+
+def _sign(user: User, claims: Dict[str, Any], subject: Optional[str], session_id: Optional[str]) -> str:
+    if session_id:
+        claims["sid"] = session_id
+    return create_access_token(subject or user.user_id or user.username, claims=claims)
+
+
+def _user_from_claims(payload: Dict[str, Any]) -> User:
+    """由声明构造未绑定会话的用户对象（只包含鉴权所需字段）"""
+    return User(
+        id=payload["uid"],
+        username=payload.get("uname"),
+        user_id=payload.get("uext"),
+        role=payload["role"],
+        is_active=payload["act"],
+    )
+
+
+async def _load_user(payload: Dict[str, Any], db: AsyncSession) -> Optional[User]:
+    """按主键查询；旧令牌只有 sub 时依次按 user_id、username 查询（各自走唯一索引，避免 OR 条件）"""
+    if payload.get("uid"):
+        return await db.get(User, payload["uid"])
+    sub = payload["sub"]
+    for column in (User.user_id, User.username):
+        result = await db.execute(select(User).where(column == sub))
+        user = result.scalars().first()
+        if user:
+            return user
+    return None
+
+
+async def authenticate(payload: Dict[str, Any], db: AsyncSession) -> Tuple[Optional[User], Optional[str]]:
+    """
+    由已验签的令牌载荷得到当前用户
+
+    Returns:
+        (用户, 重新签发的令牌)：用户不存在或令牌所属会话已吊销时为 (None, None)；
+        令牌带声明但版本号已过期（或代次不同、缺少版本号）时回落到数据库，
+        并在版本号可读取时为仍启用的用户重新签发令牌
+    """
+    has_claims = "uid" in payload
+    if has_claims and AUTH_FAST_PATH and "pe" in payload:
+        epoch = await permission_cache.auth_epoch(payload["uid"])
+        # 版本号读取失败时 epoch 为 None，回落到数据库（不信任进程内计数）
+        if epoch is not None and (payload.get("pg"), payload["pe"]) == epoch:
+            return _user_from_claims(payload), None
+
+    user = await _load_user(payload, db)
+    if not user:
+        return None, None
+    if payload.get("sid"):
+        session = await db.get(UserSession, payload["sid"])
+        if not session or session.revoked_at is not None:
+            return None, None
+    refreshed = None
+    if has_claims and AUTH_FAST_PATH and user.is_active:
+        claims = await user_claims(user)
+        if "pe" in claims:
+            refreshed = _sign(user, claims, payload["sub"], payload.get("sid"))
+    return user, refreshed
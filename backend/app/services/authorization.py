@@ -0,0 +1,97 @@
+"""
+请求级授权上下文
+同时支持 V1（user_scenario_assignments + scenario_admin_permissions）和 V2（user_scenario_roles）。
+每个请求只构建一次：用户由认证依赖传入（不再重复查询），V1 分配与细粒度权限、V2 权限位图各加载一次
+（数据来自跨请求的权限缓存），之后任意次数的场景访问/权限判断都在内存中完成。
+上下文挂在请求的数据库会话上（session.info），会话随请求结束而释放；请求内的判断基于构建时的快照。
+开启 AUTHZ_DECISION_TABLE 时用户的决策数据取自进程内授权决策表（见 app.services.authorization_table）。
+"""
+
+from typing import Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.permission_bits import PermissionSet
+from app.models.db_meta import User
+from app.services.authorization_table import AUTHZ_DECISION_TABLE, authorization_table
+from app.services.permission import PermissionService
+
+CONTEXT_KEY = "authorization_contexts"
+
+# V2 全局权限包含以下任一编码时可访问所有场景
+ALL_SCENARIOS_PERMISSIONS = ("app_management", "audit_logs")
+
+
+class AuthorizationContext:
+    """单个请求内某个用户的授权判断"""
+
+    def __init__(self, user: User, v1_grants: Dict[str, Dict], v2: PermissionSet):
+        self.user = user
+        self.v1_grants = v1_grants
+        self.v2 = v2
+
+    @classmethod
+    async def load(cls, db: AsyncSession, user: User) -> "AuthorizationContext":
+        # SYSTEM_ADMIN 拥有所有权限，无需加载分配
+        if user.role == "SYSTEM_ADMIN":
+            return cls(user, {}, PermissionSet())
+        if AUTHZ_DECISION_TABLE:
+            return cls(user, *await authorization_table.lookup(db, user.id))
+        service = PermissionService(db)
+        return cls(user, await service.get_v1_grants(user.id), await service.get_v2_permission_set(user.id))
+
+    # ---------- V1 ----------
+
+    def v1_can_access(self, scenario_id: str) -> bool:
+        """SYSTEM_ADMIN / AUDITOR 可访问所有场景，其他角色需要场景分配"""
+        if self.user.role in ("SYSTEM_ADMIN", "AUDITOR"):
+            return True
+        return scenario_id in self.v1_grants
+
+    def v1_has_permission(self, scenario_id: str, permission: str) -> bool:
+        """SYSTEM_ADMIN 拥有所有权限；SCENARIO_ADMIN 按细粒度权限配置（未配置时无权限）；其他角色无配置权限"""
+        if self.user.role == "SYSTEM_ADMIN":
+            return True
+        if self.user.role != "SCENARIO_ADMIN":
+            return False
+        grant = self.v1_grants.get(scenario_id)
+        if not grant or not grant["permissions"]:
+            return False
+        return bool(grant["permissions"].get(permission, False))
+
+    # ---------- V1 + V2 ----------
+
+    def can_access(self, scenario_id: str, permission: Optional[str] = None) -> bool:
+        """
+        检查场景访问权（指定 permission 时同时检查该权限），V1 / V2 任一通过即放行
+        """
+        if self.user.role == "SYSTEM_ADMIN":
+            return True
+
+        if permission:
+            if self.v2.has(permission, scenario_id):
+                return True
+        elif self.v2.has_global("app_management") or self.v2.has_scenario(scenario_id):
+            return True
+
+        if not self.v1_can_access(scenario_id):
+            return False
+        return not permission or self.v1_has_permission(scenario_id, permission)
+
+    def scenario_ids(self) -> Optional[List[str]]:
+        """有权访问的场景ID列表，None 表示可以访问所有场景"""
+        if self.user.role in ("SYSTEM_ADMIN", "AUDITOR"):
+            return None
+        if any(self.v2.has_global(code) for code in ALL_SCENARIOS_PERMISSIONS):
+            return None
+        return list(set(self.v1_grants) | set(self.v2.scenario_ids()))
+
+
+async def get_authorization_context(user: User, db: AsyncSession) -> AuthorizationContext:
+    """获取当前请求（数据库会话）内该用户的授权上下文，首次调用时构建"""
+    contexts = db.info.setdefault(CONTEXT_KEY, {})
+    context = contexts.get(user.id)
+    if context is None or context.user.role != user.role:
+        context = await AuthorizationContext.load(db, user)
+        contexts[user.id] = context
+    return context
@@ -0,0 +1,180 @@
+"""
+授权决策表（可选模式，AUTHZ_DECISION_TABLE=true 开启）
+把 RBAC 全量状态（roles / permissions / role_permissions / user_scenario_roles /
+user_scenario_assignments / scenario_admin_permissions）编译为进程内的 {用户ID: (V1 场景授权, V2 权限位图)}，
+授权上下文直接从表中取得用户的决策数据，(用户, 场景, 权限) 的判断为字典查找加按位与，
+不再按用户查询数据库，也不受权限缓存容量 / TTL 的影响。
+
+以权限版本号（epoch）的递增作为变更事件增量更新（所有写入路径都在提交后递增版本号）：
+- 用户 epoch 变化：只重新加载该用户的 V1 / V2 分配
+- 全局 epoch 变化（角色、角色权限变更）：只重新加载角色权限位图，用户分配不变（已删除角色的分配随之失效）
+首次使用时全量编译；编译时没有任何分配的用户在首次查询时按用户加载。
+"""
+
+import asyncio
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.permission_bits import PermissionSet, bit_of
+from app.core.permission_cache import permission_cache
+from app.models.db_meta import (
+    Permission, RolePermission, ScenarioAdminPermission, UserScenarioAssignment, UserScenarioRole
+)
+from app.services.permission import SCENARIO_PERMISSION_FIELDS
+
+AUTHZ_DECISION_TABLE = os.getenv("AUTHZ_DECISION_TABLE", "false").lower() in ("1", "true", "yes")
+
+# {场景ID: {"role": 分配角色, "permissions": {权限名: bool} 或 None}}，与 PermissionService.get_v1_grants 一致
+V1Grants = Dict[str, Dict]
+# {场景ID（None 为全局角色）: {角色ID}}
+V2Roles = Dict[Optional[str], Set[str]]
+
+
+class AuthorizationTable:
+    """进程内授权决策表"""
+
+    def __init__(self):
+        self._built = False
+        self._global_epoch: Optional[int] = None
+        self._role_masks: Dict[str, int] = {}
+        self._masks_version = 0
+        self._v1: Dict[str, V1Grants] = {}
+        self._v2_roles: Dict[str, V2Roles] = {}
+        self._user_epochs: Dict[str, int] = {}
+        self._compiled: Dict[str, Tuple[int, PermissionSet]] = {}
+        self._lock = asyncio.Lock()  # 串行化全量编译与角色位图加载，并发请求不重复加载
+        self.user_reloads = 0
+
+    @property
+    def size(self) -> int:
+        """已编译的用户数"""
+        return len(self._user_epochs)
+
+    async def lookup(self, db: AsyncSession, user_id: str) -> Tuple[V1Grants, PermissionSet]:
+        """
+        用户的决策数据，版本号变化时先增量更新
+
+        Returns:
+            (V1 场景授权, V2 权限位图)
+        """
+        # 先取版本号再加载：加载期间发生的变更会在下次查询时再次触发更新
+        global_epoch, user_epoch = await permission_cache.epoch(user_id)
+        if not self._built or global_epoch != self._global_epoch:
+            async with self._lock:
+                # 等待锁期间其他请求可能已完成编译 / 加载，加锁后重新判断
+                if not self._built:
+                    await self._rebuild(db, global_epoch)
+                elif global_epoch != self._global_epoch:
+                    await self._load_role_masks(db, global_epoch)
+        if self._user_epochs.get(user_id) != user_epoch:
+            self.user_reloads += 1
+            await self._load_users(db, {user_id: user_epoch}, only_listed=True)
+        return self._v1.get(user_id, {}), self._permission_set(user_id)
+
+    async def rebuild(self, db: AsyncSession, global_epoch: int) -> None:
+        """全量编译：先读取有分配的用户的版本号，再加载全部分配"""
+        async with self._lock:
+            await self._rebuild(db, global_epoch)
+
+    async def _rebuild(self, db: AsyncSession, global_epoch: int) -> None:
+        """全量编译（调用方已持有 _lock）"""
+        user_ids = await self._assigned_user_ids(db)
+        epochs = await permission_cache.user_epochs(user_ids)
+        await self._load_role_masks(db, global_epoch)
+        self._v1, self._v2_roles, self._user_epochs, self._compiled = {}, {}, {}, {}
+        await self._load_users(db, epochs, only_listed=False)
+        self._built = True
+
+    # ---------- 加载 ----------
+
+    async def _assigned_user_ids(self, db: AsyncSession) -> List[str]:
+        result = await db.execute(
+            select(UserScenarioAssignment.user_id).union(select(UserScenarioRole.user_id))
+        )
+        return list(result.scalars().all())
+
+    async def _load_role_masks(self, db: AsyncSession, global_epoch: int) -> None:
+        result = await db.execute(
+            select(RolePermission.role_id, Permission.permission_code)
+            .join(Permission, Permission.id == RolePermission.permission_id)
+            .where(Permission.is_active == True)
+        )
+        masks: Dict[str, int] = {}
+        for role_id, code in result.all():
+            masks[role_id] = masks.get(role_id, 0) | bit_of(code)
+        self._role_masks = masks
+        self._masks_version += 1
+        self._global_epoch = global_epoch
+
+    async def _load_users(self, db: AsyncSession, epochs: Dict[str, int], only_listed: bool) -> None:
+        """
+        加载用户的 V1 分配、场景管理员权限和 V2 角色分配
+
+        Args:
+            epochs: 加载前读取的用户版本号，加载完成后记为这些用户的编译版本
+            only_listed: 只加载 epochs 中的用户；否则加载全部
+        """
+        def scoped(query, column):
+            return query.where(column.in_(list(epochs))) if only_listed else query
+
+        configs = {}
+        result = await db.execute(scoped(
+            select(
+                ScenarioAdminPermission.user_id, ScenarioAdminPermission.scenario_id,
+                *[getattr(ScenarioAdminPermission, field) for field in SCENARIO_PERMISSION_FIELDS]
+            ),
+            ScenarioAdminPermission.user_id
+        ))
+        for user_id, scenario_id, *flags in result.all():
+            configs[(user_id, scenario_id)] = dict(zip(SCENARIO_PERMISSION_FIELDS, flags))
+
+        v1: Dict[str, V1Grants] = {user_id: {} for user_id in epochs}
+        result = await db.execute(scoped(
+            select(UserScenarioAssignment.user_id, UserScenarioAssignment.scenario_id, UserScenarioAssignment.role),
+            UserScenarioAssignment.user_id
+        ))
+        for user_id, scenario_id, role in result.all():
+            v1.setdefault(user_id, {})[scenario_id] = {
+                "role": role, "permissions": configs.get((user_id, scenario_id))
+            }
+
+        v2: Dict[str, V2Roles] = {user_id: {} for user_id in epochs}
+        result = await db.execute(scoped(
+            select(UserScenarioRole.user_id, UserScenarioRole.scenario_id, UserScenarioRole.role_id),
+            UserScenarioRole.user_id
+        ))
+        for user_id, scenario_id, role_id in result.all():
+            v2.setdefault(user_id, {}).setdefault(scenario_id, set()).add(role_id)
+
+        self._v1.update(v1)
+        self._v2_roles.update(v2)
+        for user_id in set(v1) | set(v2):
+            self._compiled.pop(user_id, None)
+        self._user_epochs.update(epochs)
+
+    # ---------- 编译 ----------
+
+    def _permission_set(self, user_id: str) -> PermissionSet:
+        """由用户的角色分配和角色权限位图编译权限位图（角色权限变更后重新编译）"""
+        compiled = self._compiled.get(user_id)
+        if compiled is not None and compiled[0] == self._masks_version:
+            return compiled[1]
+        permission_set = PermissionSet()
+        for scenario_id, role_ids in self._v2_roles.get(user_id, {}).items():
+            mask = 0
+            for role_id in role_ids:
+                mask |= self._role_masks.get(role_id, 0)
+            if not mask:
+                continue  # 与 JOIN 解析一致：没有有效权限的角色不产生场景访问权
+            if scenario_id is None:
+                permission_set.global_mask |= mask
+            else:
+                permission_set.scenario_masks[scenario_id] = mask
+        self._compiled[user_id] = (self._masks_version, permission_set)
+        return permission_set
+
+
+authorization_table = AuthorizationTable()
@@ -1,13 +1,18 @@
 import uuid
 from typing import List, Optional
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.repositories.global_keywords import GlobalKeywordsRepository
 from app.schemas.global_keywords import GlobalKeywordsCreate, GlobalKeywordsUpdate
 from app.models.db_meta import GlobalKeywords
+from app.services.keyword_duplicates import KeywordDuplicateService
+from app.services.keyword_similarity import SOURCE_GLOBAL, normalized_hash
 
 class GlobalKeywordsService:
     def __init__(self, db: AsyncSession):
+        self.db = db
         self.repository = GlobalKeywordsRepository(GlobalKeywords, db)
+        self.duplicates = KeywordDuplicateService(db)
 
     async def create_keyword(self, keyword_in: GlobalKeywordsCreate) -> GlobalKeywords:
         # Check for duplicates
@@ -17,7 +22,17 @@ class GlobalKeywordsService:
 
         obj_in_data = keyword_in.model_dump()
         obj_in_data['id'] = str(uuid.uuid4())
-        return await self.repository.create(obj_in_data)
+        obj_in_data['norm_hash'] = normalized_hash(keyword_in.keyword)
+        try:
+            keyword = await self.repository.create(obj_in_data)
+        except IntegrityError:
+            # 并发创建同一关键词时由唯一索引 uk_global_keyword 拦截
+            await self.db.rollback()
+            raise ValueError(f"Keyword '{keyword_in.keyword}' already exists.")
+
+        # 标记与已有关键词的变体关系（不阻止创建，由管理员在重复候选列表中处理）
+        await self.duplicates.flag_new_keyword(SOURCE_GLOBAL, keyword.id, keyword.keyword)
+        return keyword
 
     async def get_keyword(self, keyword_id: str) -> Optional[GlobalKeywords]:
         return await self.repository.get(keyword_id)
@@ -31,11 +46,29 @@ class GlobalKeywordsService:
     ) -> List[GlobalKeywords]:
         return await self.repository.get_all(skip, limit, keyword, tag_code)
 
+    async def search_keywords(
+        self,
+        keyword: str,
+        tag_codes: Optional[List[str]] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> dict:
+        items, total = await self.repository.search_ranked(keyword, tag_codes, skip, limit)
+        return {"total": total, "items": items}
+
     async def update_keyword(self, keyword_id: str, keyword_in: GlobalKeywordsUpdate) -> GlobalKeywords:
         keyword = await self.repository.get(keyword_id)
         if not keyword:
             raise ValueError("Keyword not found")
-        return await self.repository.update(keyword, keyword_in)
+        update_data = keyword_in.model_dump(exclude_unset=True)
+        if update_data.get("keyword"):
+            update_data["norm_hash"] = normalized_hash(update_data["keyword"])
+        try:
+            return await self.repository.update(keyword, update_data)
+        except IntegrityError:
+            # 改名为已存在的关键词
+            await self.db.rollback()
+            raise ValueError(f"Keyword '{update_data.get('keyword')}' already exists.")
 
     async def delete_keyword(self, keyword_id: str) -> Optional[GlobalKeywords]:
         return await self.repository.delete(keyword_id)
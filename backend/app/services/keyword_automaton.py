@@ -0,0 +1,101 @@
+"""
+Aho-Corasick 多模式匹配自动机
+一次扫描文本即可找出其中出现的全部关键词，复杂度与文本长度 + 命中数线性相关
+"""
+
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class KeywordAutomaton:
+    """
+    关键词自动机
+
+    用法：
+        automaton = KeywordAutomaton()
+        automaton.add("赌博", payload)
+        automaton.build()
+        for start, end, payload in automaton.iter_matches(text): ...
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # 以该节点结尾的关键词：[(关键词长度, payload)]
+        self._out: List[Optional[List[Tuple[int, Any]]]] = [None]
+        # 失败链上最近的、有输出的节点（0 表示没有），避免复制输出列表
+        self._dict_link: List[int] = [0]
+        self._built = False
+
+    def __len__(self) -> int:
+        return sum(len(out) for out in self._out if out)
+
+    def add(self, keyword: str, payload: Any = None) -> None:
+        if not keyword:
+            return
+        node = 0
+        for ch in keyword:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(None)
+                self._dict_link.append(0)
+            node = nxt
+        if self._out[node] is None:
+            self._out[node] = []
+        self._out[node].append((len(keyword), keyword if payload is None else payload))
+        self._built = False
+
+    def build(self) -> "KeywordAutomaton":
+        """按层次遍历计算失败指针"""
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                link = self._fail[child]
+                self._dict_link[child] = link if self._out[link] else self._dict_link[link]
+
+        self._built = True
+        return self
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """
+        扫描文本
+
+        Yields:
+            (起始位置, 结束位置（不含）, payload)，同一位置结束的多个关键词按长度从长到短
+        """
+        if not self._built:
+            self.build()
+        node = 0
+        goto, fail, out, dict_link = self._goto, self._fail, self._out, self._dict_link
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+
+            hit = node if out[node] else dict_link[node]
+            while hit:
+                for length, payload in out[hit]:
+                    yield i + 1 - length, i + 1, payload
+                hit = dict_link[hit]
+
+    def find_all(self, text: str) -> List[Any]:
+        """返回文本中出现的全部关键词 payload（去重，保持首次出现顺序）"""
+        seen = {}
+        for _, _, payload in self.iter_matches(text):
+            seen.setdefault(id(payload), payload)
+        return list(seen.values())
@@ -0,0 +1,344 @@
+"""
+敏感词变体/近似重复检测服务
+批量扫描全局词库、场景词库与待审核词，创建关键词时即时检测，并提供合并/忽略操作
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import AsyncSessionLocal
+from app.models.db_meta import (
+    BulkJob, GlobalKeywords, KeywordDuplicatePair, RuleScenarioPolicy, ScenarioKeywords, StagingGlobalKeywords
+)
+from app.repositories.bulk_job import BulkJobRepository
+from app.repositories.keyword_duplicate import KeywordDuplicatePairRepository
+from app.services.keyword_redundancy import POLICY_MATCH_KEYWORD
+from app.services.keyword_similarity import (
+    SOURCE_GLOBAL, SOURCE_SCENARIO, SOURCE_STAGING, MATCH_NORMALIZED, MATCH_SIMILAR,
+    SIMILARITY_THRESHOLD, DuplicatePair, KeywordEntry,
+    deletion_variants, find_duplicate_pairs, hash_normalized, is_comparable, similarity,
+)
+from app.services.staging_counters import CounterDelta, StagingCounterService, TaskState
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPE_DUPLICATE_SCAN = "KEYWORD_DUPLICATE_SCAN"
+
+SCAN_CHUNK_SIZE = 5000      # 读取 / 回写 norm_hash / 写入候选对的批大小
+
+# 参与检测的待审核词状态（已同步或已忽略的不再比较）
+ACTIVE_STAGING_STATUSES = ("PENDING", "CLAIMED", "REVIEWED")
+
+SOURCE_MODELS = {
+    SOURCE_GLOBAL: GlobalKeywords,
+    SOURCE_SCENARIO: ScenarioKeywords,
+    SOURCE_STAGING: StagingGlobalKeywords,
+}
+
+# 创建时检测需要查找的来源（与 keyword_similarity.is_comparable 的作用域规则一致）
+COMPARABLE_SOURCES = {
+    SOURCE_GLOBAL: (SOURCE_GLOBAL, SOURCE_SCENARIO, SOURCE_STAGING),
+    SOURCE_SCENARIO: (SOURCE_GLOBAL, SOURCE_SCENARIO),
+    SOURCE_STAGING: (SOURCE_GLOBAL, SOURCE_STAGING),
+}
+
+
+def _pair_row(pair: DuplicatePair, job_id: Optional[str]) -> dict:
+    scenario_id = pair.a.scenario_id or pair.b.scenario_id
+    return {
+        "id": str(uuid.uuid4()),
+        "source_a": pair.a.source,
+        "id_a": pair.a.id,
+        "keyword_a": pair.a.keyword,
+        "source_b": pair.b.source,
+        "id_b": pair.b.id,
+        "keyword_b": pair.b.keyword,
+        "scenario_id": scenario_id,
+        "match_type": pair.match_type,
+        "similarity": pair.similarity,
+        "status": "OPEN",
+        "job_id": job_id,
+    }
+
+
+class KeywordDuplicateService:
+    """敏感词变体检测与合并"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.repository = KeywordDuplicatePairRepository(KeywordDuplicatePair, db)
+        self.job_repo = BulkJobRepository(BulkJob, db)
+
+    # ---------- 批量扫描 ----------
+
+    async def create_scan_job(self, created_by: str) -> BulkJob:
+        """
+        创建扫描任务
+
+        Raises:
+            ValueError: 已有扫描任务在执行
+        """
+        running = await self.db.execute(
+            select(BulkJob.id).where(
+                BulkJob.job_type == JOB_TYPE_DUPLICATE_SCAN,
+                BulkJob.status.in_(["PENDING", "RUNNING"])
+            ).limit(1)
+        )
+        if running.scalar():
+            raise ValueError("A duplicate scan is already running")
+
+        return await self.job_repo.create({
+            "id": str(uuid.uuid4()),
+            "job_type": JOB_TYPE_DUPLICATE_SCAN,
+            "status": "PENDING",
+            "created_by": created_by,
+            "errors": [],
+        })
+
+    async def get_job(self, job_id: str) -> Optional[BulkJob]:
+        job = await self.job_repo.get(job_id)
+        if job and job.job_type == JOB_TYPE_DUPLICATE_SCAN:
+            return job
+        return None
+
+    async def run_scan(self, job_id: str) -> BulkJob:
+        """
+        执行扫描
+
+        1. 流式读取三个来源的关键词，计算归一化形式，回写变化的 norm_hash
+        2. 归一化分组 + MinHash / 编辑距离分桶找出候选对（在线程中计算，不阻塞事件循环）
+        3. 分批 upsert 候选对，清理本次未再发现的旧候选对
+
+        统计口径：processed_rows=扫描关键词数，updated_rows=回写 norm_hash 数，inserted_rows=候选对数
+        """
+        job = await self.job_repo.get(job_id)
+        # 使用数据库时间，与 created_at 的 server_default 同一时钟
+        started_at = (await self.db.execute(select(func.now()))).scalar()
+        job.status = "RUNNING"
+        job.message = None
+        await self.db.commit()
+
+        try:
+            entries: List[KeywordEntry] = []
+            for source in (SOURCE_GLOBAL, SOURCE_SCENARIO, SOURCE_STAGING):
+                loaded, refreshed = await self._load_entries(source)
+                entries.extend(loaded)
+                job.processed_rows += len(loaded)
+                job.updated_rows += refreshed
+                await self.db.commit()
+
+            pairs = await asyncio.to_thread(find_duplicate_pairs, entries)
+            rows = [_pair_row(pair, job_id) for pair in pairs]
+            for start in range(0, len(rows), SCAN_CHUNK_SIZE):
+                await self.repository.upsert_pairs(rows[start:start + SCAN_CHUNK_SIZE])
+                await self.db.commit()
+
+            removed = await self.repository.delete_stale_open(job_id, started_at)
+            job.inserted_rows = len(rows)
+            job.message = f"{len(rows)} candidate pairs, {removed} stale pairs removed"
+            job.status = "COMPLETED"
+            job.finished_at = datetime.now(timezone.utc)
+            await self.db.commit()
+        except Exception as e:
+            logger.exception("Keyword duplicate scan %s failed", job_id)
+            await self.db.rollback()
+            job = await self.job_repo.get(job_id)
+            job.status = "FAILED"
+            job.message = str(e)
+            await self.db.commit()
+
+        return job
+
+    async def _load_entries(self, source: str) -> Tuple[List[KeywordEntry], int]:
+        """读取一个来源的关键词，norm_hash 缺失或已过期（归一化规则调整）时批量回写"""
+        model = SOURCE_MODELS[source]
+        scenario_col = model.scenario_id if source == SOURCE_SCENARIO else None
+        columns = [model.id, model.keyword, model.norm_hash]
+        if scenario_col is not None:
+            columns.append(scenario_col)
+        stmt = select(*columns)
+        if source == SOURCE_STAGING:
+            stmt = stmt.where(model.status.in_(ACTIVE_STAGING_STATUSES))
+
+        entries: List[KeywordEntry] = []
+        stale: List[dict] = []
+        result = await self.db.stream(stmt.execution_options(yield_per=SCAN_CHUNK_SIZE))
+        async for row in result:
+            entry = KeywordEntry(
+                source=source,
+                id=row.id,
+                keyword=row.keyword,
+                scenario_id=row.scenario_id if scenario_col is not None else None,
+            )
+            entries.append(entry)
+            digest = hash_normalized(entry.normalized)
+            if row.norm_hash != digest:
+                stale.append({"id": row.id, "norm_hash": digest})
+
+        for start in range(0, len(stale), SCAN_CHUNK_SIZE):
+            # ORM 按主键批量 UPDATE（executemany）
+            await self.db.execute(update(model), stale[start:start + SCAN_CHUNK_SIZE])
+        return entries, len(stale)
+
+    # ---------- 创建时检测 ----------
+
+    async def flag_new_keyword(
+        self, source: str, keyword_id: str, keyword: str, scenario_id: Optional[str] = None
+    ) -> List[KeywordDuplicatePair]:
+        """
+        新建关键词后检测变体
+
+        通过 norm_hash 索引等值查找：归一化后完全相同的关键词，以及比新词少一个字符的近似词。
+        其余近似情况（替换、新词更短等）由批量扫描发现。
+        """
+        new_entry = KeywordEntry(source=source, id=keyword_id, keyword=keyword, scenario_id=scenario_id)
+        digests = {hash_normalized(new_entry.normalized)}
+        digests |= {hash_normalized(v) for v in deletion_variants(new_entry.normalized)}
+
+        candidates: List[KeywordEntry] = []
+        for other_source in COMPARABLE_SOURCES[source]:
+            model = SOURCE_MODELS[other_source]
+            stmt = select(model).where(model.norm_hash.in_(digests), model.id != keyword_id)
+            if other_source == SOURCE_SCENARIO and source == SOURCE_SCENARIO:
+                stmt = stmt.where(model.scenario_id == scenario_id)
+            if other_source == SOURCE_STAGING:
+                stmt = stmt.where(model.status.in_(ACTIVE_STAGING_STATUSES))
+            result = await self.db.execute(stmt)
+            for obj in result.scalars().all():
+                candidates.append(KeywordEntry(
+                    source=other_source,
+                    id=obj.id,
+                    keyword=obj.keyword,
+                    scenario_id=getattr(obj, "scenario_id", None) if other_source == SOURCE_SCENARIO else None,
+                ))
+
+        rows = []
+        for other in candidates:
+            if not is_comparable(new_entry, other):
+                continue
+            if other.normalized == new_entry.normalized:
+                match_type, score = MATCH_NORMALIZED, 1.0
+            else:
+                score = similarity(other.normalized, new_entry.normalized)
+                if score < SIMILARITY_THRESHOLD:
+                    continue
+                match_type, score = MATCH_SIMILAR, round(score, 4)
+            a, b = sorted((other, new_entry), key=lambda e: e.sort_key)
+            rows.append(_pair_row(DuplicatePair(a, b, match_type, score), None))
+
+        if not rows:
+            return []
+        await self.repository.upsert_pairs(rows)
+        await self.db.commit()
+        return [KeywordDuplicatePair(**row) for row in rows]
+
+    # ---------- 查询与处理 ----------
+
+    async def list_pairs(
+        self,
+        status: Optional[str] = "OPEN",
+        source: Optional[str] = None,
+        scenario_id: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> dict:
+        items, total = await self.repository.list_pairs(status, source, scenario_id, skip, limit)
+        return {"total": total, "items": items}
+
+    async def _get_open_pair(self, pair_id: str) -> KeywordDuplicatePair:
+        pair = await self.repository.get(pair_id)
+        if not pair:
+            raise ValueError("Duplicate pair not found")
+        if pair.status != "OPEN":
+            raise ValueError(f"Duplicate pair already {pair.status.lower()}")
+        return pair
+
+    async def _policy_reference_count(self, keyword: str, scenario_id: Optional[str] = None) -> int:
+        """引用该关键词的场景 KEYWORD 策略数（场景词只看所在场景，全局词看所有场景，含已停用的策略）"""
+        stmt = select(func.count()).select_from(RuleScenarioPolicy).where(
+            RuleScenarioPolicy.match_type == POLICY_MATCH_KEYWORD,
+            RuleScenarioPolicy.match_value == keyword
+        )
+        if scenario_id is not None:
+            stmt = stmt.where(RuleScenarioPolicy.scenario_id == scenario_id)
+        return (await self.db.execute(stmt)).scalar() or 0
+
+    async def merge_pair(
+        self, pair_id: str, keep: str, username: str, include_policy_referenced: bool = False
+    ) -> KeywordDuplicatePair:
+        """
+        合并候选对：保留一方，删除另一方（待审核词标记为 IGNORED）
+
+        被删除的正式词若被场景 KEYWORD 策略引用，删除后策略将失去对应关键词，
+        默认拒绝合并；需 include_policy_referenced=True 才删除。
+
+        Raises:
+            ValueError: 候选对不存在/已处理，合并方向不允许，或被删除的关键词被策略引用
+        """
+        pair = await self._get_open_pair(pair_id)
+        if keep == "a":
+            keep_source, drop_source, drop_id = pair.source_a, pair.source_b, pair.id_b
+        else:
+            keep_source, drop_source, drop_id = pair.source_b, pair.source_a, pair.id_a
+
+        if drop_source == SOURCE_GLOBAL and keep_source != SOURCE_GLOBAL:
+            raise ValueError("A global keyword can only be merged into another global keyword")
+
+        dropped = await self.db.get(SOURCE_MODELS[drop_source], drop_id)
+        if dropped is None:
+            raise ValueError("Keyword to merge no longer exists, dismiss the pair instead")
+
+        now = datetime.now(timezone.utc)
+        if drop_source == SOURCE_STAGING:
+            if dropped.status in ACTIVE_STAGING_STATUSES:
+                old_state = TaskState.of(dropped)
+                dropped.status = "IGNORED"
+                dropped.annotator = username
+                dropped.annotated_at = now
+                await StagingCounterService(self.db, "keywords", StagingGlobalKeywords).apply(
+                    CounterDelta().move(old_state, TaskState.of(dropped))
+                )
+        else:
+            if (drop_source == SOURCE_SCENARIO and keep_source == SOURCE_GLOBAL
+                    and dropped.category == ScenarioKeywords.CATEGORY_WHITE):
+                raise ValueError("Whitelist scenario keywords cannot be merged into global keywords")
+            if not include_policy_referenced:
+                scenario_id = dropped.scenario_id if drop_source == SOURCE_SCENARIO else None
+                referenced = await self._policy_reference_count(dropped.keyword, scenario_id)
+                if referenced:
+                    raise ValueError(
+                        f"Keyword to merge is referenced by {referenced} KEYWORD policies, "
+                        "keep it or set include_policy_referenced to delete it anyway"
+                    )
+            await self.db.delete(dropped)
+
+        pair.status = "MERGED"
+        pair.resolved_by = username
+        pair.resolved_at = now
+        await self.db.flush()  # 会话未开启 autoflush，先写入状态，避免下面的批量删除带上本候选对
+        await self.repository.delete_open_for(drop_source, drop_id)
+        await self.db.commit()
+        await self.db.refresh(pair)
+        return pair
+
+    async def dismiss_pair(self, pair_id: str, username: str) -> KeywordDuplicatePair:
+        """标记为非重复，之后的扫描不会重新打开"""
+        pair = await self._get_open_pair(pair_id)
+        pair.status = "DISMISSED"
+        pair.resolved_by = username
+        pair.resolved_at = datetime.now(timezone.utc)
+        await self.db.commit()
+        await self.db.refresh(pair)
+        return pair
+
+
+async def run_duplicate_scan(job_id: str) -> None:
+    """后台任务入口：使用独立会话（请求会话在响应返回后即关闭）"""
+    async with AsyncSessionLocal() as session:
+        await KeywordDuplicateService(session).run_scan(job_id)
@@ -0,0 +1,350 @@
+"""
+敏感词批量导入服务
+流式解析上传文件（CSV / JSONL），按批次去重并 upsert，支持进度查询与断点续传
+"""
+
+import codecs
+import csv
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, List, Optional, Tuple
+
+from fastapi import UploadFile
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.db_meta import BulkJob, GlobalKeywords, ScenarioKeywords
+from app.repositories.bulk_job import BulkJobRepository
+from app.repositories.global_keywords import GlobalKeywordsRepository
+from app.repositories.scenario_keywords import ScenarioKeywordsRepository
+from app.schemas.global_keywords import GlobalKeywordsCreate
+from app.schemas.scenario_keywords import ScenarioKeywordsCreate
+from app.services.keyword_similarity import normalized_hash
+
+JOB_TYPE_GLOBAL_IMPORT = "GLOBAL_KEYWORD_IMPORT"
+JOB_TYPE_SCENARIO_IMPORT = "SCENARIO_KEYWORD_IMPORT"
+
+IMPORT_CHUNK_SIZE = 1000        # 每批次（每个事务）写入的行数
+READ_BLOCK_SIZE = 64 * 1024     # 上传文件每次读取的字节数
+MAX_RECORDED_ERRORS = 1000      # 任务中最多保留的行级错误数
+
+SUPPORTED_FORMATS = ("csv", "jsonl")
+
+
+# ============================================
+# 流式解析
+# ============================================
+
+async def iter_upload_blocks(upload: UploadFile) -> AsyncIterator[bytes]:
+    """按固定块大小读取上传文件"""
+    while True:
+        block = await upload.read(READ_BLOCK_SIZE)
+        if not block:
+            break
+        yield block
+
+
+async def iter_text_lines(blocks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """将字节流增量解码为文本行（兼容 UTF-8 BOM 和 CRLF）"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    async for block in blocks:
+        buffer += decoder.decode(block)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+def detect_format(filename: Optional[str], fmt: Optional[str] = None) -> str:
+    """根据显式参数或文件扩展名确定文件格式"""
+    if fmt:
+        fmt = fmt.lower()
+        if fmt == "ndjson":
+            fmt = "jsonl"
+        if fmt not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported format '{fmt}', must be one of: {', '.join(SUPPORTED_FORMATS)}")
+        return fmt
+
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    raise ValueError("Cannot detect file format, please specify format=csv or format=jsonl")
+
+
+async def iter_records(
+    lines: AsyncIterator[str], fmt: str
+) -> AsyncIterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    逐行解析记录
+
+    Yields:
+        (行号, 记录, 错误信息)，行号为文件中的物理行号（从 1 开始）。
+        CSV 第一行为表头；字段中不支持换行。
+    """
+    header: Optional[List[str]] = None
+    row_no = 0
+    async for line in lines:
+        row_no += 1
+        if not line.strip():
+            continue
+
+        if fmt == "csv":
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [h.strip().lower() for h in values]
+                continue
+            if len(values) != len(header):
+                yield row_no, None, f"Expected {len(header)} columns, got {len(values)}"
+                continue
+            yield row_no, dict(zip(header, values)), None
+        else:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row_no, None, f"Invalid JSON: {e.msg}"
+                continue
+            if not isinstance(record, dict):
+                yield row_no, None, "Each line must be a JSON object"
+                continue
+            yield row_no, record, None
+
+
+def clean_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """去掉空字段并裁剪字符串两端空白，空值交给 Schema 默认值处理"""
+    cleaned = {}
+    for key, value in record.items():
+        if isinstance(value, str):
+            value = value.strip()
+            if value == "":
+                continue
+        if value is None:
+            continue
+        cleaned[key] = value
+    return cleaned
+
+
+def _format_validation_error(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+    )
+
+
+# ============================================
+# 导入服务
+# ============================================
+
+class KeywordImportService:
+    """敏感词批量导入服务"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.job_repo = BulkJobRepository(BulkJob, db)
+        self.global_repo = GlobalKeywordsRepository(GlobalKeywords, db)
+        self.scenario_repo = ScenarioKeywordsRepository(ScenarioKeywords, db)
+
+    async def get_job(self, job_id: str) -> Optional[BulkJob]:
+        return await self.job_repo.get(job_id)
+
+    async def prepare_job(
+        self,
+        job_type: str,
+        source_name: Optional[str],
+        created_by: str,
+        scenario_id: Optional[str] = None,
+        job_id: Optional[str] = None
+    ) -> BulkJob:
+        """
+        创建新的导入任务，或取回需要续传的任务
+
+        Raises:
+            ValueError: 续传的任务不存在、类型不匹配或已完成
+        """
+        if not job_id:
+            return await self.job_repo.create({
+                "id": str(uuid.uuid4()),
+                "job_type": job_type,
+                "status": "PENDING",
+                "scenario_id": scenario_id,
+                "source_name": source_name,
+                "created_by": created_by,
+                "errors": [],
+            })
+
+        job = await self.job_repo.get(job_id)
+        if not job or job.job_type != job_type or job.scenario_id != scenario_id:
+            raise ValueError("Import job not found")
+        if job.status == "COMPLETED":
+            raise ValueError("Import job already completed")
+        return job
+
+    async def import_global_keywords(
+        self,
+        job: BulkJob,
+        records: AsyncIterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]],
+        update_existing: bool = True
+    ) -> BulkJob:
+        """导入全局敏感词，文件内按关键词去重（后出现的重复行跳过）"""
+
+        def parse_row(record: Dict[str, Any]) -> Tuple[Hashable, dict]:
+            data = GlobalKeywordsCreate(**clean_record(record)).model_dump()
+            data["id"] = str(uuid.uuid4())
+            data["norm_hash"] = normalized_hash(data["keyword"])
+            return data["keyword"].casefold(), data
+
+        async def fetch_existing(rows: List[dict]) -> set:
+            existing = await self.global_repo.get_existing_keywords([r["keyword"] for r in rows])
+            return {k.casefold() for k in existing}
+
+        return await self._run(
+            job, records, parse_row, fetch_existing, self.global_repo.bulk_upsert, update_existing
+        )
+
+    async def import_scenario_keywords(
+        self,
+        job: BulkJob,
+        scenario_id: str,
+        records: AsyncIterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]],
+        update_existing: bool = True
+    ) -> BulkJob:
+        """导入场景敏感词，文件内按 (关键词, rule_mode) 去重"""
+
+        def parse_row(record: Dict[str, Any]) -> Tuple[Hashable, dict]:
+            record = clean_record(record)
+            record["scenario_id"] = scenario_id
+            data = ScenarioKeywordsCreate(**record).model_dump()
+            if not data["tag_code"]:
+                raise ValueError("Tag Code is required for all keywords.")
+            if data["rule_mode"] not in (0, 1):
+                raise ValueError("rule_mode must be 0 (Super) or 1 (Custom)")
+            if data["category"] not in (ScenarioKeywords.CATEGORY_WHITE, ScenarioKeywords.CATEGORY_BLACK):
+                raise ValueError("category must be 0 (white) or 1 (black)")
+            data["id"] = str(uuid.uuid4())
+            data["norm_hash"] = normalized_hash(data["keyword"])
+            return (data["keyword"].casefold(), data["rule_mode"]), data
+
+        async def fetch_existing(rows: List[dict]) -> set:
+            existing = await self.scenario_repo.get_existing_keys(
+                scenario_id, [(r["keyword"], r["rule_mode"]) for r in rows]
+            )
+            return {(k.casefold(), mode) for k, mode in existing}
+
+        return await self._run(
+            job, records, parse_row, fetch_existing, self.scenario_repo.bulk_upsert, update_existing
+        )
+
+    async def _run(
+        self,
+        job: BulkJob,
+        records: AsyncIterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]],
+        parse_row: Callable[[Dict[str, Any]], Tuple[Hashable, dict]],
+        fetch_existing: Callable[[List[dict]], Any],
+        upsert: Callable[[List[dict], bool], Any],
+        update_existing: bool
+    ) -> BulkJob:
+        """
+        导入主循环
+
+        每个批次在一个事务中完成：批次去重查询、多行 upsert、任务进度与断点更新。
+        失败时回滚当前批次，任务停留在上一个断点，重新上传同一文件并带上 job_id 即可续传。
+        """
+        job_id = job.id
+        resume_from = job.checkpoint or 0
+        errors: List[Dict[str, Any]] = list(job.errors or [])
+        seen: set = set()
+        chunk: List[Tuple[Hashable, dict]] = []
+        last_row = resume_from
+
+        job.status = "RUNNING"
+        job.message = None
+        await self.db.commit()
+
+        def record_error(row_no: int, message: str) -> None:
+            job.error_rows += 1
+            job.processed_rows += 1
+            if len(errors) < MAX_RECORDED_ERRORS:
+                errors.append({"row": row_no, "error": message})
+
+        try:
+            async for row_no, record, error in records:
+                if row_no <= resume_from:
+                    # 已提交的部分只需恢复文件内去重状态
+                    if record is not None:
+                        try:
+                            key, _ = parse_row(record)
+                            seen.add(key)
+                        except (ValidationError, ValueError):
+                            pass
+                    continue
+
+                last_row = row_no
+                if error:
+                    record_error(row_no, error)
+                    continue
+                try:
+                    key, row = parse_row(record)
+                except ValidationError as e:
+                    record_error(row_no, _format_validation_error(e))
+                    continue
+                except ValueError as e:
+                    record_error(row_no, str(e))
+                    continue
+
+                job.processed_rows += 1
+                if key in seen:
+                    job.skipped_rows += 1
+                    continue
+                seen.add(key)
+                chunk.append((key, row))
+
+                if len(chunk) >= IMPORT_CHUNK_SIZE:
+                    await self._flush(job, chunk, last_row, errors, fetch_existing, upsert, update_existing)
+
+            await self._flush(job, chunk, last_row, errors, fetch_existing, upsert, update_existing, final=True)
+        except Exception as e:
+            await self.db.rollback()
+            job = await self.job_repo.get(job_id)
+            job.status = "FAILED"
+            job.message = f"Import stopped at row {job.checkpoint}: {e}"
+            await self.db.commit()
+
+        return job
+
+    async def _flush(
+        self,
+        job: BulkJob,
+        chunk: List[Tuple[Hashable, dict]],
+        last_row: int,
+        errors: List[Dict[str, Any]],
+        fetch_existing: Callable[[List[dict]], Any],
+        upsert: Callable[[List[dict], bool], Any],
+        update_existing: bool,
+        final: bool = False
+    ) -> None:
+        """写入一个批次并推进断点（单事务）"""
+        if chunk:
+            existing = await fetch_existing([row for _, row in chunk])
+            rows = []
+            for key, row in chunk:
+                if key in existing:
+                    if not update_existing:
+                        job.skipped_rows += 1
+                        continue
+                    job.updated_rows += 1
+                else:
+                    job.inserted_rows += 1
+                rows.append(row)
+            await upsert(rows, update_existing)
+
+        job.checkpoint = last_row
+        job.errors = list(errors)
+        if final:
+            job.status = "COMPLETED"
+            job.finished_at = datetime.now(timezone.utc)
+        await self.db.commit()
+        chunk.clear()
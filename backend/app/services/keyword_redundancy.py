@@ -0,0 +1,350 @@
+"""
+场景敏感词冗余分析服务
+以全局敏感词构建 Aho-Corasick 自动机，每个场景的关键词一次扫描，找出：
+- EXACT：场景黑名单词与全局词完全相同
+- SUBSUMED：场景黑名单词包含某个全局词（命中场景词的文本必然先命中全局词）
+- WHITELIST_OVERRIDES_GLOBAL：场景白名单词与全局词完全相同（该全局词在场景内被整体放行）
+- WHITE_BLACK_CONFLICT：同一场景中同一关键词同时存在于白名单和黑名单
+前两类可一键清理，后两类需要人工确认
+"""
+
+import logging
+import uuid
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+from sqlalchemy import select, delete, insert, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import AsyncSessionLocal
+from app.models.db_meta import BulkJob, GlobalKeywords, KeywordRedundancy, RuleScenarioPolicy, ScenarioKeywords
+from app.repositories.bulk_job import BulkJobRepository
+from app.services.keyword_automaton import KeywordAutomaton
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPE_REDUNDANCY_SCAN = "KEYWORD_REDUNDANCY_SCAN"
+
+KIND_EXACT = "EXACT"
+KIND_SUBSUMED = "SUBSUMED"
+KIND_WHITELIST_OVERRIDES_GLOBAL = "WHITELIST_OVERRIDES_GLOBAL"
+KIND_WHITE_BLACK_CONFLICT = "WHITE_BLACK_CONFLICT"
+
+CLEANABLE_KINDS = (KIND_EXACT, KIND_SUBSUMED)
+
+POLICY_MATCH_KEYWORD = "KEYWORD"
+
+DELETE_CHUNK_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class GlobalEntry:
+    id: str
+    keyword: str
+    tag_code: Optional[str]
+
+
+@dataclass
+class RedundancyFinding:
+    kind: str
+    scenario_id: str
+    scenario_keyword_id: str
+    keyword: str
+    category: int
+    rule_mode: int
+    related_source: str          # GLOBAL 或 SCENARIO
+    related_id: str
+    related_keyword: str
+    tag_match: bool              # 场景词未设置标签或与关联词标签一致
+
+
+def build_global_automaton(entries: Iterable[GlobalEntry]) -> KeywordAutomaton:
+    automaton = KeywordAutomaton()
+    for entry in entries:
+        automaton.add(entry.keyword, entry)
+    return automaton.build()
+
+
+def analyze_scenario_keywords(
+    automaton: KeywordAutomaton,
+    scenario_id: str,
+    rows: Sequence[ScenarioKeywords]
+) -> List[RedundancyFinding]:
+    """
+    分析单个场景的关键词（每个关键词只扫描一次）
+
+    匹配区分大小写，与线上匹配引擎保持一致。
+    一个关键词包含多个全局词时只报告一条，优先标签一致、其次最长的全局词。
+    """
+    findings: List[RedundancyFinding] = []
+
+    def finding(kind: str, row, related_source: str, related_id: str,
+                related_keyword: str, related_tag: Optional[str]) -> RedundancyFinding:
+        return RedundancyFinding(
+            kind=kind,
+            scenario_id=scenario_id,
+            scenario_keyword_id=row.id,
+            keyword=row.keyword,
+            category=row.category,
+            rule_mode=row.rule_mode,
+            related_source=related_source,
+            related_id=related_id,
+            related_keyword=related_keyword,
+            tag_match=row.tag_code is None or row.tag_code == related_tag,
+        )
+
+    by_keyword: Dict[str, List] = defaultdict(list)
+    for row in rows:
+        by_keyword[row.keyword].append(row)
+        matches: List[GlobalEntry] = automaton.find_all(row.keyword)
+        if not matches:
+            continue
+
+        exact = next((m for m in matches if m.keyword == row.keyword), None)
+        if row.category == ScenarioKeywords.CATEGORY_WHITE:
+            if exact:
+                findings.append(finding(KIND_WHITELIST_OVERRIDES_GLOBAL, row, "GLOBAL",
+                                        exact.id, exact.keyword, exact.tag_code))
+            continue
+
+        if exact:
+            findings.append(finding(KIND_EXACT, row, "GLOBAL", exact.id, exact.keyword, exact.tag_code))
+        else:
+            best = max(matches, key=lambda m: (row.tag_code is None or row.tag_code == m.tag_code, len(m.keyword)))
+            findings.append(finding(KIND_SUBSUMED, row, "GLOBAL", best.id, best.keyword, best.tag_code))
+
+    for same_keyword in by_keyword.values():
+        blacks = [r for r in same_keyword if r.category == ScenarioKeywords.CATEGORY_BLACK]
+        if not blacks:
+            continue
+        for white in (r for r in same_keyword if r.category == ScenarioKeywords.CATEGORY_WHITE):
+            black = blacks[0]
+            findings.append(finding(KIND_WHITE_BLACK_CONFLICT, white, "SCENARIO",
+                                    black.id, black.keyword, black.tag_code))
+
+    return findings
+
+
+class KeywordRedundancyService:
+    """场景敏感词冗余分析与清理"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.job_repo = BulkJobRepository(BulkJob, db)
+
+    async def load_global_automaton(self) -> KeywordAutomaton:
+        """只有启用中的全局词参与覆盖判断"""
+        result = await self.db.stream(
+            select(GlobalKeywords.id, GlobalKeywords.keyword, GlobalKeywords.tag_code)
+            .where(GlobalKeywords.is_active.is_(True))
+            .execution_options(yield_per=5000)
+        )
+        return build_global_automaton([GlobalEntry(r.id, r.keyword, r.tag_code) async for r in result])
+
+    async def _scenario_rows(self, scenario_id: str) -> List[ScenarioKeywords]:
+        result = await self.db.execute(
+            select(ScenarioKeywords).where(ScenarioKeywords.scenario_id == scenario_id)
+        )
+        return result.scalars().all()
+
+    async def _policy_keywords(self, scenario_id: str) -> Set[str]:
+        """场景中被 KEYWORD 类型策略引用的关键词（含已停用的策略）"""
+        result = await self.db.execute(
+            select(RuleScenarioPolicy.match_value).distinct().where(
+                RuleScenarioPolicy.scenario_id == scenario_id,
+                RuleScenarioPolicy.match_type == POLICY_MATCH_KEYWORD
+            )
+        )
+        return set(result.scalars().all())
+
+    async def analyze_scenario(
+        self, scenario_id: str, automaton: Optional[KeywordAutomaton] = None
+    ) -> List[RedundancyFinding]:
+        """实时分析单个场景"""
+        automaton = automaton or await self.load_global_automaton()
+        return analyze_scenario_keywords(automaton, scenario_id, await self._scenario_rows(scenario_id))
+
+    # ---------- 批量分析 ----------
+
+    async def create_scan_job(self, created_by: str, scenario_id: Optional[str] = None) -> BulkJob:
+        running = await self.db.execute(
+            select(BulkJob.id).where(
+                BulkJob.job_type == JOB_TYPE_REDUNDANCY_SCAN,
+                BulkJob.status.in_(["PENDING", "RUNNING"])
+            ).limit(1)
+        )
+        if running.scalar():
+            raise ValueError("A redundancy scan is already running")
+
+        return await self.job_repo.create({
+            "id": str(uuid.uuid4()),
+            "job_type": JOB_TYPE_REDUNDANCY_SCAN,
+            "status": "PENDING",
+            "scenario_id": scenario_id,
+            "created_by": created_by,
+            "errors": [],
+        })
+
+    async def get_job(self, job_id: str) -> Optional[BulkJob]:
+        job = await self.job_repo.get(job_id)
+        if job and job.job_type == JOB_TYPE_REDUNDANCY_SCAN:
+            return job
+        return None
+
+    async def run_scan(self, job_id: str) -> BulkJob:
+        """
+        执行批量分析：自动机只构建一次，逐个场景扫描，
+        每个场景在一个事务中替换其分析结果并推进进度（checkpoint=已完成场景数）
+
+        统计口径：processed_rows=扫描的场景关键词数，inserted_rows=发现的问题数
+        """
+        job = await self.job_repo.get(job_id)
+        job.status = "RUNNING"
+        job.message = None
+        await self.db.commit()
+
+        try:
+            automaton = await self.load_global_automaton()
+            if job.scenario_id:
+                scenario_ids = [job.scenario_id]
+            else:
+                result = await self.db.execute(select(ScenarioKeywords.scenario_id).distinct())
+                scenario_ids = sorted(result.scalars().all())
+
+            for scenario_id in scenario_ids:
+                rows = await self._scenario_rows(scenario_id)
+                findings = analyze_scenario_keywords(automaton, scenario_id, rows)
+                await self._replace_findings(scenario_id, findings, job_id)
+                job.processed_rows += len(rows)
+                job.inserted_rows += len(findings)
+                job.checkpoint += 1
+                await self.db.commit()
+
+            if not job.scenario_id:
+                # 已无关键词的场景，清除其历史结果
+                await self.db.execute(
+                    delete(KeywordRedundancy).where(
+                        or_(KeywordRedundancy.job_id.is_(None), KeywordRedundancy.job_id != job_id)
+                    )
+                )
+            job.message = f"{len(scenario_ids)} scenarios analyzed, {len(automaton)} global keywords"
+            job.status = "COMPLETED"
+            job.finished_at = datetime.now(timezone.utc)
+            await self.db.commit()
+        except Exception as e:
+            logger.exception("Keyword redundancy scan %s failed", job_id)
+            await self.db.rollback()
+            job = await self.job_repo.get(job_id)
+            job.status = "FAILED"
+            job.message = str(e)
+            await self.db.commit()
+
+        return job
+
+    async def _replace_findings(
+        self, scenario_id: str, findings: List[RedundancyFinding], job_id: Optional[str]
+    ) -> None:
+        await self.db.execute(delete(KeywordRedundancy).where(KeywordRedundancy.scenario_id == scenario_id))
+        if findings:
+            await self.db.execute(
+                insert(KeywordRedundancy),
+                [{"id": str(uuid.uuid4()), "job_id": job_id, **asdict(f)} for f in findings]
+            )
+
+    async def list_findings(
+        self,
+        scenario_id: Optional[str] = None,
+        kind: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> dict:
+        conditions = []
+        if scenario_id:
+            conditions.append(KeywordRedundancy.scenario_id == scenario_id)
+        if kind:
+            conditions.append(KeywordRedundancy.kind == kind)
+
+        total = (await self.db.execute(
+            select(func.count()).select_from(KeywordRedundancy).where(*conditions)
+        )).scalar() or 0
+        result = await self.db.execute(
+            select(KeywordRedundancy)
+            .where(*conditions)
+            .order_by(KeywordRedundancy.scenario_id, KeywordRedundancy.kind, KeywordRedundancy.keyword)
+            .offset(skip)
+            .limit(limit)
+        )
+        return {"total": total, "items": result.scalars().all()}
+
+    # ---------- 清理 ----------
+
+    async def cleanup_scenario(
+        self,
+        scenario_id: str,
+        kinds: Sequence[str] = CLEANABLE_KINDS,
+        include_tag_overrides: bool = False,
+        keyword_ids: Optional[Sequence[str]] = None,
+        dry_run: bool = False,
+        include_policy_referenced: bool = False
+    ) -> dict:
+        """
+        一键清理场景中的冗余关键词
+
+        清理前重新实时分析，不依赖可能过期的批量结果。
+        默认只删除标签与全局词一致（或未设置标签）的行；标签不同的行可能用于在场景内改判标签，
+        需 include_tag_overrides=True 才删除。
+        被场景 KEYWORD 策略引用的关键词默认不删除，在 skipped_referenced 中返回；
+        需 include_policy_referenced=True 才删除。
+
+        Raises:
+            ValueError: kinds 包含不可自动清理的类型
+        """
+        invalid = set(kinds) - set(CLEANABLE_KINDS)
+        if invalid:
+            raise ValueError(f"Only {', '.join(CLEANABLE_KINDS)} findings can be cleaned up automatically")
+
+        findings = await self.analyze_scenario(scenario_id)
+        selected = [
+            f for f in findings
+            if f.kind in kinds
+            and (include_tag_overrides or f.tag_match)
+            and (keyword_ids is None or f.scenario_keyword_id in keyword_ids)
+        ]
+        skipped_referenced = []
+        if selected and not include_policy_referenced:
+            referenced = await self._policy_keywords(scenario_id)
+            skipped_referenced = [f for f in selected if f.keyword in referenced]
+            selected = [f for f in selected if f.keyword not in referenced]
+
+        if selected and not dry_run:
+            ids = [f.scenario_keyword_id for f in selected]
+            for start in range(0, len(ids), DELETE_CHUNK_SIZE):
+                await self.db.execute(
+                    delete(ScenarioKeywords).where(
+                        ScenarioKeywords.scenario_id == scenario_id,
+                        ScenarioKeywords.id.in_(ids[start:start + DELETE_CHUNK_SIZE])
+                    )
+                )
+            deleted = set(ids)
+            remaining = [
+                f for f in findings
+                if f.scenario_keyword_id not in deleted and f.related_id not in deleted
+            ]
+            await self._replace_findings(scenario_id, remaining, None)
+            await self.db.commit()
+
+        return {
+            "scenario_id": scenario_id,
+            "dry_run": dry_run,
+            "deleted_count": 0 if dry_run else len(selected),
+            "items": selected,
+            "skipped_referenced": skipped_referenced,
+        }
+
+
+async def run_redundancy_scan(job_id: str) -> None:
+    """后台任务入口：使用独立会话（请求会话在响应返回后即关闭）"""
+    async with AsyncSessionLocal() as session:
+        await KeywordRedundancyService(session).run_scan(job_id)
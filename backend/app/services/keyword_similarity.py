@@ -0,0 +1,274 @@
+"""
+敏感词归一化与相似度检测
+归一化（全/半角、繁/简、空格符号、大小写）+ 归一化哈希 + MinHash / 编辑距离分桶，
+用于发现全局词库、场景词库和待审核词之间的变体与近似重复
+"""
+
+import hashlib
+import random
+import unicodedata
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+try:
+    import opencc  # 可选依赖：安装后使用完整的繁简转换
+    _OPENCC = opencc.OpenCC("t2s")
+except ImportError:
+    _OPENCC = None
+
+SOURCE_GLOBAL = "GLOBAL"
+SOURCE_SCENARIO = "SCENARIO"
+SOURCE_STAGING = "STAGING"
+
+# 同一归一化分组内选择保留项的优先级：正式全局词 > 待审核词 > 场景词
+SOURCE_PRIORITY = {SOURCE_GLOBAL: 0, SOURCE_STAGING: 1, SOURCE_SCENARIO: 2}
+
+MATCH_NORMALIZED = "NORMALIZED"  # 归一化后完全相同
+MATCH_SIMILAR = "SIMILAR"        # 编辑距离相似
+
+SIMILARITY_THRESHOLD = 0.8       # 1 - 编辑距离 / 最大长度
+MIN_DELETE_BLOCK_LEN = 5         # 编辑距离为 1 时达到阈值所需的最短长度
+MINHASH_PERMUTATIONS = 32
+MINHASH_BANDS = 8                # 每段 4 行，Jaccard 约 0.6 以上的字符二元组集合会落入同一桶
+MAX_BUCKET_SIZE = 256            # 过大的桶（高频片段）不参与比较，避免平方级膨胀
+
+# 常用繁体 -> 简体对照（未安装 opencc 时使用）
+_T2S_PAIRS = (
+    "與与 專专 業业 東东 絲丝 兩两 嚴严 喪丧 個个 豐丰 臨临 為为 麗丽 舉举 義义 烏乌 樂乐 喬乔 習习 鄉乡 "
+    "書书 買买 亂乱 爭争 於于 虧亏 雲云 亞亚 產产 親亲 億亿 僅仅 從从 倉仓 儀仪 們们 價价 眾众 衆众 優优 "
+    "會会 傘伞 偉伟 傳传 傷伤 倫伦 偽伪 僞伪 體体 餘余 傭佣 債债 傾倾 兒儿 黨党 關关 興兴 內内 冊册 寫写 "
+    "軍军 農农 決决 況况 凍冻 淨净 減减 幾几 鳳凤 憑凭 凱凯 擊击 劃划 劉刘 則则 剛刚 創创 刪删 別别 劑剂 "
+    "劇剧 勸劝 辦办 務务 勵励 動动 勞劳 勢势 匯汇 區区 醫医 華华 協协 單单 賣卖 衛卫 卻却 廠厂 廳厅 歷历 "
+    "厲厉 壓压 縣县 參参 雙双 發发 髮发 變变 疊叠 號号 嚇吓 嗎吗 啟启 員员 聽听 響响 團团 園园 圍围 國国 "
+    "圖图 圓圆 場场 壞坏 塊块 堅坚 壇坛 墳坟 墜坠 壯壮 聲声 殼壳 壺壶 處处 備备 夠够 頭头 奪夺 奮奋 婦妇 "
+    "媽妈 嬌娇 孫孙 學学 寧宁 實实 審审 憲宪 寬宽 賓宾 對对 尋寻 導导 爾尔 塵尘 嘗尝 層层 屬属 嶺岭 島岛 "
+    "幣币 師师 帳帐 帶带 幫帮 廣广 庫库 應应 廟庙 廢废 開开 張张 彎弯 彈弹 歸归 當当 錄录 徹彻 後后 復复 "
+    "複复 徵征 惡恶 悅悦 惱恼 愛爱 憂忧 憶忆 懷怀 態态 懲惩 戀恋 戰战 戲戏 戶户 擴扩 撲扑 執执 掃扫 揚扬 "
+    "換换 據据 擾扰 擁拥 撥拨 擔担 擠挤 擬拟 擇择 搶抢 數数 斷断 時时 晉晋 暈晕 暫暂 曉晓 曬晒 楊杨 極极 "
+    "構构 槍枪 標标 樣样 權权 樓楼 檢检 櫃柜 樹树 橋桥 機机 歡欢 歐欧 歲岁 殘残 殺杀 氣气 漢汉 湯汤 溝沟 "
+    "滅灭 潔洁 灣湾 濕湿 濟济 測测 滿满 漁渔 潤润 澤泽 濃浓 燈灯 災灾 燒烧 熱热 煙烟 牽牵 犧牺 獄狱 獨独 "
+    "獲获 獵猎 獎奖 現现 環环 畫画 療疗 瘋疯 癮瘾 盜盗 監监 盤盘 確确 碼码 礙碍 禮礼 禍祸 離离 種种 稱称 "
+    "穩稳 積积 窮穷 竊窃 筆笔 節节 範范 築筑 簡简 類类 糧粮 糾纠 紅红 約约 級级 紀纪 純纯 紙纸 紛纷 紋纹 "
+    "細细 終终 組组 結结 絕绝 給给 統统 經经 綁绑 綜综 綠绿 網网 維维 線线 練练 繼继 續续 總总 繩绳 縮缩 "
+    "罰罚 羅罗 聯联 聰聪 職职 聞闻 腳脚 腦脑 膽胆 膠胶 臉脸 艦舰 藝艺 莊庄 萬万 葉叶 蓋盖 薦荐 藥药 蘇苏 "
+    "蘭兰 蟲虫 術术 衝冲 補补 裝装 裡里 裏里 製制 見见 規规 視视 覺觉 觀观 計计 訂订 認认 討讨 訓训 記记 "
+    "講讲 設设 訪访 許许 詐诈 詞词 詛诅 試试 詩诗 話话 該该 詳详 誇夸 誠诚 誘诱 誤误 說说 請请 諾诺 讀读 "
+    "課课 調调 談谈 論论 謀谋 謊谎 謝谢 證证 譯译 議议 護护 讓让 貝贝 負负 財财 責责 貨货 販贩 貧贫 購购 "
+    "貸贷 貼贴 貴贵 費费 賀贺 資资 賊贼 賄贿 賭赌 賠赔 賤贱 賞赏 賴赖 贊赞 贏赢 贓赃 趕赶 趙赵 跡迹 踐践 "
+    "蹤踪 車车 軌轨 軟软 較较 輕轻 載载 輸输 轉转 辭辞 這这 連连 週周 進进 遊游 運运 過过 達达 違违 遙遥 "
+    "遠远 適适 遲迟 遷迁 選选 遺遗 邊边 邏逻 郵邮 醜丑 釋释 鐘钟 鎮镇 針针 釣钓 鈔钞 鉛铅 銀银 銅铜 銷销 "
+    "鋒锋 鋼钢 錢钱 錯错 鍋锅 鍵键 鎖锁 鏡镜 長长 門门 閃闪 閉闭 問问 閒闲 間间 閱阅 闆板 闊阔 隊队 陽阳 "
+    "陰阴 陳陈 陸陆 險险 隨随 隱隐 難难 雞鸡 雜杂 電电 霧雾 靈灵 靜静 頂顶 項项 順顺 須须 預预 領领 頻频 "
+    "題题 額额 顏颜 願愿 顧顾 顯显 風风 飛飞 飯饭 飲饮 飽饱 餓饿 館馆 馬马 駕驾 騎骑 騙骗 騷骚 騰腾 驅驱 "
+    "驗验 驚惊 鬥斗 鬧闹 魚鱼 鮮鲜 鳥鸟 鴨鸭 麥麦 麼么 黃黄 點点 黴霉 齊齐 齒齿 龍龙 龜龟 並并 佔占 佈布 "
+    "報报"
+)
+_T2S_TABLE = str.maketrans({pair[0]: pair[1] for pair in _T2S_PAIRS.split()})
+
+# MinHash 置换参数 (a * x + b) mod p，固定种子保证各次运行的签名可比较
+_MINHASH_PRIME = (1 << 31) - 1
+_rng = random.Random(20240229)
+_MINHASH_A = np.array([_rng.randrange(1, _MINHASH_PRIME) for _ in range(MINHASH_PERMUTATIONS)], dtype=np.uint64)
+_MINHASH_B = np.array([_rng.randrange(0, _MINHASH_PRIME) for _ in range(MINHASH_PERMUTATIONS)], dtype=np.uint64)
+
+
+# ============================================
+# 归一化
+# ============================================
+
+def to_simplified(text: str) -> str:
+    if _OPENCC is not None:
+        return _OPENCC.convert(text)
+    return text.translate(_T2S_TABLE)
+
+
+def normalize_keyword(keyword: str) -> str:
+    """
+    归一化敏感词
+
+    1. NFKC：全角字母/数字/符号转半角，兼容字符（如 ① ﬁ）展开
+    2. 繁体转简体
+    3. 大小写折叠
+    4. 去除空白、标点、符号及不可见字符（零宽字符等）
+
+    仅由符号组成的关键词保留折叠后的原文，避免归一化为空串。
+    """
+    text = to_simplified(unicodedata.normalize("NFKC", keyword)).casefold()
+    normalized = "".join(ch for ch in text if unicodedata.category(ch)[0] not in "PSZC")
+    return normalized or text.strip()
+
+
+def normalized_hash(keyword: str) -> str:
+    """归一化形式的 SHA-1（40 位十六进制），存入 norm_hash 列用于等值查找"""
+    return hash_normalized(normalize_keyword(keyword))
+
+
+def hash_normalized(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+# ============================================
+# 相似度与分桶
+# ============================================
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein 编辑距离"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def similarity(a: str, b: str) -> float:
+    if not a and not b:
+        return 1.0
+    return 1 - edit_distance(a, b) / max(len(a), len(b))
+
+
+def deletion_variants(normalized: str) -> Set[str]:
+    """删除一个字符得到的所有变体；编辑距离为 1 的两个串至少共享一个删除变体或互为变体"""
+    if len(normalized) < MIN_DELETE_BLOCK_LEN:
+        return set()
+    return {normalized[:i] + normalized[i + 1:] for i in range(len(normalized))}
+
+
+def minhash_signature(normalized: str) -> Tuple[int, ...]:
+    """基于字符二元组的 MinHash 签名"""
+    if len(normalized) < 2:
+        shingles = {normalized}
+    else:
+        shingles = {normalized[i:i + 2] for i in range(len(normalized) - 1)}
+    values = np.array(
+        [zlib.crc32(s.encode("utf-8")) % _MINHASH_PRIME for s in shingles], dtype=np.uint64
+    )
+    hashed = (np.outer(_MINHASH_A, values) + _MINHASH_B[:, None]) % _MINHASH_PRIME
+    return tuple(int(v) for v in hashed.min(axis=1))
+
+
+def _blocking_keys(normalized: str) -> Iterable[Tuple]:
+    if len(normalized) >= MIN_DELETE_BLOCK_LEN - 1:
+        yield ("D", normalized)
+        for variant in deletion_variants(normalized):
+            yield ("D", variant)
+    if len(normalized) >= 3:
+        signature = minhash_signature(normalized)
+        rows = MINHASH_PERMUTATIONS // MINHASH_BANDS
+        for band in range(MINHASH_BANDS):
+            yield ("M", band, signature[band * rows:(band + 1) * rows])
+
+
+# ============================================
+# 重复检测
+# ============================================
+
+@dataclass
+class KeywordEntry:
+    source: str
+    id: str
+    keyword: str
+    scenario_id: Optional[str] = None
+    normalized: str = field(default="")
+
+    def __post_init__(self):
+        if not self.normalized:
+            self.normalized = normalize_keyword(self.keyword)
+
+    @property
+    def sort_key(self) -> Tuple[int, str]:
+        return SOURCE_PRIORITY[self.source], self.id
+
+
+@dataclass
+class DuplicatePair:
+    """a 为建议保留项，b 为建议合并掉的变体"""
+    a: KeywordEntry
+    b: KeywordEntry
+    match_type: str
+    similarity: float
+
+
+def is_comparable(a: KeywordEntry, b: KeywordEntry) -> bool:
+    """
+    两条关键词是否属于同一作用域，可视为互为重复
+
+    - 不同场景的场景词互不影响
+    - 待审核词只与全局词库及其他待审核词比较（审核通过后进入全局词库）
+    - 场景词与全局词原文完全相同属于冗余配置，由冗余分析处理，这里只报告变体
+    """
+    sources = {a.source, b.source}
+    if sources == {SOURCE_SCENARIO}:
+        return a.scenario_id == b.scenario_id
+    if sources == {SOURCE_SCENARIO, SOURCE_STAGING}:
+        return False
+    if sources == {SOURCE_SCENARIO, SOURCE_GLOBAL}:
+        return a.keyword != b.keyword
+    return True
+
+
+def find_duplicate_pairs(
+    entries: List[KeywordEntry], threshold: float = SIMILARITY_THRESHOLD
+) -> List[DuplicatePair]:
+    """
+    查找重复与近似重复
+
+    1. 按归一化形式分组，组内每一项与排在其前面的第一个可比较项配对（NORMALIZED）
+    2. 每组取代表项，按删除变体（编辑距离 1）与 MinHash 分段分桶，
+       仅比较同桶内的候选，再用编辑距离确认（SIMILAR）
+    """
+    groups: Dict[str, List[KeywordEntry]] = defaultdict(list)
+    for entry in entries:
+        groups[entry.normalized].append(entry)
+
+    pairs: List[DuplicatePair] = []
+    for members in groups.values():
+        members.sort(key=lambda e: e.sort_key)
+        for i, member in enumerate(members[1:], 1):
+            keep = next((m for m in members[:i] if is_comparable(m, member)), None)
+            if keep is not None:
+                pairs.append(DuplicatePair(keep, member, MATCH_NORMALIZED, 1.0))
+
+    buckets: Dict[Tuple, List[str]] = defaultdict(list)
+    for normalized in groups:
+        for key in _blocking_keys(normalized):
+            buckets[key].append(normalized)
+
+    seen: Set[Tuple[str, str]] = set()
+    for bucket in buckets.values():
+        if len(bucket) < 2 or len(bucket) > MAX_BUCKET_SIZE:
+            continue
+        for i in range(len(bucket)):
+            for j in range(i + 1, len(bucket)):
+                x, y = sorted((bucket[i], bucket[j]))
+                if (x, y) in seen:
+                    continue
+                seen.add((x, y))
+                if min(len(x), len(y)) < threshold * max(len(x), len(y)):
+                    continue
+                score = similarity(x, y)
+                if score < threshold:
+                    continue
+                pair = _pick_group_pair(groups[x], groups[y], score)
+                if pair is not None:
+                    pairs.append(pair)
+    return pairs
+
+
+def _pick_group_pair(
+    group_x: List[KeywordEntry], group_y: List[KeywordEntry], score: float
+) -> Optional[DuplicatePair]:
+    """两个近似分组之间只报告一对（优先级最高的可比较组合），组内其余成员已与各自代表项配对"""
+    for x in group_x:
+        for y in group_y:
+            if is_comparable(x, y):
+                a, b = sorted((x, y), key=lambda e: e.sort_key)
+                return DuplicatePair(a, b, MATCH_SIMILAR, round(score, 4))
+    return None
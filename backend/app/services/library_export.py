@@ -0,0 +1,160 @@
+"""
+词库/策略流式导出服务
+服务端游标 + 主键 keyset 分块读取，边读边写出（CSV / JSONL，可选 gzip），内存占用恒定
+"""
+
+import csv
+import io
+import json
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional
+
+from sqlalchemy import select
+
+from app.core.db import AsyncSessionLocal
+from app.models.db_meta import (
+    Base, GlobalKeywords, ScenarioKeywords, RuleScenarioPolicy, RuleGlobalDefaults, MetaTags
+)
+
+EXPORT_CHUNK_SIZE = 2000    # 每个 keyset 分块读取的行数
+EXPORT_FORMATS = ("csv", "jsonl")
+
+
+@dataclass
+class ExportSpec:
+    """导出定义：数据表、导出列与过滤条件"""
+    name: str
+    model: type[Base]
+    columns: List[str]
+    filters: List[Any] = field(default_factory=list)
+    details: dict = field(default_factory=dict)  # 写入审计日志的过滤参数
+
+
+def global_keywords_spec(tag_code: Optional[str] = None) -> ExportSpec:
+    filters = [GlobalKeywords.tag_code == tag_code] if tag_code else []
+    return ExportSpec(
+        name="global_keywords",
+        model=GlobalKeywords,
+        columns=["id", "keyword", "tag_code", "risk_level", "is_active"],
+        filters=filters,
+        details={"tag_code": tag_code},
+    )
+
+
+def scenario_keywords_spec(scenario_id: str, rule_mode: Optional[int] = None) -> ExportSpec:
+    filters = [ScenarioKeywords.scenario_id == scenario_id]
+    if rule_mode is not None:
+        filters.append(ScenarioKeywords.rule_mode == rule_mode)
+    return ExportSpec(
+        name=f"scenario_keywords_{scenario_id}",
+        model=ScenarioKeywords,
+        columns=["id", "scenario_id", "keyword", "tag_code", "rule_mode", "risk_level", "category", "is_active"],
+        filters=filters,
+        details={"rule_mode": rule_mode},
+    )
+
+
+def scenario_policies_spec(scenario_id: str) -> ExportSpec:
+    return ExportSpec(
+        name=f"scenario_policies_{scenario_id}",
+        model=RuleScenarioPolicy,
+        columns=["id", "scenario_id", "match_type", "match_value", "rule_mode",
+                 "extra_condition", "strategy", "is_active"],
+        filters=[RuleScenarioPolicy.scenario_id == scenario_id],
+    )
+
+
+def global_defaults_spec() -> ExportSpec:
+    return ExportSpec(
+        name="global_default_policies",
+        model=RuleGlobalDefaults,
+        columns=["id", "tag_code", "extra_condition", "strategy", "is_active"],
+    )
+
+
+def meta_tags_spec() -> ExportSpec:
+    return ExportSpec(
+        name="meta_tags",
+        model=MetaTags,
+        columns=["id", "tag_code", "tag_name", "parent_code", "level", "is_active"],
+    )
+
+
+def export_media_type(fmt: str, compress: bool) -> str:
+    if compress:
+        return "application/gzip"
+    return "text/csv; charset=utf-8" if fmt == "csv" else "application/x-ndjson"
+
+
+def export_filename(spec: ExportSpec, fmt: str, compress: bool) -> str:
+    suffix = ".gz" if compress else ""
+    return f"{spec.name}_{datetime.now().strftime('%Y%m%d%H%M%S')}.{fmt}{suffix}"
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return "" if value is None else value
+
+
+def _encode_rows(rows: List[Any], columns: List[str], fmt: str) -> bytes:
+    if fmt == "csv":
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator="\n")
+        writer.writerows([_csv_value(v) for v in row] for row in rows)
+        return buf.getvalue().encode("utf-8")
+    return "".join(
+        json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n" for row in rows
+    ).encode("utf-8")
+
+
+async def iter_export_chunks(spec: ExportSpec) -> AsyncIterator[List[Any]]:
+    """
+    按主键 keyset 分块读取（WHERE id > :last_id ORDER BY id LIMIT n），
+    每块通过服务端游标流式获取。整个导出在同一个事务内完成，保证快照一致。
+    使用独立会话：StreamingResponse 的生成器在请求依赖关闭后仍会继续执行。
+    """
+    model = spec.model
+    cols = [getattr(model, c) for c in spec.columns]
+    id_index = spec.columns.index("id")
+
+    async with AsyncSessionLocal() as session:
+        last_id = None
+        while True:
+            stmt = select(*cols).where(*spec.filters)
+            if last_id is not None:
+                stmt = stmt.where(model.id > last_id)
+            stmt = stmt.order_by(model.id).limit(EXPORT_CHUNK_SIZE)
+
+            result = await session.stream(stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+            rows = [tuple(row) async for row in result]
+            if not rows:
+                break
+            yield rows
+            if len(rows) < EXPORT_CHUNK_SIZE:
+                break
+            last_id = rows[-1][id_index]
+
+
+async def stream_export(spec: ExportSpec, fmt: str, compress: bool = False) -> AsyncIterator[bytes]:
+    """生成导出文件的字节流"""
+    compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31 -> gzip 格式
+
+    def emit(data: bytes) -> bytes:
+        return compressor.compress(data) if compressor else data
+
+    if fmt == "csv":
+        header = _encode_rows([spec.columns], spec.columns, "csv")
+        chunk = emit(header)
+        if chunk:
+            yield chunk
+
+    async for rows in iter_export_chunks(spec):
+        chunk = emit(_encode_rows(rows, spec.columns, fmt))
+        if chunk:
+            yield chunk
+
+    if compressor:
+        yield compressor.flush()
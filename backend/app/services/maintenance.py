@@ -0,0 +1,126 @@
+"""
+定时维护任务
+- 释放认领超时的待审核任务（分批，每轮有上限）
+- 待审核任务计数器对账
+- 待审核任务认领优先级增量刷新
+- 审计日志、沙盒测试历史按保留期限分批清理
+调度默认关闭，SCHEDULER_ENABLED=true 开启。
+保留天数通过环境变量配置，默认 0 表示不清理（不注册对应的清理任务）。
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Type
+
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.db_meta import Base, AuditLog, PlaygroundHistory
+from app.services.scheduler import MaintenanceScheduler, PeriodicJob
+from app.services.staging import StagingService, TASK_MODELS
+from app.services.staging_priority import StagingPriorityService
+
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "false").lower() in ("1", "true", "yes")
+
+RELEASE_INTERVAL_SECONDS = 60
+RELEASE_MAX_BATCHES = 20           # 每轮每类任务最多释放 20 批（每批 RELEASE_BATCH_SIZE 条），剩余的下一轮继续
+COUNTER_RECONCILE_INTERVAL_SECONDS = 600
+PRIORITY_REFRESH_INTERVAL_SECONDS = 60
+RETENTION_INTERVAL_SECONDS = 3600
+
+AUDIT_LOG_RETENTION_DAYS = int(os.getenv("AUDIT_LOG_RETENTION_DAYS", "0"))
+PLAYGROUND_HISTORY_RETENTION_DAYS = int(os.getenv("PLAYGROUND_HISTORY_RETENTION_DAYS", "0"))
+PURGE_BATCH_SIZE = 1000
+PURGE_MAX_BATCHES = 50
+
+
+async def purge_older_than(
+    db: AsyncSession,
+    model: Type[Base],
+    days: int,
+    batch_size: int = PURGE_BATCH_SIZE,
+    max_batches: int = PURGE_MAX_BATCHES
+) -> Dict[str, Any]:
+    """
+    按 created_at 分批删除超过保留期限的数据
+
+    每批先按 created_at 索引取最早的一批主键，再按主键删除并提交，避免长事务与大范围锁。
+    """
+    if days <= 0:
+        return {"deleted": 0, "skipped": "retention disabled"}
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    deleted = 0
+    for _ in range(max_batches):
+        result = await db.execute(
+            select(model.id).where(model.created_at < cutoff).order_by(model.created_at).limit(batch_size)
+        )
+        ids = result.scalars().all()
+        if not ids:
+            break
+        await db.execute(delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False))
+        await db.commit()
+        deleted += len(ids)
+        if len(ids) < batch_size:
+            break
+    return {"deleted": deleted, "cutoff": cutoff.isoformat()}
+
+
+async def release_expired_claims(db: AsyncSession) -> Dict[str, Any]:
+    return {
+        f"released_{task_type}": await StagingService(db, task_type).release_expired(max_batches=RELEASE_MAX_BATCHES)
+        for task_type in TASK_MODELS
+    }
+
+
+async def reconcile_staging_counters(db: AsyncSession) -> Dict[str, Any]:
+    results = [await StagingService(db, task_type).counters.reconcile() for task_type in TASK_MODELS]
+    return {f"drifted_{r['task_type']}": r["drifted"] for r in results}
+
+
+async def refresh_staging_priorities(db: AsyncSession) -> Dict[str, Any]:
+    results = [await StagingPriorityService(db, task_type).refresh() for task_type in TASK_MODELS]
+    return {
+        f"{key}_{r['task_type']}": r[key]
+        for r in results for key in ("scored", "prompts", "hit_tasks")
+    }
+
+
+async def purge_audit_logs(db: AsyncSession) -> Dict[str, Any]:
+    return await purge_older_than(db, AuditLog, AUDIT_LOG_RETENTION_DAYS)
+
+
+async def purge_playground_history(db: AsyncSession) -> Dict[str, Any]:
+    return await purge_older_than(db, PlaygroundHistory, PLAYGROUND_HISTORY_RETENTION_DAYS)
+
+
+def build_scheduler() -> MaintenanceScheduler:
+    scheduler = MaintenanceScheduler()
+    scheduler.register(PeriodicJob(
+        "release_expired_claims", RELEASE_INTERVAL_SECONDS, release_expired_claims,
+        "释放认领超时的待审核任务"
+    ))
+    scheduler.register(PeriodicJob(
+        "reconcile_staging_counters", COUNTER_RECONCILE_INTERVAL_SECONDS, reconcile_staging_counters,
+        "待审核任务计数器对账"
+    ))
+    scheduler.register(PeriodicJob(
+        "refresh_staging_priorities", PRIORITY_REFRESH_INTERVAL_SECONDS, refresh_staging_priorities,
+        "待审核任务认领优先级增量刷新"
+    ))
+    # 清理任务只在显式配置保留天数时注册
+    if AUDIT_LOG_RETENTION_DAYS > 0:
+        scheduler.register(PeriodicJob(
+            "purge_audit_logs", RETENTION_INTERVAL_SECONDS, purge_audit_logs,
+            f"清理 {AUDIT_LOG_RETENTION_DAYS} 天前的审计日志"
+        ))
+    if PLAYGROUND_HISTORY_RETENTION_DAYS > 0:
+        scheduler.register(PeriodicJob(
+            "purge_playground_history", RETENTION_INTERVAL_SECONDS, purge_playground_history,
+            f"清理 {PLAYGROUND_HISTORY_RETENTION_DAYS} 天前的沙盒测试历史"
+        ))
+    return scheduler
+
+
+# Global Instance
+scheduler = build_scheduler()
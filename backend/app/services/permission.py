@@ -5,12 +5,28 @@
 
 from typing import Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, and_
 
+from app.core.permission_bits import PermissionSet
+from app.core.permission_cache import permission_cache
 from app.models.db_meta import User, UserScenarioAssignment, ScenarioAdminPermission, Scenarios
+from app.repositories.role import UserScenarioRoleRepository
 from app.repositories.user_scenario_assignment import UserScenarioAssignmentRepository
 from app.repositories.scenario_admin_permission import ScenarioAdminPermissionRepository
 
+# 场景管理员的 5 种细粒度权限
+SCENARIO_PERMISSION_FIELDS = (
+    "scenario_basic_info", "scenario_keywords", "scenario_policies", "playground", "performance_test"
+)
+# 场景管理员未配置细粒度权限时的默认值
+DEFAULT_SCENARIO_ADMIN_PERMISSIONS = {
+    "scenario_basic_info": True,
+    "scenario_keywords": True,
+    "scenario_policies": False,
+    "playground": True,
+    "performance_test": False
+}
+
 
 class PermissionService:
     """权限检查服务"""
@@ -32,6 +48,31 @@ class PermissionService:
         """
         return await self.db.get(User, user_id)
 
+    async def get_v1_grants(self, user_id: str) -> Dict[str, Dict]:
+        """
+        V1 场景分配及场景管理员细粒度权限（带缓存，两条查询加载）
+
+        Returns:
+            {scenario_id: {"role": 分配角色, "permissions": {权限名: bool} 或 None（未配置）}}
+        """
+        async def load() -> Dict[str, Dict]:
+            assignments = await self.assignment_repo.get_user_scenarios(user_id)
+            configs = {
+                config.scenario_id: {field: getattr(config, field) for field in SCENARIO_PERMISSION_FIELDS}
+                for config in await self.permission_repo.get_user_all_permissions(user_id)
+            }
+            return {
+                a.scenario_id: {"role": a.role, "permissions": configs.get(a.scenario_id)}
+                for a in assignments
+            }
+
+        return await permission_cache.get_or_load(user_id, "v1", load)
+
+    async def get_v2_permission_set(self, user_id: str) -> PermissionSet:
+        """V2 RBAC 有效权限位图（带缓存，单条 JOIN 加载）"""
+        repo = UserScenarioRoleRepository(self.db)
+        return await permission_cache.get_or_load(user_id, "v2", lambda: repo.get_user_permission_set(user_id))
+
     async def check_role(self, user_id: str, required_roles: List[str]) -> bool:
         """
         检查用户是否拥有指定角色之一
@@ -73,8 +114,7 @@ class PermissionService:
             return True
 
         # SCENARIO_ADMIN 和 ANNOTATOR 需要检查场景分配
-        assignment = await self.assignment_repo.get_by_user_and_scenario(user_id, scenario_id)
-        return assignment is not None
+        return scenario_id in await self.get_v1_grants(user_id)
 
     async def check_scenario_permission(
         self, user_id: str, scenario_id: str, permission: str
@@ -108,13 +148,11 @@ class PermissionService:
 
         # SCENARIO_ADMIN 需要检查细粒度权限
         if user.role == "SCENARIO_ADMIN":
-            # 首先检查是否有场景访问权限
-            has_access = await self.check_scenario_access(user_id, scenario_id)
-            if not has_access:
+            # 首先检查是否有场景访问权限，再检查细粒度权限（未配置时无权限）
+            grant = (await self.get_v1_grants(user_id)).get(scenario_id)
+            if not grant or not grant["permissions"]:
                 return False
-
-            # 检查细粒度权限
-            return await self.permission_repo.check_permission(user_id, scenario_id, permission)
+            return bool(grant["permissions"].get(permission, False))
 
         return False
 
@@ -126,8 +164,10 @@ class PermissionService:
             user_id: 用户ID
 
         Returns:
-            权限信息字典，格式：
+            权限信息字典（场景列表带缓存，随分配/权限配置/场景变更失效），格式：
             {
+                "user_id": "...",
+                "username": "...",
                 "role": "SCENARIO_ADMIN",
                 "scenarios": [
                     {
@@ -149,104 +189,85 @@ class PermissionService:
         if not user:
             return {"role": None, "scenarios": []}
 
-        result = {
+        scenarios = await permission_cache.get_or_load(
+            user_id, f"scenarios:{user.role}", lambda: self._load_scenario_permissions(user)
+        )
+        return {
+            "user_id": user.id,
+            "username": user.username,
             "role": user.role,
-            "scenarios": []
+            "scenarios": scenarios
         }
 
-        # SYSTEM_ADMIN 返回所有场景（带完整权限）
-        if user.role == "SYSTEM_ADMIN":
-            query = select(Scenarios).where(Scenarios.is_active == True)
-            scenarios_result = await self.db.execute(query)
-            scenarios = scenarios_result.scalars().all()
-
-            for scenario in scenarios:
-                result["scenarios"].append({
-                    "scenario_id": scenario.app_id,
-                    "scenario_name": scenario.app_name,
-                    "role": "SYSTEM_ADMIN",
-                    "permissions": {
-                        "scenario_basic_info": True,
-                        "scenario_keywords": True,
-                        "scenario_policies": True,
-                        "playground": True,
-                        "performance_test": True
-                    }
-                })
-
-        # SCENARIO_ADMIN 和 ANNOTATOR 返回分配的场景
-        elif user.role in ["SCENARIO_ADMIN", "ANNOTATOR"]:
-            assignments = await self.assignment_repo.get_user_scenarios(user_id)
+    async def _load_scenario_permissions(self, user: User) -> List[Dict]:
+        """
+        一次查询组装用户的场景权限列表
 
-            for assignment in assignments:
-                # 获取场景信息
-                scenario = await self.db.get(Scenarios, assignment.scenario_id)
-                if not scenario:
-                    continue
-
-                scenario_info = {
-                    "scenario_id": assignment.scenario_id,
-                    "scenario_name": scenario.app_name if scenario else assignment.scenario_id,
-                    "role": assignment.role,
-                    "permissions": {}
+        SYSTEM_ADMIN / AUDITOR：所有启用的场景；
+        SCENARIO_ADMIN / ANNOTATOR：场景分配 JOIN 启用的场景（按 app_id）LEFT JOIN 细粒度权限配置，
+        已删除或停用场景的分配不返回
+        """
+        if user.role in ("SYSTEM_ADMIN", "AUDITOR"):
+            # SYSTEM_ADMIN 拥有完整权限，AUDITOR 只读
+            granted = user.role == "SYSTEM_ADMIN"
+            result = await self.db.execute(
+                select(Scenarios.app_id, Scenarios.app_name).where(Scenarios.is_active == True)
+            )
+            return [
+                {
+                    "scenario_id": app_id,
+                    "scenario_name": app_name,
+                    "role": user.role,
+                    "permissions": {field: granted for field in SCENARIO_PERMISSION_FIELDS}
                 }
+                for app_id, app_name in result.all()
+            ]
 
-                # 如果是 SCENARIO_ADMIN，获取细粒度权限
-                if assignment.role == "SCENARIO_ADMIN":
-                    permission_config = await self.permission_repo.get_user_permission(
-                        user_id, assignment.scenario_id
-                    )
-
-                    if permission_config:
-                        scenario_info["permissions"] = {
-                            "scenario_basic_info": permission_config.scenario_basic_info,
-                            "scenario_keywords": permission_config.scenario_keywords,
-                            "scenario_policies": permission_config.scenario_policies,
-                            "playground": permission_config.playground,
-                            "performance_test": permission_config.performance_test
-                        }
-                    else:
-                        # 如果没有权限配置，使用默认值
-                        scenario_info["permissions"] = {
-                            "scenario_basic_info": True,
-                            "scenario_keywords": True,
-                            "scenario_policies": False,
-                            "playground": True,
-                            "performance_test": False
-                        }
-                else:
-                    # ANNOTATOR 没有场景配置权限
-                    scenario_info["permissions"] = {
-                        "scenario_basic_info": False,
-                        "scenario_keywords": False,
-                        "scenario_policies": False,
-                        "playground": False,
-                        "performance_test": False
-                    }
-
-                result["scenarios"].append(scenario_info)
-
-        # AUDITOR 返回所有场景（只读权限）
-        elif user.role == "AUDITOR":
-            query = select(Scenarios).where(Scenarios.is_active == True)
-            scenarios_result = await self.db.execute(query)
-            scenarios = scenarios_result.scalars().all()
-
-            for scenario in scenarios:
-                result["scenarios"].append({
-                    "scenario_id": scenario.app_id,
-                    "scenario_name": scenario.app_name,
-                    "role": "AUDITOR",
-                    "permissions": {
-                        "scenario_basic_info": False,
-                        "scenario_keywords": False,
-                        "scenario_policies": False,
-                        "playground": False,
-                        "performance_test": False
-                    }
-                })
+        if user.role not in ("SCENARIO_ADMIN", "ANNOTATOR"):
+            return []
 
-        return result
+        config_columns = [getattr(ScenarioAdminPermission, field) for field in SCENARIO_PERMISSION_FIELDS]
+        query = (
+            select(
+                UserScenarioAssignment.scenario_id,
+                UserScenarioAssignment.role,
+                Scenarios.app_name,
+                ScenarioAdminPermission.id,
+                *config_columns
+            )
+            .join(
+                Scenarios,
+                and_(Scenarios.app_id == UserScenarioAssignment.scenario_id, Scenarios.is_active == True)
+            )
+            .outerjoin(
+                ScenarioAdminPermission,
+                and_(
+                    ScenarioAdminPermission.user_id == UserScenarioAssignment.user_id,
+                    ScenarioAdminPermission.scenario_id == UserScenarioAssignment.scenario_id
+                )
+            )
+            .where(UserScenarioAssignment.user_id == user.id)
+            .order_by(UserScenarioAssignment.created_at)
+        )
+        result = await self.db.execute(query)
+
+        scenarios = []
+        for scenario_id, role, app_name, config_id, *flags in result.all():
+            if role != "SCENARIO_ADMIN":
+                # ANNOTATOR 没有场景配置权限
+                permissions = {field: False for field in SCENARIO_PERMISSION_FIELDS}
+            elif config_id is None:
+                # 没有权限配置时使用默认值
+                permissions = dict(DEFAULT_SCENARIO_ADMIN_PERMISSIONS)
+            else:
+                permissions = dict(zip(SCENARIO_PERMISSION_FIELDS, flags))
+            scenarios.append({
+                "scenario_id": scenario_id,
+                "scenario_name": app_name,
+                "role": role,
+                "permissions": permissions
+            })
+        return scenarios
 
     async def get_user_scenario_ids(self, user_id: str) -> List[str]:
         """
@@ -269,4 +290,4 @@ class PermissionService:
             return list(result.scalars().all())
 
         # SCENARIO_ADMIN 和 ANNOTATOR 只能访问分配的场景
-        return await self.assignment_repo.get_scenario_ids_by_user(user_id)
+        return list(await self.get_v1_grants(user_id))
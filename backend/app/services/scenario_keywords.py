@@ -1,13 +1,22 @@
 import uuid
 from typing import List, Optional
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.repositories.scenario_keywords import ScenarioKeywordsRepository
 from app.schemas.scenario_keywords import ScenarioKeywordsCreate, ScenarioKeywordsUpdate
 from app.models.db_meta import ScenarioKeywords
+from app.services.keyword_duplicates import KeywordDuplicateService
+from app.services.keyword_similarity import SOURCE_SCENARIO, normalized_hash
+
+def _duplicate_message(keyword: str, scenario_id: str, rule_mode: int) -> str:
+    mode_str = "Custom Mode" if rule_mode == 1 else "Super Mode"
+    return f"Keyword '{keyword}' already exists in scenario '{scenario_id}' for {mode_str}."
 
 class ScenarioKeywordsService:
     def __init__(self, db: AsyncSession):
+        self.db = db
         self.repository = ScenarioKeywordsRepository(ScenarioKeywords, db)
+        self.duplicates = KeywordDuplicateService(db)
 
     async def create_keyword(self, keyword_in: ScenarioKeywordsCreate) -> ScenarioKeywords:
         # Validate that tag_code is required for both Blacklist and Whitelist
@@ -21,12 +30,23 @@ class ScenarioKeywordsService:
             keyword_in.rule_mode
         )
         if existing:
-            mode_str = "Custom Mode" if keyword_in.rule_mode == 1 else "Super Mode"
-            raise ValueError(f"Keyword '{keyword_in.keyword}' already exists in scenario '{keyword_in.scenario_id}' for {mode_str}.")
+            raise ValueError(_duplicate_message(keyword_in.keyword, keyword_in.scenario_id, keyword_in.rule_mode))
 
         obj_in_data = keyword_in.model_dump()
         obj_in_data['id'] = str(uuid.uuid4())
-        return await self.repository.create(obj_in_data)
+        obj_in_data['norm_hash'] = normalized_hash(keyword_in.keyword)
+        try:
+            keyword = await self.repository.create(obj_in_data)
+        except IntegrityError:
+            # 并发创建同一关键词时由唯一索引 uk_scenario_keyword 拦截
+            await self.db.rollback()
+            raise ValueError(_duplicate_message(keyword_in.keyword, keyword_in.scenario_id, keyword_in.rule_mode))
+
+        # 标记与已有关键词的变体关系（不阻止创建，由管理员在重复候选列表中处理）
+        await self.duplicates.flag_new_keyword(
+            SOURCE_SCENARIO, keyword.id, keyword.keyword, scenario_id=keyword.scenario_id
+        )
+        return keyword
 
     async def get_by_scenario(self, scenario_id: str, rule_mode: Optional[int] = None) -> List[ScenarioKeywords]:
         return await self.repository.get_by_scenario(scenario_id, rule_mode)
@@ -45,7 +65,20 @@ class ScenarioKeywordsService:
         if not new_tag_code:
              raise ValueError("Tag Code is required for all keywords.")
 
-        return await self.repository.update(keyword, keyword_in)
+        update_data = keyword_in.model_dump(exclude_unset=True)
+        if update_data.get("keyword"):
+            update_data["norm_hash"] = normalized_hash(update_data["keyword"])
+        target = (
+            update_data.get("keyword", keyword.keyword),
+            update_data.get("scenario_id", keyword.scenario_id),
+            update_data.get("rule_mode", keyword.rule_mode),
+        )
+        try:
+            return await self.repository.update(keyword, update_data)
+        except IntegrityError:
+            # 改名为同一场景、同一模式下已存在的关键词
+            await self.db.rollback()
+            raise ValueError(_duplicate_message(*target))
 
     async def delete_keyword(self, keyword_id: str) -> Optional[ScenarioKeywords]:
         return await self.repository.delete(keyword_id)
@@ -1,12 +1,19 @@
 import uuid
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cursor import decode_cursor, encode_cursor
+from app.core.permission_cache import permission_cache
 from app.repositories.scenarios import ScenariosRepository
 from app.schemas.scenarios import ScenariosCreate, ScenariosUpdate
-from app.models.db_meta import Scenarios
+from app.models.db_meta import Scenarios, User
+from app.services.authorization import get_authorization_context
+from app.services.permission import SCENARIO_PERMISSION_FIELDS
+
+MAX_PAGE_SIZE = 200
 
 class ScenariosService:
     def __init__(self, db: AsyncSession):
+        self.db = db
         self.repository = ScenariosRepository(Scenarios, db)
 
     async def create_scenario(self, scenario_in: ScenariosCreate) -> Scenarios:
@@ -16,11 +23,68 @@ class ScenariosService:
             
         obj_in_data = scenario_in.model_dump()
         obj_in_data['id'] = str(uuid.uuid4())
-        return await self.repository.create(obj_in_data)
+        scenario = await self.repository.create(obj_in_data)
+        # 场景列表与名称是缓存的用户权限信息的一部分
+        await permission_cache.invalidate_all()
+        return scenario
 
     async def get_all_scenarios(self, skip: int = 0, limit: int = 100) -> List[Scenarios]:
         return await self.repository.get_all(skip, limit)
 
+    async def list_accessible_scenarios(
+        self,
+        user: User,
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> dict:
+        """
+        分页查询用户可访问的场景，并附带每个场景的有效权限
+
+        - 可访问所有场景的用户（SYSTEM_ADMIN、AUDITOR、V2 全局权限）不过滤，
+          其他用户在 SQL 中按 V1 场景分配 / V2 场景角色过滤（EXISTS），只返回有权访问的场景
+        - 权限标记由请求级授权上下文计算，与接口实际的权限检查一致
+
+        Returns:
+            {"next_cursor", "items": [{场景字段..., "permissions": {权限名: bool}}]}，next_cursor 为空表示没有下一页
+
+        Raises:
+            ValueError: 参数无效
+        """
+        if limit < 1 or limit > MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        after = None
+        if cursor:
+            values = decode_cursor(cursor)
+            if len(values) != 1 or not isinstance(values[0], str):
+                raise ValueError("Invalid cursor")
+            after = values[0]
+
+        context = await get_authorization_context(user, self.db)
+        user_filter = None if context.scenario_ids() is None else user.id
+        rows = await self.repository.list_accessible_page(user_filter, search, after, limit + 1)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1].app_id])
+
+        items = []
+        for scenario in rows:
+            items.append({
+                "id": scenario.id,
+                "app_id": scenario.app_id,
+                "app_name": scenario.app_name,
+                "description": scenario.description,
+                "is_active": scenario.is_active,
+                "enable_whitelist": scenario.enable_whitelist,
+                "enable_blacklist": scenario.enable_blacklist,
+                "enable_custom_policy": scenario.enable_custom_policy,
+                "permissions": {
+                    field: context.can_access(scenario.app_id, field) for field in SCENARIO_PERMISSION_FIELDS
+                },
+            })
+        return {"next_cursor": next_cursor, "items": items}
+
     async def get_scenario(self, scenario_id: str) -> Optional[Scenarios]:
         # get by PK
         return await self.repository.get(scenario_id)
@@ -32,7 +96,11 @@ class ScenariosService:
         scenario = await self.repository.get(scenario_id)
         if not scenario:
             raise ValueError("Scenario not found")
-        return await self.repository.update(scenario, scenario_in)
+        scenario = await self.repository.update(scenario, scenario_in)
+        await permission_cache.invalidate_all()
+        return scenario
 
     async def delete_scenario(self, scenario_id: str) -> Optional[Scenarios]:
-        return await self.repository.delete(scenario_id)
+        scenario = await self.repository.delete(scenario_id)
+        await permission_cache.invalidate_all()
+        return scenario
@@ -0,0 +1,248 @@
+"""
+应用内定时任务调度
+多副本部署时通过数据库租约选主：只有持有未过期租约的副本执行定时任务，
+主副本宕机后租约过期，由其他副本接管；正常停机时主动释放租约。
+每次执行（定时或手动触发）还需持有该任务的租约锁，同一任务在所有副本中同时只有一个在执行；
+执行期间后台定期续约任务锁与主副本租约，长任务不会因租约过期被其他副本重复执行。
+每个任务使用独立会话执行，并记录运行指标（次数、失败数、耗时、最近结果）。
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from contextlib import suppress
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import AsyncSessionLocal
+from app.models.db_meta import SchedulerLease
+from app.repositories.scheduler_lease import SchedulerLeaseRepository
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "maintenance-scheduler"
+JOB_LEASE_PREFIX = "maintenance-job:"   # 任务锁租约名：前缀 + 任务名
+LEASE_SECONDS = 30    # 租约有效期，主副本失联超过该时间后由其他副本接管
+LEASE_RENEW_SECONDS = 10  # 任务执行期间的续约间隔（小于租约有效期）
+TICK_SECONDS = 5      # 调度间隔（续约 + 检查到期任务）
+
+
+class JobLockedError(Exception):
+    """任务正在本副本或其他副本执行"""
+
+
+@dataclass
+class PeriodicJob:
+    """定时任务定义：func 接收独立会话，返回写入指标的结果摘要"""
+    name: str
+    interval_seconds: int
+    func: Callable[[AsyncSession], Awaitable[Dict[str, Any]]]
+    description: str = ""
+
+
+@dataclass
+class JobMetrics:
+    runs: int = 0
+    failures: int = 0
+    last_started_at: Optional[datetime] = None
+    last_duration_ms: Optional[int] = None
+    last_result: Optional[Dict[str, Any]] = None
+    last_error: Optional[str] = None
+    next_run_at: Optional[datetime] = None
+
+
+@dataclass
+class _JobState:
+    job: PeriodicJob
+    metrics: JobMetrics = field(default_factory=JobMetrics)
+    next_run: float = 0.0   # time.monotonic()
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class MaintenanceScheduler:
+    """定时任务调度器（每个进程一个实例）"""
+
+    def __init__(self, session_factory=AsyncSessionLocal, instance_id: Optional[str] = None):
+        self.session_factory = session_factory
+        self.instance_id = instance_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self.lease_expires_at: Optional[datetime] = None
+        self._jobs: Dict[str, _JobState] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stop = asyncio.Event()
+
+    def register(self, job: PeriodicJob) -> None:
+        self._jobs[job.name] = _JobState(job)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._task = asyncio.create_task(self._loop(), name="maintenance-scheduler")
+        logger.info("Scheduler %s started with jobs: %s", self.instance_id, ", ".join(self._jobs))
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self._stop.set()
+        await self._task
+        self._task = None
+        if self.is_leader:
+            try:
+                async with self.session_factory() as session:
+                    await SchedulerLeaseRepository(SchedulerLease, session).release(LEASE_NAME, self.instance_id)
+            except Exception:
+                logger.exception("Failed to release scheduler lease")
+            self.is_leader = False
+        logger.info("Scheduler %s stopped", self.instance_id)
+
+    async def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if await self._renew_lease():
+                    await self._run_due_jobs()
+            except Exception:
+                logger.exception("Scheduler tick failed")
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=TICK_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _renew_lease(self) -> bool:
+        async with self.session_factory() as session:
+            leader = await SchedulerLeaseRepository(SchedulerLease, session).try_acquire(
+                LEASE_NAME, self.instance_id, LEASE_SECONDS
+            )
+        if leader != self.is_leader:
+            logger.info("Scheduler %s %s leadership", self.instance_id, "acquired" if leader else "lost")
+            if leader:
+                # 新主副本立即执行一轮全部任务（维护任务均可重复执行）
+                for state in self._jobs.values():
+                    state.next_run = 0.0
+        self.is_leader = leader
+        self.lease_expires_at = self._local_lease_expiry() if leader else None
+        return leader
+
+    @staticmethod
+    def _local_lease_expiry() -> datetime:
+        """本副本时钟估算的租约过期时间，仅用于状态展示（租约判断以数据库时钟为准）"""
+        return datetime.now(timezone.utc) + timedelta(seconds=LEASE_SECONDS)
+
+    async def _run_due_jobs(self) -> None:
+        for name, state in self._jobs.items():
+            if self._stop.is_set():
+                return
+            if time.monotonic() < state.next_run:
+                continue
+            # 任务之间续约，避免多个任务连续执行时租约过期被其他副本接管
+            if not await self._renew_lease():
+                return
+            try:
+                await self.run_job(name)
+            except JobLockedError:
+                # 正在被手动触发执行，本轮跳过
+                logger.info("Scheduled job %s skipped: already running", name)
+                state.next_run = time.monotonic() + state.job.interval_seconds
+
+    async def _heartbeat(self, lease_names: List[str]) -> None:
+        """任务执行期间定期续约，直到被取消"""
+        while True:
+            await asyncio.sleep(LEASE_RENEW_SECONDS)
+            try:
+                async with self.session_factory() as session:
+                    repo = SchedulerLeaseRepository(SchedulerLease, session)
+                    for lease_name in lease_names:
+                        if not await repo.try_acquire(lease_name, self.instance_id, LEASE_SECONDS):
+                            logger.warning("Scheduler %s lost lease %s while a job was running",
+                                           self.instance_id, lease_name)
+                        elif lease_name == LEASE_NAME:
+                            self.lease_expires_at = self._local_lease_expiry()
+            except Exception:
+                logger.exception("Failed to renew scheduler leases")
+
+    async def run_job(self, name: str) -> Dict[str, Any]:
+        """
+        执行一次任务并记录指标（定时触发或手动触发）
+
+        Raises:
+            KeyError: 任务不存在
+            JobLockedError: 任务正在本副本或其他副本执行
+        """
+        state = self._jobs[name]
+        if state.lock.locked():
+            raise JobLockedError(f"Job {name} is already running")
+        async with state.lock:
+            job_lease = JOB_LEASE_PREFIX + name
+            async with self.session_factory() as session:
+                acquired = await SchedulerLeaseRepository(SchedulerLease, session).try_acquire(
+                    job_lease, self.instance_id, LEASE_SECONDS
+                )
+            if not acquired:
+                raise JobLockedError(f"Job {name} is already running on another replica")
+            # 主副本执行定时任务时一并续约主副本租约；非主副本的手动执行只续约任务锁
+            heartbeat = asyncio.create_task(
+                self._heartbeat([job_lease, LEASE_NAME] if self.is_leader else [job_lease])
+            )
+            try:
+                return await self._execute(state)
+            finally:
+                heartbeat.cancel()
+                with suppress(asyncio.CancelledError):
+                    await heartbeat
+                try:
+                    async with self.session_factory() as session:
+                        await SchedulerLeaseRepository(SchedulerLease, session).release(job_lease, self.instance_id)
+                except Exception:
+                    logger.exception("Failed to release lease %s", job_lease)
+
+    async def _execute(self, state: _JobState) -> Dict[str, Any]:
+        """执行任务函数并记录指标（调用方已持有任务锁）"""
+        name = state.job.name
+        metrics = state.metrics
+        started = time.monotonic()
+        metrics.last_started_at = datetime.now(timezone.utc)
+        try:
+            async with self.session_factory() as session:
+                result = await state.job.func(session)
+            metrics.last_result = result
+            metrics.last_error = None
+            logger.info("Scheduled job %s finished in %.0f ms: %s",
+                        name, (time.monotonic() - started) * 1000, result)
+        except Exception as e:
+            metrics.failures += 1
+            metrics.last_error = str(e)
+            result = {"error": str(e)}
+            logger.exception("Scheduled job %s failed", name)
+        finally:
+            metrics.runs += 1
+            metrics.last_duration_ms = int((time.monotonic() - started) * 1000)
+            state.next_run = time.monotonic() + state.job.interval_seconds
+            metrics.next_run_at = datetime.now(timezone.utc) + timedelta(seconds=state.job.interval_seconds)
+        return result
+
+    def status(self) -> Dict[str, Any]:
+        jobs: List[Dict[str, Any]] = []
+        for name, state in self._jobs.items():
+            jobs.append({
+                "name": name,
+                "description": state.job.description,
+                "interval_seconds": state.job.interval_seconds,
+                **vars(state.metrics),
+            })
+        return {
+            "instance_id": self.instance_id,
+            "running": self.running,
+            "is_leader": self.is_leader,
+            "lease_expires_at": self.lease_expires_at,
+            "jobs": jobs,
+        }
@@ -1,8 +1,7 @@
 """SSO服务 - 处理单点登录逻辑"""
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Optional
-from jose import jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
@@ -10,6 +9,8 @@ from app.core.config import settings
 from app.clients.usap_client import usap_client, TicketValidationResult, UserInfo
 from app.models.db_meta import User
 from app.schemas.sso import SSOLoginResponse, SSOUserInfoResponse
+from app.services.auth_sessions import AuthSessionService
+from app.services.auth_tokens import issue_access_token
 
 
 class SSOServiceError(Exception):
@@ -28,8 +29,8 @@ class SSOService:
         1. 验证Ticket
         2. 获取UserID
         3. 同步/创建本地用户
-        4. 查询用户权限
-        5. 生成JWT Token
+        4. 创建登录会话
+        5. 生成JWT Token与刷新令牌
         """
         # 1. 验证Ticket
         validation_result = await usap_client.validate_ticket(ticket)
@@ -45,15 +46,18 @@ class SSOService:
         # 3. 同步/创建本地用户
         user = await self._sync_user_from_usap(user_id, validation_result, db)
 
-        # 4. 生成JWT Token
-        access_token = self._create_access_token(user_id=user.user_id, role=user.role)
+        # 4. 创建登录会话，生成JWT Token与刷新令牌（令牌过期后凭刷新令牌续期，无需再次验证Ticket）
+        session, refresh_token = await AuthSessionService(db).create_session(user)
+        access_token = await self._create_access_token(user, session.id)
 
         return SSOLoginResponse(
             access_token=access_token,
             token_type="bearer",
             expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
             user_id=user.user_id,
-            role=user.role
+            role=user.role,
+            refresh_token=refresh_token,
+            session_id=session.id
         )
 
     async def _sync_user_from_usap(
@@ -100,18 +104,9 @@ class SSOService:
 
         return user
 
-    def _create_access_token(self, user_id: str, role: str) -> str:
-        """生成JWT Access Token"""
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-
-        payload = {
-            "exp": expire,
-            "sub": user_id,
-            "role": role
-        }
-
-        token = jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-        return token
+    async def _create_access_token(self, user: User, session_id: Optional[str] = None) -> str:
+        """生成JWT Access Token（sub 为 USAP UserID，并携带用户主键、角色、状态、权限版本号与会话声明）"""
+        return await issue_access_token(user, subject=user.user_id, session_id=session_id)
 
     async def get_user_info(self, user_id: str, db: AsyncSession) -> Optional[SSOUserInfoResponse]:
         """获取用户完整信息"""
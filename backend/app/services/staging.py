@@ -0,0 +1,399 @@
+"""
+智能标注任务服务
+待审核关键词/规则的认领、审核与同步
+"""
+
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import pytz
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cursor import decode_cursor, encode_cursor
+from app.models.db_meta import Base, StagingGlobalKeywords, StagingGlobalRules
+from app.repositories.staging import StagingRepository
+from app.services.staging_agreement import StagingAgreementService
+from app.services.staging_counters import (
+    CounterDelta, StagingCounterService, TaskState, DIM_STATUS, DIM_ANNOTATOR, DIM_CLAIMER, DIM_BATCH
+)
+
+# 中国时区
+CHINA_TZ = pytz.timezone('Asia/Shanghai')
+
+CLAIM_TIMEOUT_MINUTES = 30      # 认领超时时间
+MAX_CLAIM_BATCH_SIZE = 500      # 单次认领上限
+RELEASE_BATCH_SIZE = 500        # 超时释放每批（每个事务）处理的任务数
+
+TASK_MODELS: Dict[str, Type[Base]] = {
+    "keywords": StagingGlobalKeywords,
+    "rules": StagingGlobalRules,
+}
+
+# 审核结果字段 -> 对应的预测字段（用于计算 is_modified）
+REVIEW_FIELDS: Dict[str, Dict[str, str]] = {
+    "keywords": {"final_tag": "predicted_tag", "final_risk": "predicted_risk"},
+    "rules": {"final_strategy": "predicted_strategy"},
+}
+
+REVIEW_STATUSES = ("REVIEWED", "IGNORED")
+TASK_STATUSES = ("PENDING", "CLAIMED", "REVIEWED", "IGNORED", "SYNCED")
+
+# 列表页只读取展示所需的列，不构造 ORM 对象
+LIST_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "keywords": ("id", "keyword", "predicted_tag", "predicted_risk", "final_tag", "final_risk", "status",
+                 "is_modified", "confidence", "priority", "claimed_by", "batch_id", "annotator", "created_at"),
+    "rules": ("id", "tag_code", "extra_condition", "predicted_strategy", "final_strategy", "status",
+              "is_modified", "confidence", "priority", "claimed_by", "batch_id", "annotator", "created_at"),
+}
+MAX_PAGE_SIZE = 500
+
+
+def get_china_now():
+    """获取中国时区的当前时间"""
+    return datetime.now(CHINA_TZ)
+
+
+class StagingService:
+    """智能标注任务服务"""
+
+    def __init__(self, db: AsyncSession, task_type: str = "keywords"):
+        if task_type not in TASK_MODELS:
+            raise ValueError(f"Unknown task_type '{task_type}', must be one of: {', '.join(TASK_MODELS)}")
+        self.db = db
+        self.task_type = task_type
+        self.model = TASK_MODELS[task_type]
+        self.repository = StagingRepository(self.model, db)
+        self.counters = StagingCounterService(db, task_type, self.model)
+        self.agreement = StagingAgreementService(db, task_type, self.model)
+
+    async def claim_batch(self, username: str, batch_size: int) -> dict:
+        """
+        批量认领任务（原子操作，并发认领不会重复分配）
+
+        Raises:
+            ValueError: batch_size 超出范围
+        """
+        if batch_size < 1 or batch_size > MAX_CLAIM_BATCH_SIZE:
+            raise ValueError(f"batch_size must be between 1 and {MAX_CLAIM_BATCH_SIZE}")
+
+        batch_id = str(uuid.uuid4())
+        now = get_china_now()
+        claimed_ids = await self.repository.claim_pending(username, batch_id, now, batch_size)
+        if claimed_ids:
+            await self.counters.apply(CounterDelta().move(
+                TaskState("PENDING"), TaskState("CLAIMED", None, username, batch_id), len(claimed_ids)
+            ))
+        await self.db.commit()
+
+        return {
+            "claimed_count": len(claimed_ids),
+            "batch_id": batch_id,
+            "expires_at": now + timedelta(minutes=CLAIM_TIMEOUT_MINUTES),
+            "timeout_minutes": CLAIM_TIMEOUT_MINUTES,
+        }
+
+    async def list_tasks(
+        self,
+        username: str,
+        role: str,
+        status: Optional[str] = None,
+        batch_id: Optional[str] = None,
+        my_tasks: bool = False,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        order: str = "desc"
+    ) -> dict:
+        """
+        分页查询任务列表（keyset 分页 + 轻量投影）
+
+        - 指定 batch_id 或 my_tasks 时按批次直接查找（batch_id 索引），按主键排序；
+          my_tasks 未指定批次时取当前用户最近认领的批次
+        - 否则按 (created_at, id) 排序，status 过滤走 (status, created_at) 索引
+        - ANNOTATOR 只能看到自己认领/审核的任务（PENDING 所有人可见）
+        - total 优先读取计数器；批次内（不超过单次认领上限）直接 COUNT
+
+        Returns:
+            {"total", "next_cursor", "batch_id", "items"}，next_cursor 为空表示没有下一页
+
+        Raises:
+            ValueError: 参数无效
+        """
+        if limit < 1 or limit > MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        if status and status not in TASK_STATUSES:
+            raise ValueError(f"status must be one of: {', '.join(TASK_STATUSES)}")
+        if order not in ("asc", "desc"):
+            raise ValueError("order must be asc or desc")
+
+        model = self.model
+        if my_tasks and not batch_id:
+            batch_id = await self.repository.get_current_batch_id(username)
+            if not batch_id:
+                return {"total": 0, "next_cursor": None, "batch_id": None, "items": []}
+
+        conditions = []
+        counter_key = None
+        if status:
+            conditions.append(model.status == status)
+        if batch_id:
+            conditions.append(model.batch_id == batch_id)
+            if my_tasks or role == "ANNOTATOR":
+                conditions.append(model.claimed_by == username)
+            order_by, descending = [model.id], False
+        else:
+            counter_key = (DIM_STATUS, "")
+            if role == "ANNOTATOR":
+                if status in REVIEW_STATUSES:
+                    conditions.append(model.annotator == username)
+                    counter_key = (DIM_ANNOTATOR, username)
+                elif status == "CLAIMED":
+                    conditions.append(model.claimed_by == username)
+                    counter_key = (DIM_CLAIMER, username)
+            order_by, descending = [model.created_at, model.id], order == "desc"
+
+        after = None
+        if cursor:
+            after = decode_cursor(cursor)
+            if len(after) != len(order_by) or not all(isinstance(v, str) for v in after):
+                raise ValueError("Invalid cursor")
+            if len(order_by) == 2:
+                try:
+                    after[0] = datetime.fromisoformat(after[0])
+                except ValueError:
+                    raise ValueError("Invalid cursor")
+
+        columns = [getattr(model, name) for name in LIST_COLUMNS[self.task_type]]
+        rows = await self.repository.list_page(columns, conditions, order_by, after, limit + 1, descending)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([getattr(rows[-1], c.key) for c in order_by])
+
+        if counter_key:
+            counts = await self.counters.status_counts(*counter_key)
+            total = counts.get(status, 0) if status else sum(counts.values())
+        else:
+            total = await self.repository.count(conditions)
+
+        return {
+            "total": total,
+            "next_cursor": next_cursor,
+            "batch_id": batch_id,
+            "items": [row._asdict() for row in rows],
+        }
+
+    async def batch_review(
+        self, username: str, items: List[Dict[str, Any]], is_admin: bool = False
+    ) -> dict:
+        """
+        批量审核（集合操作）
+
+        1. 一次 id IN (...) 批量读取并加锁，内存中完成校验
+        2. 归属校验：标注员只能审核自己认领的任务（claimed_by == 当前用户），管理员不受限；已同步的不可再审核
+        3. 按 (状态, 审核结果, is_modified) 分组，每组一条 UPDATE
+        未提供的审核字段沿用已有结果，没有结果时采用预测值；is_modified 按行与预测值比较得出。
+
+        Returns:
+            汇总计数与按请求顺序排列的逐条结果 [{"id", "success", "error"}]
+        """
+        fields = REVIEW_FIELDS[self.task_type]
+        results: List[Dict[str, Any]] = []
+        valid: Dict[str, Dict[str, Any]] = {}
+        for item in items:
+            error = None
+            if item["id"] in valid:
+                error = "Duplicate item in request"
+            elif item.get("status") not in REVIEW_STATUSES:
+                error = f"status must be one of: {', '.join(REVIEW_STATUSES)}"
+            else:
+                valid[item["id"]] = item
+            results.append({"id": item["id"], "success": error is None, "error": error})
+
+        rows = await self.repository.get_many_for_update(list(valid))
+        groups: Dict[Tuple, List[str]] = defaultdict(list)
+        delta = CounterDelta()
+        reviews: List[Tuple[Any, str, str]] = []
+        for result in results:
+            if not result["success"]:
+                continue
+            item = valid[result["id"]]
+            row = rows.get(item["id"])
+            error = self._review_error(row, username, is_admin)
+            if error:
+                result.update(success=False, error=error)
+                continue
+
+            values = {}
+            for final_field, predicted_field in fields.items():
+                values[final_field] = (
+                    item.get(final_field) or getattr(row, final_field) or getattr(row, predicted_field)
+                )
+            is_modified = any(values[f] != getattr(row, p) for f, p in fields.items())
+            groups[(item["status"], is_modified, *values.items())].append(item["id"])
+            delta.move(TaskState.of(row), TaskState(item["status"], username, row.claimed_by, row.batch_id))
+            reviews.append((row, username, self.agreement.label_of(item["status"], values)))
+
+        now = get_china_now()
+        for (status, is_modified, *values), ids in groups.items():
+            await self.repository.bulk_update_by_ids(ids, {
+                **dict(values),
+                "status": status,
+                "is_modified": is_modified,
+                "annotator": username,
+                "annotated_at": now,
+            })
+        await self.counters.apply(delta)
+        await self.agreement.record_first_reviews(reviews)
+        await self.db.commit()
+
+        failed_ids = [r["id"] for r in results if not r["success"]]
+        return {
+            "success_count": len(results) - len(failed_ids),
+            "failed_count": len(failed_ids),
+            "failed_ids": failed_ids,
+            "results": results,
+        }
+
+    async def review_one(self, username: str, item: Dict[str, Any], is_admin: bool = False) -> Any:
+        """
+        审核单个任务（与批量审核相同的校验与计数）
+
+        Raises:
+            LookupError: 任务不存在
+            ValueError: 状态无效或无权审核
+        """
+        result = (await self.batch_review(username, [item], is_admin=is_admin))["results"][0]
+        if not result["success"]:
+            if result["error"] == "Item not found":
+                raise LookupError(result["error"])
+            raise ValueError(result["error"])
+        row = await self.repository.get(item["id"])
+        await self.db.refresh(row)
+        return row
+
+    async def add_tasks(self, rows: List[Any]) -> int:
+        """新增待审核任务并计数"""
+        delta = CounterDelta()
+        for row in rows:
+            row.status = row.status or "PENDING"
+            delta.add(TaskState.of(row))
+        self.db.add_all(rows)
+        await self.counters.apply(delta)
+        await self.db.commit()
+        return len(rows)
+
+    async def delete_task(self, task_id: str) -> bool:
+        row = (await self.repository.get_many_for_update([task_id])).get(task_id)
+        if not row:
+            return False
+        await self.db.delete(row)
+        await self.counters.apply(CounterDelta().remove(TaskState.of(row)))
+        await self.db.commit()
+        return True
+
+    async def release_expired(
+        self,
+        timeout_minutes: int = CLAIM_TIMEOUT_MINUTES,
+        batch_size: int = RELEASE_BATCH_SIZE,
+        max_batches: Optional[int] = None
+    ) -> int:
+        """
+        释放认领超时的任务，回到 PENDING
+
+        分批处理，每批一个短事务（加锁读取 -> 按主键更新 -> 计数），max_batches 为空时处理到没有超时任务为止。
+
+        Returns:
+            释放的任务数
+        """
+        threshold = get_china_now() - timedelta(minutes=timeout_minutes)
+        released, batches = 0, 0
+        while max_batches is None or batches < max_batches:
+            rows = await self.repository.lock_expired_claims(threshold, batch_size)
+            if not rows:
+                break
+
+            await self.repository.bulk_update_by_ids(
+                [row.id for row in rows],
+                {"status": "PENDING", "claimed_by": None, "claimed_at": None, "batch_id": None}
+            )
+            delta = CounterDelta()
+            for row in rows:
+                delta.move(TaskState.of(row), TaskState("PENDING", row.annotator))
+            await self.counters.apply(delta)
+            await self.db.commit()
+
+            released += len(rows)
+            batches += 1
+            if len(rows) < batch_size:
+                break
+        return released
+
+    # ---------- 统计（读取计数器） ----------
+
+    async def overview(self) -> dict:
+        counts = await self.counters.status_counts()
+        return {
+            **{f"{status.lower()}_count": counts.get(status, 0) for status in TASK_STATUSES},
+            "total_count": sum(counts.values()),
+        }
+
+    async def annotator_stats(self) -> List[dict]:
+        """各标注员的审核数，以及双人审核抽样中的一致性（只做过第二次审核的标注员审核数为 0）"""
+        counts_by_annotator = await self.counters.annotator_counts()
+        agreement = await self.agreement.annotator_agreement()
+        stats = []
+        for annotator in sorted(set(counts_by_annotator) | set(agreement)):
+            counts = counts_by_annotator.get(annotator, {})
+            total = sum(counts.values())
+            pair = agreement.get(annotator)
+            if total or pair:
+                stats.append({
+                    "annotator": annotator,
+                    "reviewed_count": counts.get("REVIEWED", 0),
+                    "ignored_count": counts.get("IGNORED", 0),
+                    "total_count": total,
+                    "agreement_samples": pair["samples"] if pair else 0,
+                    "observed_agreement": pair["observed_agreement"] if pair else None,
+                    "kappa": pair["kappa"] if pair else None,
+                })
+        return stats
+
+    async def my_tasks_stats(self, username: str) -> dict:
+        """当前用户认领中的任务数，以及最近一个批次的完成情况"""
+        claimed = await self.counters.status_counts(DIM_CLAIMER, username)
+        batch = await self.repository.get_current_batch(username)
+        batch_id, claimed_at, batch_counts = None, None, {}
+        if batch:
+            batch_id, claimed_at = batch.batch_id, batch.claimed_at
+            batch_counts = await self.counters.status_counts(DIM_BATCH, batch_id)
+
+        expires_at = None
+        if claimed_at:
+            # 如果 claimed_at 是 naive datetime，将其视为中国时区
+            if claimed_at.tzinfo is None:
+                claimed_at = CHINA_TZ.localize(claimed_at)
+            expires_at = claimed_at + timedelta(minutes=CLAIM_TIMEOUT_MINUTES)
+
+        return {
+            "claimed_count": claimed.get("CLAIMED", 0),
+            "reviewed_count": batch_counts.get("REVIEWED", 0),
+            "ignored_count": batch_counts.get("IGNORED", 0),
+            "batch_id": batch_id,
+            "claimed_at": claimed_at,
+            "expires_at": expires_at,
+        }
+
+    @staticmethod
+    def _review_error(row: Optional[Any], username: str, is_admin: bool) -> Optional[str]:
+        if row is None:
+            return "Item not found"
+        if row.status == "SYNCED":
+            return "Item already synced"
+        if not is_admin:
+            if row.claimed_by != username:
+                return "Item is not claimed by current user"
+            if row.status == "PENDING":
+                return "Item is not claimed"
+        return None
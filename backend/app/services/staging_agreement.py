@@ -0,0 +1,262 @@
+"""
+标注一致性（双人审核抽样）
+按比例抽取任务：首次人工审核后生成抽样记录，由另一名标注员盲审（看不到第一次的结论）。
+每完成一次第二次审核，即在同一事务中增量累加 全局 / 按标签 / 按标注员 的一致性计数，
+Cohen's kappa 直接由累计量算出，不需要对审核记录做全表统计。
+"""
+
+import hashlib
+import os
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, update, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.db_meta import StagingAgreementCounter, StagingReviewSample
+from app.repositories.staging_agreement import StagingAgreementCounterRepository
+
+# 双人审核抽样比例（0 表示关闭）
+DOUBLE_REVIEW_FRACTION = float(os.getenv("STAGING_DOUBLE_REVIEW_FRACTION", "0"))
+SECOND_CLAIM_TIMEOUT_MINUTES = 30
+
+SCOPE_GLOBAL = "GLOBAL"
+SCOPE_TAG = "TAG"
+SCOPE_ANNOTATOR = "ANNOTATOR"
+
+IGNORED_LABEL = "IGNORED"
+
+# 盲审时展示的字段（不含第一次的审核结论）
+BLIND_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "keywords": ("id", "keyword", "predicted_tag", "predicted_risk", "confidence"),
+    "rules": ("id", "tag_code", "extra_condition", "predicted_strategy", "confidence"),
+}
+# 审核结论字段、对应的预测字段、按标签分组的字段
+LABEL_FIELDS: Dict[str, Tuple[str, str, str]] = {
+    "keywords": ("final_tag", "predicted_tag", "predicted_tag"),
+    "rules": ("final_strategy", "predicted_strategy", "tag_code"),
+}
+
+
+def is_sampled(task_id: str, fraction: float) -> bool:
+    """按任务ID哈希确定性抽样（同一任务重复审核时抽样结果不变）"""
+    if fraction <= 0:
+        return False
+    return int(hashlib.sha1(task_id.encode("utf-8")).hexdigest()[:8], 16) < fraction * 0x100000000
+
+
+def cohen_kappa(cells: Dict[str, int]) -> Optional[float]:
+    """
+    由累计量计算 Cohen's kappa
+
+    Args:
+        cells: {"n": 样本数, "agree": 一致数, "a:<结论>": 评审 A 的边际计数, "b:<结论>": 评审 B 的边际计数}
+    """
+    n = cells.get("n", 0)
+    if not n:
+        return None
+    observed = cells.get("agree", 0) / n
+    expected = sum(
+        (count / n) * (cells.get("b:" + cell[2:], 0) / n)
+        for cell, count in cells.items() if cell.startswith("a:")
+    )
+    if expected >= 1.0:
+        return 1.0 if observed >= 1.0 else 0.0
+    return round((observed - expected) / (1.0 - expected), 4)
+
+
+def _summary(key: str, cells: Dict[str, int]) -> dict:
+    n = cells.get("n", 0)
+    return {
+        "key": key,
+        "samples": n,
+        "observed_agreement": round(cells.get("agree", 0) / n, 4) if n else None,
+        "kappa": cohen_kappa(cells),
+    }
+
+
+class StagingAgreementService:
+    """双人审核抽样与一致性统计"""
+
+    def __init__(self, db: AsyncSession, task_type: str, model: Any, fraction: Optional[float] = None):
+        self.db = db
+        self.task_type = task_type
+        self.model = model
+        self.fraction = DOUBLE_REVIEW_FRACTION if fraction is None else fraction
+        self.counters = StagingAgreementCounterRepository(StagingAgreementCounter, db)
+
+    def label_of(self, status: str, values: Dict[str, Any]) -> str:
+        if status == "IGNORED":
+            return IGNORED_LABEL
+        return values[LABEL_FIELDS[self.task_type][0]]
+
+    # ---------- 抽样 ----------
+
+    async def record_first_reviews(self, reviews: Sequence[Tuple[Any, str, str]]) -> int:
+        """
+        为抽中的任务生成抽样记录（随首次审核在同一事务中写入，不提交事务）
+
+        Args:
+            reviews: [(任务行, 审核人, 审核结论)]
+        """
+        sampled = [r for r in reviews if is_sampled(r[0].id, self.fraction)]
+        if not sampled:
+            return 0
+        existing = await self.db.execute(
+            select(StagingReviewSample.task_id).where(
+                StagingReviewSample.task_type == self.task_type,
+                StagingReviewSample.task_id.in_([row.id for row, _, _ in sampled])
+            )
+        )
+        existing_ids = set(existing.scalars().all())
+        tag_field = LABEL_FIELDS[self.task_type][2]
+        samples = [
+            StagingReviewSample(
+                id=str(uuid.uuid4()),
+                task_type=self.task_type,
+                task_id=row.id,
+                tag=getattr(row, tag_field),
+                first_annotator=annotator,
+                first_label=label,
+                status="PENDING",
+            )
+            for row, annotator, label in sampled if row.id not in existing_ids
+        ]
+        self.db.add_all(samples)
+        return len(samples)
+
+    # ---------- 第二次审核 ----------
+
+    async def claim(self, username: str, batch_size: int, now: datetime) -> List[dict]:
+        """
+        认领一批待第二次审核的抽样任务（不会分配给第一次审核的人；超时未提交的可被重新认领）
+
+        Returns:
+            盲审所需的任务字段
+        """
+        threshold = now - timedelta(minutes=SECOND_CLAIM_TIMEOUT_MINUTES)
+        result = await self.db.execute(
+            select(StagingReviewSample.id, StagingReviewSample.task_id)
+            .where(
+                StagingReviewSample.task_type == self.task_type,
+                StagingReviewSample.first_annotator != username,
+                or_(
+                    StagingReviewSample.status == "PENDING",
+                    and_(StagingReviewSample.status == "CLAIMED", StagingReviewSample.claimed_at < threshold)
+                )
+            )
+            .order_by(StagingReviewSample.created_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        samples = result.all()
+        if not samples:
+            await self.db.commit()
+            return []
+
+        await self.db.execute(
+            update(StagingReviewSample)
+            .where(StagingReviewSample.id.in_([s.id for s in samples]))
+            .values(status="CLAIMED", claimed_by=username, claimed_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        columns = [getattr(self.model, name) for name in BLIND_COLUMNS[self.task_type]]
+        rows = await self.db.execute(select(*columns).where(self.model.id.in_([s.task_id for s in samples])))
+        items = [row._asdict() for row in rows.all()]
+        await self.db.commit()
+        return items
+
+    async def submit(self, username: str, items: List[Dict[str, Any]], now: datetime) -> dict:
+        """
+        提交第二次审核结论，逐条完成抽样并增量累加一致性计数（单事务）
+
+        Args:
+            items: [{"id": 任务ID, "status": REVIEWED/IGNORED, 审核结论字段（缺省为预测值）}]
+        """
+        label_field, predicted_field, _ = LABEL_FIELDS[self.task_type]
+        task_ids = [item["id"] for item in items]
+        result = await self.db.execute(
+            select(StagingReviewSample)
+            .where(
+                StagingReviewSample.task_type == self.task_type,
+                StagingReviewSample.task_id.in_(task_ids),
+                StagingReviewSample.status == "CLAIMED",
+                StagingReviewSample.claimed_by == username
+            )
+            .with_for_update()
+        )
+        samples = {sample.task_id: sample for sample in result.scalars().all()}
+        predicted = dict((await self.db.execute(
+            select(self.model.id, getattr(self.model, predicted_field)).where(self.model.id.in_(list(samples)))
+        )).all())
+
+        deltas: Counter = Counter()
+        results = []
+        for item in items:
+            error = None
+            if item.get("status") not in ("REVIEWED", "IGNORED"):
+                error = "status must be one of: REVIEWED, IGNORED"
+            else:
+                sample = samples.pop(item["id"], None)  # 同一任务重复提交时第二条失败
+                if sample is None:
+                    error = "Sample is not claimed by current user"
+            if error:
+                results.append({"id": item["id"], "success": False, "error": error})
+                continue
+            values = {label_field: item.get(label_field) or predicted.get(sample.task_id)}
+            sample.second_annotator = username
+            sample.second_label = self.label_of(item["status"], values)
+            sample.status = "DONE"
+            sample.reviewed_at = now
+            deltas.update(self._pair_deltas(sample))
+            results.append({"id": item["id"], "success": True, "error": None})
+
+        await self.counters.increment(self.task_type, sorted((k, n) for k, n in deltas.items() if n))
+        await self.db.commit()
+        failed = [r["id"] for r in results if not r["success"]]
+        return {
+            "success_count": len(results) - len(failed),
+            "failed_count": len(failed),
+            "failed_ids": failed,
+            "results": results,
+        }
+
+    @staticmethod
+    def _pair_deltas(sample: StagingReviewSample) -> Counter:
+        """一对审核结论对各累计量的增量；按标注员统计时 A 为该标注员，B 为另一方"""
+        first, second = sample.first_label, sample.second_label
+        agree = int(first == second)
+        deltas: Counter = Counter()
+        scopes = [
+            (SCOPE_GLOBAL, "", first, second),
+            (SCOPE_TAG, sample.tag or "", first, second),
+            (SCOPE_ANNOTATOR, sample.first_annotator, first, second),
+            (SCOPE_ANNOTATOR, sample.second_annotator, second, first),
+        ]
+        for scope, key, own, other in scopes:
+            deltas[(scope, key, "n")] += 1
+            deltas[(scope, key, "agree")] += agree
+            deltas[(scope, key, "a:" + own)] += 1
+            deltas[(scope, key, "b:" + other)] += 1
+        return deltas
+
+    # ---------- 统计 ----------
+
+    async def annotator_agreement(self) -> Dict[str, dict]:
+        """{标注员: {"samples", "observed_agreement", "kappa"}}"""
+        cells = await self.counters.load(self.task_type, SCOPE_ANNOTATOR)
+        return {key: _summary(key, value) for key, value in cells.items()}
+
+    async def summary(self) -> dict:
+        """全局、按标签、按标注员的一致性"""
+        overall = (await self.counters.load(self.task_type, SCOPE_GLOBAL, "")).get("", {})
+        by_tag = await self.counters.load(self.task_type, SCOPE_TAG)
+        return {
+            "task_type": self.task_type,
+            "fraction": self.fraction,
+            "overall": _summary("", overall),
+            "by_tag": [_summary(key, value) for key, value in sorted(by_tag.items())],
+            "by_annotator": [value for _, value in sorted((await self.annotator_agreement()).items())],
+        }
@@ -0,0 +1,240 @@
+"""
+待审核任务自动预审
+批量比对模型预测与已有结论：正式库中的同一（归一化）关键词/规则、以及人工审核过的历史任务。
+全部已有结论都与预测一致的任务直接标记为 REVIEWED（标注员记为机器预审），有冲突或没有可比对结论的留给人工审核。
+每块一次 IN 查询预取正式库与历史审核结果，在内存中按哈希键比对（hash join），一个事务完成标记与计数。
+"""
+
+import logging
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import AsyncSessionLocal
+from app.models.db_meta import BulkJob, GlobalKeywords, RuleGlobalDefaults
+from app.repositories.bulk_job import BulkJobRepository
+from app.repositories.staging import StagingRepository
+from app.services.keyword_similarity import normalized_hash
+from app.services.staging import TASK_MODELS, get_china_now
+from app.services.staging_counters import CounterDelta, StagingCounterService, TaskState
+
+logger = logging.getLogger(__name__)
+
+MACHINE_ANNOTATOR = "machine:auto-accept"   # 自动预审通过的任务的标注员
+AUTO_ACCEPT_CHUNK_SIZE = 1000              # 每个事务处理的任务数
+
+AUTO_ACCEPT_JOB_TYPES: Dict[str, str] = {
+    "keywords": "STAGING_KEYWORD_AUTO_ACCEPT",
+    "rules": "STAGING_RULE_AUTO_ACCEPT",
+}
+
+# 人工审核结论所在的状态（已同步的任务同样代表人工结论；被忽略的视为与任何预测都冲突）
+HUMAN_DECISION_STATUSES = ("REVIEWED", "SYNCED", "IGNORED")
+IGNORED_DECISION = ("IGNORED",)
+
+
+class StagingAutoAcceptService:
+    """待审核任务自动预审"""
+
+    def __init__(self, db: AsyncSession, task_type: str = "keywords"):
+        if task_type not in AUTO_ACCEPT_JOB_TYPES:
+            raise ValueError(f"Unknown task_type '{task_type}', must be one of: {', '.join(AUTO_ACCEPT_JOB_TYPES)}")
+        self.db = db
+        self.task_type = task_type
+        self.job_type = AUTO_ACCEPT_JOB_TYPES[task_type]
+        self.model = TASK_MODELS[task_type]
+        self.repository = StagingRepository(self.model, db)
+        self.counters = StagingCounterService(db, task_type, self.model)
+        self.job_repo = BulkJobRepository(BulkJob, db)
+
+    async def create_job(self, created_by: str) -> BulkJob:
+        """
+        Raises:
+            ValueError: 同类型的预审任务正在执行
+        """
+        running = await self.db.execute(
+            select(BulkJob.id).where(
+                BulkJob.job_type == self.job_type,
+                BulkJob.status.in_(["PENDING", "RUNNING"])
+            ).limit(1)
+        )
+        if running.scalar():
+            raise ValueError("An auto-accept job is already running")
+
+        return await self.job_repo.create({
+            "id": str(uuid.uuid4()),
+            "job_type": self.job_type,
+            "status": "PENDING",
+            "created_by": created_by,
+            "errors": [],
+        })
+
+    async def get_job(self, job_id: str) -> Optional[BulkJob]:
+        job = await self.job_repo.get(job_id)
+        if job and job.job_type in AUTO_ACCEPT_JOB_TYPES.values():
+            return job
+        return None
+
+    async def run(self, job_id: str) -> BulkJob:
+        """
+        执行预审：按主键顺序分块扫描 PENDING 任务
+
+        统计口径：processed_rows=扫描的任务数，updated_rows=自动通过数，
+        skipped_rows=留给人工的任务数（已有结论与预测冲突或没有可比对的结论），checkpoint=已提交的块数；
+        message 中给出冲突/无结论的分项与吞吐量
+        """
+        job = await self.job_repo.get(job_id)
+        job.status = "RUNNING"
+        job.message = None
+        await self.db.commit()
+
+        started = time.monotonic()
+        stats = {"accepted": 0, "disagreed": 0, "unmatched": 0}
+        try:
+            last_id = None
+            while True:
+                rows = await self._lock_chunk(last_id)
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                chunk_stats = await self._review_chunk(rows)
+                for key, count in chunk_stats.items():
+                    stats[key] += count
+                job.processed_rows += len(rows)
+                job.updated_rows += chunk_stats["accepted"]
+                job.skipped_rows += len(rows) - chunk_stats["accepted"]
+                job.checkpoint += 1
+                await self.db.commit()
+            job.status = "COMPLETED"
+        except Exception as e:
+            logger.exception("Staging auto-accept %s failed", job_id)
+            await self.db.rollback()
+            job = await self.job_repo.get(job_id)
+            job.status = "FAILED"
+            stats["error"] = str(e)
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        job.message = (
+            f"accepted={stats['accepted']} disagreed={stats['disagreed']} unmatched={stats['unmatched']} "
+            f"elapsed={elapsed:.1f}s throughput={job.processed_rows / elapsed:.0f} rows/s"
+            + (f" error={stats['error']}" if "error" in stats else "")
+        )
+        job.finished_at = datetime.now(timezone.utc)
+        await self.db.commit()
+        return job
+
+    async def _lock_chunk(self, last_id: Optional[str]) -> List[Any]:
+        """加锁读取下一块 PENDING 任务，跳过正在被认领的行"""
+        model = self.model
+        query = select(model).where(model.status == "PENDING")
+        if last_id is not None:
+            query = query.where(model.id > last_id)
+        result = await self.db.execute(
+            query.order_by(model.id).limit(AUTO_ACCEPT_CHUNK_SIZE).with_for_update(skip_locked=True)
+        )
+        return result.scalars().all()
+
+    async def _review_chunk(self, rows: List[Any]) -> Dict[str, int]:
+        """比对一块任务并标记一致的任务，不提交事务"""
+        keys = {row.id: self._key(row) for row in rows}
+        evidence = await self._evidence(set(keys.values()))
+
+        accepted: List[Any] = []
+        stats = {"accepted": 0, "disagreed": 0, "unmatched": 0}
+        for row in rows:
+            decisions = evidence.get(keys[row.id])
+            if not decisions:
+                stats["unmatched"] += 1
+            elif decisions == {self._prediction(row)}:
+                accepted.append(row)
+            else:
+                stats["disagreed"] += 1
+        stats["accepted"] = len(accepted)
+        if not accepted:
+            return stats
+
+        model = self.model
+        values = {
+            "status": "REVIEWED",
+            "is_modified": False,
+            "annotator": MACHINE_ANNOTATOR,
+            "annotated_at": get_china_now(),
+        }
+        # 审核结果即预测值：UPDATE ... SET final_x = predicted_x，一条语句完成
+        if self.task_type == "keywords":
+            values.update(final_tag=model.predicted_tag, final_risk=model.predicted_risk)
+        else:
+            values.update(final_strategy=model.predicted_strategy)
+        await self.repository.bulk_update_by_ids([row.id for row in accepted], values)
+
+        delta = CounterDelta()
+        for row in accepted:
+            delta.move(TaskState.of(row), TaskState("REVIEWED", MACHINE_ANNOTATOR, row.claimed_by, row.batch_id))
+        await self.counters.apply(delta)
+        return stats
+
+    # ---------- 比对键与已有结论 ----------
+
+    def _key(self, row: Any) -> Any:
+        if self.task_type == "keywords":
+            return row.norm_hash or normalized_hash(row.keyword)
+        return (row.tag_code, row.extra_condition)
+
+    def _prediction(self, row: Any) -> Tuple:
+        if self.task_type == "keywords":
+            return (row.predicted_tag, row.predicted_risk)
+        return (row.predicted_strategy,)
+
+    async def _evidence(self, keys: Set[Any]) -> Dict[Any, Set[Tuple]]:
+        """
+        一次查询正式库、一次查询人工审核过的历史任务，汇总为 {比对键: {已有结论}}
+
+        机器预审通过的任务不作为结论来源，避免自我强化。
+        """
+        evidence: Dict[Any, Set[Tuple]] = defaultdict(set)
+        model = self.model
+        if self.task_type == "keywords":
+            queries = [
+                select(GlobalKeywords.norm_hash, literal("REVIEWED"), GlobalKeywords.tag_code, GlobalKeywords.risk_level)
+                .where(GlobalKeywords.norm_hash.in_(keys), GlobalKeywords.is_active.is_(True)),
+                select(model.norm_hash, model.status, model.final_tag, model.final_risk)
+                .where(
+                    model.norm_hash.in_(keys),
+                    model.status.in_(HUMAN_DECISION_STATUSES),
+                    model.annotator != MACHINE_ANNOTATOR
+                ),
+            ]
+            for query in queries:
+                for norm_hash, status, *decision in (await self.db.execute(query)).all():
+                    evidence[norm_hash].add(IGNORED_DECISION if status == "IGNORED" else tuple(decision))
+        else:
+            tag_codes = {tag_code for tag_code, _ in keys}
+            queries = [
+                select(RuleGlobalDefaults.tag_code, RuleGlobalDefaults.extra_condition,
+                       literal("REVIEWED"), RuleGlobalDefaults.strategy)
+                .where(RuleGlobalDefaults.tag_code.in_(tag_codes), RuleGlobalDefaults.is_active.is_(True)),
+                select(model.tag_code, model.extra_condition, model.status, model.final_strategy)
+                .where(
+                    model.tag_code.in_(tag_codes),
+                    model.status.in_(HUMAN_DECISION_STATUSES),
+                    model.annotator != MACHINE_ANNOTATOR
+                ),
+            ]
+            for query in queries:
+                for tag_code, extra_condition, status, strategy in (await self.db.execute(query)).all():
+                    if (tag_code, extra_condition) in keys:
+                        evidence[(tag_code, extra_condition)].add(
+                            IGNORED_DECISION if status == "IGNORED" else (strategy,)
+                        )
+        return evidence
+
+
+async def run_staging_auto_accept(job_id: str, task_type: str) -> None:
+    """后台任务入口：使用独立会话（请求会话在响应返回后即关闭）"""
+    async with AsyncSessionLocal() as session:
+        await StagingAutoAcceptService(session, task_type).run(job_id)
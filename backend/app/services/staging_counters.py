@@ -0,0 +1,137 @@
+"""
+待审核任务计数器
+按 状态 / 标注员 / 认领人 / 批次 维护任务数，随认领、审核、同步、释放、删除在同一事务中增量更新，
+统计接口只读取计数器（每个维度键若干分片行），不再对任务表做全表聚合。
+定期对账：锁定计数器后按任务表重新统计并整体替换，修正历史数据或异常路径造成的偏差。
+"""
+
+import logging
+import random
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.db_meta import StagingTaskCounter
+from app.repositories.staging_counter import CounterKey, StagingCounterRepository
+
+logger = logging.getLogger(__name__)
+
+# 热点行（如 STATUS/PENDING）拆成多个分片，并发事务随机落到不同行上，减少行锁等待
+COUNTER_SHARDS = 8
+
+DIM_STATUS = "STATUS"
+DIM_ANNOTATOR = "ANNOTATOR"
+DIM_CLAIMER = "CLAIMER"
+DIM_BATCH = "BATCH"
+
+
+@dataclass(frozen=True)
+class TaskState:
+    """任务行中与计数相关的字段"""
+    status: str
+    annotator: Optional[str] = None
+    claimed_by: Optional[str] = None
+    batch_id: Optional[str] = None
+
+    @classmethod
+    def of(cls, row: Any) -> "TaskState":
+        return cls(row.status, row.annotator, row.claimed_by, row.batch_id)
+
+    def keys(self) -> List[CounterKey]:
+        keys = [(DIM_STATUS, "", self.status)]
+        if self.annotator:
+            keys.append((DIM_ANNOTATOR, self.annotator, self.status))
+        if self.claimed_by:
+            keys.append((DIM_CLAIMER, self.claimed_by, self.status))
+        if self.batch_id:
+            keys.append((DIM_BATCH, self.batch_id, self.status))
+        return keys
+
+
+class CounterDelta:
+    """一个事务内累积的计数变化"""
+
+    def __init__(self):
+        self._deltas: Counter = Counter()
+
+    def add(self, state: TaskState, n: int = 1) -> "CounterDelta":
+        for key in state.keys():
+            self._deltas[key] += n
+        return self
+
+    def remove(self, state: TaskState, n: int = 1) -> "CounterDelta":
+        return self.add(state, -n)
+
+    def move(self, old: TaskState, new: TaskState, n: int = 1) -> "CounterDelta":
+        return self.remove(old, n).add(new, n)
+
+    def items(self) -> List[tuple]:
+        """非零变化，按键排序（固定加锁顺序）"""
+        return sorted((key, n) for key, n in self._deltas.items() if n)
+
+
+class StagingCounterService:
+    """待审核任务计数器读写"""
+
+    def __init__(self, db: AsyncSession, task_type: str, model: Any):
+        self.db = db
+        self.task_type = task_type
+        self.model = model
+        self.repository = StagingCounterRepository(StagingTaskCounter, db)
+
+    async def apply(self, delta: CounterDelta) -> None:
+        """写入计数变化，不提交事务（与任务状态变更一起提交）"""
+        await self.repository.increment(self.task_type, random.randrange(COUNTER_SHARDS), delta.items())
+
+    # ---------- 读取 ----------
+
+    async def status_counts(self, dimension: str = DIM_STATUS, dim_key: str = "") -> Dict[str, int]:
+        """某个维度键下各状态的任务数"""
+        sums = await self.repository.sums(self.task_type, dimension, dim_key)
+        return {status: count for (_, status), count in sums.items()}
+
+    async def annotator_counts(self) -> Dict[str, Dict[str, int]]:
+        """{标注员: {状态: 任务数}}"""
+        result: Dict[str, Dict[str, int]] = {}
+        for (annotator, status), count in (await self.repository.sums(self.task_type, DIM_ANNOTATOR)).items():
+            result.setdefault(annotator, {})[status] = count
+        return result
+
+    # ---------- 对账 ----------
+
+    async def reconcile(self) -> dict:
+        """
+        按任务表重新统计并替换计数器
+
+        先锁定计数器行再读取任务表：并发事务的任务变更要么已提交（统计可见），
+        要么在等待计数器行锁（在对账之后再叠加自己的增量），因此不会重复或遗漏。
+
+        Returns:
+            {"task_type", "counters": 计数器键数, "drifted": 与统计结果不一致的键数}
+        """
+        current = await self.repository.lock_all(self.task_type)
+
+        model = self.model
+        result = await self.db.execute(
+            select(model.status, model.annotator, model.claimed_by, model.batch_id, func.count())
+            .group_by(model.status, model.annotator, model.claimed_by, model.batch_id)
+        )
+        expected = CounterDelta()
+        for status, annotator, claimed_by, batch_id, count in result.all():
+            expected.add(TaskState(status, annotator, claimed_by, batch_id), count)
+        expected_counts = dict(expected.items())
+
+        drifted = [
+            key for key in set(current) | set(expected_counts)
+            if current.get(key, 0) != expected_counts.get(key, 0)
+        ]
+        if drifted:
+            logger.warning("Staging %s counters drifted on %d keys, e.g. %s",
+                           self.task_type, len(drifted), sorted(drifted)[:5])
+        await self.repository.replace_all(self.task_type, expected_counts)
+        await self.db.commit()
+
+        return {"task_type": self.task_type, "counters": len(expected_counts), "drifted": len(drifted)}
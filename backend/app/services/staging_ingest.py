@@ -0,0 +1,109 @@
+"""
+待审核任务流式入库
+模型预测结果以 NDJSON 流式上传，按批次去重后多行写入待审核表：
+文件内去重、与待审核表已有任务去重、与正式库已有数据去重，重复行跳过。
+每行可携带模型置信度，入库时即按置信度与风险等级计算认领优先级，之后由定时任务结合提示词命中增量刷新。
+复用敏感词导入的批次事务、错误记录与断点续传。
+"""
+
+import uuid
+from typing import Any, AsyncIterator, Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.db_meta import BulkJob, RuleGlobalDefaults
+from app.schemas.staging_ingest import StagingKeywordIngest, StagingRuleIngest
+from app.services.keyword_import import KeywordImportService, clean_record
+from app.services.keyword_similarity import normalized_hash
+from app.services.staging import TASK_MODELS
+from app.services.staging_counters import CounterDelta, StagingCounterService, TaskState
+from app.services.staging_priority import priority_score, risk_weight
+
+INGEST_JOB_TYPES: Dict[str, str] = {
+    "keywords": "STAGING_KEYWORD_INGEST",
+    "rules": "STAGING_RULE_INGEST",
+}
+
+
+class StagingIngestService(KeywordImportService):
+    """待审核任务流式入库服务"""
+
+    def __init__(self, db: AsyncSession, task_type: str = "keywords"):
+        if task_type not in INGEST_JOB_TYPES:
+            raise ValueError(f"Unknown task_type '{task_type}', must be one of: {', '.join(INGEST_JOB_TYPES)}")
+        super().__init__(db)
+        self.task_type = task_type
+        self.job_type = INGEST_JOB_TYPES[task_type]
+        self.model = TASK_MODELS[task_type]
+        self.counters = StagingCounterService(db, task_type, self.model)
+
+    async def get_job(self, job_id: str) -> Optional[BulkJob]:
+        job = await self.job_repo.get(job_id)
+        if job and job.job_type in INGEST_JOB_TYPES.values():
+            return job
+        return None
+
+    async def ingest(
+        self,
+        job: BulkJob,
+        records: AsyncIterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]
+    ) -> BulkJob:
+        """
+        入库主流程
+
+        统计口径：inserted_rows=新增任务数，skipped_rows=文件内重复或已存在于待审核表/正式库的行数
+        """
+        if self.task_type == "keywords":
+            parse_row, fetch_existing = self._parse_keyword, self._existing_keywords
+        else:
+            parse_row, fetch_existing = self._parse_rule, self._existing_rules
+        return await self._run(job, records, parse_row, fetch_existing, self._insert_tasks, update_existing=False)
+
+    # ---------- 解析 ----------
+
+    def _new_row(self, data: Dict[str, Any], risk: float) -> Dict[str, Any]:
+        # 初始优先级由置信度与风险等级计算，不含提示词命中（priority_at 为空，由下一轮刷新补齐）
+        data["id"] = str(uuid.uuid4())
+        data["status"] = "PENDING"
+        data["priority"] = priority_score(data["confidence"], risk=risk)
+        return data
+
+    def _parse_keyword(self, record: Dict[str, Any]) -> Tuple[Hashable, dict]:
+        data = StagingKeywordIngest(**clean_record(record)).model_dump()
+        data = self._new_row(data, risk_weight(data["predicted_risk"]))
+        data["norm_hash"] = normalized_hash(data["keyword"])
+        return data["keyword"].casefold(), data
+
+    def _parse_rule(self, record: Dict[str, Any]) -> Tuple[Hashable, dict]:
+        data = self._new_row(StagingRuleIngest(**clean_record(record)).model_dump(), risk_weight(None))
+        return (data["tag_code"], data["extra_condition"]), data
+
+    # ---------- 批次去重 ----------
+
+    async def _existing_keywords(self, rows: List[dict]) -> set:
+        """待审核表（任意状态）与正式库中已存在的关键词，各一次 IN 查询"""
+        keywords = [r["keyword"] for r in rows]
+        staged = await self.db.execute(select(self.model.keyword).where(self.model.keyword.in_(keywords)))
+        existing = set(staged.scalars().all()) | await self.global_repo.get_existing_keywords(keywords)
+        return {k.casefold() for k in existing}
+
+    async def _existing_rules(self, rows: List[dict]) -> set:
+        """待审核表与正式库中已存在的 (标签, 附加条件)，按标签 IN 查询后在内存中匹配（附加条件可为空）"""
+        tag_codes = {r["tag_code"] for r in rows}
+        existing = set()
+        for model in (self.model, RuleGlobalDefaults):
+            result = await self.db.execute(
+                select(model.tag_code, model.extra_condition).where(model.tag_code.in_(tag_codes))
+            )
+            existing.update((tag_code, extra_condition) for tag_code, extra_condition in result.all())
+        return existing
+
+    # ---------- 写入 ----------
+
+    async def _insert_tasks(self, rows: List[dict], update_existing: bool = False) -> None:
+        """多行 INSERT 新任务并在同一事务中累加 PENDING 计数，不提交事务"""
+        if not rows:
+            return
+        await self.db.execute(insert(self.model), rows)
+        await self.counters.apply(CounterDelta().add(TaskState("PENDING"), len(rows)))
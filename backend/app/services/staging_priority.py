@@ -0,0 +1,287 @@
+"""
+待审核任务认领优先级（主动学习队列）
+优先级 = 模型不确定度、关键词在近期提示词中的命中频次、风险等级的加权和，预先计算并写入带索引的 priority 列，
+认领时沿 (status, priority DESC, created_at) 索引直接取最优先的一批，不需要对任务表排序。
+
+定时增量刷新，每轮只处理需要更新的行：
+- 待打分：新增的任务（priority_at 为空），回溯窗口内已扫描过的提示词计算命中数
+- 新命中：上次扫描之后新增的提示词中出现的关键词
+- 过期：打分时间早于 PRIORITY_MAX_AGE_HOURS 的任务（命中数按半衰期衰减后重新打分）
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update, func, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.db_meta import GlobalKeywords, PlaygroundHistory, StagingPriorityState
+from app.repositories.staging import IN_CHUNK_SIZE
+from app.services.keyword_automaton import KeywordAutomaton
+from app.services.staging import TASK_MODELS
+
+# 打分权重
+W_UNCERTAINTY = 0.5
+W_FREQUENCY = 0.3
+W_RISK = 0.2
+DEFAULT_UNCERTAINTY = 0.5       # 没有模型置信度时的不确定度
+HIT_SATURATION = 10.0           # 命中频次归一化：hits / (hits + HIT_SATURATION)
+RISK_WEIGHTS = {"high": 1.0, "medium": 0.6, "low": 0.2}
+DEFAULT_RISK = 0.5
+
+# 提示词频次
+PROMPT_WINDOW_DAYS = 7          # 新任务回溯的提示词时间窗口
+HIT_HALF_LIFE_HOURS = 72        # 命中数半衰期
+PROMPT_SCAN_LIMIT = 20000       # 每轮最多扫描的提示词数，剩余的下一轮继续
+PROMPT_CHUNK_SIZE = 1000
+PROMPT_SCAN_LAG_SECONDS = 5     # 只扫描若干秒之前的提示词，避免越过尚未提交的并发写入
+
+# 重新打分
+REFRESH_BATCH_SIZE = 1000       # 每轮最多处理的待打分/过期任务数
+PRIORITY_MAX_AGE_HOURS = 6
+
+
+def risk_weight(level: Optional[str]) -> float:
+    return RISK_WEIGHTS.get((level or "").lower(), DEFAULT_RISK)
+
+
+def priority_score(confidence: Optional[float], hits: float = 0.0, risk: float = DEFAULT_RISK) -> float:
+    """
+    认领优先级，越大越先认领
+
+    Args:
+        confidence: 模型对预测结果的置信度（0~1）
+        hits: 近期提示词命中数（已衰减）
+        risk: 风险权重（0~1）
+    """
+    uncertainty = DEFAULT_UNCERTAINTY if confidence is None else 1.0 - confidence
+    frequency = hits / (hits + HIT_SATURATION) if hits > 0 else 0.0
+    return round(W_UNCERTAINTY * uncertainty + W_FREQUENCY * frequency + W_RISK * risk, 6)
+
+
+def decayed_hits(hits: float, since: Optional[datetime], now: datetime) -> float:
+    """把 since 时刻的命中数按半衰期衰减到 now"""
+    if not hits or since is None:
+        return hits or 0.0
+    hours = max((now - _utc(since)).total_seconds(), 0.0) / 3600
+    return hits * 0.5 ** (hours / HIT_HALF_LIFE_HOURS)
+
+
+def _utc(value: datetime) -> datetime:
+    """统一为不带时区的 UTC 时间（数据库读出的时间不带时区，按 UTC 处理）"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _prompt_text(input_data: Any) -> str:
+    if isinstance(input_data, dict):
+        return str(input_data.get("input_prompt") or "")
+    if isinstance(input_data, str):
+        return input_data
+    return ""
+
+
+class StagingPriorityService:
+    """待审核任务优先级刷新"""
+
+    def __init__(self, db: AsyncSession, task_type: str = "keywords"):
+        if task_type not in TASK_MODELS:
+            raise ValueError(f"Unknown task_type '{task_type}', must be one of: {', '.join(TASK_MODELS)}")
+        self.db = db
+        self.task_type = task_type
+        self.model = TASK_MODELS[task_type]
+
+    async def refresh(self, now: Optional[datetime] = None) -> dict:
+        """
+        增量刷新一轮（单事务）
+
+        Returns:
+            {"scored": 重新打分的任务数, "prompts": 扫描的新提示词数, "hit_tasks": 新命中的任务数}
+        """
+        now = _utc(now or datetime.now(timezone.utc))
+        model = self.model
+        state = await self.db.get(StagingPriorityState, self.task_type)
+        if state is None:
+            state = StagingPriorityState(task_type=self.task_type)
+            self.db.add(state)
+
+        # 1. 待打分与过期的任务
+        stale_before = now - timedelta(hours=PRIORITY_MAX_AGE_HOURS)
+        result = await self.db.execute(
+            select(model.id, model.priority_at)
+            .where(model.status == "PENDING", or_(model.priority_at.is_(None), model.priority_at < stale_before))
+            .order_by(model.priority_at)
+            .limit(REFRESH_BATCH_SIZE)
+        )
+        targets: Dict[str, float] = {}
+        unscored: List[str] = []
+        for task_id, priority_at in result.all():
+            targets[task_id] = 0.0
+            if priority_at is None:
+                unscored.append(task_id)
+
+        prompts = 0
+        hit_tasks = 0
+        if self.task_type == "keywords":
+            # 2. 新任务回溯窗口内已扫描过的提示词（之后的提示词由第 3 步统计，不会重复计数）
+            if unscored and state.prompt_created_at is not None:
+                backfill = await self._keyword_automaton(model.id.in_(unscored))
+                hits, _, _ = await self._scan_prompts(
+                    backfill, now,
+                    and_(
+                        PlaygroundHistory.created_at >= now - timedelta(days=PROMPT_WINDOW_DAYS),
+                        or_(
+                            PlaygroundHistory.created_at < state.prompt_created_at,
+                            and_(PlaygroundHistory.created_at == state.prompt_created_at,
+                                 PlaygroundHistory.id <= state.prompt_id)
+                        )
+                    ),
+                    descending=True
+                )
+                for task_id, n in hits.items():
+                    targets[task_id] += n
+
+            # 3. 上次扫描之后的新提示词，只统计已完成回溯的任务（含本轮回溯的任务）
+            hits, prompts, last = await self._scan_new_prompts(state, now, unscored)
+            hit_tasks = len(hits)
+            for task_id, n in hits.items():
+                targets[task_id] = targets.get(task_id, 0.0) + n
+            if last:
+                state.prompt_created_at, state.prompt_id = last
+
+        scored = await self._rescore(targets, now)
+        state.refreshed_at = now
+        await self.db.commit()
+        return {"task_type": self.task_type, "scored": scored, "prompts": prompts, "hit_tasks": hit_tasks}
+
+    # ---------- 提示词扫描 ----------
+
+    async def _keyword_automaton(self, condition: Any) -> KeywordAutomaton:
+        automaton = KeywordAutomaton()
+        result = await self.db.execute(
+            select(self.model.id, self.model.keyword).where(self.model.status == "PENDING", condition)
+        )
+        for task_id, keyword in result.all():
+            automaton.add(keyword.casefold(), task_id)
+        return automaton.build()
+
+    async def _scan_new_prompts(
+        self, state: StagingPriorityState, now: datetime, unscored: List[str]
+    ) -> Tuple[Dict[str, float], int, Optional[Tuple[datetime, str]]]:
+        """扫描上次位置之后的新提示词（首次运行从窗口起点开始）"""
+        upper = now - timedelta(seconds=PROMPT_SCAN_LAG_SECONDS)
+        conditions = [PlaygroundHistory.created_at <= upper]
+        if state.prompt_created_at is None:
+            conditions.append(PlaygroundHistory.created_at >= now - timedelta(days=PROMPT_WINDOW_DAYS))
+        else:
+            conditions.append(or_(
+                PlaygroundHistory.created_at > state.prompt_created_at,
+                and_(PlaygroundHistory.created_at == state.prompt_created_at,
+                     PlaygroundHistory.id > state.prompt_id)
+            ))
+
+        pending = await self.db.execute(
+            select(PlaygroundHistory.id).where(*conditions).limit(1)
+        )
+        if pending.scalar() is None:
+            return {}, 0, None
+        automaton = await self._keyword_automaton(
+            or_(self.model.priority_at.is_not(None), self.model.id.in_(unscored))
+        )
+        return await self._scan_prompts(automaton, now, and_(*conditions))
+
+    async def _scan_prompts(
+        self, automaton: KeywordAutomaton, now: datetime, condition: Any, descending: bool = False
+    ) -> Tuple[Dict[str, float], int, Optional[Tuple[datetime, str]]]:
+        """
+        按 (created_at, id) 分块扫描提示词，统计每个任务关键词出现在多少条提示词中（按提示词时间衰减到 now）
+
+        Returns:
+            (命中 {任务ID: 衰减后的命中数}, 扫描的提示词数, 扫描到的最后位置)
+        """
+        hits: Dict[str, float] = {}
+        scanned = 0
+        last: Optional[Tuple[datetime, str]] = None
+        order = (
+            [PlaygroundHistory.created_at.desc(), PlaygroundHistory.id.desc()] if descending
+            else [PlaygroundHistory.created_at, PlaygroundHistory.id]
+        )
+        has_keywords = len(automaton) > 0
+        while scanned < PROMPT_SCAN_LIMIT:
+            query = select(PlaygroundHistory.id, PlaygroundHistory.created_at, PlaygroundHistory.input_data).where(condition)
+            if last is not None:
+                if descending:
+                    query = query.where(or_(PlaygroundHistory.created_at < last[0],
+                                            and_(PlaygroundHistory.created_at == last[0], PlaygroundHistory.id < last[1])))
+                else:
+                    query = query.where(or_(PlaygroundHistory.created_at > last[0],
+                                            and_(PlaygroundHistory.created_at == last[0], PlaygroundHistory.id > last[1])))
+            limit = min(PROMPT_CHUNK_SIZE, PROMPT_SCAN_LIMIT - scanned)
+            rows = (await self.db.execute(query.order_by(*order).limit(limit))).all()
+            for prompt_id, created_at, input_data in rows:
+                text = _prompt_text(input_data)
+                if text and has_keywords:
+                    weight = decayed_hits(1.0, created_at, now)
+                    for task_id in automaton.find_all(text.casefold()):
+                        hits[task_id] = hits.get(task_id, 0.0) + weight
+            scanned += len(rows)
+            if rows:
+                last = (rows[-1].created_at, rows[-1].id)
+            if len(rows) < limit:
+                break
+        return hits, scanned, last
+
+    # ---------- 打分 ----------
+
+    async def _rescore(self, targets: Dict[str, float], now: datetime) -> int:
+        """按主键批量读取并写回 priority（executemany），targets 为 {任务ID: 新增命中数}"""
+        model = self.model
+        ids = list(targets)
+        is_keywords = self.task_type == "keywords"
+        for start in range(0, len(ids), IN_CHUNK_SIZE):
+            chunk = ids[start:start + IN_CHUNK_SIZE]
+            if is_keywords:
+                columns = [model.id, model.confidence, model.predicted_risk, model.prompt_hits, model.prompt_hits_at]
+            else:
+                columns = [model.id, model.confidence, model.tag_code]
+            rows = (await self.db.execute(select(*columns).where(model.id.in_(chunk)))).all()
+
+            params = []
+            if is_keywords:
+                for row in rows:
+                    hits = decayed_hits(row.prompt_hits, row.prompt_hits_at, now) + targets[row.id]
+                    params.append({
+                        "id": row.id,
+                        "priority": priority_score(row.confidence, hits, risk_weight(row.predicted_risk)),
+                        "prompt_hits": hits,
+                        "prompt_hits_at": now,
+                        "priority_at": now,
+                    })
+            else:
+                risks = await self._tag_risks({row.tag_code for row in rows})
+                for row in rows:
+                    params.append({
+                        "id": row.id,
+                        "priority": priority_score(row.confidence, 0.0, risks.get(row.tag_code, DEFAULT_RISK)),
+                        "priority_at": now,
+                    })
+            if params:
+                await self.db.execute(update(model), params)
+        return len(ids)
+
+    async def _tag_risks(self, tag_codes: set) -> Dict[str, float]:
+        """标签风险：正式库中该标签下启用关键词的平均风险权重"""
+        if not tag_codes:
+            return {}
+        result = await self.db.execute(
+            select(GlobalKeywords.tag_code, GlobalKeywords.risk_level, func.count())
+            .where(GlobalKeywords.tag_code.in_(tag_codes), GlobalKeywords.is_active.is_(True))
+            .group_by(GlobalKeywords.tag_code, GlobalKeywords.risk_level)
+        )
+        totals: Dict[str, List[float]] = {}
+        for tag_code, risk_level, count in result.all():
+            total = totals.setdefault(tag_code, [0.0, 0])
+            total[0] += risk_weight(risk_level) * count
+            total[1] += count
+        return {tag_code: weighted / count for tag_code, (weighted, count) in totals.items()}
@@ -0,0 +1,333 @@
+"""
+待审核库 -> 正式库批量同步服务
+按块处理已审核（REVIEWED）的任务：每块一次查询预取正式库已有行，多行 upsert 写入正式库，
+并在同一事务中把任务标记为 SYNCED、写入变更流水。每次同步生成正式库的一个新版本。
+"""
+
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import select, insert, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import AsyncSessionLocal
+from app.models.db_meta import (
+    Base, BulkJob, GlobalKeywords, RuleGlobalDefaults, LibraryVersion, LibraryChange
+)
+from app.repositories.bulk_job import BulkJobRepository
+from app.repositories.global_keywords import GlobalKeywordsRepository
+from app.repositories.staging import StagingRepository
+from app.services.keyword_similarity import normalized_hash
+from app.services.staging import TASK_MODELS
+from app.services.staging_counters import CounterDelta, StagingCounterService, TaskState
+
+logger = logging.getLogger(__name__)
+
+SYNC_CHUNK_SIZE = 1000  # 每个事务同步的任务数
+
+LIBRARY_GLOBAL_KEYWORDS = "GLOBAL_KEYWORDS"
+LIBRARY_GLOBAL_DEFAULTS = "GLOBAL_DEFAULTS"
+
+
+@dataclass(frozen=True)
+class SyncSpec:
+    """同步定义：任务类型对应的正式库、业务键与写入字段"""
+    job_type: str
+    library: str
+    model: Type[Base]
+    staging_key: Callable[[Any], Any]        # 任务行 -> 业务键
+    production_key: Callable[[Any], Any]     # 正式库行 -> 业务键
+    values: Callable[[Any], Dict[str, Any]]  # 任务行 -> 正式库写入字段
+
+
+SYNC_SPECS: Dict[str, SyncSpec] = {
+    "keywords": SyncSpec(
+        job_type="STAGING_KEYWORD_SYNC",
+        library=LIBRARY_GLOBAL_KEYWORDS,
+        model=GlobalKeywords,
+        # 正式库 keyword 列为大小写不敏感排序规则（uk_global_keyword），按 casefold 匹配
+        staging_key=lambda row: row.keyword.casefold(),
+        production_key=lambda row: row.keyword.casefold(),
+        values=lambda row: {"tag_code": row.final_tag, "risk_level": row.final_risk},
+    ),
+    "rules": SyncSpec(
+        job_type="STAGING_RULE_SYNC",
+        library=LIBRARY_GLOBAL_DEFAULTS,
+        model=RuleGlobalDefaults,
+        staging_key=lambda row: (row.tag_code, row.extra_condition),
+        production_key=lambda row: (row.tag_code, row.extra_condition),
+        values=lambda row: {"strategy": row.final_strategy},
+    ),
+}
+
+JOB_TASK_TYPES = {spec.job_type: task_type for task_type, spec in SYNC_SPECS.items()}
+
+
+def _record_key(key: Any) -> str:
+    if isinstance(key, tuple):
+        return "|".join("" if part is None else part for part in key)
+    return key
+
+
+class StagingSyncService:
+    """已审核任务同步到正式库"""
+
+    def __init__(self, db: AsyncSession, task_type: str = "keywords"):
+        if task_type not in SYNC_SPECS:
+            raise ValueError(f"Unknown task_type '{task_type}', must be one of: {', '.join(SYNC_SPECS)}")
+        self.db = db
+        self.task_type = task_type
+        self.spec = SYNC_SPECS[task_type]
+        self.staging_model = TASK_MODELS[task_type]
+        self.staging_repo = StagingRepository(self.staging_model, db)
+        self.counters = StagingCounterService(db, task_type, self.staging_model)
+        self.job_repo = BulkJobRepository(BulkJob, db)
+
+    async def create_sync_job(self, created_by: str) -> BulkJob:
+        """
+        Raises:
+            ValueError: 同类型的同步任务正在执行（同一正式库的版本号必须串行分配）
+        """
+        running = await self.db.execute(
+            select(BulkJob.id).where(
+                BulkJob.job_type == self.spec.job_type,
+                BulkJob.status.in_(["PENDING", "RUNNING"])
+            ).limit(1)
+        )
+        if running.scalar():
+            raise ValueError("A sync job is already running")
+
+        return await self.job_repo.create({
+            "id": str(uuid.uuid4()),
+            "job_type": self.spec.job_type,
+            "status": "PENDING",
+            "created_by": created_by,
+            "errors": [],
+        })
+
+    async def get_job(self, job_id: str) -> Optional[BulkJob]:
+        job = await self.job_repo.get(job_id)
+        if job and job.job_type in JOB_TASK_TYPES:
+            return job
+        return None
+
+    async def run_sync(self, job_id: str, ids: Optional[Sequence[str]] = None) -> BulkJob:
+        """
+        执行同步：ids 为空时同步全部 REVIEWED 任务
+
+        每块一个事务：任务行加锁读取 -> 一次查询预取正式库已有行 -> 多行写入 -> 标记 SYNCED -> 写入变更流水与进度。
+        失败时已提交的块保持有效，版本照常封版。
+
+        统计口径：processed_rows=同步的任务数，inserted_rows/updated_rows=正式库新增/更新的行数，
+        skipped_rows=指定的任务中不存在或不是 REVIEWED 的数量，checkpoint=已提交的块数
+        """
+        job = await self.job_repo.get(job_id)
+        job.status = "RUNNING"
+        job.message = None
+        version = await self._open_version(job)
+        version_id = version.id
+        await self.db.commit()
+
+        try:
+            async for chunk_rows, requested in self._iter_chunks(ids):
+                inserted, updated = await self._sync_chunk(chunk_rows, version)
+                job.processed_rows += len(chunk_rows)
+                job.inserted_rows += inserted
+                job.updated_rows += updated
+                job.skipped_rows += requested - len(chunk_rows)
+                job.checkpoint += 1
+                version.inserted_rows += inserted
+                version.updated_rows += updated
+                await self.db.commit()
+
+            job.message = f"{self.spec.library} version {version.version}"
+            job.status = "COMPLETED"
+        except Exception as e:
+            logger.exception("Staging sync %s failed", job_id)
+            await self.db.rollback()
+            job = await self.job_repo.get(job_id)
+            version = await self.db.get(LibraryVersion, version_id)
+            job.status = "FAILED"
+            job.message = str(e)
+
+        job.finished_at = datetime.now(timezone.utc)
+        version.finished_at = job.finished_at
+        await self.db.commit()
+        return job
+
+    async def _open_version(self, job: BulkJob) -> LibraryVersion:
+        current = (await self.db.execute(
+            select(func.max(LibraryVersion.version)).where(LibraryVersion.library == self.spec.library)
+        )).scalar() or 0
+        version = LibraryVersion(
+            id=str(uuid.uuid4()),
+            library=self.spec.library,
+            version=current + 1,
+            job_id=job.id,
+            inserted_rows=0,
+            updated_rows=0,
+            created_by=job.created_by,
+        )
+        self.db.add(version)
+        return version
+
+    async def _iter_chunks(self, ids: Optional[Sequence[str]]):
+        """
+        逐块加锁读取待同步的任务行
+
+        Yields:
+            (REVIEWED 任务行, 本块请求的任务数)
+        """
+        model = self.staging_model
+        if ids is not None:
+            ids = list(dict.fromkeys(ids))
+            for start in range(0, len(ids), SYNC_CHUNK_SIZE):
+                chunk = ids[start:start + SYNC_CHUNK_SIZE]
+                result = await self.db.execute(
+                    select(model)
+                    .where(model.id.in_(chunk), model.status == "REVIEWED")
+                    .with_for_update()
+                )
+                yield result.scalars().all(), len(chunk)
+            return
+
+        last_id = None
+        while True:
+            query = select(model).where(model.status == "REVIEWED")
+            if last_id is not None:
+                query = query.where(model.id > last_id)
+            result = await self.db.execute(
+                query.order_by(model.id).limit(SYNC_CHUNK_SIZE).with_for_update()
+            )
+            rows = result.scalars().all()
+            if not rows:
+                return
+            yield rows, len(rows)
+            last_id = rows[-1].id
+
+    async def _sync_chunk(self, rows: List[Any], version: LibraryVersion) -> Tuple[int, int]:
+        """同步一块任务，不提交事务。Returns: (新增数, 更新数)"""
+        if not rows:
+            return 0, 0
+        spec = self.spec
+
+        # 同一业务键出现多次时以最后一条为准
+        latest: Dict[Any, Any] = {spec.staging_key(row): row for row in rows}
+        existing = await self._prefetch(list(latest.values()))
+
+        changes = []
+        if self.task_type == "keywords":
+            upserts = []
+            for key, row in latest.items():
+                current = existing.get(key)
+                upserts.append({
+                    "id": current.id if current else str(uuid.uuid4()),
+                    "keyword": row.keyword,
+                    **spec.values(row),
+                    "is_active": current.is_active if current else True,
+                    "norm_hash": normalized_hash(row.keyword),
+                })
+                # 已有行的 keyword 不会被覆盖，流水记录正式库中的原文
+                record_key = current.keyword if current else row.keyword
+                changes.append((upserts[-1]["id"], record_key, "UPDATE" if current else "INSERT"))
+            await GlobalKeywordsRepository(GlobalKeywords, self.db).bulk_upsert(upserts)
+        else:
+            # 规则按 (标签, 附加条件) 匹配，附加条件可为空，无法依赖唯一索引，预取后分别插入/更新
+            inserts, updates = [], []
+            for key, row in latest.items():
+                current = existing.get(key)
+                if current:
+                    updates.append({"id": current.id, **spec.values(row)})
+                    changes.append((current.id, key, "UPDATE"))
+                else:
+                    inserts.append({
+                        "id": str(uuid.uuid4()),
+                        "tag_code": row.tag_code,
+                        "extra_condition": row.extra_condition,
+                        **spec.values(row),
+                        "is_active": True,
+                    })
+                    changes.append((inserts[-1]["id"], key, "INSERT"))
+            if inserts:
+                await self.db.execute(insert(spec.model), inserts)
+            if updates:
+                await self.db.execute(update(spec.model), updates)
+
+        await self.staging_repo.bulk_update_by_ids([row.id for row in rows], {"status": "SYNCED"})
+        delta = CounterDelta()
+        for row in rows:
+            delta.move(TaskState.of(row), TaskState("SYNCED", row.annotator, row.claimed_by, row.batch_id))
+        await self.counters.apply(delta)
+        await self.db.execute(insert(LibraryChange), [
+            {
+                "id": str(uuid.uuid4()),
+                "library": spec.library,
+                "version": version.version,
+                "record_id": record_id,
+                "record_key": _record_key(key),
+                "action": action,
+            }
+            for record_id, key, action in changes
+        ])
+
+        inserted = sum(1 for change in changes if change[2] == "INSERT")
+        return inserted, len(changes) - inserted
+
+    async def _prefetch(self, rows: List[Any]) -> Dict[Any, Any]:
+        """一次查询取出本块任务涉及的正式库已有行 {业务键: 行}"""
+        model = self.spec.model
+        if self.task_type == "keywords":
+            query = select(model.id, model.keyword, model.is_active, model.norm_hash).where(
+                model.keyword.in_({row.keyword for row in rows})
+            )
+        else:
+            query = select(model.id, model.tag_code, model.extra_condition).where(
+                model.tag_code.in_({row.tag_code for row in rows})
+            )
+        result = await self.db.execute(query)
+        return {self.spec.production_key(row): row for row in result.all()}
+
+    # ---------- 变更流水 ----------
+
+    async def get_current_version(self) -> int:
+        """最新的已封版版本号（0 表示尚未同步过）"""
+        return (await self.db.execute(
+            select(func.max(LibraryVersion.version)).where(
+                LibraryVersion.library == self.spec.library,
+                LibraryVersion.finished_at.is_not(None)
+            )
+        )).scalar() or 0
+
+    async def list_changes(self, since_version: int = 0, skip: int = 0, limit: int = 1000) -> dict:
+        """
+        增量拉取 since_version 之后、已封版版本内的变更
+
+        Returns:
+            {"library", "current_version", "items"}，下游处理完后以 current_version 作为下次的 since_version
+        """
+        current_version = await self.get_current_version()
+        result = await self.db.execute(
+            select(LibraryChange)
+            .where(
+                LibraryChange.library == self.spec.library,
+                LibraryChange.version > since_version,
+                LibraryChange.version <= current_version
+            )
+            .order_by(LibraryChange.version, LibraryChange.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        return {
+            "library": self.spec.library,
+            "current_version": current_version,
+            "items": result.scalars().all(),
+        }
+
+
+async def run_staging_sync(job_id: str, task_type: str, ids: Optional[List[str]] = None) -> None:
+    """后台任务入口：使用独立会话（请求会话在响应返回后即关闭）"""
+    async with AsyncSessionLocal() as session:
+        await StagingSyncService(session, task_type).run_sync(job_id, ids)
@@ -11,6 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.db_meta import User, UserScenarioAssignment, ScenarioAdminPermission
 from app.repositories.user_scenario_assignment import UserScenarioAssignmentRepository
 from app.repositories.scenario_admin_permission import ScenarioAdminPermissionRepository
+from app.core.permission_cache import permission_cache
 from app.core.security import get_password_hash
 
 
@@ -58,7 +59,9 @@ class UserManagementService:
             "created_by": created_by
         }
 
-        return await self.assignment_repo.create(assignment_data)
+        assignment = await self.assignment_repo.create(assignment_data)
+        await permission_cache.invalidate_user(user_id)
+        return assignment
 
     async def remove_scenario_assignment(
         self,
@@ -82,6 +85,7 @@ class UserManagementService:
 
         # 同时删除权限配置（如果存在）
         await self.permission_repo.delete_by_user_and_scenario(user_id, scenario_id)
+        await permission_cache.invalidate_user(user_id)
 
         return assignment_deleted
 
@@ -118,7 +122,9 @@ class UserManagementService:
             permissions["id"] = str(uuid.uuid4())
 
         # 创建或更新权限
-        return await self.permission_repo.create_or_update(user_id, scenario_id, permissions)
+        config = await self.permission_repo.create_or_update(user_id, scenario_id, permissions)
+        await permission_cache.invalidate_user(user_id)
+        return config
 
     async def get_user_scenarios(self, user_id: str) -> List[dict]:
         """
@@ -131,6 +137,12 @@ class UserManagementService:
             场景分配列表
         """
         assignments = await self.assignment_repo.get_user_scenarios(user_id)
+        # 权限配置一次查出，按场景匹配
+        configs = {}
+        if any(a.role == "SCENARIO_ADMIN" for a in assignments):
+            configs = {
+                c.scenario_id: c for c in await self.permission_repo.get_user_all_permissions(user_id)
+            }
         result = []
 
         for assignment in assignments:
@@ -144,9 +156,7 @@ class UserManagementService:
 
             # 如果是场景管理员，获取权限配置
             if assignment.role == "SCENARIO_ADMIN":
-                permission_config = await self.permission_repo.get_user_permission(
-                    user_id, assignment.scenario_id
-                )
+                permission_config = configs.get(assignment.scenario_id)
                 if permission_config:
                     item["permissions"] = {
                         "scenario_basic_info": permission_config.scenario_basic_info,
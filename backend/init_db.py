@@ -13,7 +13,18 @@ from app.models.db_meta import (
     PlaygroundHistory,
     User,
     StagingGlobalKeywords,
-    StagingGlobalRules
+    StagingGlobalRules,
+    BulkJob,
+    KeywordDuplicatePair,
+    KeywordRedundancy,
+    LibraryVersion,
+    LibraryChange,
+    StagingTaskCounter,
+    SchedulerLease,
+    StagingPriorityState,
+    StagingReviewSample,
+    StagingAgreementCounter,
+    UserSession
 )
 
 async def init_database():
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：批量导入支持
+- 创建 bulk_jobs 表（导入任务进度/断点）
+- 为全局/场景敏感词添加唯一索引（INSERT ... ON DUPLICATE KEY UPDATE 依赖）
+"""
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import text
+from app.core.config import settings
+from app.models.db_meta import BulkJob
+
+async def migrate():
+    engine = create_async_engine(settings.DATABASE_URL, echo=True)
+
+    async with engine.begin() as conn:
+        # 创建 bulk_jobs 表
+        await conn.run_sync(lambda sync_conn: BulkJob.__table__.create(sync_conn, checkfirst=True))
+
+    # 唯一索引：存在重复数据时会失败，需要先清理重复行
+    async with engine.begin() as conn:
+        try:
+            await conn.execute(text(
+                "CREATE UNIQUE INDEX uk_global_keyword ON lib_global_keywords(keyword)"
+            ))
+        except Exception as e:
+            print(f"Index uk_global_keyword: {e}")
+            print("  -> 请先清理重复关键词: SELECT keyword, COUNT(*) FROM lib_global_keywords GROUP BY keyword HAVING COUNT(*) > 1")
+
+    async with engine.begin() as conn:
+        try:
+            await conn.execute(text(
+                "CREATE UNIQUE INDEX uk_scenario_keyword ON lib_scenario_keywords(scenario_id, keyword, rule_mode)"
+            ))
+        except Exception as e:
+            print(f"Index uk_scenario_keyword: {e}")
+            print("  -> 请先清理重复关键词: SELECT scenario_id, keyword, rule_mode, COUNT(*) FROM lib_scenario_keywords "
+                  "GROUP BY scenario_id, keyword, rule_mode HAVING COUNT(*) > 1")
+
+    await engine.dispose()
+    print("Migration completed successfully!")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：敏感词变体/近似重复检测
+- lib_global_keywords / lib_scenario_keywords / staging_global_keywords 添加 norm_hash 列及索引
+- 创建 keyword_duplicate_pairs 表（候选对）
+迁移完成后调用 POST /api/v1/keywords/duplicates/scan 回填 norm_hash 并生成候选对
+"""
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import text
+from app.core.config import settings
+from app.models.db_meta import KeywordDuplicatePair
+
+TABLES = ("lib_global_keywords", "lib_scenario_keywords", "staging_global_keywords")
+
+async def migrate():
+    engine = create_async_engine(settings.DATABASE_URL, echo=True)
+
+    for table in TABLES:
+        index_name = f"ix_{table}_norm_hash"  # 与模型 index=True 生成的索引名一致
+        async with engine.begin() as conn:
+            try:
+                await conn.execute(text(
+                    f"ALTER TABLE {table} ADD COLUMN norm_hash CHAR(40) NULL"
+                ))
+            except Exception as e:
+                print(f"Column {table}.norm_hash: {e}")
+
+        async with engine.begin() as conn:
+            try:
+                await conn.execute(text(f"CREATE INDEX {index_name} ON {table}(norm_hash)"))
+            except Exception as e:
+                print(f"Index {index_name}: {e}")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: KeywordDuplicatePair.__table__.create(sync_conn, checkfirst=True))
+
+    await engine.dispose()
+    print("Migration completed successfully!")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：场景敏感词冗余分析
+- 创建 keyword_redundancies 表（分析结果）
+"""
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.config import settings
+from app.models.db_meta import KeywordRedundancy
+
+async def migrate():
+    engine = create_async_engine(settings.DATABASE_URL, echo=True)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: KeywordRedundancy.__table__.create(sync_conn, checkfirst=True))
+
+    await engine.dispose()
+    print("Migration completed successfully!")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
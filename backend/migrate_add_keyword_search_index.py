@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：全局敏感词检索索引
+- ngram 全文索引（中文子串检索，MATCH ... AGAINST）
+- tag_code 普通索引（标签过滤）
+注意：ngram_token_size 默认为 2，需与 app/repositories/global_keywords.py 中 NGRAM_TOKEN_SIZE 一致
+"""
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import text
+from app.core.config import settings
+
+async def migrate():
+    engine = create_async_engine(settings.DATABASE_URL, echo=True)
+
+    async with engine.begin() as conn:
+        try:
+            await conn.execute(text(
+                "ALTER TABLE lib_global_keywords ADD FULLTEXT INDEX ft_global_keyword (keyword) WITH PARSER ngram"
+            ))
+        except Exception as e:
+            print(f"Index ft_global_keyword: {e}")
+
+        try:
+            await conn.execute(text("CREATE INDEX idx_global_keyword_tag ON lib_global_keywords(tag_code)"))
+        except Exception as e:
+            print(f"Index idx_global_keyword_tag: {e}")
+
+    await engine.dispose()
+    print("Migration completed successfully!")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：待审核库批量同步
+- 创建 library_versions 表（正式库版本）
+- 创建 library_changes 表（正式库变更流水）
+- 回填 lib_global_keywords.norm_hash：早期版本的同步对新增的正式关键词写入了未归一化文本的哈希
+"""
+import asyncio
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.config import settings
+from app.models.db_meta import GlobalKeywords, LibraryVersion, LibraryChange
+from app.services.keyword_similarity import normalized_hash
+
+BACKFILL_BATCH_SIZE = 1000
+
+async def backfill_norm_hash(engine) -> int:
+    """按主键分批重算 norm_hash，只更新与归一化哈希不一致的行"""
+    fixed = 0
+    last_id = ""
+    while True:
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                select(GlobalKeywords.id, GlobalKeywords.keyword, GlobalKeywords.norm_hash)
+                .where(GlobalKeywords.id > last_id, GlobalKeywords.norm_hash.is_not(None))
+                .order_by(GlobalKeywords.id)
+                .limit(BACKFILL_BATCH_SIZE)
+            )
+            rows = result.all()
+            if not rows:
+                return fixed
+            for row in rows:
+                expected = normalized_hash(row.keyword)
+                if row.norm_hash != expected:
+                    await conn.execute(
+                        update(GlobalKeywords).where(GlobalKeywords.id == row.id).values(norm_hash=expected)
+                    )
+                    fixed += 1
+            last_id = rows[-1].id
+
+async def migrate():
+    engine = create_async_engine(settings.DATABASE_URL, echo=True)
+
+    async with engine.begin() as conn:
+        for table in (LibraryVersion.__table__, LibraryChange.__table__):
+            await conn.run_sync(lambda sync_conn, t=table: t.create(sync_conn, checkfirst=True))
+
+    try:
+        print(f"Backfilled norm_hash for {await backfill_norm_hash(engine)} global keywords")
+    except Exception as e:
+        print(f"Backfill norm_hash: {e}")
+
+    await engine.dispose()
+    print("Migration completed successfully!")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：权限解析单条 JOIN 查询的覆盖索引
+- user_scenario_roles (user_id, role_id, scenario_id)
+- role_permissions (role_id, permission_id)
+"""
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import text
+from app.core.config import settings
+
+INDEXES = [
+    ("idx_user_scenario_role_user", "user_scenario_roles", "user_id, role_id, scenario_id"),
+    ("idx_role_perm_role_perm", "role_permissions", "role_id, permission_id"),
+]
+
+async def migrate():
+    engine = create_async_engine(settings.DATABASE_URL, echo=True)
+
+    for index_name, table, columns in INDEXES:
+        async with engine.begin() as conn:
+            try:
+                await conn.execute(text(f"CREATE INDEX {index_name} ON {table}({columns})"))
+            except Exception as e:
+                print(f"Index {index_name}: {e}")
+
+    await engine.dispose()
+    print("Migration completed successfully!")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
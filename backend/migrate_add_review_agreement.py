@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：双人审核抽样与一致性统计
+- staging_review_samples：抽样任务及两次审核结论
+- staging_agreement_counters：全局 / 按标签 / 按标注员的一致性累计量（增量维护）
+抽样比例由环境变量 STAGING_DOUBLE_REVIEW_FRACTION 配置，默认 0（关闭）
+"""
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.config import settings
+from app.models.db_meta import StagingAgreementCounter, StagingReviewSample
+
+async def migrate():
+    engine = create_async_engine(settings.DATABASE_URL, echo=True)
+
+    async with engine.begin() as conn:
+        for model in (StagingReviewSample, StagingAgreementCounter):
+            await conn.run_sync(lambda sync_conn, table=model.__table__: table.create(sync_conn, checkfirst=True))
+
+    await engine.dispose()
+    print("Migration completed successfully!")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：角色关联表唯一索引（批量分配 / 权限矩阵编辑依赖唯一索引去重）
+- 清理 role_permissions、user_scenario_roles 中的重复行（保留 id 最小的一行）
+- role_permissions (role_id, permission_id) 唯一索引替换 idx_role_perm_role_perm
+- user_scenario_roles (user_id, role_id, scenario_id) 唯一索引替换 idx_user_scenario_role_user
+"""
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import text
+from app.core.config import settings
+
+STATEMENTS = [
+    """DELETE a FROM role_permissions a JOIN role_permissions b
+       ON a.role_id = b.role_id AND a.permission_id = b.permission_id AND a.id > b.id""",
+    """DELETE a FROM user_scenario_roles a JOIN user_scenario_roles b
+       ON a.user_id = b.user_id AND a.role_id = b.role_id AND a.scenario_id <=> b.scenario_id AND a.id > b.id""",
+    "CREATE UNIQUE INDEX uk_role_permission ON role_permissions(role_id, permission_id)",
+    "CREATE UNIQUE INDEX uk_user_scenario_role ON user_scenario_roles(user_id, role_id, scenario_id)",
+    "DROP INDEX idx_role_perm_role_perm ON role_permissions",
+    "DROP INDEX idx_user_scenario_role_user ON user_scenario_roles",
+]
+
+async def migrate():
+    engine = create_async_engine(settings.DATABASE_URL, echo=True)
+
+    for statement in STATEMENTS:
+        async with engine.begin() as conn:
+            try:
+                await conn.execute(text(statement))
+            except Exception as e:
+                print(f"Statement failed: {statement.split(chr(10))[0]}: {e}")
+
+    await engine.dispose()
+    print("Migration completed successfully!")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
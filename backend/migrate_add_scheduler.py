@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：定时维护任务
+- 创建 scheduler_leases 表（多副本选主租约）
+- staging_global_keywords / staging_global_rules 添加 (status, claimed_at) 联合索引（超时释放）
+- playground_history 添加 created_at 索引（按保留期限清理）
+"""
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import text
+from app.core.config import settings
+from app.models.db_meta import SchedulerLease
+
+INDEXES = [
+    ("idx_staging_kw_status_claimed", "staging_global_keywords", "status, claimed_at"),
+    ("idx_staging_rule_status_claimed", "staging_global_rules", "status, claimed_at"),
+    ("idx_playground_created", "playground_history", "created_at"),
+]
+
+async def migrate():
+    engine = create_async_engine(settings.DATABASE_URL, echo=True)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: SchedulerLease.__table__.create(sync_conn, checkfirst=True))
+
+    for index_name, table, columns in INDEXES:
+        async with engine.begin() as conn:
+            try:
+                await conn.execute(text(f"CREATE INDEX {index_name} ON {table}({columns})"))
+            except Exception as e:
+                print(f"Index {index_name}: {e}")
+
+    await engine.dispose()
+    print("Migration completed successfully!")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：认领任务索引
+- staging_global_keywords / staging_global_rules 添加 (status, created_at) 联合索引
+  认领时按该索引取最早的 PENDING 任务并 FOR UPDATE SKIP LOCKED（需要 MySQL 8.0+）
+"""
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import text
+from app.core.config import settings
+
+INDEXES = {
+    "idx_staging_kw_status_created": "staging_global_keywords",
+    "idx_staging_rule_status_created": "staging_global_rules",
+}
+
+async def migrate():
+    engine = create_async_engine(settings.DATABASE_URL, echo=True)
+
+    for index_name, table in INDEXES.items():
+        async with engine.begin() as conn:
+            try:
+                await conn.execute(text(f"CREATE INDEX {index_name} ON {table}(status, created_at)"))
+            except Exception as e:
+                print(f"Index {index_name}: {e}")
+
+    await engine.dispose()
+    print("Migration completed successfully!")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：待审核任务计数器
+- 创建 staging_task_counters 表
+- 按现有任务数据初始化计数器（与定时对账相同的逻辑）
+"""
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from app.core.config import settings
+from app.models.db_meta import StagingTaskCounter
+from app.services.staging import StagingService, TASK_MODELS
+
+async def migrate():
+    engine = create_async_engine(settings.DATABASE_URL, echo=True)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: StagingTaskCounter.__table__.create(sync_conn, checkfirst=True))
+
+    session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    for task_type in TASK_MODELS:
+        async with session_factory() as session:
+            try:
+                result = await StagingService(session, task_type).counters.reconcile()
+                print(f"Counters for {task_type}: {result}")
+            except Exception as e:
+                print(f"Counters for {task_type}: {e}")
+
+    await engine.dispose()
+    print("Migration completed successfully!")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：待审核任务流式入库与优先认领
+- confidence / priority 字段：模型置信度与认领优先级（已有任务优先级为 0）
+- (status, priority DESC, created_at)：认领时优先分配最不确定的任务，同优先级先到先得
+- 入库去重索引：关键词、(标签, 附加条件)
+"""
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import text
+from app.core.config import settings
+
+TABLES = ["staging_global_keywords", "staging_global_rules"]
+
+INDEXES = [
+    ("idx_staging_kw_claim_priority", "staging_global_keywords", "status, priority DESC, created_at"),
+    ("idx_staging_kw_keyword", "staging_global_keywords", "keyword"),
+    ("idx_staging_rule_claim_priority", "staging_global_rules", "status, priority DESC, created_at"),
+    ("idx_staging_rule_tag_condition", "staging_global_rules", "tag_code, extra_condition"),
+]
+
+async def migrate():
+    engine = create_async_engine(settings.DATABASE_URL, echo=True)
+
+    for table in TABLES:
+        async with engine.begin() as conn:
+            try:
+                await conn.execute(text(f"""
+                    ALTER TABLE {table}
+                    ADD COLUMN confidence FLOAT NULL AFTER is_modified,
+                    ADD COLUMN priority FLOAT NOT NULL DEFAULT 0 AFTER confidence
+                """))
+            except Exception as e:
+                print(f"Columns on {table}: {e}")
+
+    for index_name, table, columns in INDEXES:
+        async with engine.begin() as conn:
+            try:
+                await conn.execute(text(f"CREATE INDEX {index_name} ON {table}({columns})"))
+            except Exception as e:
+                print(f"Index {index_name}: {e}")
+
+    await engine.dispose()
+    print("Migration completed successfully!")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
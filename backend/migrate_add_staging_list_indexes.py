@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：任务列表分页索引
+- (claimed_by, status, claimed_at)：定位用户当前认领批次、标注员查看已认领任务
+- (annotator, status, created_at)：标注员查看自己已审核/已忽略的任务，按创建时间 keyset 分页
+"""
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import text
+from app.core.config import settings
+
+INDEXES = [
+    ("idx_staging_kw_claimer_status", "staging_global_keywords", "claimed_by, status, claimed_at"),
+    ("idx_staging_kw_annotator_status", "staging_global_keywords", "annotator, status, created_at"),
+    ("idx_staging_rule_claimer_status", "staging_global_rules", "claimed_by, status, claimed_at"),
+    ("idx_staging_rule_annotator_status", "staging_global_rules", "annotator, status, created_at"),
+]
+
+async def migrate():
+    engine = create_async_engine(settings.DATABASE_URL, echo=True)
+
+    for index_name, table, columns in INDEXES:
+        async with engine.begin() as conn:
+            try:
+                await conn.execute(text(f"CREATE INDEX {index_name} ON {table}({columns})"))
+            except Exception as e:
+                print(f"Index {index_name}: {e}")
+
+    await engine.dispose()
+    print("Migration completed successfully!")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：待审核任务认领优先级增量刷新
+- priority_at：打分时间，为空表示待打分（已有任务全部待打分，由定时任务分批补齐）
+- prompt_hits / prompt_hits_at：关键词近期提示词命中数（按半衰期衰减）
+- (status, priority_at)：刷新时定位待打分与过期的任务
+- staging_priority_state：提示词扫描进度
+"""
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import text
+from app.core.config import settings
+from app.models.db_meta import StagingPriorityState
+
+COLUMNS = [
+    ("staging_global_keywords", """
+        ADD COLUMN priority_at DATETIME NULL AFTER priority,
+        ADD COLUMN prompt_hits FLOAT NOT NULL DEFAULT 0 AFTER priority_at,
+        ADD COLUMN prompt_hits_at DATETIME NULL AFTER prompt_hits
+    """),
+    ("staging_global_rules", "ADD COLUMN priority_at DATETIME NULL AFTER priority"),
+]
+
+INDEXES = [
+    ("idx_staging_kw_status_priority_at", "staging_global_keywords", "status, priority_at"),
+    ("idx_staging_rule_status_priority_at", "staging_global_rules", "status, priority_at"),
+]
+
+async def migrate():
+    engine = create_async_engine(settings.DATABASE_URL, echo=True)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: StagingPriorityState.__table__.create(sync_conn, checkfirst=True))
+
+    for table, columns in COLUMNS:
+        async with engine.begin() as conn:
+            try:
+                await conn.execute(text(f"ALTER TABLE {table} {columns}"))
+            except Exception as e:
+                print(f"Columns on {table}: {e}")
+
+    for index_name, table, columns in INDEXES:
+        async with engine.begin() as conn:
+            try:
+                await conn.execute(text(f"CREATE INDEX {index_name} ON {table}({columns})"))
+            except Exception as e:
+                print(f"Index {index_name}: {e}")
+
+    await engine.dispose()
+    print("Migration completed successfully!")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
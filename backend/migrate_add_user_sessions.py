@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+数据库迁移脚本：登录会话（刷新令牌）
+- 创建 user_sessions 表（含 (user_id, revoked_at) 联合索引）
+"""
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.config import settings
+from app.models.db_meta import UserSession
+
+async def migrate():
+    engine = create_async_engine(settings.DATABASE_URL, echo=True)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: UserSession.__table__.create(sync_conn, checkfirst=True))
+
+    await engine.dispose()
+    print("Migration completed successfully!")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
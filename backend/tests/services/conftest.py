@@ -0,0 +1,43 @@
+"""
+服务层测试公共工具
+"""
+from typing import List
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class QueryCounter:
+    """记录 with 块内通过会话所在引擎发出的 SQL 语句（每次进入时清空）"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if event.contains(self.engine, "before_cursor_execute", self._record):
+            event.remove(self.engine, "before_cursor_execute", self._record)
+
+
+@pytest.fixture
+def query_counter(db_session: AsyncSession):
+    """统计 SQL 语句数：with query_counter: ... 后读取 query_counter.count"""
+    counter = QueryCounter(db_session.bind.sync_engine)
+    yield counter
+    counter.close()
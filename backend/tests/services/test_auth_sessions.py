@@ -0,0 +1,78 @@
+"""
+登录会话与刷新令牌测试
+"""
+import uuid
+
+import pytest
+from jose import jwt
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.db_meta import User, UserSession
+from app.services.auth_sessions import AuthSessionService
+from app.services.auth_tokens import authenticate
+
+
+def _decode(token: str) -> dict:
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_and_detects_reuse(db_session: AsyncSession):
+    """测试刷新令牌轮换；旧令牌再次使用时吊销会话"""
+    user = User(id=str(uuid.uuid4()), username=f"session_{uuid.uuid4().hex[:8]}", hashed_password="x",
+                role="ANNOTATOR", is_active=True)
+    db_session.add(user)
+    await db_session.commit()
+    service = AuthSessionService(db_session)
+    try:
+        tokens = await service.issue_tokens(user, subject=user.username, user_agent="pytest")
+        assert _decode(tokens["access_token"])["sid"] == tokens["session_id"]
+
+        refreshed = await service.refresh(tokens["refresh_token"])
+        assert refreshed["session_id"] == tokens["session_id"]
+        assert refreshed["refresh_token"] != tokens["refresh_token"]
+        assert _decode(refreshed["access_token"])["sid"] == tokens["session_id"]
+
+        with pytest.raises(ValueError):
+            await service.refresh(tokens["refresh_token"])
+        # 检测到重用后整个会话被吊销，轮换后的新令牌同样失效
+        with pytest.raises(ValueError):
+            await service.refresh(refreshed["refresh_token"])
+        assert await service.list_active_sessions(user.id) == []
+    finally:
+        await db_session.execute(delete(UserSession).where(UserSession.user_id == user.id))
+        await db_session.execute(delete(User).where(User.id == user.id))
+        await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_revoke_user_sessions_rejects_tokens(db_session: AsyncSession):
+    """测试强制下线后访问令牌与刷新令牌均失效，登出只影响当前会话"""
+    user = User(id=str(uuid.uuid4()), username=f"session_{uuid.uuid4().hex[:8]}", hashed_password="x",
+                role="ANNOTATOR", is_active=True)
+    db_session.add(user)
+    await db_session.commit()
+    service = AuthSessionService(db_session)
+    try:
+        first = await service.issue_tokens(user)
+        second = await service.issue_tokens(user)
+        assert len(await service.list_active_sessions(user.id)) == 2
+
+        assert await service.logout(first["refresh_token"]) is True
+        assert await service.logout(first["refresh_token"]) is False
+        current, _ = await authenticate(_decode(first["access_token"]), db_session)
+        assert current is None
+        current, _ = await authenticate(_decode(second["access_token"]), db_session)
+        assert current.id == user.id
+
+        assert await service.revoke_user_sessions(user.id, "USER_DISABLED") == 1
+        current, refreshed = await authenticate(_decode(second["access_token"]), db_session)
+        assert (current, refreshed) == (None, None)
+        with pytest.raises(ValueError):
+            await service.refresh(second["refresh_token"])
+    finally:
+        await db_session.execute(delete(UserSession).where(UserSession.user_id == user.id))
+        await db_session.execute(delete(User).where(User.id == user.id))
+        await db_session.commit()
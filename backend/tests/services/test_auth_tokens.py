@@ -0,0 +1,149 @@
+"""
+访问令牌声明与快速路径测试
+"""
+import uuid
+
+import pytest
+from jose import jwt
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.permission_cache import PermissionCache, permission_cache
+from app.models.db_meta import User
+from app.services import auth_tokens
+from app.services.auth_tokens import authenticate, issue_access_token
+
+
+def _decode(token: str) -> dict:
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+
+@pytest.mark.asyncio
+async def test_fast_path_skips_database_until_epoch_changes(db_session: AsyncSession, query_counter, monkeypatch):
+    """测试版本号未变时不查库；版本号变化后回落到数据库并重新签发令牌"""
+    monkeypatch.setattr(auth_tokens, "AUTH_FAST_PATH", True)
+    user = User(id=str(uuid.uuid4()), username=f"token_{uuid.uuid4().hex[:8]}", hashed_password="x",
+                role="ANNOTATOR", is_active=True)
+    db_session.add(user)
+    await db_session.commit()
+
+    try:
+        payload = _decode(await issue_access_token(user))
+        assert (payload["uid"], payload["role"], payload["act"]) == (user.id, "ANNOTATOR", True)
+
+        with query_counter:
+            current, refreshed = await authenticate(payload, db_session)
+        assert (current.id, current.username, current.role) == (user.id, user.username, "ANNOTATOR")
+        assert refreshed is None and query_counter.count == 0
+
+        await permission_cache.invalidate_user(user.id)
+        current, refreshed = await authenticate(payload, db_session)
+        assert current is user  # 按主键读取（会话内命中身份映射）
+        new_payload = _decode(refreshed)
+        assert new_payload["pe"] == payload["pe"] + 1
+
+        # 旧令牌（只有 sub）按用户名查询，不使用 OR 条件
+        with query_counter:
+            legacy, refreshed = await authenticate({"sub": user.username}, db_session)
+        assert legacy is user and refreshed is None
+        assert not any(" OR " in sql for sql in query_counter.statements)
+    finally:
+        await db_session.execute(delete(User).where(User.id == user.id))
+        await db_session.commit()
+
+
+class _FakeRedis:
+    """进程内模拟的 Redis（只实现版本号用到的命令），down=True 时所有命令失败"""
+
+    def __init__(self):
+        self.data = {}
+        self.down = False
+
+    def _check(self):
+        if self.down:
+            raise ConnectionError("redis unavailable")
+
+    async def mget(self, *keys):
+        self._check()
+        return [self.data.get(key) for key in keys]
+
+    async def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    async def set(self, key, value, nx=False):
+        self._check()
+        if not (nx and key in self.data):
+            self.data[key] = value
+
+    async def incr(self, key):
+        self._check()
+        self.data[key] = str(int(self.data.get(key) or 0) + 1)
+
+    def pipeline(self, transaction=False):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.keys = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def incr(self, key):
+        self.keys.append(key)
+
+    async def execute(self):
+        for key in self.keys:
+            await self.client.incr(key)
+
+
+@pytest.mark.asyncio
+async def test_fast_path_fails_closed(db_session: AsyncSession, monkeypatch):
+    """测试 Redis 不可用、数据丢失或版本号递增未写入时，令牌回落到数据库校验"""
+    redis = _FakeRedis()
+    cache = PermissionCache(redis_url="redis://fake")
+    cache._redis = redis
+    monkeypatch.setattr(auth_tokens, "permission_cache", cache)
+    monkeypatch.setattr(auth_tokens, "AUTH_FAST_PATH", True)
+    user = User(id=str(uuid.uuid4()), username=f"token_{uuid.uuid4().hex[:8]}", hashed_password="x",
+                role="ANNOTATOR", is_active=True)
+    db_session.add(user)
+    await db_session.commit()
+
+    try:
+        payload = _decode(await issue_access_token(user))
+        assert payload["pe"] == 0 and payload["pg"]
+        user.is_active = False  # 停用后令牌声明仍为启用
+        await db_session.commit()
+
+        # Redis 不可用：不信任进程内计数，回落到数据库
+        redis.down = True
+        current, refreshed = await authenticate(payload, db_session)
+        assert current is user and not current.is_active and refreshed is None
+
+        # Redis 数据丢失：版本号归零，但代次改变，旧令牌不再匹配
+        redis.down = False
+        redis.data.clear()
+        current, _ = await authenticate(payload, db_session)
+        assert current is user and not current.is_active
+
+        # 版本号递增写入失败：写入成功前回落到数据库，之后补写
+        user.is_active = True
+        await db_session.commit()
+        payload = _decode(await issue_access_token(user))
+        redis.down = True
+        await cache.invalidate_user(user.id)
+        redis.down = False
+        assert (await cache.auth_epoch(user.id))[1] == payload["pe"] + 1
+        current, refreshed = await authenticate(payload, db_session)
+        assert current is user and _decode(refreshed)["pe"] == payload["pe"] + 1
+    finally:
+        await db_session.execute(delete(User).where(User.id == user.id))
+        await db_session.commit()
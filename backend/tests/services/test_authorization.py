@@ -0,0 +1,63 @@
+"""
+请求级授权上下文测试
+"""
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.permission_cache import permission_cache
+from app.api.v1.permission_helpers import check_scenario_access_or_403, get_user_scenario_ids_or_all
+from app.models.db_meta import (
+    Permission, Role, RolePermission, ScenarioAdminPermission, User, UserScenarioAssignment, UserScenarioRole
+)
+from app.services.authorization import get_authorization_context
+from app.services.user_management import UserManagementService
+
+
+@pytest.mark.asyncio
+async def test_context_answers_v1_and_v2_checks_from_memory(db_session: AsyncSession, query_counter):
+    """测试上下文构建一次后，V1 / V2 的访问与权限判断不再查询数据库"""
+    marker = uuid.uuid4().hex[:8]
+    user = User(id=str(uuid.uuid4()), username=f"authz_{marker}", hashed_password="x", role="SCENARIO_ADMIN")
+    permission = Permission(id=str(uuid.uuid4()), permission_code=f"authz_{marker}", permission_name="authz",
+                            scope="SCENARIO")
+    role = Role(id=str(uuid.uuid4()), role_code=f"authz_{marker}", role_name="authz")
+    db_session.add_all([user, permission, role])
+    db_session.add(RolePermission(id=str(uuid.uuid4()), role_id=role.id, permission_id=permission.id))
+    v1_scenario, v2_scenario = f"authz_v1_{marker}", f"authz_v2_{marker}"
+    await db_session.commit()
+
+    service = UserManagementService(db_session)
+    await service.assign_scenario(user.id, v1_scenario, "SCENARIO_ADMIN", user.id)
+    await service.configure_permissions(user.id, v1_scenario, {"scenario_keywords": True, "scenario_policies": False}, user.id)
+    db_session.add(UserScenarioRole(id=str(uuid.uuid4()), user_id=user.id, scenario_id=v2_scenario, role_id=role.id))
+    await db_session.commit()
+    await permission_cache.invalidate_user(user.id)  # 直接写入的 V2 分配
+
+    try:
+        context = await get_authorization_context(user, db_session)
+        with query_counter:
+            assert await get_authorization_context(user, db_session) is context
+            await check_scenario_access_or_403(user, v1_scenario, db_session)
+            await check_scenario_access_or_403(user, v1_scenario, db_session, permission="scenario_keywords")
+            await check_scenario_access_or_403(user, v2_scenario, db_session)
+            await check_scenario_access_or_403(user, v2_scenario, db_session, permission=permission.permission_code)
+            with pytest.raises(HTTPException):
+                await check_scenario_access_or_403(user, v1_scenario, db_session, permission="scenario_policies")
+            with pytest.raises(HTTPException):
+                await check_scenario_access_or_403(user, "other", db_session)
+            assert sorted(await get_user_scenario_ids_or_all(user, db_session)) == sorted([v1_scenario, v2_scenario])
+
+        assert query_counter.count == 0
+    finally:
+        await db_session.execute(delete(UserScenarioRole).where(UserScenarioRole.user_id == user.id))
+        await db_session.execute(delete(UserScenarioAssignment).where(UserScenarioAssignment.user_id == user.id))
+        await db_session.execute(delete(ScenarioAdminPermission).where(ScenarioAdminPermission.user_id == user.id))
+        await db_session.execute(delete(RolePermission).where(RolePermission.role_id == role.id))
+        await db_session.execute(delete(Role).where(Role.id == role.id))
+        await db_session.execute(delete(Permission).where(Permission.id == permission.id))
+        await db_session.execute(delete(User).where(User.id == user.id))
+        await db_session.commit()
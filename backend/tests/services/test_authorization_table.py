@@ -0,0 +1,214 @@
+"""
+授权决策表测试（增量更新与基准：数据库加载 vs 编译后的决策表）
+"""
+import asyncio
+import os
+import random
+import time
+import uuid
+
+import pytest
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.permission_cache import permission_cache
+from app.models.db_meta import (
+    Permission, Role, RolePermission, ScenarioAdminPermission, User, UserScenarioAssignment, UserScenarioRole
+)
+from app.repositories.role import RoleRepository, UserScenarioRoleRepository
+from app.services.authorization import AuthorizationContext
+from app.services.authorization_table import AuthorizationTable
+from app.services.permission import PermissionService
+from app.services.user_management import UserManagementService
+
+BENCH_USERS = int(os.getenv("AUTHZ_BENCH_USERS", "10000"))
+BENCH_SCENARIOS = int(os.getenv("AUTHZ_BENCH_SCENARIOS", "1000"))
+BENCH_SAMPLE = 200
+
+
+@pytest.mark.asyncio
+async def test_table_matches_database_and_applies_changes(db_session: AsyncSession, query_counter):
+    """测试决策表与数据库解析一致，用户分配变更只重新加载该用户，角色权限变更只重新加载角色位图"""
+    marker = uuid.uuid4().hex[:8]
+    user = User(id=str(uuid.uuid4()), username=f"table_{marker}", hashed_password="x", role="SCENARIO_ADMIN")
+    permissions = [
+        Permission(id=str(uuid.uuid4()), permission_code=f"table_{marker}_{i}", permission_name="table", scope="SCENARIO")
+        for i in range(2)
+    ]
+    roles = [Role(id=str(uuid.uuid4()), role_code=f"table_{marker}_{i}", role_name="table") for i in range(2)]
+    db_session.add_all([user] + permissions + roles)
+    db_session.add_all([
+        RolePermission(id=str(uuid.uuid4()), role_id=roles[0].id, permission_id=permissions[0].id),
+        RolePermission(id=str(uuid.uuid4()), role_id=roles[1].id, permission_id=permissions[1].id),
+        UserScenarioRole(id=str(uuid.uuid4()), user_id=user.id, scenario_id=f"table_{marker}_a", role_id=roles[0].id),
+    ])
+    await db_session.commit()
+    await UserManagementService(db_session).assign_scenario(user.id, f"table_{marker}_v1", "SCENARIO_ADMIN", user.id)
+    await UserManagementService(db_session).configure_permissions(
+        user.id, f"table_{marker}_v1", {"scenario_keywords": True, "scenario_policies": False}, user.id
+    )
+
+    table = AuthorizationTable()
+    service = PermissionService(db_session)
+
+    async def assert_matches_database():
+        v1, v2 = await table.lookup(db_session, user.id)
+        permission_cache.clear()
+        assert v1 == await service.get_v1_grants(user.id)
+        assert v2.to_dict() == (await service.get_v2_permission_set(user.id)).to_dict()
+        return v2
+
+    try:
+        v2 = await assert_matches_database()
+        assert v2.has(permissions[0].permission_code, f"table_{marker}_a")
+
+        with query_counter:
+            await table.lookup(db_session, user.id)
+        assert query_counter.count == 0  # 未发生变更时不查询数据库
+
+        reloads = table.user_reloads
+        await UserScenarioRoleRepository(db_session).assign_role(UserScenarioRole(
+            id=str(uuid.uuid4()), user_id=user.id, scenario_id=f"table_{marker}_b", role_id=roles[1].id
+        ))
+        v2 = await assert_matches_database()
+        assert table.user_reloads == reloads + 1
+        assert v2.has(permissions[1].permission_code, f"table_{marker}_b")
+
+        await RoleRepository(db_session).update_role_permissions(roles[1].id, [permissions[0].id])
+        v2 = await assert_matches_database()
+        assert table.user_reloads == reloads + 1
+        assert v2.has(permissions[0].permission_code, f"table_{marker}_b")
+
+        await RoleRepository(db_session).delete_role(roles[0].id)
+        v2 = await assert_matches_database()
+        assert not v2.has_scenario(f"table_{marker}_a")
+    finally:
+        await db_session.execute(delete(UserScenarioRole).where(UserScenarioRole.user_id == user.id))
+        await db_session.execute(delete(UserScenarioAssignment).where(UserScenarioAssignment.user_id == user.id))
+        await db_session.execute(delete(ScenarioAdminPermission).where(ScenarioAdminPermission.user_id == user.id))
+        await db_session.execute(delete(RolePermission).where(RolePermission.role_id.in_([r.id for r in roles])))
+        await db_session.execute(delete(Role).where(Role.id.in_([r.id for r in roles])))
+        await db_session.execute(delete(Permission).where(Permission.id.in_([p.id for p in permissions])))
+        await db_session.execute(delete(User).where(User.id == user.id))
+        await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_build_once(monkeypatch):
+    """测试并发查询：全量编译与角色位图加载各只执行一次，等待锁的请求直接使用已加载的结果"""
+    table = AuthorizationTable()
+    epochs = {"global": 1}
+    calls = {"rebuild": 0, "role_masks": 0}
+
+    async def epoch(user_id):
+        return epochs["global"], 1
+
+    async def user_epochs(user_ids):
+        return {user_id: 1 for user_id in user_ids}
+
+    async def assigned_user_ids(db):
+        calls["rebuild"] += 1
+        await asyncio.sleep(0.01)
+        return ["u1"]
+
+    async def load_role_masks(db, global_epoch):
+        calls["role_masks"] += 1
+        await asyncio.sleep(0.01)
+        table._global_epoch = global_epoch
+
+    async def load_users(db, user_epochs, only_listed):
+        table._user_epochs.update(user_epochs)
+
+    monkeypatch.setattr(permission_cache, "epoch", epoch)
+    monkeypatch.setattr(permission_cache, "user_epochs", user_epochs)
+    monkeypatch.setattr(table, "_assigned_user_ids", assigned_user_ids)
+    monkeypatch.setattr(table, "_load_role_masks", load_role_masks)
+    monkeypatch.setattr(table, "_load_users", load_users)
+
+    await asyncio.gather(*(table.lookup(None, "u1") for _ in range(10)))
+    assert calls == {"rebuild": 1, "role_masks": 1}
+
+    epochs["global"] = 2
+    await asyncio.gather(*(table.lookup(None, "u1") for _ in range(10)))
+    assert calls == {"rebuild": 1, "role_masks": 2}
+
+
+async def _insert(db_session: AsyncSession, model, rows, chunk_size: int = 5000):
+    for start in range(0, len(rows), chunk_size):
+        await db_session.execute(insert(model), rows[start:start + chunk_size])
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_benchmark_database_vs_compiled_checks(db_session: AsyncSession, query_counter):
+    """基准（-m benchmark 运行）：BENCH_USERS 用户 × BENCH_SCENARIOS 场景下，数据库加载判断与编译后的决策表判断"""
+    marker = f"bench{uuid.uuid4().hex[:6]}"
+    rng = random.Random(42)
+    scenarios = [f"{marker}_{i}" for i in range(BENCH_SCENARIOS)]
+    permission = Permission(id=str(uuid.uuid4()), permission_code=f"{marker}_perm", permission_name="bench",
+                            scope="SCENARIO")
+    role = Role(id=str(uuid.uuid4()), role_code=f"{marker}_role", role_name="bench")
+    db_session.add_all([permission, role])
+    db_session.add(RolePermission(id=str(uuid.uuid4()), role_id=role.id, permission_id=permission.id))
+
+    users = [
+        User(id=str(uuid.uuid4()), username=f"{marker}_{i}", role="SCENARIO_ADMIN" if i % 2 else "ANNOTATOR")
+        for i in range(BENCH_USERS)
+    ]
+    v1_rows, config_rows, v2_rows = [], [], []
+    for user in users:
+        scenario_id = rng.choice(scenarios)
+        v1_rows.append({"id": str(uuid.uuid4()), "user_id": user.id, "scenario_id": scenario_id, "role": user.role})
+        if user.role == "SCENARIO_ADMIN":
+            config_rows.append({"id": str(uuid.uuid4()), "user_id": user.id, "scenario_id": scenario_id,
+                                "scenario_keywords": rng.random() < 0.5})
+        for other in rng.sample(scenarios, 2):
+            v2_rows.append({"id": str(uuid.uuid4()), "user_id": user.id, "scenario_id": other, "role_id": role.id})
+    await _insert(db_session, UserScenarioAssignment, v1_rows)
+    await _insert(db_session, ScenarioAdminPermission, config_rows)
+    await _insert(db_session, UserScenarioRole, v2_rows)
+    await db_session.commit()
+
+    sample = rng.sample(users, BENCH_SAMPLE)
+    checks = [(user, rng.choice(scenarios), rng.choice(["scenario_keywords", permission.permission_code]))
+              for user in sample]
+    service = PermissionService(db_session)
+    table = AuthorizationTable()
+    try:
+        started = time.perf_counter()
+        expected = []
+        for user, scenario_id, code in checks:
+            permission_cache.clear()
+            context = AuthorizationContext(user, await service.get_v1_grants(user.id),
+                                           await service.get_v2_permission_set(user.id))
+            expected.append(context.can_access(scenario_id, code))
+        database_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        await table.lookup(db_session, sample[0].id)
+        build_seconds = time.perf_counter() - started
+
+        with query_counter:
+            started = time.perf_counter()
+            actual = []
+            for user, scenario_id, code in checks:
+                context = AuthorizationContext(user, *await table.lookup(db_session, user.id))
+                actual.append(context.can_access(scenario_id, code))
+            compiled_seconds = time.perf_counter() - started
+
+        print(
+            f"\n{BENCH_USERS} users x {BENCH_SCENARIOS} scenarios: table built in {build_seconds * 1000:.0f} ms; "
+            f"database check {database_seconds / BENCH_SAMPLE * 1e6:.0f} us, "
+            f"compiled check {compiled_seconds / BENCH_SAMPLE * 1e6:.1f} us"
+        )
+        assert actual == expected
+        assert query_counter.count == 0
+        assert table.size >= BENCH_USERS
+        assert compiled_seconds < database_seconds
+    finally:
+        for model in (UserScenarioAssignment, ScenarioAdminPermission, UserScenarioRole):
+            await db_session.execute(delete(model).where(model.scenario_id.like(f"{marker}_%")))
+        await db_session.execute(delete(RolePermission).where(RolePermission.role_id == role.id))
+        await db_session.execute(delete(Role).where(Role.id == role.id))
+        await db_session.execute(delete(Permission).where(Permission.id == permission.id))
+        await db_session.commit()
@@ -0,0 +1,61 @@
+"""
+全局敏感词检索测试
+/keywords/global/search 走 ngram 全文索引（条件按 MySQL 方言编译校验），列表接口保持 LIKE 子串匹配
+"""
+import uuid
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import mysql
+
+from app.models.db_meta import GlobalKeywords
+from app.repositories.global_keywords import GlobalKeywordsRepository
+
+
+def _sql(keyword: str) -> str:
+    condition = GlobalKeywordsRepository(GlobalKeywords, None).search_condition(keyword)
+    statement = select(GlobalKeywords.id).where(condition)
+    return str(statement.compile(dialect=mysql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_search_short_query_falls_back_to_substring_like():
+    """测试短于 ngram token 的查询词不走全文索引，按子串匹配"""
+    sql = _sql("赌")
+
+    assert "MATCH" not in sql
+    assert "LIKE concat('%%', '赌', '%%')" in sql
+
+
+def test_search_ngram_phrase_uses_fulltext_match():
+    """测试多字查询词以短语形式走全文索引"""
+    sql = _sql("赌博网站")
+
+    assert "MATCH (lib_global_keywords.keyword) AGAINST ('\"赌博网站\"' IN BOOLEAN MODE)" in sql
+    assert "LIKE" not in sql
+
+
+def test_search_escapes_special_characters():
+    """测试 LIKE 通配符被转义；短语中的双引号被替换，布尔运算符在短语内不生效"""
+    assert "LIKE concat('%%', '/%%', '%%') ESCAPE '/'" in _sql("%")
+    assert "LIKE concat('%%', '/_', '%%') ESCAPE '/'" in _sql("_")
+    assert "AGAINST ('\"a b +c\"' IN BOOLEAN MODE)" in _sql('a"b +c')
+
+
+@pytest.mark.asyncio
+async def test_get_all_keeps_substring_like(db_session):
+    """测试列表接口的关键词过滤仍为子串匹配"""
+    repository = GlobalKeywordsRepository(GlobalKeywords, db_session)
+    ids = []
+    for text in ("检索子串测试甲", "甲检索子串测试", "无关词条"):
+        keyword = await repository.create(
+            {"id": str(uuid.uuid4()), "keyword": text, "tag_code": "TEST", "risk_level": "LOW"}
+        )
+        ids.append(keyword.id)
+
+    try:
+        items = await repository.get_all(keyword="子串测试")
+        assert {item.keyword for item in items} == {"检索子串测试甲", "甲检索子串测试"}
+        assert {item.keyword for item in await repository.search("子串测试")} == {"检索子串测试甲", "甲检索子串测试"}
+    finally:
+        for keyword_id in ids:
+            await repository.delete(keyword_id)
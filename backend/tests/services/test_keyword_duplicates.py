@@ -0,0 +1,239 @@
+"""
+敏感词变体合并/忽略测试
+"""
+import uuid
+
+import pytest
+from sqlalchemy import delete, or_, select
+
+from app.models.db_meta import (
+    GlobalKeywords, KeywordDuplicatePair, RuleScenarioPolicy, ScenarioKeywords, StagingGlobalKeywords
+)
+from app.schemas.global_keywords import GlobalKeywordsCreate
+from app.schemas.scenario_keywords import ScenarioKeywordsCreate
+from app.services.global_keywords import GlobalKeywordsService
+from app.services.keyword_duplicates import KeywordDuplicateService
+from app.services.keyword_similarity import SOURCE_GLOBAL, SOURCE_SCENARIO, SOURCE_STAGING
+from app.services.scenario_keywords import ScenarioKeywordsService
+from app.services.staging import StagingService
+
+
+def _pair(a, source_a: str, b, source_b: str, scenario_id: str = None) -> KeywordDuplicatePair:
+    return KeywordDuplicatePair(
+        id=str(uuid.uuid4()),
+        source_a=source_a, id_a=a.id, keyword_a=a.keyword,
+        source_b=source_b, id_b=b.id, keyword_b=b.keyword,
+        scenario_id=scenario_id, match_type="NORMALIZED", similarity=1.0, status="OPEN",
+    )
+
+
+@pytest.fixture
+async def scenario_data(db_session):
+    """独立场景ID与测试关键词后缀，测试结束后清理涉及的行"""
+    suffix = uuid.uuid4().hex[:8]
+    scenario_id = f"duplicates-{suffix}"
+
+    yield scenario_id, suffix
+
+    await db_session.rollback()
+    for model in (ScenarioKeywords, RuleScenarioPolicy, KeywordDuplicatePair):
+        await db_session.execute(delete(model).where(model.scenario_id == scenario_id))
+    await db_session.execute(delete(KeywordDuplicatePair).where(or_(
+        KeywordDuplicatePair.keyword_a.contains(suffix), KeywordDuplicatePair.keyword_b.contains(suffix)
+    )))
+    await db_session.execute(delete(GlobalKeywords).where(GlobalKeywords.keyword.contains(suffix)))
+    await db_session.execute(delete(StagingGlobalKeywords).where(StagingGlobalKeywords.keyword.contains(suffix)))
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_merge_keep_a_deletes_b_and_closes_related_pairs(db_session, scenario_data):
+    """测试保留 a：删除场景词 b，候选对标记 MERGED，涉及 b 的其他未处理候选对被清理"""
+    scenario_id, suffix = scenario_data
+    kept = GlobalKeywords(id=str(uuid.uuid4()), keyword=f"变体{suffix}", tag_code="TEST", risk_level="LOW")
+    dropped = ScenarioKeywords(id=str(uuid.uuid4()), scenario_id=scenario_id, keyword=f"变 体{suffix}",
+                               rule_mode=1, category=ScenarioKeywords.CATEGORY_BLACK)
+    other = ScenarioKeywords(id=str(uuid.uuid4()), scenario_id=scenario_id, keyword=f"变体!{suffix}",
+                             rule_mode=1, category=ScenarioKeywords.CATEGORY_BLACK)
+    pair = _pair(kept, SOURCE_GLOBAL, dropped, SOURCE_SCENARIO, scenario_id)
+    related = _pair(other, SOURCE_SCENARIO, dropped, SOURCE_SCENARIO, scenario_id)
+    db_session.add_all([kept, dropped, other, pair, related])
+    await db_session.commit()
+    pair_id, related_id, kept_id, dropped_id = pair.id, related.id, kept.id, dropped.id
+
+    merged = await KeywordDuplicateService(db_session).merge_pair(pair_id, "a", "admin")
+
+    assert (merged.status, merged.resolved_by) == ("MERGED", "admin")
+    assert merged.resolved_at is not None
+    assert await db_session.get(ScenarioKeywords, dropped_id) is None
+    assert await db_session.get(GlobalKeywords, kept_id) is not None
+    assert (await db_session.execute(
+        select(KeywordDuplicatePair.id).where(KeywordDuplicatePair.id == related_id)
+    )).scalar() is None
+
+
+@pytest.mark.asyncio
+async def test_merge_keep_b_deletes_a(db_session, scenario_data):
+    """测试保留 b：删除场景词 a"""
+    scenario_id, suffix = scenario_data
+    first = ScenarioKeywords(id=str(uuid.uuid4()), scenario_id=scenario_id, keyword=f"甲乙{suffix}",
+                             rule_mode=1, category=ScenarioKeywords.CATEGORY_BLACK)
+    second = ScenarioKeywords(id=str(uuid.uuid4()), scenario_id=scenario_id, keyword=f"甲 乙{suffix}",
+                              rule_mode=1, category=ScenarioKeywords.CATEGORY_BLACK)
+    pair = _pair(first, SOURCE_SCENARIO, second, SOURCE_SCENARIO, scenario_id)
+    db_session.add_all([first, second, pair])
+    await db_session.commit()
+    pair_id, first_id, second_id = pair.id, first.id, second.id
+
+    merged = await KeywordDuplicateService(db_session).merge_pair(pair_id, "b", "admin")
+
+    assert merged.status == "MERGED"
+    assert await db_session.get(ScenarioKeywords, first_id) is None
+    assert await db_session.get(ScenarioKeywords, second_id) is not None
+
+
+@pytest.mark.asyncio
+async def test_merge_rejects_whitelist_and_global_drops(db_session, scenario_data):
+    """测试白名单场景词不能并入全局词，全局词只能并入全局词；拒绝后不做任何修改"""
+    scenario_id, suffix = scenario_data
+    global_keyword = GlobalKeywords(id=str(uuid.uuid4()), keyword=f"白名单{suffix}", tag_code="TEST", risk_level="LOW")
+    white = ScenarioKeywords(id=str(uuid.uuid4()), scenario_id=scenario_id, keyword=f"白 名单{suffix}",
+                             rule_mode=1, category=ScenarioKeywords.CATEGORY_WHITE)
+    pair = _pair(global_keyword, SOURCE_GLOBAL, white, SOURCE_SCENARIO, scenario_id)
+    db_session.add_all([global_keyword, white, pair])
+    await db_session.commit()
+    pair_id, white_id, global_id = pair.id, white.id, global_keyword.id
+    service = KeywordDuplicateService(db_session)
+
+    with pytest.raises(ValueError, match="Whitelist"):
+        await service.merge_pair(pair_id, "a", "admin")
+    with pytest.raises(ValueError, match="only be merged into another global keyword"):
+        await service.merge_pair(pair_id, "b", "admin")
+
+    await db_session.rollback()
+    assert (await db_session.get(KeywordDuplicatePair, pair_id)).status == "OPEN"
+    assert await db_session.get(ScenarioKeywords, white_id) is not None
+    assert await db_session.get(GlobalKeywords, global_id) is not None
+
+
+@pytest.mark.asyncio
+async def test_merge_rejects_policy_referenced_keyword_unless_included(db_session, scenario_data):
+    """测试被删除的关键词被场景 KEYWORD 策略引用时默认拒绝合并，显式确认后才删除"""
+    scenario_id, suffix = scenario_data
+    kept = ScenarioKeywords(id=str(uuid.uuid4()), scenario_id=scenario_id, keyword=f"策略词{suffix}",
+                            rule_mode=1, category=ScenarioKeywords.CATEGORY_BLACK)
+    dropped = ScenarioKeywords(id=str(uuid.uuid4()), scenario_id=scenario_id, keyword=f"策 略词{suffix}",
+                               rule_mode=1, category=ScenarioKeywords.CATEGORY_BLACK)
+    policy = RuleScenarioPolicy(id=str(uuid.uuid4()), scenario_id=scenario_id, match_type="KEYWORD",
+                                match_value=dropped.keyword, rule_mode=1, strategy="PASS")
+    pair = _pair(kept, SOURCE_SCENARIO, dropped, SOURCE_SCENARIO, scenario_id)
+    db_session.add_all([kept, dropped, policy, pair])
+    await db_session.commit()
+    pair_id, dropped_id = pair.id, dropped.id
+    service = KeywordDuplicateService(db_session)
+
+    with pytest.raises(ValueError, match="referenced by 1 KEYWORD policies"):
+        await service.merge_pair(pair_id, "a", "admin")
+    await db_session.rollback()
+    assert await db_session.get(ScenarioKeywords, dropped_id) is not None
+
+    merged = await service.merge_pair(pair_id, "a", "admin", include_policy_referenced=True)
+    assert merged.status == "MERGED"
+    assert await db_session.get(ScenarioKeywords, dropped_id) is None
+
+
+@pytest.mark.asyncio
+async def test_merge_global_keyword_checks_policies_in_all_scenarios(db_session, scenario_data):
+    """测试被删除的全局词被任一场景的 KEYWORD 策略引用时拒绝合并"""
+    scenario_id, suffix = scenario_data
+    kept = GlobalKeywords(id=str(uuid.uuid4()), keyword=f"全局词{suffix}", tag_code="TEST", risk_level="LOW")
+    dropped = GlobalKeywords(id=str(uuid.uuid4()), keyword=f"全局 词{suffix}", tag_code="TEST", risk_level="LOW")
+    policy = RuleScenarioPolicy(id=str(uuid.uuid4()), scenario_id=scenario_id, match_type="KEYWORD",
+                                match_value=dropped.keyword, rule_mode=1, strategy="BLOCK")
+    pair = _pair(kept, SOURCE_GLOBAL, dropped, SOURCE_GLOBAL)
+    db_session.add_all([kept, dropped, policy, pair])
+    await db_session.commit()
+
+    with pytest.raises(ValueError, match="referenced by 1 KEYWORD policies"):
+        await KeywordDuplicateService(db_session).merge_pair(pair.id, "a", "admin")
+
+
+@pytest.mark.asyncio
+async def test_merge_staging_keyword_marks_ignored_and_updates_counters(db_session, scenario_data):
+    """测试合并待审核词：标记为 IGNORED（不删除），状态计数器 PENDING -1 / IGNORED +1"""
+    _, suffix = scenario_data
+    staging = StagingService(db_session, "keywords")
+    kept = GlobalKeywords(id=str(uuid.uuid4()), keyword=f"待审{suffix}", tag_code="TEST", risk_level="LOW")
+    task = StagingGlobalKeywords(id=str(uuid.uuid4()), keyword=f"待 审{suffix}",
+                                 predicted_tag="TEST", predicted_risk="LOW")
+    db_session.add(kept)
+    await staging.add_tasks([task])
+    pair = _pair(kept, SOURCE_GLOBAL, task, SOURCE_STAGING)
+    db_session.add(pair)
+    await db_session.commit()
+    pair_id, task_id = pair.id, task.id
+    before = await staging.counters.status_counts()
+
+    merged = await KeywordDuplicateService(db_session).merge_pair(pair_id, "a", "admin")
+
+    assert merged.status == "MERGED"
+    task = await db_session.get(StagingGlobalKeywords, task_id)
+    assert (task.status, task.annotator) == ("IGNORED", "admin")
+    after = await staging.counters.status_counts()
+    assert after.get("PENDING", 0) == before.get("PENDING", 0) - 1
+    assert after.get("IGNORED", 0) == before.get("IGNORED", 0) + 1
+
+
+@pytest.mark.asyncio
+async def test_dismiss_pair(db_session, scenario_data):
+    """测试标记为非重复后不可再次处理，关键词保持不变"""
+    scenario_id, suffix = scenario_data
+    first = ScenarioKeywords(id=str(uuid.uuid4()), scenario_id=scenario_id, keyword=f"忽略{suffix}",
+                             rule_mode=1, category=ScenarioKeywords.CATEGORY_BLACK)
+    second = ScenarioKeywords(id=str(uuid.uuid4()), scenario_id=scenario_id, keyword=f"忽 略{suffix}",
+                              rule_mode=1, category=ScenarioKeywords.CATEGORY_BLACK)
+    pair = _pair(first, SOURCE_SCENARIO, second, SOURCE_SCENARIO, scenario_id)
+    db_session.add_all([first, second, pair])
+    await db_session.commit()
+    pair_id, first_id, second_id = pair.id, first.id, second.id
+    service = KeywordDuplicateService(db_session)
+
+    dismissed = await service.dismiss_pair(pair_id, "admin")
+
+    assert (dismissed.status, dismissed.resolved_by) == ("DISMISSED", "admin")
+    with pytest.raises(ValueError, match="already dismissed"):
+        await service.merge_pair(pair_id, "a", "admin")
+    assert await db_session.get(ScenarioKeywords, first_id) is not None
+    assert await db_session.get(ScenarioKeywords, second_id) is not None
+
+
+@pytest.mark.asyncio
+async def test_create_keyword_flags_variants(db_session, scenario_data):
+    """测试创建全局词/场景词时即时登记与已有关键词的变体候选对"""
+    scenario_id, suffix = scenario_data
+    existing = GlobalKeywords(id=str(uuid.uuid4()), keyword=f"新建变体{suffix}", tag_code="TEST", risk_level="LOW")
+    db_session.add(existing)
+    await db_session.commit()
+    existing_id = existing.id
+
+    created = await GlobalKeywordsService(db_session).create_keyword(
+        GlobalKeywordsCreate(keyword=f"新建 变体{suffix}", tag_code="TEST", risk_level="LOW")
+    )
+    scenario_keyword = await ScenarioKeywordsService(db_session).create_keyword(ScenarioKeywordsCreate(
+        scenario_id=scenario_id, keyword=f"新建变体!{suffix}", tag_code="TEST", rule_mode=1
+    ))
+
+    result = await db_session.execute(select(KeywordDuplicatePair).where(or_(
+        KeywordDuplicatePair.id_a.in_([created.id, scenario_keyword.id]),
+        KeywordDuplicatePair.id_b.in_([created.id, scenario_keyword.id]),
+    )))
+    pairs = {
+        frozenset({(p.source_a, p.id_a), (p.source_b, p.id_b)}): p for p in result.scalars().all()
+    }
+    assert set(pairs) == {
+        frozenset({(SOURCE_GLOBAL, existing_id), (SOURCE_GLOBAL, created.id)}),
+        frozenset({(SOURCE_GLOBAL, existing_id), (SOURCE_SCENARIO, scenario_keyword.id)}),
+        frozenset({(SOURCE_GLOBAL, created.id), (SOURCE_SCENARIO, scenario_keyword.id)}),
+    }
+    assert all(p.match_type == "NORMALIZED" and p.status == "OPEN" for p in pairs.values())
+    assert pairs[frozenset({(SOURCE_GLOBAL, existing_id), (SOURCE_SCENARIO, scenario_keyword.id)})].scenario_id == scenario_id
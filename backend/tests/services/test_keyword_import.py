@@ -0,0 +1,109 @@
+"""
+敏感词批量导入解析测试
+"""
+import uuid
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.db_meta import GlobalKeywords, ScenarioKeywords
+from app.repositories.global_keywords import GlobalKeywordsRepository
+from app.repositories.scenario_keywords import ScenarioKeywordsRepository
+from app.schemas.global_keywords import GlobalKeywordsCreate, GlobalKeywordsUpdate
+from app.services.global_keywords import GlobalKeywordsService
+from app.services.keyword_import import detect_format, iter_records, iter_text_lines
+
+
+async def _blocks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def _collect(lines, fmt):
+    return [item async for item in iter_records(lines, fmt)]
+
+
+@pytest.mark.asyncio
+async def test_iter_text_lines_handles_split_multibyte_and_bom():
+    """测试跨块的多字节字符、BOM 与 CRLF"""
+    data = "\ufeff敏感词,TAG\r\n第二行".encode("utf-8")
+    # 在多字节字符中间切开
+    parts = (data[:5], data[5:11], data[11:])
+    lines = [line async for line in iter_text_lines(_blocks(*parts))]
+    assert lines == ["敏感词,TAG", "第二行"]
+
+
+@pytest.mark.asyncio
+async def test_iter_records_csv_reports_row_errors():
+    """测试 CSV 解析：表头、空行与列数错误"""
+    text = "keyword,tag_code,risk_level\nfoo,T,High\n\nbar,T\n"
+    records = await _collect(iter_text_lines(_blocks(text.encode())), "csv")
+
+    assert records[0] == (2, {"keyword": "foo", "tag_code": "T", "risk_level": "High"}, None)
+    row_no, record, error = records[1]
+    assert row_no == 4
+    assert record is None
+    assert "columns" in error
+
+
+@pytest.mark.asyncio
+async def test_iter_records_jsonl():
+    """测试 JSONL 解析：非对象行和非法 JSON 行报错"""
+    text = '{"keyword": "foo"}\n[1, 2]\n{bad\n'
+    records = await _collect(iter_text_lines(_blocks(text.encode())), "jsonl")
+
+    assert records[0] == (1, {"keyword": "foo"}, None)
+    assert records[1][0] == 2 and records[1][2] is not None
+    assert records[2][0] == 3 and records[2][2].startswith("Invalid JSON")
+
+
+def test_detect_format():
+    """测试文件格式识别"""
+    assert detect_format("words.csv") == "csv"
+    assert detect_format("words.ndjson") == "jsonl"
+    assert detect_format("anything.bin", "NDJSON") == "jsonl"
+    with pytest.raises(ValueError):
+        detect_format("words.xlsx")
+
+
+@pytest.mark.asyncio
+async def test_rename_to_existing_keyword_is_rejected(db_session: AsyncSession):
+    """测试改名为已存在的关键词时由唯一索引拦截，返回“已存在”而不是数据库错误"""
+    marker = uuid.uuid4().hex[:8]
+    service = GlobalKeywordsService(db_session)
+    first = await service.create_keyword(GlobalKeywordsCreate(keyword=f"uk_a_{marker}", tag_code="T", risk_level="High"))
+    second = await service.create_keyword(GlobalKeywordsCreate(keyword=f"uk_b_{marker}", tag_code="T", risk_level="High"))
+    ids = [first.id, second.id]
+    try:
+        with pytest.raises(ValueError, match="already exists"):
+            await service.update_keyword(ids[1], GlobalKeywordsUpdate(keyword=f"uk_a_{marker}"))
+        renamed = await service.update_keyword(ids[1], GlobalKeywordsUpdate(keyword=f"uk_c_{marker}"))
+        assert renamed.keyword == f"uk_c_{marker}"
+    finally:
+        await db_session.execute(delete(GlobalKeywords).where(GlobalKeywords.id.in_(ids)))
+        await db_session.commit()
+
+
+class _RecordingSession:
+    """只记录语句、不执行的会话（按 MySQL 方言编译校验 upsert 语句）"""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_refreshes_norm_hash():
+    """测试重复导入已存在的关键词时同时刷新 norm_hash（变体检测依赖该列）"""
+    for model, repository_cls, row in (
+        (GlobalKeywords, GlobalKeywordsRepository, {"keyword": "a", "tag_code": "T", "risk_level": "L"}),
+        (ScenarioKeywords, ScenarioKeywordsRepository, {"scenario_id": "s", "keyword": "a", "rule_mode": 1}),
+    ):
+        session = _RecordingSession()
+        await repository_cls(model, session).bulk_upsert([{"id": "1", "norm_hash": "h", **row}])
+        sql = str(session.statements[0].compile(dialect=mysql.dialect()))
+        assert "norm_hash = VALUES(norm_hash)" in sql
@@ -0,0 +1,87 @@
+"""
+场景敏感词冗余分析测试
+"""
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import delete
+
+from app.models.db_meta import GlobalKeywords, KeywordRedundancy, RuleScenarioPolicy, ScenarioKeywords
+from app.services.keyword_automaton import KeywordAutomaton
+from app.services.keyword_redundancy import (
+    GlobalEntry, KeywordRedundancyService, analyze_scenario_keywords, build_global_automaton,
+    KIND_EXACT, KIND_SUBSUMED, KIND_WHITELIST_OVERRIDES_GLOBAL, KIND_WHITE_BLACK_CONFLICT,
+)
+
+
+def _row(id, keyword, category=1, rule_mode=1, tag_code=None):
+    return SimpleNamespace(id=id, keyword=keyword, category=category, rule_mode=rule_mode, tag_code=tag_code)
+
+
+def test_automaton_finds_overlapping_matches():
+    """测试自动机：重叠与嵌套关键词全部命中"""
+    automaton = KeywordAutomaton()
+    for word in ["he", "she", "his", "hers"]:
+        automaton.add(word)
+    automaton.build()
+
+    matches = sorted((start, end, word) for start, end, word in automaton.iter_matches("ushers"))
+    assert matches == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+    assert automaton.find_all("nothing") == []
+
+
+def test_analyze_scenario_keywords():
+    """测试完全重复、包含、白名单覆盖与黑白冲突"""
+    automaton = build_global_automaton([
+        GlobalEntry("g1", "赌博", "GAMBLING"),
+        GlobalEntry("g2", "毒品", "DRUG"),
+    ])
+    rows = [
+        _row("s1", "赌博", tag_code="GAMBLING"),
+        _row("s2", "网络赌博平台", tag_code="FRAUD"),
+        _row("s3", "毒品", category=0),
+        _row("s4", "正常词"),
+        _row("s5", "正常词", category=0, rule_mode=0),
+    ]
+    findings = {f.scenario_keyword_id: f for f in analyze_scenario_keywords(automaton, "app", rows)}
+
+    assert findings["s1"].kind == KIND_EXACT and findings["s1"].tag_match
+    assert findings["s2"].kind == KIND_SUBSUMED and findings["s2"].related_id == "g1"
+    assert not findings["s2"].tag_match
+    assert findings["s3"].kind == KIND_WHITELIST_OVERRIDES_GLOBAL
+    assert findings["s5"].kind == KIND_WHITE_BLACK_CONFLICT and findings["s5"].related_id == "s4"
+    assert "s4" not in findings
+
+
+@pytest.mark.asyncio
+async def test_cleanup_skips_keywords_referenced_by_policies(db_session):
+    """测试被场景 KEYWORD 策略引用的冗余关键词默认不清理，并在结果中报告"""
+    scenario_id = f"redundancy-{uuid.uuid4().hex[:8]}"
+    global_id = str(uuid.uuid4())
+    db_session.add(GlobalKeywords(id=global_id, keyword="冗余策略词", tag_code="TEST", risk_level="LOW"))
+    db_session.add_all([
+        ScenarioKeywords(id=str(uuid.uuid4()), scenario_id=scenario_id, keyword="冗余策略词", rule_mode=1, category=1),
+        ScenarioKeywords(id=str(uuid.uuid4()), scenario_id=scenario_id, keyword="冗余策略词网站", rule_mode=1, category=1),
+        RuleScenarioPolicy(
+            id=str(uuid.uuid4()), scenario_id=scenario_id, match_type="KEYWORD",
+            match_value="冗余策略词", rule_mode=1, strategy="PASS"
+        ),
+    ])
+    await db_session.commit()
+    service = KeywordRedundancyService(db_session)
+
+    try:
+        result = await service.cleanup_scenario(scenario_id)
+        assert [f.keyword for f in result["items"]] == ["冗余策略词网站"]
+        assert [f.keyword for f in result["skipped_referenced"]] == ["冗余策略词"]
+        assert result["deleted_count"] == 1
+
+        result = await service.cleanup_scenario(scenario_id, include_policy_referenced=True)
+        assert [f.keyword for f in result["items"]] == ["冗余策略词"]
+        assert result["skipped_referenced"] == []
+    finally:
+        for model in (ScenarioKeywords, RuleScenarioPolicy, KeywordRedundancy):
+            await db_session.execute(delete(model).where(model.scenario_id == scenario_id))
+        await db_session.execute(delete(GlobalKeywords).where(GlobalKeywords.id == global_id))
+        await db_session.commit()
@@ -0,0 +1,57 @@
+"""
+敏感词归一化与近似重复检测测试
+"""
+from app.services.keyword_similarity import (
+    KeywordEntry, MATCH_NORMALIZED, MATCH_SIMILAR,
+    find_duplicate_pairs, normalize_keyword, normalized_hash, edit_distance,
+)
+
+
+def test_normalize_keyword_folds_variants():
+    """测试全/半角、繁简、大小写、空格符号与零宽字符的归一化"""
+    assert normalize_keyword("ＡＢＣ　ｄ") == "abcd"
+    assert normalize_keyword("賭博") == "赌博"
+    assert normalize_keyword("赌 博!") == "赌博"
+    assert normalize_keyword("​色-情") == "色情"
+    assert normalize_keyword("***") == "***"
+    assert normalized_hash("Fa Lun") == normalized_hash("ｆａｌｕｎ")
+
+
+def test_edit_distance():
+    assert edit_distance("kitten", "sitting") == 3
+    assert edit_distance("", "abc") == 3
+    assert edit_distance("赌博网站", "赌博网站") == 0
+
+
+def test_find_duplicate_pairs_respects_scope():
+    """测试归一化分组与作用域：不同场景的场景词互不视为重复"""
+    entries = [
+        KeywordEntry("SCENARIO", "s1-1", "赌 博 网站", scenario_id="s1"),
+        KeywordEntry("SCENARIO", "s2-1", "赌 博 网站", scenario_id="s2"),
+        KeywordEntry("GLOBAL", "g-1", "赌博网站"),
+        KeywordEntry("STAGING", "st-1", "賭博網站"),
+        KeywordEntry("SCENARIO", "s3-1", "完全不同", scenario_id="s3"),
+        KeywordEntry("SCENARIO", "s3-2", "完全不同!", scenario_id="s4"),
+    ]
+    pairs = {(p.a.id, p.b.id, p.match_type) for p in find_duplicate_pairs(entries)}
+
+    assert pairs == {
+        ("g-1", "st-1", MATCH_NORMALIZED),
+        ("g-1", "s1-1", MATCH_NORMALIZED),
+        ("g-1", "s2-1", MATCH_NORMALIZED),
+    }
+
+
+def test_find_duplicate_pairs_near_duplicates():
+    """测试编辑距离近似：一个字符不同的长词被发现，短词不误报"""
+    entries = [
+        KeywordEntry("GLOBAL", "1", "网络赌博平台官网"),
+        KeywordEntry("GLOBAL", "2", "网络赌搏平台官网"),
+        KeywordEntry("GLOBAL", "3", "网络游戏平台"),
+        KeywordEntry("GLOBAL", "4", "赌博"),
+        KeywordEntry("GLOBAL", "5", "赌搏"),
+    ]
+    pairs = find_duplicate_pairs(entries)
+
+    assert [(p.a.id, p.b.id, p.match_type) for p in pairs] == [("1", "2", MATCH_SIMILAR)]
+    assert pairs[0].similarity == 0.875
@@ -0,0 +1,195 @@
+"""
+词库流式导出测试
+覆盖 keyset 分块、CSV / JSONL 编码、gzip 输出以及导出接口的审计日志
+"""
+import csv
+import gzip
+import io
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.v1.endpoints import global_keywords as global_keywords_endpoint
+from app.api.v1.endpoints import meta_tags as meta_tags_endpoint
+from app.api.v1.endpoints import scenario_keywords as scenario_keywords_endpoint
+from app.models.db_meta import GlobalKeywords
+from app.repositories.global_keywords import GlobalKeywordsRepository
+from app.services import library_export
+from app.services.audit import AuditService
+from app.services.library_export import (
+    global_keywords_spec, iter_export_chunks, stream_export, _encode_rows
+)
+
+KEYWORDS = ["导出,逗号", '导出"引号"', "导出\n换行", "导出普通词", "导出,混合\"词"]
+
+
+async def _collect(stream) -> bytes:
+    return b"".join([chunk async for chunk in stream])
+
+
+@pytest.fixture
+async def exported_keywords(db_session):
+    """创建一组独立标签的全局敏感词，测试结束后清理"""
+    repository = GlobalKeywordsRepository(GlobalKeywords, db_session)
+    tag_code = f"EXPORT_{uuid.uuid4().hex[:8]}"
+    ids = []
+    for text in KEYWORDS:
+        keyword = await repository.create({
+            "id": str(uuid.uuid4()), "keyword": f"{text}{tag_code}",
+            "tag_code": tag_code, "risk_level": "LOW", "is_active": True
+        })
+        ids.append(keyword.id)
+
+    yield tag_code, ids
+
+    for keyword_id in ids:
+        await repository.delete(keyword_id)
+
+
+def test_encode_rows_csv_quotes_commas_and_quotes():
+    """测试 CSV 编码对逗号、引号、换行正确转义，布尔值与空值按约定输出"""
+    columns = ["id", "keyword", "is_active", "tag_code"]
+    rows = [("1", "a,b", True, None), ("2", 'say "hi"', False, "T"), ("3", "x\ny", True, "T")]
+
+    data = _encode_rows(rows, columns, "csv")
+
+    assert b'"a,b"' in data
+    assert b'"say ""hi"""' in data
+    parsed = list(csv.reader(io.StringIO(data.decode("utf-8"))))
+    assert parsed == [
+        ["1", "a,b", "true", ""],
+        ["2", 'say "hi"', "false", "T"],
+        ["3", "x\ny", "true", "T"],
+    ]
+
+
+def test_encode_rows_jsonl_one_object_per_line():
+    """测试 JSONL 编码每行一个对象，中文不转义"""
+    columns = ["id", "keyword", "is_active"]
+    rows = [("1", '赌博,"网站"', True), ("2", "x\ny", False)]
+
+    data = _encode_rows(rows, columns, "jsonl")
+
+    lines = data.decode("utf-8").splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0]) == {"id": "1", "keyword": '赌博,"网站"', "is_active": True}
+    assert json.loads(lines[1]) == {"id": "2", "keyword": "x\ny", "is_active": False}
+    assert "赌博".encode("utf-8") in data
+
+
+@pytest.mark.asyncio
+async def test_iter_export_chunks_keyset_across_chunks(monkeypatch, exported_keywords):
+    """测试分块小于总行数时按主键 keyset 连续翻页，行不重不漏"""
+    tag_code, ids = exported_keywords
+    monkeypatch.setattr(library_export, "EXPORT_CHUNK_SIZE", 2)
+
+    chunks = [rows async for rows in iter_export_chunks(global_keywords_spec(tag_code=tag_code))]
+
+    assert [len(rows) for rows in chunks] == [2, 2, 1]
+    exported_ids = [row[0] for rows in chunks for row in rows]
+    assert exported_ids == sorted(ids)
+
+
+@pytest.mark.asyncio
+async def test_stream_export_csv_round_trip(monkeypatch, exported_keywords):
+    """测试 CSV 导出含表头，跨分块的含逗号/引号关键词可原样解析"""
+    tag_code, _ = exported_keywords
+    monkeypatch.setattr(library_export, "EXPORT_CHUNK_SIZE", 2)
+    spec = global_keywords_spec(tag_code=tag_code)
+
+    data = await _collect(stream_export(spec, "csv"))
+
+    parsed = list(csv.reader(io.StringIO(data.decode("utf-8"))))
+    assert parsed[0] == spec.columns
+    assert sorted(row[1] for row in parsed[1:]) == sorted(f"{text}{tag_code}" for text in KEYWORDS)
+    assert all(row[2] == tag_code and row[4] == "true" for row in parsed[1:])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+async def test_stream_export_gzip_matches_plain(monkeypatch, exported_keywords, fmt):
+    """测试 gzip 输出解压后与未压缩输出逐字节一致"""
+    tag_code, _ = exported_keywords
+    monkeypatch.setattr(library_export, "EXPORT_CHUNK_SIZE", 2)
+    spec = global_keywords_spec(tag_code=tag_code)
+
+    plain = await _collect(stream_export(spec, fmt))
+    compressed = await _collect(stream_export(spec, fmt, compress=True))
+
+    assert compressed[:2] == b"\x1f\x8b"
+    assert gzip.decompress(compressed) == plain
+    if fmt == "jsonl":
+        assert len(plain.decode("utf-8").splitlines()) == len(KEYWORDS)
+
+
+@pytest.fixture
+def export_audit_calls(monkeypatch):
+    """记录 AuditService.log_export 的调用参数"""
+    calls = []
+
+    async def log_export(self, **kwargs):
+        calls.append(kwargs)
+
+    monkeypatch.setattr(AuditService, "log_export", log_export)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_export_keywords_endpoint_logs_export(db_session, exported_keywords, export_audit_calls):
+    """测试全局敏感词导出接口记录审计日志并返回流式响应"""
+    tag_code, _ = exported_keywords
+    user = SimpleNamespace(id=str(uuid.uuid4()), username="export_tester")
+
+    response = await global_keywords_endpoint.export_keywords(
+        request=None, format="jsonl", compress=True, tag=tag_code, db=db_session, current_user=user
+    )
+
+    assert export_audit_calls == [{
+        "user_id": user.id,
+        "username": "export_tester",
+        "resource_type": "GLOBAL_KEYWORD",
+        "details": {"format": "jsonl", "compress": True, "tag_code": tag_code},
+        "request": None,
+    }]
+    assert response.media_type == "application/gzip"
+    body = gzip.decompress(await _collect(response.body_iterator))
+    assert len(body.decode("utf-8").splitlines()) == len(KEYWORDS)
+
+
+@pytest.mark.asyncio
+async def test_export_tags_endpoint_logs_export(db_session, export_audit_calls):
+    """测试标签导出接口记录审计日志"""
+    user = SimpleNamespace(id=str(uuid.uuid4()), username="export_tester")
+
+    response = await meta_tags_endpoint.export_tags(
+        request=None, format="csv", compress=False, db=db_session, current_user=user
+    )
+
+    assert [call["resource_type"] for call in export_audit_calls] == ["META_TAG"]
+    assert export_audit_calls[0]["details"] == {"format": "csv", "compress": False}
+    assert response.media_type == "text/csv; charset=utf-8"
+
+
+@pytest.mark.asyncio
+async def test_export_scenario_keywords_endpoint_logs_export(monkeypatch, db_session, export_audit_calls):
+    """测试场景敏感词导出接口在权限检查通过后记录带场景ID的审计日志"""
+    checked = []
+
+    async def allow(user, scenario_id, db, permission=None):
+        checked.append((scenario_id, permission))
+
+    monkeypatch.setattr(scenario_keywords_endpoint, "check_scenario_access_or_403", allow)
+    user = SimpleNamespace(id=str(uuid.uuid4()), username="export_tester")
+    scenario_id = f"export_{uuid.uuid4().hex[:8]}"
+
+    await scenario_keywords_endpoint.export_scenario_keywords(
+        scenario_id=scenario_id, request=None, format="csv", compress=False,
+        rule_mode=1, db=db_session, current_user=user
+    )
+
+    assert checked == [(scenario_id, "scenario_keywords")]
+    assert export_audit_calls[0]["resource_type"] == "SCENARIO_KEYWORD"
+    assert export_audit_calls[0]["scenario_id"] == scenario_id
+    assert export_audit_calls[0]["details"] == {"format": "csv", "compress": False, "rule_mode": 1}
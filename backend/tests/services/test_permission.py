@@ -2,10 +2,11 @@
 权限服务测试
 """
 import pytest
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.permission import PermissionService
 from app.services.user_management import UserManagementService
-from app.models.db_meta import User
+from app.models.db_meta import Scenarios, User
 from app.core.security import get_password_hash
 import uuid
 
@@ -200,12 +201,16 @@ async def test_get_user_permissions(db_session: AsyncSession):
         is_active=True
     )
     db_session.add(scenario_admin)
+    scenario_1 = "test_scenario_004"
+    scenario_2 = "test_scenario_005"
+    # 只返回存在且启用的场景
+    for app_id in (scenario_1, scenario_2):
+        if not (await db_session.execute(select(Scenarios.id).where(Scenarios.app_id == app_id))).scalar():
+            db_session.add(Scenarios(id=str(uuid.uuid4()), app_id=app_id, app_name=app_id))
     await db_session.commit()
 
     # 分配多个场景
     user_mgmt_service = UserManagementService(db_session)
-    scenario_1 = "test_scenario_004"
-    scenario_2 = "test_scenario_005"
 
     await user_mgmt_service.assign_scenario(
         user_id=admin_id,
@@ -309,3 +314,58 @@ async def test_permission_update_immediately_effective(db_session: AsyncSession)
 
     # 验证权限立即生效
     assert await perm_service.check_scenario_permission(admin_id, test_scenario_id, "scenario_policies")
+
+
+@pytest.mark.asyncio
+async def test_get_user_permissions_batched(db_session: AsyncSession, query_counter):
+    """测试场景权限列表一次查询组装：按 app_id 关联场景名称，未配置细粒度权限时使用默认值"""
+    from sqlalchemy import delete
+    from app.models.db_meta import Scenarios, UserScenarioAssignment, ScenarioAdminPermission
+
+    admin_id = str(uuid.uuid4())
+    db_session.add(User(
+        id=admin_id,
+        username=f"test_scenario_admin_{uuid.uuid4().hex[:8]}",
+        hashed_password=get_password_hash("test123"),
+        role="SCENARIO_ADMIN",
+        is_active=True
+    ))
+    app_ids = [f"batch_{admin_id[:8]}_{i}" for i in range(20)]
+    # app_ids[2] 对应的场景已删除，app_ids[3] 已停用
+    db_session.add_all([
+        Scenarios(id=str(uuid.uuid4()), app_id=app_id, app_name="批量场景" if i == 0 else app_id,
+                  is_active=i != 3)
+        for i, app_id in enumerate(app_ids) if i != 2
+    ])
+    await db_session.commit()
+
+    user_mgmt_service = UserManagementService(db_session)
+    for app_id in app_ids:
+        await user_mgmt_service.assign_scenario(admin_id, app_id, "SCENARIO_ADMIN", admin_id)
+    await user_mgmt_service.configure_permissions(
+        admin_id, app_ids[1], {"scenario_policies": True, "performance_test": True}, admin_id
+    )
+
+    try:
+        perm_service = PermissionService(db_session)
+        with query_counter:
+            permissions = await perm_service.get_user_permissions(admin_id)
+        # 用户本身在会话中已加载，只需一条组装查询
+        assert query_counter.count <= 2
+        by_id = {s["scenario_id"]: s for s in permissions["scenarios"]}
+        assert len(by_id) == 18
+        assert by_id[app_ids[0]]["scenario_name"] == "批量场景"
+        assert app_ids[2] not in by_id  # 已删除的场景不返回
+        assert app_ids[3] not in by_id  # 停用的场景不返回
+        assert by_id[app_ids[1]]["permissions"]["scenario_policies"] is True
+        assert by_id[app_ids[4]]["permissions"]["scenario_policies"] is False
+
+        # 第二次读取命中缓存，不再查询场景分配
+        with query_counter:
+            await perm_service.get_user_permissions(admin_id)
+        assert not any("user_scenario_assignments" in sql for sql in query_counter.statements)
+    finally:
+        await db_session.execute(delete(ScenarioAdminPermission).where(ScenarioAdminPermission.user_id == admin_id))
+        await db_session.execute(delete(UserScenarioAssignment).where(UserScenarioAssignment.user_id == admin_id))
+        await db_session.execute(delete(Scenarios).where(Scenarios.app_id.in_(app_ids)))
+        await db_session.commit()
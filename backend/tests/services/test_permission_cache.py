@@ -0,0 +1,76 @@
+"""
+用户有效权限缓存测试
+"""
+import uuid
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.permission_cache import PermissionCache, permission_cache
+from app.models.db_meta import User, UserScenarioAssignment
+from app.services.permission import PermissionService
+from app.services.user_management import UserManagementService
+
+
+class _Loader:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return self.calls
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_until_epoch_changes():
+    """测试命中、按用户/全局版本号失效、LRU 淘汰"""
+    cache = PermissionCache(ttl_seconds=60, max_entries=2, redis_url=None)
+    loader = _Loader()
+
+    assert await cache.get_or_load("u1", "v2", loader) == 1
+    assert await cache.get_or_load("u1", "v2", loader) == 1
+    await cache.invalidate_user("u2")
+    assert await cache.get_or_load("u1", "v2", loader) == 1
+    await cache.invalidate_user("u1")
+    assert await cache.get_or_load("u1", "v2", loader) == 2
+    await cache.invalidate_all()
+    assert await cache.get_or_load("u1", "v2", loader) == 3
+
+    await cache.get_or_load("u2", "v2", loader)
+    await cache.get_or_load("u3", "v2", loader)   # 淘汰最久未使用的 u1
+    assert await cache.get_or_load("u1", "v2", loader) == 6
+    assert cache.hits == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_expires_after_ttl():
+    """测试 TTL 到期后重新加载"""
+    cache = PermissionCache(ttl_seconds=0, redis_url=None)
+    loader = _Loader()
+    await cache.get_or_load("u1", "v1", loader)
+    assert await cache.get_or_load("u1", "v1", loader) == 2
+
+
+@pytest.mark.asyncio
+async def test_assignment_change_invalidates_cached_grants(db_session: AsyncSession):
+    """测试场景分配变更后缓存的 V1 权限立即失效"""
+    user_id = str(uuid.uuid4())
+    db_session.add(User(id=user_id, username=f"cache_{user_id[:8]}", hashed_password="x", role="ANNOTATOR"))
+    await db_session.commit()
+    service = PermissionService(db_session)
+    scenario_id = f"cache_scenario_{user_id[:8]}"
+
+    try:
+        assert not await service.check_scenario_access(user_id, scenario_id)
+        hits = permission_cache.hits
+        assert not await service.check_scenario_access(user_id, scenario_id)
+        assert permission_cache.hits == hits + 1
+
+        await UserManagementService(db_session).assign_scenario(user_id, scenario_id, "ANNOTATOR", user_id)
+        assert await service.check_scenario_access(user_id, scenario_id)
+        assert await service.get_user_scenario_ids(user_id) == [scenario_id]
+    finally:
+        await db_session.execute(delete(UserScenarioAssignment).where(UserScenarioAssignment.user_id == user_id))
+        await db_session.execute(delete(User).where(User.id == user_id))
+        await db_session.commit()
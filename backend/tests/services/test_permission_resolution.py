@@ -0,0 +1,65 @@
+"""
+V2 RBAC 权限解析测试（单条 JOIN + 权限位图）
+"""
+import uuid
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.permission_bits import PermissionSet, codes_of, mask_of
+from app.models.db_meta import Permission, Role, RolePermission, UserScenarioRole
+from app.repositories.role import UserScenarioRoleRepository
+
+ASSIGNMENTS = 200
+
+
+def test_permission_set_bits():
+    """测试位图：全局权限覆盖所有场景，场景权限只在对应场景生效"""
+    perms = PermissionSet.from_rows([(None, "app_management"), ("s1", "scenario_keywords"), ("s1", "playground")])
+    assert perms.has("app_management", "any")
+    assert perms.has("playground", "s1") and not perms.has("playground", "s2")
+    assert perms.has_scenario("s1") and not perms.has_scenario("s2")
+    assert sorted(perms.to_dict()["scenario_permissions"]["s1"]) == ["playground", "scenario_keywords"]
+    assert codes_of(mask_of(["a_code", "b_code"])) == ["a_code", "b_code"]
+
+
+@pytest.mark.asyncio
+async def test_permission_resolution_single_query(db_session: AsyncSession, query_counter):
+    """测试大量场景角色分配时只执行一条查询，结果与逐条分配解析一致"""
+    marker = uuid.uuid4().hex[:8]
+    user_id = str(uuid.uuid4())
+    codes = [f"bench_{marker}_{i}" for i in range(4)]
+    permissions = [
+        Permission(id=str(uuid.uuid4()), permission_code=code, permission_name=code, scope="SCENARIO")
+        for code in codes
+    ]
+    permissions[-1].is_active = False
+    scenario_role = Role(id=str(uuid.uuid4()), role_code=f"bench_s_{marker}", role_name="bench")
+    global_role = Role(id=str(uuid.uuid4()), role_code=f"bench_g_{marker}", role_name="bench", role_type="GLOBAL")
+    db_session.add_all(permissions + [scenario_role, global_role])
+    db_session.add_all([
+        RolePermission(id=str(uuid.uuid4()), role_id=scenario_role.id, permission_id=p.id) for p in permissions[1:]
+    ] + [RolePermission(id=str(uuid.uuid4()), role_id=global_role.id, permission_id=permissions[0].id)])
+    db_session.add_all([
+        UserScenarioRole(id=str(uuid.uuid4()), user_id=user_id, scenario_id=f"bench_{marker}_{i}", role_id=scenario_role.id)
+        for i in range(ASSIGNMENTS)
+    ] + [UserScenarioRole(id=str(uuid.uuid4()), user_id=user_id, scenario_id=None, role_id=global_role.id)])
+    await db_session.commit()
+
+    try:
+        repo = UserScenarioRoleRepository(db_session)
+        with query_counter:
+            perms = await repo.get_user_permission_set(user_id)
+
+        assert query_counter.count == 1
+        assert perms.has_global(codes[0])
+        assert len(perms.scenario_ids()) == ASSIGNMENTS
+        assert sorted(perms.to_dict()["scenario_permissions"][f"bench_{marker}_0"]) == codes[1:3]
+        assert not perms.has(codes[3], f"bench_{marker}_0")  # 停用的权限不生效
+    finally:
+        await db_session.execute(delete(UserScenarioRole).where(UserScenarioRole.user_id == user_id))
+        await db_session.execute(delete(RolePermission).where(RolePermission.role_id.in_([scenario_role.id, global_role.id])))
+        await db_session.execute(delete(Role).where(Role.id.in_([scenario_role.id, global_role.id])))
+        await db_session.execute(delete(Permission).where(Permission.permission_code.in_(codes)))
+        await db_session.commit()
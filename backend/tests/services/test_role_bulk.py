@@ -0,0 +1,84 @@
+"""
+批量角色分配与权限矩阵编辑测试
+"""
+import uuid
+
+import pytest
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.permission_cache import permission_cache
+from app.models.db_meta import Permission, Role, RolePermission, UserScenarioRole
+from app.repositories.role import RoleRepository, UserScenarioRoleRepository
+
+USERS = 30
+SCENARIOS = 20
+
+
+@pytest.mark.asyncio
+async def test_bulk_assign_diffs_existing(db_session: AsyncSession, query_counter):
+    """测试批量分配只插入缺失的行，重复提交全部跳过；查询数与分配数量无关"""
+    marker = uuid.uuid4().hex[:8]
+    scenario_role = Role(id=str(uuid.uuid4()), role_code=f"bulk_s_{marker}", role_name="bulk")
+    global_role = Role(id=str(uuid.uuid4()), role_code=f"bulk_g_{marker}", role_name="bulk", role_type="GLOBAL")
+    db_session.add_all([scenario_role, global_role])
+    await db_session.commit()
+    user_ids = [str(uuid.uuid4()) for _ in range(USERS)]
+    scenario_ids = [f"bulk_{marker}_{i}" for i in range(SCENARIOS)]
+    targets = [(u, s, scenario_role.id) for u in user_ids for s in scenario_ids] + [(u, None, global_role.id) for u in user_ids]
+    repo = UserScenarioRoleRepository(db_session)
+
+    try:
+        # 预先存在一条场景分配和一条全局分配
+        await repo.bulk_assign([targets[0], targets[-1]])
+        epoch_before = await permission_cache.epoch(user_ids[1])
+
+        with query_counter:
+            created, skipped = await repo.bulk_assign(targets + targets[:5])
+
+        assert (created, skipped) == (len(targets) - 2, 2)
+        assert query_counter.count <= 1 + (len(targets) // 500 + 1) + 1  # 查询已有 + 分块插入 + 提交
+        assert (await permission_cache.epoch(user_ids[1]))[1] == epoch_before[1] + 1
+
+        assert await repo.bulk_assign(targets) == (0, len(targets))
+        count = await db_session.execute(
+            select(func.count()).select_from(UserScenarioRole).where(UserScenarioRole.user_id.in_(user_ids))
+        )
+        assert count.scalar_one() == len(targets)
+        assert await repo.get_assignment(user_ids[0], None, global_role.id)
+    finally:
+        await db_session.execute(delete(UserScenarioRole).where(UserScenarioRole.user_id.in_(user_ids)))
+        await db_session.execute(delete(Role).where(Role.id.in_([scenario_role.id, global_role.id])))
+        await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_replace_permission_matrix(db_session: AsyncSession):
+    """测试权限矩阵替换只写差异，并统一失效一次权限缓存"""
+    marker = uuid.uuid4().hex[:8]
+    permissions = [
+        Permission(id=str(uuid.uuid4()), permission_code=f"matrix_{marker}_{i}", permission_name="matrix", scope="SCENARIO")
+        for i in range(4)
+    ]
+    roles = [Role(id=str(uuid.uuid4()), role_code=f"matrix_{marker}_{i}", role_name="matrix") for i in range(2)]
+    db_session.add_all(permissions + roles)
+    await db_session.commit()
+    p = [perm.id for perm in permissions]
+    repo = RoleRepository(db_session)
+    try:
+        stats = await repo.replace_permission_matrix({roles[0].id: p[:2], roles[1].id: p[1:3]})
+        assert stats == {roles[0].id: {"added": 2, "removed": 0}, roles[1].id: {"added": 2, "removed": 0}}
+
+        global_epoch = (await permission_cache.epoch("any"))[0]
+        stats = await repo.replace_permission_matrix({roles[0].id: [p[1], p[3], p[3]], roles[1].id: p[1:3]})
+        assert stats == {roles[0].id: {"added": 1, "removed": 1}, roles[1].id: {"added": 0, "removed": 0}}
+        assert (await permission_cache.epoch("any"))[0] == global_epoch + 1
+
+        assert await repo.update_role_permissions(roles[1].id, []) == {"added": 0, "removed": 2}
+        assert sorted(perm.id for perm in await repo.get_role_permissions(roles[0].id)) == sorted([p[1], p[3]])
+        assert await repo.get_role_permission_count(roles[1].id) == 0
+    finally:
+        await db_session.execute(delete(RolePermission).where(RolePermission.role_id.in_([r.id for r in roles])))
+        await db_session.execute(delete(Role).where(Role.id.in_([r.id for r in roles])))
+        await db_session.execute(delete(Permission).where(Permission.id.in_(p)))
+        await db_session.commit()
@@ -0,0 +1,77 @@
+"""
+角色列表 / 用户角色分配列表的批量查询测试（查询数不随角色、分配数量增长）
+"""
+import uuid
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.endpoints.roles import list_roles
+from app.api.v1.endpoints.users import get_user_roles
+from app.models.db_meta import Permission, Role, RolePermission, User, UserScenarioRole
+from app.repositories.role import RoleRepository
+
+
+@pytest.mark.asyncio
+async def test_list_roles_constant_queries(db_session: AsyncSession, query_counter):
+    """测试角色列表的查询数与角色数量无关，权限数与逐个统计一致"""
+    marker = uuid.uuid4().hex[:8]
+    admin = User(id=str(uuid.uuid4()), username=f"admin_{marker}", hashed_password="x", role="SYSTEM_ADMIN")
+    permissions = [
+        Permission(id=str(uuid.uuid4()), permission_code=f"bench_{marker}_{i}", permission_name="bench", scope="SCENARIO")
+        for i in range(3)
+    ]
+    roles = []
+    db_session.add_all([admin] + permissions)
+    await db_session.commit()
+
+    async def add_roles(count: int):
+        for _ in range(count):
+            role = Role(id=str(uuid.uuid4()), role_code=f"bench_{marker}_{len(roles)}", role_name="bench")
+            db_session.add(role)
+            db_session.add_all([
+                RolePermission(id=str(uuid.uuid4()), role_id=role.id, permission_id=p.id)
+                for p in permissions[:len(roles) % 4]
+            ])
+            db_session.add_all([
+                UserScenarioRole(id=str(uuid.uuid4()), user_id=admin.id, scenario_id=f"s_{marker}_{len(roles)}",
+                                 role_id=role.id)
+            ])
+            roles.append(role)
+        await db_session.commit()
+
+    try:
+        await add_roles(5)
+        with query_counter:
+            await list_roles(db=db_session, current_user=admin)
+        small_queries = query_counter.count
+        with query_counter:
+            await get_user_roles(user_id=admin.id, db=db_session, current_user=admin)
+        small_user_queries = query_counter.count
+
+        await add_roles(100)
+        with query_counter:
+            listed = await list_roles(db=db_session, current_user=admin)
+        queries = query_counter.count
+        with query_counter:
+            assignments = await get_user_roles(user_id=admin.id, db=db_session, current_user=admin)
+        user_queries = query_counter.count
+
+        assert queries == small_queries == 1
+        assert user_queries == small_user_queries == 1
+        counts = {r.id: r.permission_count for r in listed}
+        repo = RoleRepository(db_session)
+        for role in roles[:4]:
+            assert counts[role.id] == await repo.get_role_permission_count(role.id)
+        assert [counts[role.id] for role in roles[:4]] == [0, 1, 2, 3]
+        assert len(assignments) == len(roles)
+        assert {a.role_code for a in assignments} == {role.role_code for role in roles}
+    finally:
+        role_ids = [role.id for role in roles]
+        await db_session.execute(delete(UserScenarioRole).where(UserScenarioRole.user_id == admin.id))
+        await db_session.execute(delete(RolePermission).where(RolePermission.role_id.in_(role_ids)))
+        await db_session.execute(delete(Role).where(Role.id.in_(role_ids)))
+        await db_session.execute(delete(Permission).where(Permission.id.in_([p.id for p in permissions])))
+        await db_session.execute(delete(User).where(User.id == admin.id))
+        await db_session.commit()
@@ -0,0 +1,84 @@
+"""
+按权限过滤的场景列表测试（SQL 过滤 + keyset 分页 + 内联权限标记）
+"""
+import uuid
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.db_meta import (
+    Permission, Role, RolePermission, Scenarios, User, UserScenarioAssignment, UserScenarioRole
+)
+from app.services.scenarios import ScenariosService
+
+SCENARIOS = 12
+
+
+@pytest.mark.asyncio
+async def test_list_accessible_scenarios(db_session: AsyncSession, query_counter):
+    """测试只返回有 V1 分配或 V2 场景角色的场景，分页完整且权限标记与权限检查一致；没有有效权限的角色不产生访问权"""
+    marker = uuid.uuid4().hex[:8]
+    app_ids = [f"list_{marker}_{i:02d}" for i in range(SCENARIOS)]
+    db_session.add_all([
+        Scenarios(id=str(uuid.uuid4()), app_id=app_id, app_name=f"Listing {i}") for i, app_id in enumerate(app_ids)
+    ])
+    user = User(id=str(uuid.uuid4()), username=f"list_{marker}", hashed_password="x", role="ANNOTATOR")
+    admin = User(id=str(uuid.uuid4()), username=f"list_admin_{marker}", hashed_password="x", role="SYSTEM_ADMIN")
+    result = await db_session.execute(select(Permission).where(Permission.permission_code == "playground"))
+    permission = result.scalars().first()
+    created_permission = permission is None
+    if created_permission:
+        permission = Permission(id=str(uuid.uuid4()), permission_code="playground", permission_name="playground",
+                                scope="SCENARIO")
+    role = Role(id=str(uuid.uuid4()), role_code=f"list_{marker}", role_name="list")
+    empty_role = Role(id=str(uuid.uuid4()), role_code=f"list_empty_{marker}", role_name="list empty")
+    db_session.add_all([user, admin, permission, role, empty_role])
+    db_session.add(RolePermission(id=str(uuid.uuid4()), role_id=role.id, permission_id=permission.id))
+    db_session.add_all([
+        UserScenarioAssignment(id=str(uuid.uuid4()), user_id=user.id, scenario_id=app_ids[i], role="ANNOTATOR")
+        for i in (1, 4, 7)
+    ] + [
+        UserScenarioRole(id=str(uuid.uuid4()), user_id=user.id, scenario_id=app_ids[i], role_id=role.id)
+        for i in (4, 9)
+    ] + [
+        UserScenarioRole(id=str(uuid.uuid4()), user_id=user.id, scenario_id=app_ids[10], role_id=empty_role.id)
+    ])
+    await db_session.commit()
+
+    service = ScenariosService(db_session)
+    try:
+        pages, cursor = [], None
+        while True:
+            page = await service.list_accessible_scenarios(user, search=marker, cursor=cursor, limit=2)
+            pages.append(page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        items = [item for page in pages for item in page]
+        assert [item["app_id"] for item in items] == [app_ids[i] for i in (1, 4, 7, 9)]
+        flags = {item["app_id"]: item["permissions"] for item in items}
+        assert flags[app_ids[4]]["playground"] and flags[app_ids[9]]["playground"]
+        assert not flags[app_ids[1]]["playground"] and not flags[app_ids[1]]["scenario_keywords"]
+
+        # 授权上下文已构建后，每页只执行一条查询
+        with query_counter:
+            await service.list_accessible_scenarios(user, search=marker, limit=2)
+        assert query_counter.count == 1
+
+        page = await service.list_accessible_scenarios(admin, search=f"{marker}_1", limit=50)
+        assert [item["app_id"] for item in page["items"]] == [app_ids[10], app_ids[11]]
+        assert all(page["items"][0]["permissions"].values())
+
+        with pytest.raises(ValueError):
+            await service.list_accessible_scenarios(user, cursor="not-a-cursor")
+    finally:
+        await db_session.execute(delete(UserScenarioRole).where(UserScenarioRole.user_id == user.id))
+        await db_session.execute(delete(UserScenarioAssignment).where(UserScenarioAssignment.user_id == user.id))
+        await db_session.execute(delete(RolePermission).where(RolePermission.role_id == role.id))
+        await db_session.execute(delete(Role).where(Role.id.in_([role.id, empty_role.id])))
+        if created_permission:
+            await db_session.execute(delete(Permission).where(Permission.id == permission.id))
+        await db_session.execute(delete(Scenarios).where(Scenarios.app_id.in_(app_ids)))
+        await db_session.execute(delete(User).where(User.id.in_([user.id, admin.id])))
+        await db_session.commit()
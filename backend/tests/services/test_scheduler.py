@@ -0,0 +1,160 @@
+"""
+定时任务调度测试
+"""
+import asyncio
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.db_meta import SchedulerLease
+from app.repositories.scheduler_lease import SchedulerLeaseRepository
+from app.services import scheduler as scheduler_module
+from app.services.scheduler import JOB_LEASE_PREFIX, JobLockedError, MaintenanceScheduler, PeriodicJob
+
+
+@pytest.fixture
+def session_factory(db_session: AsyncSession):
+    """与 db_session 同一数据库的会话工厂（调度器每个操作使用独立会话）"""
+    return async_sessionmaker(bind=db_session.bind, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+
+
+class _RecordingSession:
+    """只记录语句、不执行的会话（按 MySQL 方言编译校验租约语句）"""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(rowcount=1)
+
+    async def commit(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_lease_expiry_uses_database_clock():
+    """测试过期判断与新的过期时间都由数据库时钟计算，不使用副本本地时间"""
+    session = _RecordingSession()
+    repo = SchedulerLeaseRepository(SchedulerLease, session)
+    assert await repo.try_acquire("lease", "replica-a", 30) is True
+    await repo.release("lease", "replica-a")
+
+    acquire, release = (str(s.compile(dialect=mysql.dialect())) for s in session.statements)
+    assert "scheduler_leases.expires_at < utc_timestamp()" in acquire
+    assert "expires_at=timestampadd(SECOND, %s, utc_timestamp())" in acquire
+    assert "expires_at=timestampadd(SECOND, %s, utc_timestamp())" in release
+    # 语句中没有来自副本本地时钟的时间参数
+    assert not any(isinstance(v, datetime) for s in session.statements for v in s.compile().params.values())
+
+
+@pytest.mark.asyncio
+async def test_lease_single_leader_and_failover(db_session: AsyncSession):
+    """测试租约选主：同一时刻只有一个副本持有，过期后其他副本接管"""
+    name = f"test-lease-{uuid.uuid4().hex[:8]}"
+    repo = SchedulerLeaseRepository(SchedulerLease, db_session)
+
+    assert await repo.try_acquire(name, "replica-a", 30) is True
+    assert await repo.try_acquire(name, "replica-b", 30) is False
+    # 主副本续约
+    assert await repo.try_acquire(name, "replica-a", 30) is True
+    assert await repo.try_acquire(name, "replica-b", 30) is False
+    # 主副本失联，租约过期后被接管（续约为已过期的租约模拟失联）
+    assert await repo.try_acquire(name, "replica-a", -5) is True
+    assert await repo.try_acquire(name, "replica-b", 30) is True
+    assert await repo.try_acquire(name, "replica-a", 30) is False
+    # 主动释放后立即可被接管
+    await repo.release(name, "replica-b")
+    assert await repo.try_acquire(name, "replica-a", 30) is True
+
+
+@pytest.mark.asyncio
+async def test_run_job_records_metrics(session_factory):
+    """测试任务执行指标：成功与失败都会记录"""
+    calls = []
+
+    async def ok_job(session):
+        calls.append(session)
+        return {"released": 3}
+
+    async def failing_job(session):
+        raise RuntimeError("boom")
+
+    scheduler = MaintenanceScheduler(session_factory, instance_id=f"test-{uuid.uuid4().hex[:8]}")
+    scheduler.register(PeriodicJob("ok", 60, ok_job))
+    scheduler.register(PeriodicJob("failing", 60, failing_job))
+
+    assert await scheduler.run_job("ok") == {"released": 3}
+    assert await scheduler.run_job("failing") == {"error": "boom"}
+    with pytest.raises(KeyError):
+        await scheduler.run_job("missing")
+
+    jobs = {job["name"]: job for job in scheduler.status()["jobs"]}
+    assert (jobs["ok"]["runs"], jobs["ok"]["failures"], jobs["ok"]["last_result"]) == (1, 0, {"released": 3})
+    assert (jobs["failing"]["runs"], jobs["failing"]["failures"], jobs["failing"]["last_error"]) == (1, 1, "boom")
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_run_job_takes_cross_replica_job_lock(db_session: AsyncSession, session_factory):
+    """测试任务锁：其他副本持有任务租约时不执行；执行结束后释放，其他副本可立即执行"""
+    name = f"locked-{uuid.uuid4().hex[:8]}"
+    calls = []
+
+    async def job(session):
+        calls.append(1)
+        return {}
+
+    replica_a = MaintenanceScheduler(session_factory, instance_id=f"a-{name}")
+    replica_b = MaintenanceScheduler(session_factory, instance_id=f"b-{name}")
+    for replica in (replica_a, replica_b):
+        replica.register(PeriodicJob(name, 60, job))
+
+    repo = SchedulerLeaseRepository(SchedulerLease, db_session)
+    assert await repo.try_acquire(JOB_LEASE_PREFIX + name, replica_b.instance_id, 30)
+
+    with pytest.raises(JobLockedError):
+        await replica_a.run_job(name)
+    assert calls == []
+
+    await repo.release(JOB_LEASE_PREFIX + name, replica_b.instance_id)
+    await replica_a.run_job(name)
+    await replica_b.run_job(name)
+    assert calls == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_job_lease_renewed_while_running(monkeypatch, session_factory):
+    """测试长任务执行期间续约任务锁，同一副本内的并发触发被拒绝"""
+    monkeypatch.setattr(scheduler_module, "LEASE_RENEW_SECONDS", 0.05)
+    name = f"long-{uuid.uuid4().hex[:8]}"
+    started = asyncio.Event()
+    expirations = []
+
+    async def lease_expires_at():
+        async with session_factory() as session:
+            return (await session.get(SchedulerLease, JOB_LEASE_PREFIX + name)).expires_at
+
+    async def long_job(session):
+        expirations.append(await lease_expires_at())
+        started.set()
+        await asyncio.sleep(1.2)  # 数据库时钟精度为秒，跨过一秒后续约才能看到过期时间推后
+        expirations.append(await lease_expires_at())
+        return {}
+
+    scheduler = MaintenanceScheduler(session_factory, instance_id=f"test-{name}")
+    scheduler.register(PeriodicJob(name, 60, long_job))
+
+    run = asyncio.create_task(scheduler.run_job(name))
+    try:
+        await asyncio.wait_for(started.wait(), timeout=5)
+        with pytest.raises(JobLockedError):
+            await scheduler.run_job(name)
+    finally:
+        await run
+
+    assert expirations[1] > expirations[0]
@@ -0,0 +1,76 @@
+"""
+双人审核一致性测试
+"""
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.db_meta import StagingAgreementCounter, StagingGlobalKeywords, StagingReviewSample
+from app.services.staging import StagingService
+from app.services.staging_agreement import cohen_kappa, is_sampled
+
+
+def test_cohen_kappa():
+    """测试由累计量计算 kappa：完全一致为 1，与随机一致相当为 0"""
+    assert cohen_kappa({}) is None
+    assert cohen_kappa({"n": 4, "agree": 4, "a:AD": 2, "a:PORN": 2, "b:AD": 2, "b:PORN": 2}) == 1.0
+    assert cohen_kappa({"n": 4, "agree": 2, "a:AD": 2, "a:PORN": 2, "b:AD": 2, "b:PORN": 2}) == 0.0
+    assert cohen_kappa({"n": 2, "agree": 2, "a:AD": 2, "b:AD": 2}) == 1.0
+    assert not is_sampled("any", 0.0) and is_sampled("any", 1.0)
+
+
+@pytest.mark.asyncio
+async def test_double_review_updates_agreement_incrementally(db_session: AsyncSession):
+    """测试首次审核抽样、第二人盲审提交后一致性计数增量更新"""
+    marker = f"agree{uuid.uuid4().hex[:8]}"
+    first, second = f"{marker}-a", f"{marker}-b"
+    tasks = [
+        StagingGlobalKeywords(id=str(uuid.uuid4()), keyword=f"{marker}-{i}", predicted_tag="AD",
+                              predicted_risk="Low", created_at=datetime(2001, 7, 1))
+        for i in range(3)
+    ]
+    service = StagingService(db_session, "keywords")
+    service.agreement.fraction = 1.0
+    await service.add_tasks(tasks)
+    ids = [task.id for task in tasks]
+
+    try:
+        result = await service.batch_review(first, [
+            {"id": ids[0], "status": "REVIEWED", "final_tag": "AD", "final_risk": "Low"},
+            {"id": ids[1], "status": "REVIEWED", "final_tag": "PORN", "final_risk": "High"},
+            {"id": ids[2], "status": "IGNORED"},
+        ], is_admin=True)
+        assert result["success_count"] == 3
+
+        # 第一次审核人不能认领自己的抽样
+        assert await service.agreement.claim(first, 10, datetime(2001, 7, 2)) == []
+        items = await service.agreement.claim(second, 10, datetime(2001, 7, 2))
+        assert {item["id"] for item in items} >= set(ids)
+        assert all("final_tag" not in item for item in items)
+
+        result = await service.agreement.submit(second, [
+            {"id": ids[0], "status": "REVIEWED", "final_tag": "AD"},
+            {"id": ids[1], "status": "REVIEWED", "final_tag": "AD"},
+            {"id": ids[2], "status": "IGNORED"},
+            {"id": ids[2], "status": "IGNORED"},
+        ], datetime(2001, 7, 2))
+        assert result["success_count"] == 3 and result["failed_ids"] == [ids[2]]
+
+        stats = {row["annotator"]: row for row in await service.annotator_stats()}
+        assert stats[first]["agreement_samples"] == 3 and stats[first]["total_count"] == 3
+        assert stats[second]["agreement_samples"] == 3 and stats[second]["total_count"] == 0
+        assert stats[first]["observed_agreement"] == pytest.approx(2 / 3, abs=1e-4)
+
+        summary = await service.agreement.summary()
+        assert {row["key"] for row in summary["by_annotator"]} >= {first, second}
+        # 第一人 (AD, PORN, IGNORED) 对 第二人 (AD, AD, IGNORED)：po=2/3, pe=(1*2+1*0+1*1)/9=1/3
+        assert stats[first]["kappa"] == pytest.approx(0.5, abs=1e-4)
+    finally:
+        await db_session.execute(delete(StagingReviewSample).where(StagingReviewSample.task_id.in_(ids)))
+        await db_session.execute(delete(StagingAgreementCounter).where(StagingAgreementCounter.scope_key.like(f"{marker}%")))
+        await db_session.execute(delete(StagingGlobalKeywords).where(StagingGlobalKeywords.keyword.like(f"{marker}-%")))
+        await db_session.commit()
+        await service.counters.reconcile()
@@ -0,0 +1,69 @@
+"""
+待审核任务自动预审测试
+"""
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.db_meta import GlobalKeywords, StagingGlobalKeywords
+from app.services.keyword_similarity import normalized_hash
+from app.services.staging import StagingService
+from app.services.staging_auto_accept import MACHINE_ANNOTATOR, StagingAutoAcceptService
+
+
+@pytest.mark.asyncio
+async def test_auto_accept_agreeing_predictions(db_session: AsyncSession):
+    """测试与正式库或人工审核历史一致的任务自动通过，冲突与无结论的留给人工"""
+    marker = f"auto{uuid.uuid4().hex[:8]}"
+
+    def production(suffix, tag, risk):
+        keyword = f"{marker}{suffix}"
+        return GlobalKeywords(id=str(uuid.uuid4()), keyword=keyword, tag_code=tag, risk_level=risk,
+                              norm_hash=normalized_hash(keyword))
+
+    def staged(keyword, tag, risk, **kwargs):
+        return StagingGlobalKeywords(id=str(uuid.uuid4()), keyword=keyword, predicted_tag=tag,
+                                     predicted_risk=risk, created_at=datetime(2001, 6, 1), **kwargs)
+
+    db_session.add_all([production("a", "AD", "Low"), production("b", "AD", "Low")])
+    await db_session.commit()
+
+    service = StagingService(db_session, "keywords")
+    await service.counters.reconcile()
+    await service.add_tasks([
+        staged(f"{marker}c", "AD", "Low", status="REVIEWED", annotator="alice",
+               final_tag="AD", final_risk="High", norm_hash=normalized_hash(f"{marker}c")),
+        staged(f"{marker.upper()}A", "AD", "Low", status="PENDING"),   # 归一化后与正式库一致
+        staged(f"{marker}b", "PORN", "High", status="PENDING"),        # 与正式库冲突
+        staged(f"{marker}c", "AD", "High", status="PENDING"),          # 与人工审核历史一致
+        staged(f"{marker}d", "AD", "Low", status="PENDING"),           # 没有可比对的结论
+    ])
+
+    auto = StagingAutoAcceptService(db_session, "keywords")
+    try:
+        job = await auto.create_job(created_by="tester")
+        job = await auto.run(job.id)
+        assert job.status == "COMPLETED"
+        assert job.updated_rows >= 2 and job.processed_rows >= 4
+        assert "throughput=" in job.message
+
+        rows = (await db_session.execute(
+            select(StagingGlobalKeywords)
+            .where(StagingGlobalKeywords.keyword.ilike(f"{marker}%"), StagingGlobalKeywords.annotator.is_distinct_from("alice"))
+            .execution_options(populate_existing=True)
+        )).scalars().all()
+        by_suffix = {row.keyword[-1].lower(): row for row in rows}
+        assert by_suffix["a"].status == by_suffix["c"].status == "REVIEWED"
+        assert by_suffix["a"].annotator == MACHINE_ANNOTATOR
+        assert (by_suffix["c"].final_tag, by_suffix["c"].final_risk, by_suffix["c"].is_modified) == ("AD", "High", False)
+        assert by_suffix["b"].status == by_suffix["d"].status == "PENDING"
+
+        assert (await service.counters.reconcile())["drifted"] == 0
+    finally:
+        await db_session.execute(delete(StagingGlobalKeywords).where(StagingGlobalKeywords.keyword.ilike(f"{marker}%")))
+        await db_session.execute(delete(GlobalKeywords).where(GlobalKeywords.keyword.like(f"{marker}%")))
+        await db_session.commit()
+        await service.counters.reconcile()
@@ -0,0 +1,88 @@
+"""
+智能标注任务认领并发测试
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from app.core.db import AsyncSessionLocal
+from app.models.db_meta import StagingGlobalKeywords
+from app.services.staging import StagingService
+
+ANNOTATORS = 24
+BATCH_SIZE = 7
+TASKS = 200  # 多于 ANNOTATORS * BATCH_SIZE，认领结束后本测试的数据仍有剩余
+
+
+@pytest.mark.asyncio
+async def test_concurrent_claims_never_double_assign():
+    """测试多名标注员同时认领：每条任务最多分配一次，且按入队时间先到先得（只断言本测试的批次与数据）"""
+    marker = f"claim-test-{uuid.uuid4().hex[:8]}"
+    base = datetime(2000, 1, 1)
+    async with AsyncSessionLocal() as session:
+        session.add_all([
+            StagingGlobalKeywords(
+                id=str(uuid.uuid4()),
+                keyword=f"{marker}-{i}",
+                predicted_tag=marker,
+                predicted_risk="Low",
+                status="PENDING",
+                # 优先级最高且早于其他数据，保证本测试的任务最先被认领
+                priority=1.0,
+                created_at=base + timedelta(seconds=i),
+            )
+            for i in range(TASKS)
+        ])
+        await session.commit()
+
+    async def claim(username: str) -> dict:
+        async with AsyncSessionLocal() as session:
+            return await StagingService(session).claim_batch(username, BATCH_SIZE)
+
+    annotators = [f"{marker}-annotator-{i}" for i in range(ANNOTATORS)]
+    results = []
+    try:
+        results = await asyncio.gather(*(claim(username) for username in annotators))
+        batches = {r["batch_id"]: r["claimed_count"] for r in results}
+
+        async with AsyncSessionLocal() as session:
+            # 本次认领写入的所有行（队列中已有的更高优先级任务也可能被认领）
+            batch_rows = (await session.execute(
+                select(StagingGlobalKeywords).where(StagingGlobalKeywords.batch_id.in_(list(batches)))
+            )).scalars().all()
+            rows = (await session.execute(
+                select(StagingGlobalKeywords).where(StagingGlobalKeywords.predicted_tag == marker)
+            )).scalars().all()
+
+        # 每个批次的计数与实际写入一致，没有任何一行被两个批次覆盖
+        assert len(batch_rows) == sum(batches.values())
+        for batch_id, count in batches.items():
+            assert sum(1 for r in batch_rows if r.batch_id == batch_id) == count
+        owners = {r["batch_id"]: username for r, username in zip(results, annotators)}
+        assert all(r.status == "CLAIMED" and r.claimed_by == owners[r.batch_id] for r in batch_rows)
+
+        # 本测试的任务：被认领的都属于本次的批次，且按入队时间先到先得
+        claimed = [r for r in rows if r.status == "CLAIMED"]
+        assert claimed and all(r.batch_id in batches for r in claimed)
+        pending = [r for r in rows if r.status == "PENDING"]
+        assert len(claimed) + len(pending) == TASKS
+        if pending:
+            assert max(r.created_at for r in claimed) < min(r.created_at for r in pending)
+    finally:
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                delete(StagingGlobalKeywords).where(StagingGlobalKeywords.predicted_tag == marker)
+            )
+            # 归还被本次认领的其他任务
+            batch_ids = [r["batch_id"] for r in results]
+            if batch_ids:
+                await session.execute(
+                    update(StagingGlobalKeywords)
+                    .where(StagingGlobalKeywords.batch_id.in_(batch_ids))
+                    .values(status="PENDING", claimed_by=None, claimed_at=None, batch_id=None)
+                )
+            await StagingService(session).counters.reconcile()
+            await session.commit()
@@ -0,0 +1,77 @@
+"""
+待审核任务计数器测试
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.db_meta import StagingGlobalKeywords
+from app.services.staging import StagingService
+from app.services.staging_sync import StagingSyncService
+
+
+@pytest.mark.asyncio
+async def test_counters_follow_task_lifecycle(db_session: AsyncSession):
+    """测试计数器随 新增/认领/审核/释放/同步/删除 增量维护，与重新统计的结果一致"""
+    service = StagingService(db_session, "keywords")
+    await service.counters.reconcile()
+    before = await service.overview()
+
+    user = f"user_{uuid.uuid4().hex[:8]}"
+    await service.add_tasks([
+        StagingGlobalKeywords(id=str(uuid.uuid4()), keyword=f"{user}_{i}",
+                              predicted_tag="AD", predicted_risk="Low",
+                              created_at=datetime(2001, 1, 1) + timedelta(seconds=i))
+        for i in range(4)
+    ])
+    overview = await service.overview()
+    assert overview["total_count"] == before["total_count"] + 4
+
+    claim = await service.claim_batch(user, 4)
+    page = await service.list_tasks(user, "ANNOTATOR", my_tasks=True)
+    ids = [item["id"] for item in page["items"]]
+    assert len(ids) == claim["claimed_count"]
+
+    await service.batch_review(user, [
+        {"id": ids[0], "status": "REVIEWED"},
+        {"id": ids[1], "status": "IGNORED"},
+    ])
+    stats = await service.my_tasks_stats(user)
+    assert (stats["reviewed_count"], stats["ignored_count"]) == (1, 1)
+    assert stats["batch_id"] == claim["batch_id"]
+
+    annotator = next(s for s in await service.annotator_stats() if s["annotator"] == user)
+    assert (annotator["reviewed_count"], annotator["ignored_count"], annotator["total_count"]) == (1, 1, 2)
+
+    released = await service.release_expired(timeout_minutes=-1)
+    assert released >= 2
+    assert (await service.my_tasks_stats(user))["claimed_count"] == 0
+
+    sync = StagingSyncService(db_session, "rules")
+    assert sync.counters.task_type == "rules"
+    await service.delete_task(ids[1])
+
+    result = await service.counters.reconcile()
+    assert result["drifted"] == 0
+
+
+@pytest.mark.asyncio
+async def test_release_expired_in_bounded_batches(db_session: AsyncSession):
+    """测试超时释放分批执行：max_batches 限制单轮处理量，剩余的下一轮继续"""
+    service = StagingService(db_session, "keywords")
+    user = f"user_{uuid.uuid4().hex[:8]}"
+    await service.add_tasks([
+        StagingGlobalKeywords(id=str(uuid.uuid4()), keyword=f"{user}_{i}",
+                              predicted_tag="AD", predicted_risk="Low",
+                              created_at=datetime(2001, 1, 1) + timedelta(seconds=i))
+        for i in range(5)
+    ])
+    await service.claim_batch(user, 5)
+    await service.release_expired(timeout_minutes=-1)  # 清掉其他测试遗留的认领
+    await service.claim_batch(user, 5)
+
+    assert await service.release_expired(timeout_minutes=-1, batch_size=2, max_batches=1) == 2
+    assert await service.release_expired(timeout_minutes=-1, batch_size=2) == 3
+    assert (await service.my_tasks_stats(user))["claimed_count"] == 0
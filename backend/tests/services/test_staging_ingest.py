@@ -0,0 +1,67 @@
+"""
+待审核任务流式入库测试
+"""
+import json
+import uuid
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.db_meta import GlobalKeywords, StagingGlobalKeywords
+from app.services.keyword_import import iter_records, iter_text_lines
+from app.services.staging import StagingService
+from app.services.staging_ingest import StagingIngestService
+
+
+async def _ndjson(*records):
+    yield "\n".join(r if isinstance(r, str) else json.dumps(r) for r in records).encode("utf-8")
+
+
+@pytest.mark.asyncio
+async def test_ingest_dedupes_and_claims_uncertain_first(db_session: AsyncSession):
+    """测试入库去重（文件内、待审核表、正式库）、PENDING 计数，以及认领时置信度低的优先"""
+    marker = f"ingest-{uuid.uuid4().hex[:8]}"
+    db_session.add(GlobalKeywords(id=str(uuid.uuid4()), keyword=f"{marker}-prod",
+                                  tag_code="AD", risk_level="Low"))
+    await db_session.commit()
+
+    service = StagingIngestService(db_session, "keywords")
+    await service.counters.reconcile()
+    before = (await service.counters.status_counts()).get("PENDING", 0)
+
+    def record(name, confidence):
+        return {"keyword": f"{marker}-{name}", "predicted_tag": "AD",
+                "predicted_risk": "Low", "confidence": confidence}
+
+    job = await service.prepare_job(service.job_type, source_name=marker, created_by="tester")
+    job = await service.ingest(job, iter_records(iter_text_lines(_ndjson(
+        record("sure", 0.99),
+        record("unsure", 0.01),
+        record("UNSURE", 0.5),          # 文件内重复（大小写不敏感）
+        record("prod", 0.02),           # 正式库已存在
+        record("bad", 2),               # 置信度超出范围
+        "{not json",
+        record("middle", 0.03),
+    )), "jsonl"))
+
+    try:
+        assert job.status == "COMPLETED"
+        assert (job.inserted_rows, job.skipped_rows, job.error_rows) == (3, 2, 2)
+        assert (await service.counters.status_counts()).get("PENDING", 0) == before + 3
+
+        # 再次入库同一关键词：与待审核表去重
+        again = await service.prepare_job(service.job_type, source_name=marker, created_by="tester")
+        again = await service.ingest(again, iter_records(iter_text_lines(_ndjson(record("sure", 0.1))), "jsonl"))
+        assert (again.inserted_rows, again.skipped_rows) == (0, 1)
+
+        claim = await StagingService(db_session, "keywords").claim_batch(f"{marker}-user", 2)
+        claimed = (await db_session.execute(
+            select(StagingGlobalKeywords.keyword).where(StagingGlobalKeywords.batch_id == claim["batch_id"])
+        )).scalars().all()
+        assert sorted(claimed) == [f"{marker}-middle", f"{marker}-unsure"]
+    finally:
+        await db_session.execute(delete(StagingGlobalKeywords).where(StagingGlobalKeywords.keyword.like(f"{marker}-%")))
+        await db_session.execute(delete(GlobalKeywords).where(GlobalKeywords.keyword.like(f"{marker}-%")))
+        await db_session.commit()
+        await service.counters.reconcile()
@@ -0,0 +1,103 @@
+"""
+智能标注任务分页列表测试
+"""
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.endpoints.staging import LEGACY_LIST_HAS_MORE_HEADER, list_staging_keywords
+from app.models.db_meta import StagingGlobalKeywords
+from app.core.cursor import encode_cursor
+from app.services.staging import StagingService
+
+
+@pytest.mark.asyncio
+async def test_list_tasks_keyset_pages(db_session: AsyncSession):
+    """测试 keyset 分页：逐页遍历不重复、不遗漏，total 为过滤后的总数"""
+    tag = f"T_{uuid.uuid4().hex[:8]}"
+    base = datetime(2024, 1, 1)
+    db_session.add_all([
+        # 创建时间两两相同，验证按 id 打破并列
+        StagingGlobalKeywords(id=str(uuid.uuid4()), keyword=f"kw_{i}_{tag}", predicted_tag=tag,
+                              predicted_risk="Low", status="PENDING",
+                              created_at=base + timedelta(seconds=i // 2))
+        for i in range(5)
+    ])
+    await db_session.commit()
+
+    service = StagingService(db_session, "keywords")
+    await service.counters.reconcile()  # 测试数据直接写库，先按任务表重建计数器
+    seen, cursor = [], None
+    for _ in range(100):
+        page = await service.list_tasks("admin", "SYSTEM_ADMIN", status="PENDING", cursor=cursor, limit=2)
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert page["total"] == len(seen)
+    assert len(seen) == len(set(seen))
+    assert "claimed_at" not in page["items"][0]
+
+
+@pytest.mark.asyncio
+async def test_list_my_tasks_by_batch(db_session: AsyncSession):
+    """测试我的任务：按当前认领批次直接查找"""
+    user = f"user_{uuid.uuid4().hex[:8]}"
+    db_session.add_all([
+        StagingGlobalKeywords(id=str(uuid.uuid4()), keyword=f"mine_{i}_{user}", predicted_tag="AD",
+                              predicted_risk="Low", status="PENDING")
+        for i in range(3)
+    ])
+    await db_session.commit()
+
+    service = StagingService(db_session, "keywords")
+    claim = await service.claim_batch(user, 2)
+    page = await service.list_tasks(user, "ANNOTATOR", my_tasks=True)
+
+    assert page["batch_id"] == claim["batch_id"]
+    assert page["total"] == claim["claimed_count"] == 2
+    assert {item["claimed_by"] for item in page["items"]} == {user}
+
+    with pytest.raises(ValueError):
+        await service.list_tasks(user, "ANNOTATOR", cursor="not-a-cursor")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("values", [[123, "id"], ["not-a-date", "id"], ["2024-01-01T00:00:00"], [None, "id"]])
+async def test_list_tasks_rejects_malformed_cursor(db_session: AsyncSession, values):
+    """测试游标值类型或格式不对时返回参数错误，而不是在解析时抛出其他异常"""
+    service = StagingService(db_session, "keywords")
+
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        await service.list_tasks("admin", "SYSTEM_ADMIN", cursor=encode_cursor(values))
+
+
+@pytest.mark.asyncio
+async def test_legacy_list_reports_truncation(db_session: AsyncSession):
+    """测试废弃的全量列表接口通过响应头标记结果是否被 limit 截断"""
+    user = SimpleNamespace(username=f"user_{uuid.uuid4().hex[:8]}", role="ANNOTATOR")
+    db_session.add_all([
+        StagingGlobalKeywords(id=str(uuid.uuid4()), keyword=f"legacy_{i}_{user.username}", predicted_tag="AD",
+                              predicted_risk="Low", status="CLAIMED", claimed_by=user.username,
+                              claimed_at=datetime(2024, 1, 1) + timedelta(seconds=i))
+        for i in range(3)
+    ])
+    await db_session.commit()
+
+    async def fetch(skip: int, limit: int):
+        response = Response()
+        rows = await list_staging_keywords(
+            response, my_tasks=True, skip=skip, limit=limit, db=db_session, current_user=user
+        )
+        return [row.keyword for row in rows], response.headers[LEGACY_LIST_HAS_MORE_HEADER]
+
+    first, has_more = await fetch(0, 2)
+    assert (len(first), has_more) == (2, "true")
+    rest, has_more = await fetch(2, 2)
+    assert (len(rest), has_more) == (1, "false")
+    assert first + rest == [f"legacy_{i}_{user.username}" for i in range(3)]
@@ -0,0 +1,79 @@
+"""
+待审核任务认领优先级测试
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.db_meta import PlaygroundHistory, StagingGlobalKeywords
+from app.services.staging import StagingService
+from app.services.staging_priority import StagingPriorityService, decayed_hits, priority_score, risk_weight
+
+
+def test_priority_score():
+    """测试打分：越不确定、命中越多、风险越高，优先级越高"""
+    assert priority_score(0.1) > priority_score(0.9)
+    assert priority_score(0.5, hits=5) > priority_score(0.5)
+    assert priority_score(0.5, risk=risk_weight("High")) > priority_score(0.5, risk=risk_weight("low"))
+    now = datetime(2024, 1, 10)
+    assert decayed_hits(8.0, now - timedelta(hours=72), now) == pytest.approx(4.0)
+
+
+def _prompt(text: str, created_at: datetime) -> PlaygroundHistory:
+    return PlaygroundHistory(
+        id=str(uuid.uuid4()), request_id=str(uuid.uuid4()), playground_type="INPUT", app_id="priority-test",
+        input_data={"input_prompt": text}, config_snapshot={}, output_data={}, created_at=created_at,
+    )
+
+
+async def _rows(db_session: AsyncSession, marker: str) -> dict:
+    result = await db_session.execute(
+        select(StagingGlobalKeywords).where(StagingGlobalKeywords.keyword.like(f"{marker}-%"))
+        .execution_options(populate_existing=True)
+    )
+    return {row.keyword.split("-")[-1]: row for row in result.scalars().all()}
+
+
+@pytest.mark.asyncio
+async def test_refresh_scores_prompt_hits_incrementally(db_session: AsyncSession):
+    """测试增量刷新：新任务回溯提示词命中，新提示词只累加一次，命中的任务优先级更高"""
+    marker = f"prio{uuid.uuid4().hex[:8]}"
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    db_session.add(_prompt(f"please check {marker}-hot now", now - timedelta(hours=1)))
+    await db_session.commit()
+
+    await StagingService(db_session, "keywords").add_tasks([
+        StagingGlobalKeywords(id=str(uuid.uuid4()), keyword=f"{marker}-{name}", predicted_tag="AD",
+                              predicted_risk="Low", confidence=0.5, created_at=datetime(2024, 1, 1))
+        for name in ("hot", "cold")
+    ])
+    service = StagingPriorityService(db_session, "keywords")
+
+    try:
+        for _ in range(20):
+            await service.refresh()
+            rows = await _rows(db_session, marker)
+            if all(row.priority_at is not None for row in rows.values()):
+                break
+        assert rows["hot"].prompt_hits > 0
+        assert rows["cold"].prompt_hits == 0
+        assert rows["hot"].priority > rows["cold"].priority
+        hot_hits = rows["hot"].prompt_hits
+
+        db_session.add(_prompt(f"{marker}-COLD appears", now - timedelta(seconds=30)))
+        await db_session.commit()
+        result = await service.refresh()
+        rows = await _rows(db_session, marker)
+
+        assert result["hit_tasks"] >= 1
+        assert rows["cold"].prompt_hits > 0
+        # 已统计过的提示词不会重复计数
+        assert rows["hot"].prompt_hits == pytest.approx(hot_hits, rel=1e-3)
+    finally:
+        await db_session.execute(delete(StagingGlobalKeywords).where(StagingGlobalKeywords.keyword.like(f"{marker}-%")))
+        await db_session.execute(delete(PlaygroundHistory).where(PlaygroundHistory.app_id == "priority-test"))
+        await db_session.commit()
+        await StagingService(db_session, "keywords").counters.reconcile()
@@ -0,0 +1,81 @@
+"""
+智能标注批量审核测试
+"""
+import uuid
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.db_meta import StagingGlobalKeywords, StagingGlobalRules
+from app.services.staging import StagingService
+
+
+def _keyword(status="CLAIMED", claimed_by="alice", **kwargs):
+    return StagingGlobalKeywords(
+        id=str(uuid.uuid4()),
+        keyword=f"kw_{uuid.uuid4().hex[:8]}",
+        predicted_tag="AD",
+        predicted_risk="Low",
+        status=status,
+        claimed_by=claimed_by,
+        **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_batch_review_keywords(db_session: AsyncSession):
+    """测试批量审核：逐行计算 is_modified，校验归属，逐条返回结果"""
+    accepted = _keyword()
+    changed = _keyword()
+    others = _keyword(claimed_by="bob")
+    synced = _keyword(status="SYNCED")
+    db_session.add_all([accepted, changed, others, synced])
+    await db_session.commit()
+
+    service = StagingService(db_session, "keywords")
+    result = await service.batch_review("alice", [
+        {"id": accepted.id, "status": "REVIEWED"},
+        {"id": changed.id, "final_risk": "High", "status": "REVIEWED"},
+        {"id": others.id, "status": "REVIEWED"},
+        {"id": synced.id, "status": "IGNORED"},
+        {"id": "missing", "status": "REVIEWED"},
+        {"id": changed.id, "status": "IGNORED"},
+        {"id": str(uuid.uuid4()), "status": "CLAIMED"},
+    ])
+
+    assert result["success_count"] == 2
+    assert [r["success"] for r in result["results"]] == [True, True, False, False, False, False, False]
+    assert result["results"][2]["error"] == "Item is not claimed by current user"
+    assert result["results"][3]["error"] == "Item already synced"
+    assert result["results"][4]["error"] == "Item not found"
+
+    for item in (accepted, changed, others):
+        await db_session.refresh(item)
+    assert accepted.status == "REVIEWED" and accepted.is_modified is False
+    assert (accepted.final_tag, accepted.final_risk) == ("AD", "Low")
+    assert changed.is_modified is True and changed.final_risk == "High"
+    assert changed.annotator == "alice"
+    assert others.status == "CLAIMED"
+
+
+@pytest.mark.asyncio
+async def test_batch_review_rules_admin(db_session: AsyncSession):
+    """测试管理员可审核他人认领的规则"""
+    rule = StagingGlobalRules(
+        id=str(uuid.uuid4()),
+        tag_code="AD",
+        predicted_strategy="BLOCK",
+        status="CLAIMED",
+        claimed_by="bob",
+    )
+    db_session.add(rule)
+    await db_session.commit()
+
+    service = StagingService(db_session, "rules")
+    result = await service.batch_review(
+        "admin", [{"id": rule.id, "final_strategy": "PASS", "status": "REVIEWED"}], is_admin=True
+    )
+
+    assert result["failed_ids"] == []
+    await db_session.refresh(rule)
+    assert rule.final_strategy == "PASS" and rule.is_modified is True and rule.annotator == "admin"
@@ -0,0 +1,114 @@
+"""
+待审核库批量同步测试
+"""
+import uuid
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.db_meta import GlobalKeywords, RuleGlobalDefaults, StagingGlobalKeywords, StagingGlobalRules
+from app.services.keyword_similarity import normalized_hash
+from app.services.staging_sync import StagingSyncService
+
+
+def _rule(tag_code, extra_condition, strategy, status="REVIEWED"):
+    return StagingGlobalRules(
+        id=str(uuid.uuid4()),
+        tag_code=tag_code,
+        extra_condition=extra_condition,
+        predicted_strategy="BLOCK",
+        final_strategy=strategy,
+        status=status,
+    )
+
+
+@pytest.mark.asyncio
+async def test_sync_rules_upserts_and_bumps_version(db_session: AsyncSession):
+    """测试规则同步：已有行更新、新行插入、未审核的跳过，生成新版本与变更流水"""
+    tag = f"T_{uuid.uuid4().hex[:8]}"
+    existing = RuleGlobalDefaults(id=str(uuid.uuid4()), tag_code=tag, extra_condition=None,
+                                  strategy="BLOCK", is_active=True)
+    update_row = _rule(tag, None, "PASS")
+    insert_row = _rule(tag, "MINOR", "REVIEW")
+    pending_row = _rule(tag, "OTHER", "PASS", status="PENDING")
+    db_session.add_all([existing, update_row, insert_row, pending_row])
+    await db_session.commit()
+
+    service = StagingSyncService(db_session, "rules")
+    before = await service.get_current_version()
+    job = await service.create_sync_job(created_by="admin")
+    job = await service.run_sync(job.id, [update_row.id, insert_row.id, pending_row.id])
+
+    assert job.status == "COMPLETED"
+    assert (job.processed_rows, job.inserted_rows, job.updated_rows, job.skipped_rows) == (2, 1, 1, 1)
+
+    result = await db_session.execute(select(RuleGlobalDefaults).where(RuleGlobalDefaults.tag_code == tag))
+    strategies = {r.extra_condition: r.strategy for r in result.scalars().all()}
+    assert strategies == {None: "PASS", "MINOR": "REVIEW"}
+
+    for row in (update_row, insert_row, pending_row):
+        await db_session.refresh(row)
+    assert [update_row.status, insert_row.status, pending_row.status] == ["SYNCED", "SYNCED", "PENDING"]
+
+    assert await service.get_current_version() == before + 1
+    changes = await service.list_changes(since_version=before)
+    assert {(c.record_key, c.action) for c in changes["items"]} == {(f"{tag}|", "UPDATE"), (f"{tag}|MINOR", "INSERT")}
+
+
+@pytest.mark.asyncio
+async def test_sync_keywords_all_reviewed(db_session: AsyncSession):
+    """测试未指定任务时同步全部已审核关键词，已有关键词保持原 id 与启用状态"""
+    word = f"kw_{uuid.uuid4().hex[:8]}"
+    existing = GlobalKeywords(id=str(uuid.uuid4()), keyword=word, tag_code="AD",
+                              risk_level="Low", is_active=False)
+    staged = StagingGlobalKeywords(id=str(uuid.uuid4()), keyword=word, predicted_tag="AD",
+                                   predicted_risk="Low", final_tag="PORN", final_risk="High",
+                                   status="REVIEWED")
+    db_session.add_all([existing, staged])
+    await db_session.commit()
+
+    service = StagingSyncService(db_session, "keywords")
+    job = await service.create_sync_job(created_by="admin")
+    job = await service.run_sync(job.id)
+
+    assert job.status == "COMPLETED"
+    result = await db_session.execute(select(GlobalKeywords).where(GlobalKeywords.keyword == word))
+    rows = result.scalars().all()
+    assert len(rows) == 1
+    assert (rows[0].id, rows[0].tag_code, rows[0].risk_level, rows[0].is_active) == (existing.id, "PORN", "High", False)
+    assert rows[0].norm_hash == normalized_hash(word)
+
+
+@pytest.mark.asyncio
+async def test_sync_keywords_matches_case_variants(db_session: AsyncSession):
+    """测试关键词按大小写不敏感匹配正式库：大小写变体更新已有行，同一块内的多个变体只写入一次"""
+    word = f"Kw_{uuid.uuid4().hex[:8]}"
+    existing = GlobalKeywords(id=str(uuid.uuid4()), keyword=word, tag_code="AD",
+                              risk_level="Low", is_active=False)
+    first, last = sorted(str(uuid.uuid4()) for _ in range(2))
+    staged = [
+        StagingGlobalKeywords(id=first, keyword=word.upper(), predicted_tag="AD", predicted_risk="Low",
+                              final_tag="PORN", final_risk="High", status="REVIEWED"),
+        StagingGlobalKeywords(id=last, keyword=word.lower(), predicted_tag="AD", predicted_risk="Low",
+                              final_tag="FRAUD", final_risk="Medium", status="REVIEWED"),
+    ]
+    db_session.add_all([existing, *staged])
+    await db_session.commit()
+
+    service = StagingSyncService(db_session, "keywords")
+    before = await service.get_current_version()
+    job = await service.create_sync_job(created_by="admin")
+    job = await service.run_sync(job.id, [first, last])
+
+    assert job.status == "COMPLETED"
+    assert (job.inserted_rows, job.updated_rows) == (0, 1)
+    result = await db_session.execute(
+        select(GlobalKeywords).where(GlobalKeywords.norm_hash == normalized_hash(word))
+    )
+    rows = result.scalars().all()
+    assert len(rows) == 1
+    assert (rows[0].id, rows[0].keyword, rows[0].tag_code, rows[0].is_active) == (existing.id, word, "FRAUD", False)
+
+    changes = await service.list_changes(since_version=before)
+    assert [(c.record_id, c.record_key, c.action) for c in changes["items"]] == [(existing.id, word, "UPDATE")]